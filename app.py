@@ -1,12 +1,18 @@
 # LAUNCHER APP
+import startup_profile
+startup_profile.install_from_argv("app")  # before the heavy imports, see --profile-startup
 import sys
 import os
 import subprocess
 import threading
-import urllib.request
-import json
 import webbrowser
 import time
+import importlib
+import html
+import multiprocessing
+
+import metrics
+import update_check
 
 
 # TASKBAR ICON TWEAK FOR WINDOWS
@@ -41,7 +47,8 @@ except Exception:
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QGroupBox, QGridLayout, QMessageBox, QSizePolicy
+    QPushButton, QLabel, QGroupBox, QGridLayout, QMessageBox, QSizePolicy,
+    QDialog, QLineEdit, QComboBox, QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QSettings, QTimer
 from PyQt6.QtGui import QIcon, QAction
@@ -49,6 +56,18 @@ from PyQt6.QtGui import QIcon, QAction
 APPVER_FILE = os.path.join(os.path.dirname(__file__), 'appver.txt')
 DEFAULT_GITHUB_REPO = 'aamitn/plategen'
 
+# Sub-apps that can be opened inside the launcher process:
+# filename -> (module name, factory creating the top-level window from the module)
+HOSTED_APPS = {
+    'app_bch.py': ('app_bch', lambda m: m.RatingPlateGUI()),
+    'app_db.py': ('app_db', lambda m: m.DBRatingPlateGUI()),
+    'app_ups.py': ('app_ups', lambda m: m.UPSRatingPlateGUI()),
+    'app_np.py': ('app_np', lambda m: m.NameplateApp()),
+    'app_mgen_ups.py': ('app_mgen_ups', lambda m: m.UPSConfiguratorApp(m.DEFAULT_PARAMS, m.DEFAULT_LIST_DATA)),
+    'app_sticker.py': ('app_sticker', lambda m: m.StickerApp()),
+}
+PREWARM_DELAY_MS = 1500  # wait for the launcher to become idle before importing sub-apps
+
 
 def read_local_version():
     try:
@@ -58,24 +77,6 @@ def read_local_version():
         return 'v0.0.0'
 
 
-def fetch_latest_github_release(repo, timeout=8):
-    """Return (tag, html_url, err) for latest release of repo 'owner/repo'."""
-    if not repo or '/' not in repo:
-        return None, None, 'No repo configured'
-    url = f'https://api.github.com/repos/{repo}/releases/latest'
-    req = urllib.request.Request(url, headers={'User-Agent': 'plategen-launcher'})
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            if resp.status != 200:
-                return None, None, f'HTTP {resp.status}'
-            data = resp.read().decode('utf-8')
-            j = json.loads(data)
-            tag = j.get('tag_name') or j.get('name')
-            html = j.get('html_url')
-            return tag, html, None
-    except Exception as e:
-        return None, None, str(e)
-
 def get_app_dir():
     if getattr(sys, 'frozen', False):
         # running from PyInstaller EXE
@@ -84,6 +85,127 @@ def get_app_dir():
         # running from source
         return os.path.dirname(os.path.abspath(__file__))
 
+class PlateHistoryDialog(QDialog):
+    """Search the plate history (plate_history.py) and render, export or re-queue past plates."""
+
+    COLUMNS = ['ID', 'Last Used', 'Tool', 'Project', 'Order', 'Year', 'Label', 'Uses']
+
+    def __init__(self, store, render, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Plate History')
+        self.resize(820, 480)
+        self.store = store
+        self.render = render  # callable(snapshot ids) drawing them into AutoCAD
+
+        layout = QVBoxLayout(self)
+        search_row = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText('Project, order, product text, 63A MCCB, ...')
+        self.search_edit.setClearButtonEnabled(True)
+        search_row.addWidget(self.search_edit, 1)
+        self.tool_combo = QComboBox()
+        self.tool_combo.addItems(['All', 'BCH', 'DB', 'UPS'])
+        search_row.addWidget(self.tool_combo)
+        layout.addLayout(search_row)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeMode.Stretch)
+        self.table.doubleClicked.connect(self.render_selected)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.status = QLabel('')
+        buttons.addWidget(self.status, 1)
+        for label, slot in (('Render', self.render_selected), ('Export SVG/PDF', self.export_selected),
+                            ('Add to Job', self.add_selected_to_job), ('Delete', self.delete_selected),
+                            ('Close', self.reject)):
+            btn = QPushButton(label)
+            btn.clicked.connect(slot)
+            buttons.addWidget(btn)
+        layout.addLayout(buttons)
+
+        # Search as you type, once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.refresh)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        self.tool_combo.currentIndexChanged.connect(self.refresh)
+        self.refresh()
+
+    def refresh(self):
+        tool = self.tool_combo.currentText().lower()
+        found = self.store.search(self.search_edit.text(), None if tool == 'all' else tool)
+        self.table.setRowCount(len(found))
+        for row, snap in enumerate(found):
+            cells = [snap.id, time.strftime('%Y-%m-%d %H:%M', time.localtime(snap.last_used)), snap.tool.upper(),
+                     snap.project_no or '', snap.order_no or '', snap.year or '', snap.label, snap.uses]
+            for col, value in enumerate(cells):
+                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+        self.table.resizeColumnsToContents()
+        self.status.setText(f'{len(found)} of {self.store.count()} plates')
+
+    def selected_ids(self):
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        ids = [int(self.table.item(row, 0).text()) for row in rows]
+        if not ids:
+            QMessageBox.information(self, 'Plate History', 'Select one or more plates first.')
+        return ids
+
+    def render_selected(self):
+        ids = self.selected_ids()
+        if ids:
+            self.render(ids)
+            self.refresh()
+
+    def export_selected(self):
+        import plate_export
+        import plate_history
+        import plate_job
+
+        ids = self.selected_ids()
+        if not ids:
+            return
+        try:
+            job = plate_history.job_for(self.store.get(ids))
+            jobs = plate_job.layout_jobs(job)
+        except Exception as e:
+            QMessageBox.critical(self, 'Plate History', f'Could not lay out the plates:\n{e}')
+            return
+        if plate_export.export_dialog(self, jobs, job['sheet']):
+            self.store.touch(ids)
+            self.refresh()
+
+    def add_selected_to_job(self):
+        import plate_job
+
+        ids = self.selected_ids()
+        if not ids:
+            return
+        try:
+            for snap in self.store.get(ids):
+                count = plate_job.add_plate(snap.tool, snap.config, snap.label)
+        except Exception as e:
+            QMessageBox.critical(self, 'Plate History', f'Could not add the plates to the job:\n{e}')
+            return
+        self.store.touch(ids)
+        self.refresh()
+        QMessageBox.information(self, 'Job', f'{len(ids)} plate(s) added to the job ({count} entries).')
+
+    def delete_selected(self):
+        ids = self.selected_ids()
+        if not ids:
+            return
+        answer = QMessageBox.question(self, 'Plate History', f'Delete {len(ids)} plate(s) from the history?')
+        if answer == QMessageBox.StandardButton.Yes:
+            self.store.delete(ids)
+            self.refresh()
+
+
 class LauncherWindow(QMainWindow):
     release_check_finished = pyqtSignal(object, object, object)
     
@@ -96,6 +218,10 @@ class LauncherWindow(QMainWindow):
         # Store COM object reference here if found active, otherwise None
         self.acad_com_ref = None 
 
+        # Sub-app windows opened in this process (kept referenced until closed)
+        self.hosted_windows = []
+        self.in_process_enabled = False
+
         # apps: list of tuples (label, filename_without_path)
         here = get_app_dir()
         if apps is None:
@@ -122,6 +248,10 @@ class LauncherWindow(QMainWindow):
 
         self.release_check_finished.connect(self._on_release_check_finished)
 
+        # Import the hosted sub-apps in the background once the launcher is idle
+        if self.in_process_action.isChecked():
+            QTimer.singleShot(PREWARM_DELAY_MS, self._start_prewarm)
+
     def _init_menu(self):
         menubar = self.menuBar()
         settings_menu = menubar.addMenu('Settings')
@@ -139,6 +269,14 @@ class LauncherWindow(QMainWindow):
         self.auto_open_acad_action.toggled.connect(self._on_auto_open_acad_toggled)
         settings_menu.addAction(self.auto_open_acad_action)
         
+        # Open tools as windows of the launcher instead of separate processes (persisted)
+        self.in_process_action = QAction('Open tools inside launcher (faster)', self, checkable=True)
+        inproc = self.settings.value('in_process', False, type=bool)
+        self.in_process_action.setChecked(inproc)
+        self.in_process_enabled = inproc
+        self.in_process_action.toggled.connect(self._on_in_process_toggled)
+        settings_menu.addAction(self.in_process_action)
+
         # Add a menu option to manually kill AutoCAD
         kill_acad_action = QAction('Kill AutoCAD Process(es)', self)
         kill_acad_action.triggered.connect(self.kill_autocad_process)
@@ -149,6 +287,10 @@ class LauncherWindow(QMainWindow):
         chk_action.triggered.connect(self.check_for_update)
         help_menu.addAction(chk_action)
 
+        stats_action = QAction('Timing Statistics', self)
+        stats_action.triggered.connect(self.show_timing_stats)
+        help_menu.addAction(stats_action)
+
         about_action = QAction('About', self)
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
@@ -213,6 +355,18 @@ class LauncherWindow(QMainWindow):
         self.launch_template_btn.setToolTip('Opens acadiso.dwt as a new drawing in AutoCAD.')
         self.launch_template_btn.clicked.connect(self.launch_autocad_template)
         bottom.addWidget(self.launch_template_btn)
+
+        # Render the plates collected by the tools' "Add to Job" into one drawing
+        self.render_job_btn = QPushButton('Render Job')
+        self.render_job_btn.setToolTip('Draws all plates added to the job (BCH, DB, UPS) into one new drawing.')
+        self.render_job_btn.clicked.connect(self.render_job)
+        bottom.addWidget(self.render_job_btn)
+
+        # Past plates of every tool, for repeat orders (plate_history.py)
+        self.history_btn = QPushButton('Plate History')
+        self.history_btn.setToolTip('Search previously generated plates and render them again.')
+        self.history_btn.clicked.connect(self.show_plate_history)
+        bottom.addWidget(self.history_btn)
         
         bottom.addWidget(self.kill_acad_btn)
         
@@ -231,7 +385,7 @@ class LauncherWindow(QMainWindow):
 
         # if auto-check enabled on start, trigger background check
         if self.auto_update_action.isChecked():
-            QTimerThread(self._start_release_check).start()
+            update_check.check_async(self.repo, self._emit_auto_release_check)
 
         # Start periodic AutoCAD status checks (every 3s)
         self.acad_timer = QTimer(self)
@@ -244,6 +398,11 @@ class LauncherWindow(QMainWindow):
     def _make_launcher(self, path):
         def _launch():
             try:
+                # In-process hosting: open the window in this Qt process
+                if self.in_process_action.isChecked() and os.path.basename(path) in HOSTED_APPS:
+                    if self._open_hosted(path):
+                        return
+
                 # Check for .exe (PyInstaller mode)
                 exe_path = os.path.splitext(path)[0] + '.exe'
                 if os.path.exists(exe_path):
@@ -269,6 +428,76 @@ class LauncherWindow(QMainWindow):
         return _launch
 
 
+    # --- In-process hosting ---
+
+    def _open_hosted(self, path):
+        """Open a sub-app window inside the launcher. Returns False to fall back to spawning."""
+        module_name, factory = HOSTED_APPS[os.path.basename(path)]
+        self.statusBar().showMessage(f'Opening {module_name}...')
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            # Sub-apps use relative paths (appver.txt, templates, databases)
+            os.chdir(get_app_dir())
+            module = importlib.import_module(module_name)
+            window = factory(module)
+        except Exception as e:
+            print(f"In-process launch of {module_name} failed, spawning instead: {e}")
+            self.statusBar().showMessage(f'Version: {read_local_version()}')
+            return False
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        window.destroyed.connect(lambda _=None, w=window: self._forget_hosted(w))
+        self.hosted_windows.append(window)
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        self.statusBar().showMessage(f'Version: {read_local_version()}')
+        return True
+
+    def _forget_hosted(self, window):
+        try:
+            self.hosted_windows.remove(window)
+        except ValueError:
+            pass
+
+    def _start_prewarm(self):
+        # Module-level code of the sub-apps reads relative paths; the working
+        # directory is process-wide, so set it here on the GUI thread
+        try:
+            os.chdir(get_app_dir())
+        except Exception:
+            pass
+        threading.Thread(target=self._prewarm_modules, name='prewarm', daemon=True).start()
+
+    def _prewarm_modules(self):
+        """Import the hosted sub-app modules (and their heavy dependencies) ahead of use."""
+        for module_name, _ in HOSTED_APPS.values():
+            if not self.in_process_enabled:
+                return
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                print(f"Pre-warm of {module_name} skipped: {e}")
+
+    def _on_in_process_toggled(self, checked):
+        self.settings.setValue('in_process', bool(checked))
+        self.in_process_enabled = bool(checked)
+        if checked:
+            self._start_prewarm()
+
+    def closeEvent(self, event):
+        # Hosted tools live in this process; closing the launcher closes them too
+        for window in list(self.hosted_windows):
+            try:
+                if not window.close():
+                    event.ignore()
+                    return
+            except RuntimeError:
+                pass
+        event.accept()
+
     def _on_auto_update_toggled(self, checked):
         self.settings.setValue('auto_update', bool(checked))
 
@@ -351,6 +580,57 @@ class LauncherWindow(QMainWindow):
             )
 
 
+    def render_job(self):
+        """Renders the shared plate job (plate_job.py) into one new drawing."""
+        import plate_job
+
+        try:
+            job = plate_job.load_job()
+        except Exception as e:
+            QMessageBox.critical(self, 'Job Error', str(e))
+            return
+        if not job['plates']:
+            QMessageBox.information(self, 'Render Job', 'The job is empty. Use "Add to Job" in the BCH, DB or UPS tool first.')
+            return
+
+        try:
+            self.launch_autocad(wait=True)
+            plates, sheets = plate_job.render_job()
+        except Exception as e:
+            QMessageBox.critical(self, 'AutoCAD Error', f"Could not render the job:\n{e}")
+            return
+
+        answer = QMessageBox.question(
+            self, 'Render Job',
+            f"Rendered {plates} plates on {sheets} sheet(s).\n\nClear the job?"
+        )
+        if answer == QMessageBox.StandardButton.Yes:
+            plate_job.clear_job()
+
+
+    def show_plate_history(self):
+        """Opens the plate history (plate_history.py) to re-render past plates."""
+        import plate_history
+
+        store = plate_history.get_store()
+        if store is None:
+            QMessageBox.critical(self, 'Plate History', f'Could not open {plate_history.history_path()}')
+            return
+        PlateHistoryDialog(store, self.render_snapshots, self).exec()
+
+    def render_snapshots(self, snapshot_ids):
+        """Renders plate history snapshots into one new drawing."""
+        import plate_history
+
+        try:
+            self.launch_autocad(wait=True)
+            plates, sheets = plate_history.render_snapshots(snapshot_ids, plate_history.get_store())
+        except Exception as e:
+            QMessageBox.critical(self, 'AutoCAD Error', f"Could not render the plates:\n{e}")
+            return
+        QMessageBox.information(self, 'Plate History', f"Rendered {plates} plates on {sheets} sheet(s).")
+
+
     # --- AutoCAD Status and Control Methods ---
 
     def _get_autocad_pids(self):
@@ -723,11 +1003,12 @@ class LauncherWindow(QMainWindow):
     def check_for_update(self):
         self.statusBar().showMessage('Checking latest release...')
         self.update_btn.setEnabled(False)
-        threading.Thread(target=self._start_release_check, daemon=True).start()
+        update_check.check_async(self.repo, self.release_check_finished.emit, force=True)
 
-    def _start_release_check(self):
-        tag, url, err = fetch_latest_github_release(self.repo)
-        self.release_check_finished.emit(tag, url, err)
+    def _emit_auto_release_check(self, tag, url, err):
+        # Startup check: only speak up when there is something to update to
+        if tag and not err and tag.strip() != read_local_version().strip():
+            self.release_check_finished.emit(tag, url, err)
 
     def _on_release_check_finished(self, tag, url, err):
         self.update_btn.setEnabled(True)
@@ -751,33 +1032,49 @@ class LauncherWindow(QMainWindow):
 
     def show_about(self):
         cur = read_local_version()
-        # This part should probably be moved to a separate thread like check_for_update,
-        # but maintaining the user's original immediate fetch for 'About'.
-        tag, url, err = fetch_latest_github_release(self.repo, timeout=6) 
+        # Only the cached answer: About never waits on the network
+        cached = update_check.get_checker().cached(self.repo)
         body = f"Plategen Launcher\nVersion: {cur}\nRepo: {self.repo}\n"
-        if tag:
+        if cached:
+            tag, url, _ = cached
             body += f"Latest release: {tag}\n{url}\n"
-        if err:
-            body += f"(Latest lookup failed: {err})\n"
+        else:
+            body += "Latest release: not checked yet (Help > Check for update)\n"
+            update_check.check_async(self.repo)  # have it ready next time
         QMessageBox.information(self, 'About Plategen', body)
 
-
-class QTimerThread(threading.Thread):
-    """Utility thread for delayed UI-safe start (very small helper)."""
-    def __init__(self, fn, delay=0.1):
-        super().__init__(daemon=True)
-        self.fn = fn
-        self.delay = delay
-
-    def run(self):
-        time.sleep(self.delay)
-        try:
-            self.fn()
-        except Exception:
-            pass
+    def show_timing_stats(self):
+        """p50/p95 per operation from the metrics files of every workstation (see metrics.py)."""
+        records = metrics.load()
+        table = metrics.format_stats(metrics.summarize(records))
+        hosts = len({r.get('host') for r in records})
+        box = QMessageBox(self)
+        box.setWindowTitle('Timing Statistics')
+        box.setTextFormat(Qt.TextFormat.RichText)
+        box.setText(f"<pre>{html.escape(table)}</pre>"
+                    f"{len(records)} measurements from {hosts} workstation(s) in {html.escape(str(metrics.metrics_dir()))}")
+        box.exec()
 
 
 def main():
+    # Process pool workers (queue CPU lanes, hosted UPS batch) re-run this exe with
+    # --multiprocessing-fork; freeze_support() runs the worker and exits instead of
+    # opening another launcher window
+    multiprocessing.freeze_support()
+    # The subcommands print to the console: run them with plategen-cli.exe, the
+    # console build (plategen.exe is windowed and has no stdout).
+    # "plategen stats ..." prints the timing summary instead of opening the launcher
+    if len(sys.argv) > 1 and sys.argv[1] == 'stats':
+        sys.exit(metrics.main(sys.argv[1:]))
+    # "plategen history ..." searches and re-renders past plates (plate_history.py)
+    if len(sys.argv) > 1 and sys.argv[1] == 'history':
+        import plate_history
+        sys.exit(plate_history.main(sys.argv[2:]))
+    # "plategen queue ..." runs the unattended job queue (job_daemon.py)
+    if len(sys.argv) > 1 and sys.argv[1] == 'queue':
+        import job_daemon
+        sys.exit(job_daemon.main(sys.argv[2:]))
+
     set_windows_app_id()
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
@@ -789,6 +1086,7 @@ def main():
 
     w = LauncherWindow(repo=repo)
     w.show()
+    startup_profile.mark_first_window(w)
     sys.exit(app.exec())
 
 
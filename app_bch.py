@@ -1,9 +1,12 @@
 # CHARGER RATING PLATE GENERATOR
-import win32com.client
-import pythoncom
-from array import array
-import urllib.request
-import json
+import startup_profile
+startup_profile.install_from_argv("app_bch")  # before the heavy imports, see --profile-startup
+try:
+    import win32com.client
+    import pythoncom
+except Exception:
+    win32com = None
+    pythoncom = None
 import webbrowser
 import os
 import time
@@ -12,13 +15,21 @@ from datetime import datetime
 import re
 import subprocess
 import base64
+import update_check
+import metrics
+import plate_layout
+import sheet_nesting
+import plate_job
+import plate_export
+import plate_history
+from plate_drawing import DrawingSession
+from plate_preview import PreviewPanel, confirm_overflows, preview_dock
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QComboBox, 
                              QPushButton, QGroupBox, QGridLayout, QScrollArea,
                              QMessageBox, QDoubleSpinBox, QSpinBox, QCheckBox)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QAction, QIcon
-import math
 
 # Application version
 try:
@@ -29,34 +40,7 @@ except Exception:
     
 # 2. Append the required suffix
 APP_VERSION = f"{base_version}-bch"
-
-# -----------------------------
-# SAFEARRAY helpers
-# -----------------------------
-def make_safearray_3d(points):
-    arr = array('d')
-    for x, y, z in points:
-        arr.extend([float(x), float(y), float(z)])
-    return win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, arr)
-
-def make_point_variant(x, y, z=0.0):
-    
-    arr = array('d', [float(x), float(y), float(z)])
-    return win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, arr)
-
-# -----------------------------
-# Text style (Consolas) helper
-# -----------------------------
-def ensure_consolas_style(doc):
-    """
-    DEBUG MODE:
-    Simply return AutoCAD standard style to avoid font issues.
-    """
-    styles = doc.TextStyles
-    try:
-        return styles.Item("Standard")
-    except:
-        return styles.Add("Standard")
+GITHUB_REPO = "aamitn/plategen"
 
 
 def compute_fiscal_yy(year, ref_date=None):
@@ -78,26 +62,6 @@ def compute_fiscal_yy(year, ref_date=None):
     return start % 100, end % 100
 
 
-def fetch_latest_github_release(repo):
-    """Return latest release tag for a given GitHub repo 'owner/repo'."""
-    if not repo or '/' not in repo:
-        return None, None, 'No repo configured'
-
-    url = f"https://api.github.com/repos/{repo}/releases/latest"
-    req = urllib.request.Request(url, headers={"User-Agent": "plategen-agent"})
-    try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            if resp.status != 200:
-                return None, None, f"HTTP {resp.status}"
-            data = resp.read().decode('utf-8')
-            j = json.loads(data)
-            tag = j.get('tag_name') or j.get('name')
-            html_url = j.get('html_url')
-            return tag, html_url, None
-    except Exception as e:
-        return None, None, str(e)
-
-
 def compare_versions(local, remote):
     """Compare two version strings. Return -1 if remote>local, 0 if equal, 1 if local>remote."""
     if not local or not remote:
@@ -129,586 +93,86 @@ def compare_versions(local, remote):
         return 0
 
 # -----------------------------
-# Primitives: rectangles, lines, text, mtext
+# Main rating plate drawer
 # -----------------------------
-def add_rect(ms, x1, y1, x2, y2):
-    pts = [(x1,y1,0),(x2,y1,0),(x2,y2,0),(x1,y2,0),(x1,y1,0)]
-    v = make_safearray_3d(pts)
-    pl = ms.AddPolyline(v)
-    pl.Closed = True
-    return pl
-
-def add_line(ms, x1, y1, x2, y2):
-    p1 = make_point_variant(x1, y1, 0)
-    p2 = make_point_variant(x2, y2, 0)
-    return ms.AddLine(p1,p2)
-
-def add_text(ms, text, x, y, height, style):
-    p = make_point_variant(x, y, 0)
-    t = ms.AddText(text, p, float(height))
-    t.StyleName = style.Name
-    return t
-    
-def add_bold_text(ms, text, x, y, height, width=200):
-    """
-    Adds bold Consolas text using MTEXT formatting.
-    Works even if AutoCAD styles are not bold.
-    """
-    if win32com is None:
-        return None
-    
-    formatted = fr"\fConsolas|b1;{text}"
-    
-    mt = ms.AddMText(
-        make_point_variant(x, y),
-        float(width),
-        formatted
-    )
-    mt.Height = float(height)
-    
-    # Center-left style (optional)
-    try:
-        mt.Attachment = 2
-    except:
-        pass
-    
-    return mt
-
-
-def add_mtext(ms, text, x, y, width, height, style):
-    p = make_point_variant(x, y, 0)
-    mt = ms.AddMText(p, float(width), text)
-    mt.Height = float(height)
-    mt.StyleName = style.Name
-    try:
-        mt.Attachment = 2
-    except Exception:
-        pass
-    return mt
-
-def align_label(label, width=8):
-    return label.ljust(width)
-
-def add_dimension_aligned(ms, x1, y1, x2, y2, dim_x, dim_y, override_text=None, text_height=None):
-    """
-    Add an aligned dimension between (x1,y1) and (x2,y2) with
-    dimension line passing through (dim_x,dim_y).
-    """
-    p1 = make_point_variant(x1, y1)
-    p2 = make_point_variant(x2, y2)
-    p_dim_alligned = make_point_variant(dim_x - 3, dim_y - 3)
-    dim = ms.AddDimAligned(p1, p2, p_dim_alligned)
-
-    try:
-        dim.TextFill = False
-    except Exception:
-        pass
-    
-    dim.TextGap = 1.5
-
-    content = override_text if override_text is not None else "<>"
-    final_override = r"\FConsolas;"
-
-    if text_height:
-        final_override += r"\H{0};".format(text_height)
-    
-    final_override += content
-    dim.TextOverride = final_override
-    
-    return dim
-
-def insert_scaled_block(ms, block_path, x, y, target_w, target_h):
-    ins_pt = make_point_variant(x, y, 0)
-    blk = ms.InsertBlock(ins_pt, block_path, 1.0, 1.0, 1.0, 0)
-
-    try:
-        blk.Update()
-    except:
-        pass
-
-    bb = blk.GetBoundingBox()
-    (xmin, ymin, zmin) = bb[0]
-    (xmax, ymax, zmax) = bb[1]
-
-    bw = xmax - xmin
-    bh = ymax - ymin
-
-    if bw == 0 or bh == 0:
-        print("Block has zero geometry.")
-        return blk
-
-    sx = target_w / bw
-    sy = target_h / bh
-    s = min(sx, sy)
+def _plate_layout(config):
+    """Layout template name and its params for ``config`` (see layouts/bch_*.json)."""
+    mode = config.get('mode', 'single')
+    params = dict(config)
+    # Older configs carry the bottom extension per mode
+    if config.get(f'bottom_extra_{mode}') is not None:
+        params['bottom_extra'] = config[f'bottom_extra_{mode}']
+    return f"bch_{mode}", params
 
-    blk.XScaleFactor = s
-    blk.YScaleFactor = s
-    blk.ZScaleFactor = s
 
-    blk.Update()
-    bb2 = blk.GetBoundingBox()
-    (xmin2, ymin2, zmin2) = bb2[0]
+def _plate_values(config):
+    """Text values for one plate: the config plus the derived serial-number fields."""
+    values = dict(config)
+    year = config.get('year', datetime.now().year)
+    yy1, yy2 = compute_fiscal_yy(year)
+    values['year'] = year
+    values['fy_range'] = f"{yy1:02d}-{yy2:02d}"
+    return values
 
-    dx = x - xmin2
-    dy = y - ymin2
 
-    blk.Move(make_point_variant(0, 0, 0), make_point_variant(dx, dy, 0))
+def job_plates(config):
+    """Layout jobs ``(plan, values, count)`` for this config (used by plate_job)."""
+    name, params = _plate_layout(config)
+    return [(plate_layout.plan_for(name, params), _plate_values(config), max(1, int(config.get('units', 1))))]
 
-    # Try to ensure the block reference retains its original colors when duplicated.
-    # Some AutoCAD setups may render inserted DWG blocks as black when the block
-    # definition is reused across multiple inserts. Try setting the block reference
-    # to ByLayer (color index 256) and, if necessary, explode the block as a fallback
-    # so constituent entities retain their colors.
-    try:
-        try:
-            blk.Color = 256
-            blk.Update()
-        except Exception:
-            pass
 
-        # Explode fallback: explode and set entity colors to ByLayer where possible
-        try:
-            ents = blk.Explode()
-            # If Explode returned a collection/tuple, iterate and set color
-            if ents is not None:
-                try:
-                    for e in ents:
-                        try:
-                            e.Color = 256
-                        except Exception:
-                            pass
-                except TypeError:
-                    # single entity
-                    try:
-                        ents.Color = 256
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-    except Exception:
-        pass
+def sheet_options(config):
+    """Sheet size, kerf and rotation for nesting this config's plates (AutoCAD and SVG/PDF export)."""
+    return {
+        'sheet_width': float(config.get('sheet_width', sheet_nesting.DEFAULT_SHEET_WIDTH)),
+        'sheet_height': float(config.get('sheet_height', sheet_nesting.DEFAULT_SHEET_HEIGHT)),
+        'kerf': float(config.get('plate_gap', sheet_nesting.DEFAULT_KERF)),
+        'allow_rotate': config.get('allow_rotate', False),
+    }
 
-    return blk
 
-# -----------------------------
-# Main rating plate drawer
-# -----------------------------
 def draw_rating_plate(doc, config, suppress_zoom=False):
     """
     Draw rating plate using configuration from GUI
     """
-    plate_w = config.get('plate_width', 150.0)
-    plate_h = config.get('plate_height', 100.0)
-    margin = config.get('margin', 3.0)
-    offset_x = config.get('offset_x', 100.0)
-    offset_y = config.get('offset_y', 100.0)
-    label_w = config.get('label_w', 40.0)
-    product_h = config.get('product_h', 20.0)
-    row_h = config.get('row_h', 10.0)
-    logo_w = config.get('logo_width', 35.0)
-    logo_h = config.get('logo_height', 20.0)
-    draw_logo_box = config.get('draw_logo_box', False)
-    
-    mode = config.get('mode', 'single')
-    bottom_extra_single = config.get('bottom_extra_single', 3)
-    bottom_extra_dual = config.get('bottom_extra_dual', 13.0)
-    bottom_extra_ffcb = config.get('bottom_extra_ffcb', 13.0)
-    bottom_extra_dualsf = config.get('bottom_extra_dualsf', 18.0)
-    
-    dimension_text_size = config.get('dim_text_size', 5)
-
-    style = ensure_consolas_style(doc)
-    
-    ms = doc.ModelSpace
-
-    ox = offset_x
-    oy = offset_y
-    w = plate_w
-    h = plate_h
-    
-    # Choose bottom extension per mode
-    if mode == 'ffcb':
-        bottom_extra = float(bottom_extra_ffcb)
-    elif mode == 'dual':
-        bottom_extra = float(bottom_extra_dual)
-    elif mode == 'dualsf':
-        bottom_extra = float(bottom_extra_dualsf)
-    else:
-        bottom_extra = float(bottom_extra_single)
-
-    outer_top = oy + h
-    outer_bottom = oy - bottom_extra
-
-    # Outer + inner frames
-    add_rect(ms, ox, outer_bottom, ox + w, outer_top)
-    add_rect(ms, ox + margin, outer_bottom + margin, ox + w - margin, outer_top - margin)
-    # Get dimension override values
-    dim_width_override = config.get('dim_width_override', None)
-    dim_height_override = config.get('dim_height_override', None)
-    
-    # Use override if provided, otherwise calculate from actual dimensions
-    width_text = f"{dim_width_override:.1f} mm" if dim_width_override else f"{w:.1f} mm"
-    height_text = f"{dim_height_override:.1f} mm" if dim_height_override else f"{(h + bottom_extra):.1f} mm"
-    
-    # Dimensions
-    add_dimension_aligned(
-        ms, ox, outer_bottom, ox + w, outer_bottom,
-        ox + w/2, outer_bottom - 8,
-        width_text, text_height=dimension_text_size
-    )
-
-    # Height dimension: rotate the dimension text vertically for readability
-    dim_h = add_dimension_aligned(
-        ms, ox, outer_bottom, ox, outer_top,
-        ox - 10, outer_top - (h + bottom_extra)/2.0,
-        height_text, text_height=dimension_text_size
-    )
-    try:
-        import math as _math
-        if dim_h is not None:
-            try:
-                dim_h.TextRotation = _math.pi / 2
-            except Exception:
-                pass
-    except Exception:
-        pass
-    
-    ux1 = ox + margin
-    uy1 = outer_bottom + margin
-    ux2 = ox + w - margin
-    uy2 = outer_top - margin
-
-    sep_gap = 2.0
-    y_top_inner = uy2
-    y = y_top_inner
-
-    # PRODUCT row
-    y_bottom_product = y - product_h
-    add_rect(ms, ux1, y_bottom_product, ux2, y)
-    add_bold_text(ms, "PRODUCT", ux1 + 3, y - 8, 4)
-
-    vertical_shift = 3.0
-    vx = ux1 + label_w + sep_gap + vertical_shift
-    data_x = vx + 2.0
-
-    col1_x = data_x
-    col1_w = (ux2 - data_x) * 0.5 - 6
-    col2_x = data_x + col1_w + 8
-
-    mtext_w = (ux2 - data_x) - 4.0
-    mt_top = y - 2
-    product_font_h = config.get('product_font_h', 2.0)
-
-    product_desc = config.get('product_desc', 'DEFAULT_PRODUCT_DESCRIPTION')
-    add_mtext(ms, r"\fConsolas|b1;" + product_desc, data_x, mt_top, mtext_w, product_font_h, style)
-
-    y = y_bottom_product
-
-    # INPUT VOLTAGE row
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    add_text(ms, "INPUT VOLTAGE", ux1 + 3, y - 6, 3.0, style)
-    
-    input_voltage = config.get('input_voltage', '415V AC, 3 PHASE, 4 WIRES, 50HZ')
-    add_text(ms, input_voltage, data_x, y - 6, 3.0, style)
-    y = y_bottom
-
-    # 3-column block (OUTPUT VOLTAGE + OUTPUT CURRENT)
-    three_top = y
-
-    if mode in ('dual', 'ffcb', 'dualsf'):
-        y_header_bottom = y - row_h
-        add_rect(ms, ux1, y_header_bottom, ux2, y)
-        add_text(ms, "OUTPUT VOLT-AMP", ux1 + 3, y - 6, 2.8, style)
-
-        if mode == 'dual':
-            left_label = "CHARGER-I"
-            right_label = "CHARGER-II"
-            shift_left = -12
-        elif mode == 'dualsf':
-            left_label = "CHARGER-I"
-            right_label = "CHARGER-II"
-            shift_left = -18
-        else:  # ffcb
-            left_label = "FLOAT CHARGER"
-            right_label = "FCB CHARGER"
-            shift_left = -18
-
-        col1_center_x = col1_x + (col1_w / 2.0)
-        col2_w = (ux2 - col2_x) - 4.0
-        col2_center_x = col2_x + (col2_w / 2.0)
-
-        add_bold_text(ms, left_label, col1_center_x + shift_left, y - 3, 3.0)
-        add_bold_text(ms, right_label, col2_center_x + shift_left, y - 3, 3.0)
-
-        y = y_header_bottom
-
-    # OUTPUT VOLTAGE
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    add_text(ms, "OUTPUT VOLTAGE", ux1 + 3, y - 6, 3.0, style)
-
-    if mode == 'dual':
-        float_y = y - 4
-        boost_y = y - 8
-        ch1_fv = config.get('ch1_float_voltage', 123.75)
-        ch1_bv = config.get('ch1_boost_voltage', 126.5)
-        ch2_fv = config.get('ch2_float_voltage', 123.75)
-        ch2_bv = config.get('ch2_boost_voltage', 126.5)
-        
-        add_text(ms, f"FLOAT : {ch1_fv}V", col1_x + 2, float_y, 3.0, style)
-        add_text(ms, f"BOOST : {ch1_bv}V", col1_x + 2, boost_y, 3.0, style)
-        add_text(ms, f"FLOAT : {ch2_fv}V", col2_x + 2, float_y, 3.0, style)
-        add_text(ms, f"BOOST : {ch2_bv}V", col2_x + 2, boost_y, 3.0, style)
-        
-    elif mode == 'dualsf':
-        float_y = y - 4
-        boost_y = y - 8
-        ch1_fv = config.get('ch1_float_voltage', 54.0)
-        ch1_bv = config.get('ch1_boost_voltage', 66.0)
-        ch2_fv = config.get('ch2_float_voltage', 54.0)
-        ch2_bv = config.get('ch2_boost_voltage', 66.0)
-        
-        add_text(ms, f"FLOAT : {ch1_fv}V", col1_x + 2, float_y, 3.0, style)
-        add_text(ms, f"BOOST : {ch1_bv}V", col1_x + 2, boost_y, 3.0, style)
-        add_text(ms, f"FLOAT : {ch2_fv}V", col2_x + 2, float_y, 3.0, style)
-        add_text(ms, f"BOOST : {ch2_bv}V", col2_x + 2, boost_y, 3.0, style)
-        
-    elif mode == 'ffcb':
-        float_charger_v = config.get('float_charger_voltage', 123.75)
-        fcb_fv = config.get('fcb_float_voltage', 123.75)
-        fcb_bv = config.get('fcb_boost_voltage', 126.5)
-        
-        add_text(ms, f"{float_charger_v}V", col1_x + 2, y - 6, 3.0, style)
-        float_y = y - 4
-        boost_y = y - 8
-        add_text(ms, f"FLOAT : {fcb_fv}V", col2_x + 2, float_y, 3.0, style)
-        add_text(ms, f"BOOST : {fcb_bv}V", col2_x + 2, boost_y, 3.0, style)
-        
-    else:  # single
-        fv = config.get('float_voltage', 123.75)
-        bv = config.get('boost_voltage', 126.5)
-        add_text(ms, f"FLOAT : {fv}V", col1_x + 2, y - 6, 3.0, style)
-        add_text(ms, f"BOOST : {bv}V", col2_x + 2, y - 6, 3.0, style)
-
-    y = y_bottom
-
-    # OUTPUT CURRENT
-    current_row_h = row_h * 1.5 if mode == 'dualsf' else row_h
-    y_bottom2 = y - current_row_h
-    add_rect(ms, ux1, y_bottom2, ux2, y)
-    
-    if mode == 'dualsf':
-        add_text(ms, "OUTPUT CURRENT", ux1 + 3, y - 9, 3.0, style)
-    else:
-        add_text(ms, "OUTPUT CURRENT", ux1 + 3, y - 6, 3.0, style)
-
-    if mode == 'dual':
-        float_y = y - 4
-        boost_y = y - 8
-        ch1_fc = config.get('ch1_float_current', 20.0)
-        ch1_bc = config.get('ch1_boost_current', 20.0)
-        ch2_fc = config.get('ch2_float_current', 20.0)
-        ch2_bc = config.get('ch2_boost_current', 20.0)
-        
-        add_text(ms, f"FLOAT : {ch1_fc}A", col1_x + 2, float_y, 3.0, style)
-        add_text(ms, f"BOOST : {ch1_bc}A", col1_x + 2, boost_y, 3.0, style)
-        add_text(ms, f"FLOAT : {ch2_fc}A", col2_x + 2, float_y, 3.0, style)
-        add_text(ms, f"BOOST : {ch2_bc}A", col2_x + 2, boost_y, 3.0, style)
-        
-    elif mode == 'dualsf':
-        float_y = y - 4.5
-        ch1_fc = config.get('ch1_float_current', 100.0)
-        ch1_bs = config.get('ch1_boost_start', 60.0)
-        ch1_bf = config.get('ch1_boost_finish', 30.0)
-        ch2_fc = config.get('ch2_float_current', 100.0)
-        ch2_bs = config.get('ch2_boost_start', 60.0)
-        ch2_bf = config.get('ch2_boost_finish', 30.0)
-        
-        # Left column
-        add_text(ms, f"FLOAT : {ch1_fc}A", col1_x + 2, float_y, 3.0, style)
-        line_y = float_y - 2.0
-        line_start_x = col1_x - 2
-        line_end_x = col1_x + 97
-        v2 = make_safearray_3d([(line_start_x, line_y, 0), (line_end_x, line_y, 0)])
-        ms.AddPolyline(v2)
-        
-        boost_label_x = col1_x - 0.5
-        boost_y = y - 12
-        add_text(ms, "BOOST", boost_label_x, boost_y, 3.0, style)
-        
-        v_line_x = boost_label_x + 15
-        v_line_top = y - 6.5
-        v_line_bottom = y - 15.0
-        v3 = make_safearray_3d([(v_line_x, v_line_top, 0), (v_line_x, v_line_bottom, 0)])
-        ms.AddPolyline(v3)
-        
-        start_x = boost_label_x + 35
-        start_y = y - 10
-        finish_y = y - 14
-        sf_size = 2.4
-        add_text(ms, f"START : {ch1_bs}A", start_x + shift_left, start_y, sf_size, style)
-        add_text(ms, f"FINISH : {ch1_bf}A", start_x + shift_left, finish_y, sf_size, style)
-
-        # Right column
-        add_text(ms, f"FLOAT : {ch2_fc}A", col2_x + 2, float_y, 3.0, style)
-        boost_label_x2 = col2_x - 2
-        add_text(ms, "BOOST", boost_label_x2, boost_y, 3.0, style)
-        
-        v_line_x2 = boost_label_x2 + 15
-        v4 = make_safearray_3d([(v_line_x2, v_line_top, 0), (v_line_x2, v_line_bottom, 0)])
-        ms.AddPolyline(v4)
-        
-        start_x2 = boost_label_x2 + 35
-        add_text(ms, f"START : {ch2_bs}A", start_x2 + shift_left, start_y, sf_size, style)
-        add_text(ms, f"FINISH : {ch2_bf}A", start_x2 + shift_left, finish_y, sf_size, style)
-        
-    elif mode == 'ffcb':
-        float_charger_c = config.get('float_charger_current', 15.0)
-        fcb_fc = config.get('fcb_float_current', 15.0)
-        fcb_bc = config.get('fcb_boost_current', 15.0)
-        
-        add_text(ms, f"{float_charger_c}A", col1_x + 2, y - 6, 3.0, style)
-        float_y = y - 4
-        boost_y = y - 8
-        add_text(ms, f"FLOAT : {fcb_fc}A", col2_x + 2, float_y, 3.0, style)
-        add_text(ms, f"BOOST : {fcb_bc}A", col2_x + 2, boost_y, 3.0, style)
-        
-    else:  # single
-        fc = config.get('float_current', 20.0)
-        bc = config.get('boost_current', 20.0)
-        add_text(ms, f"FLOAT : {fc}A", col1_x + 2, y - 6, 3.0, style)
-        add_text(ms, f"BOOST : {bc}A", col2_x + 2, y - 6, 3.0, style)
-
-    y = y_bottom2
-    three_bottom = y
-
-    # Vertical lines for three-column block
-    v2_x = col2_x - 4.0
-    v2 = make_safearray_3d([(v2_x, three_top, 0),(v2_x, three_bottom, 0)])
-    ms.AddPolyline(v2)
-
-    # Get current year and FY range (fiscal year Apr–Mar)
-    year = config.get('year', datetime.now().year)
-    yy1, yy2 = compute_fiscal_yy(year)
-    fy_range = f"{yy1:02d}-{yy2:02d}"
-
-    # SL NO
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    add_text(ms, "SL. NO.", ux1 + 3, y - 6, 3.0, style)
-
-    project_no = config.get('project_no', 1077)
-    order_no = config.get('order_no', 2111)
-    serial_no = f"LL/{fy_range}/{project_no}-OP{order_no}/BCH"
-    add_text(ms, serial_no, data_x, y - 6, 3.0, style)
-    y = y_bottom
-
-    # YEAR
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    add_text(ms, "YEAR OF MFG.", ux1 + 3, y - 6, 3.0, style)
-    add_text(ms, str(year), data_x, y - 6, 3.0, style)
-    y = y_bottom
-
-    # FIRST COLUMN VERTICAL LINE
-    v_line = make_safearray_3d([(vx, uy2, 0),(vx, y, 0)])
-    ms.AddPolyline(v_line)
-
-    # Footer block
-    FOOT_H = 25
-    y_footer_top = y
-    y_footer_bottom = y_footer_top - FOOT_H
-
-    add_line(ms, ux1, y_footer_top, ux2, y_footer_top)
-    add_line(ms, ux1, y_footer_bottom, ux1, y_footer_top)
-    add_line(ms, ux2, y_footer_bottom, ux2, y_footer_top)
-
-    footer_title_h = 3.2
-    footer_text_h = 2.6
-    footer_text_h_a = 2.3
-
-    fx = ux1 + 3
-
-    # LOGO BOX
-    lx1 = ux2 - logo_w + 3
-    ly1 = y_footer_bottom - 2
-    lx2 = lx1 + logo_w - 3
-    ly2 = ly1 + logo_h
-
-    if draw_logo_box:
-        add_rect(ms, lx1, ly1, lx2, ly2)
-
-    add_mtext(ms, r"\fConsolas|b1;LIVELINE ELECTRONICS", fx, y_footer_top - 4, 200, footer_title_h, style)
-    add_text(ms, "North Ramchandrapur, Narendrapur, Kolkata : 700103", fx, y_footer_top - 12, footer_text_h_a, style)
-    add_text(ms, f"{align_label('Telefax')}", fx, y_footer_top - 17, footer_text_h, style)
-    add_text(ms, f"{align_label(':')}", fx+15, y_footer_top - 17, footer_text_h, style)
-    add_text(ms, f"{align_label('033 2477 2094')}", fx+25, y_footer_top - 17, footer_text_h, style)
-    add_text(ms, f"{align_label('Email')}", fx, y_footer_top - 22, footer_text_h, style)
-    add_text(ms, f"{align_label(':')}", fx+15, y_footer_top - 22, footer_text_h, style)
-    add_text(ms, f"{align_label('info@livelineindia.com')}", fx+25, y_footer_top - 22, footer_text_h, style)
-
-    logo_block = os.path.abspath("liveline_logo.dwg")
-    insert_scaled_block(ms, logo_block, lx1 - 4, ly1 + 1, logo_w, logo_h)
-
-    # Re-draw outer and inner frames
-    try:
-        add_rect(ms, ox, outer_bottom, ox + w, outer_top)
-        add_rect(ms, ux1, uy1, ux2, uy2)
-    except Exception:
-        pass
+    name, params = _plate_layout(config)
+    plan = plate_layout.plan_for(name, params)
+    origin = (float(config.get('offset_x', 100.0)), float(config.get('offset_y', 100.0)))
+    plan.draw(doc.ModelSpace, _plate_values(config), origin)
 
     # Zoom extents (only when not suppressed)
     if not suppress_zoom:
-        try:
-            doc.SendCommand("_ZOOM _E ")
-        except Exception:
-            pass
+        plate_layout.zoom_extents(doc)
 
     print("Done. Rating plate generated successfully!")
 
 
 def draw_plates_grid(doc, config):
-    """Tile multiple rating plates in an automatic near-square grid.
-    Uses `units` from config and `plate_gap` for spacing (mm).
+    """Nest multiple rating plates onto sheets.
+    Uses `units` from config, `sheet_width`/`sheet_height` for the sheet
+    size and `plate_gap` as the kerf between plates (mm).
+    The plate is drawn once as a block definition and inserted per
+    placement; set `explode_grid` to get plain entities instead of references.
     """
     units = int(config.get('units', 1))
-    plate_gap = float(config.get('plate_gap', 10.0))
-    plate_w = float(config.get('plate_width', 150.0))
-    plate_h = float(config.get('plate_height', 100.0))
 
     if units <= 1:
         draw_rating_plate(doc, config, suppress_zoom=False)
         return
 
-    cols = math.ceil(math.sqrt(units))
-    rows = math.ceil(units / cols)
-
-    ox0 = float(config.get('offset_x', 100.0))
-    oy0 = float(config.get('offset_y', 100.0))
-
-    for i in range(units):
-        r = i // cols
-        c = i % cols
-        cfg = config.copy()
-        cfg['offset_x'] = ox0 + c * (plate_w + plate_gap)
-        cfg['offset_y'] = oy0 - r * (plate_h + plate_gap)
-        # suppress zoom for intermediate plates, run zoom once at the end
-        suppress = True if i < (units - 1) else False
-        try:
-            draw_rating_plate(doc, cfg, suppress_zoom=suppress)
-        except Exception:
-            # fallback: attempt single plate draw without suppress
-            try:
-                draw_rating_plate(doc, cfg, suppress_zoom=False)
-            except Exception:
-                pass
+    name, params = _plate_layout(config)
+    plan = plate_layout.plan_for(name, params)
+    placements = plate_layout.draw_sheets(
+        doc, [(plan, _plate_values(config), units)],
+        origin=(float(config.get('offset_x', 100.0)), float(config.get('offset_y', 100.0))),
+        explode=config.get('explode_grid', False),
+        outline=config.get('draw_sheet_outline', False),
+        **sheet_options(config),
+    )
 
     # Final zoom extents to show all plates
-    try:
-        doc.SendCommand("_ZOOM _E ")
-    except Exception:
-        pass
+    plate_layout.zoom_extents(doc)
+    print(f"Done. {units} rating plates generated on {sheet_nesting.sheet_count(placements)} sheet(s).")
 
 # -----------------------------
 # PyQt6 GUI
@@ -793,10 +257,27 @@ class RatingPlateGUI(QMainWindow):
         """)
         self.generate_btn.clicked.connect(self.generate_plate)
         button_layout.addWidget(self.generate_btn)
+
+        # Collect this plate for one combined drawing with the other tools (plate_job.py)
+        self.add_job_btn = QPushButton("Add to Job")
+        self.add_job_btn.setMinimumHeight(40)
+        self.add_job_btn.clicked.connect(self.add_to_job)
+        button_layout.addWidget(self.add_job_btn)
+
+        # Vector files for the engraving machine, no AutoCAD needed (plate_export.py)
+        self.export_btn = QPushButton("Export SVG/PDF")
+        self.export_btn.setMinimumHeight(40)
+        self.export_btn.clicked.connect(self.export_vector)
+        button_layout.addWidget(self.export_btn)
         button_layout.addStretch()
         main_layout.addLayout(button_layout)
         
         self.update_voltage_current_fields()
+
+        # Live preview from the same layout plan that is sent to AutoCAD
+        self.preview = PreviewPanel(lambda: job_plates(self.get_config())[0][:2])
+        preview_dock(self, self.preview)
+        self.preview.watch(main_widget)
         
         # Menu bar: Settings and Help
         menubar = self.menuBar()
@@ -806,6 +287,11 @@ class RatingPlateGUI(QMainWindow):
         self.auto_open_action.setChecked(self.auto_open_acad)
         self.auto_open_action.toggled.connect(self.set_auto_open_acad)
         settings_menu.addAction(self.auto_open_action)
+
+        help_menu = menubar.addMenu("Help")
+        self.check_action = QAction("Check Latest Release", self)
+        self.check_action.triggered.connect(self.check_latest_release)
+        help_menu.addAction(self.check_action)
     
         # Connect signal for background release check
         self.release_check_finished.connect(self._display_release_info)
@@ -1092,6 +578,12 @@ class RatingPlateGUI(QMainWindow):
     def set_auto_open_acad(self, checked: bool):
         self.auto_open_acad = bool(checked)
 
+    def check_latest_release(self):
+        """Look up the latest release in the background (shared, cached checker)."""
+        self.check_action.setEnabled(False)
+        self.statusBar().showMessage("Checking latest release...")
+        update_check.check_async(GITHUB_REPO, self.release_check_finished.emit, force=True)
+
     def _display_release_info(self, tag, html_url, err):
         """Display release info in the main thread and offer to open the release URL if newer."""
         # Re-enable the check action and clear status
@@ -1239,6 +731,21 @@ class RatingPlateGUI(QMainWindow):
         self.plate_gap.setValue(25.0)
         self.plate_gap.setSuffix(" mm")
         layout.addWidget(self.plate_gap, 6, 3)
+
+        # Sheet the tiled plates are nested onto
+        layout.addWidget(QLabel("Sheet Width:"), 7, 0)
+        self.sheet_width = QDoubleSpinBox()
+        self.sheet_width.setRange(50, 5000)
+        self.sheet_width.setValue(sheet_nesting.DEFAULT_SHEET_WIDTH)
+        self.sheet_width.setSuffix(" mm")
+        layout.addWidget(self.sheet_width, 7, 1)
+
+        layout.addWidget(QLabel("Sheet Height:"), 7, 2)
+        self.sheet_height = QDoubleSpinBox()
+        self.sheet_height.setRange(50, 5000)
+        self.sheet_height.setValue(sheet_nesting.DEFAULT_SHEET_HEIGHT)
+        self.sheet_height.setSuffix(" mm")
+        layout.addWidget(self.sheet_height, 7, 3)
         
         group.setLayout(layout)
         return group
@@ -1575,13 +1082,39 @@ class RatingPlateGUI(QMainWindow):
         except Exception:
             config['plate_gap'] = float(config.get('plate_gap', 10.0))
 
+        if getattr(self, 'sheet_width', None):
+            config['sheet_width'] = float(self.sheet_width.value())
+            config['sheet_height'] = float(self.sheet_height.value())
+
         return config
     
+    def add_to_job(self):
+        """Add the current plate to the shared job manifest."""
+        try:
+            count = plate_job.add_plate('bch', self.get_config(), self.product_desc.text())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not add the plate to the job:\n{str(e)}")
+            return
+        QMessageBox.information(self, "Job", f"Plate added to the job ({count} entries).\n{plate_job.job_path()}")
+
+    def export_vector(self):
+        """Export the current plates as SVG or PDF for the engraving machine."""
+        config = self.get_config()
+        if plate_export.export_dialog(self, job_plates(config), sheet_options(config)):
+            plate_history.record('bch', config, self.product_desc.text())
+
     def generate_plate(self):
+        if win32com is None:
+            QMessageBox.critical(self, "Error", "pywin32 is not installed; AutoCAD cannot be reached from this machine.")
+            return
         try:
             config = self.get_config()
-            
+            # Report texts that overflow their cells before AutoCAD is touched
+            if not confirm_overflows(self, job_plates(config)):
+                return
+
             pythoncom.CoInitialize()
+            connect_started = time.perf_counter()
             acad = None
             # First try to get an active AutoCAD COM object
             try:
@@ -1671,14 +1204,20 @@ class RatingPlateGUI(QMainWindow):
                     break
 
             if doc is None:
+                metrics.record("acad.connect", (time.perf_counter() - connect_started) * 1000, ok=False)
                 raise RuntimeError("No active AutoCAD document and could not create one.")
+            metrics.record("acad.connect", (time.perf_counter() - connect_started) * 1000)
 
             # If multiple units requested, draw tiled plates; otherwise draw single plate
             units = int(config.get('units', 1))
-            if units > 1:
-                draw_plates_grid(doc, config)
-            else:
-                draw_rating_plate(doc, config)
+            # One regen and one zoom for the whole batch
+            with DrawingSession(doc) as session:
+                if units > 1:
+                    draw_plates_grid(doc, config)
+                else:
+                    draw_rating_plate(doc, config)
+            print(session.summary())
+            plate_history.record('bch', config, self.product_desc.text())
             
             QMessageBox.information(self, "Success", "Rating plate generated successfully!")
             
@@ -1706,4 +1245,5 @@ if __name__ == "__main__":
         pass
 
     window.show()
+    startup_profile.mark_first_window(window)
     sys.exit(app.exec())
\ No newline at end of file
@@ -1,9 +1,8 @@
 # ACDB DCDB RATING PLATE GENERATOR
+import startup_profile
+startup_profile.install_from_argv("app_db")  # before the heavy imports, see --profile-startup
 import sys
 import os
-import math
-from array import array
-from math import ceil
 from datetime import datetime
 try:
     import win32com.client
@@ -12,12 +11,20 @@ except Exception:
     win32com = None
     pythoncom = None
 
+import metrics
+import plate_layout
+import sheet_nesting
+import plate_job
+import plate_export
+import plate_history
+import outgoing_table
+from plate_drawing import DrawingSession
+from plate_preview import PreviewPanel, confirm_overflows, preview_dock
 from PyQt6.QtWidgets import (QApplication, QDialog, QMainWindow, QWidget,
                              QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
                              QComboBox, QPushButton, QGroupBox, QGridLayout,
-                             QMessageBox, QSpinBox, QDoubleSpinBox,
-                             QListWidget, QListWidgetItem)
-from PyQt6.QtCore import Qt
+                             QMessageBox, QSpinBox, QDoubleSpinBox, QListView)
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
 from PyQt6.QtGui import QFont, QIcon
 
 # Application version
@@ -33,176 +40,17 @@ APP_VERSION = f"{base_version}-db"
 APP_NAME = 'DB Rating Plate Generator'
 
 
-def make_safearray_3d(points):
-    arr = array('d')
-    for x, y, z in points:
-        arr.extend([float(x), float(y), float(z)])
-    if win32com is None:
-        return arr
-    return win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, arr)
-
-
-def make_point_variant(x, y, z=0.0):
-    # Accept either numbers or tuples
-    if isinstance(x, (list, tuple)) and y is None:
-        x_, y_, z_ = x
-        x, y, z = x_, y_, z_
-    if win32com is None:
-        return (float(x), float(y), float(z))
-    arr = array('d', [float(x), float(y), float(z)])
-    return win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, arr)
-
-
-def add_rect(ms, x1, y1, x2, y2):
-    pts = [(x1, y1, 0), (x2, y1, 0), (x2, y2, 0), (x1, y2, 0), (x1, y1, 0)]
-    v = make_safearray_3d(pts)
-    if win32com is None:
-        # fallback: no-op
-        return None
-    pl = ms.AddPolyline(v)
-    pl.Closed = True
-    return pl
-
-
-def add_line(ms, x1, y1, x2, y2):
-    if win32com is None:
-        return None
-    return ms.AddLine(make_point_variant(x1, y1), make_point_variant(x2, y2))
-
-def get_consolas_style(doc):
-    """
-    Returns a TextStyle named 'Consolas' if it exists.
-    If not found, attempts to create it, but COM cannot apply font properties.
-    """
-    styles = doc.TextStyles
-    try:
-        return styles.Item("Consolas")
-    except Exception:
-        # Create style if missing (font must be preconfigured in DWG)
-        try:
-            return styles.Add("Consolas")
-        except:
-            return None
-
-
-def add_text(ms, text, x, y, height):
-    if win32com is None:
-        return None
-
-    t = ms.AddText(str(text), make_point_variant(x, y), float(height))
-
-    # Assign Consolas style if available
-    try:
-        doc = ms.Parent
-        st = get_consolas_style(doc)
-        if st:
-            t.StyleName = "Consolas"
-    except:
-        pass
-
-    return t
-
-
-def add_mtext(ms, text, x, y, width, height):
-    if win32com is None:
-        return None
-
-    mt = ms.AddMText(make_point_variant(x, y), float(width), str(text))
-    mt.Height = float(height)
-
-    try:
-        mt.Attachment = 2
-    except:
-        pass
-
-    # Apply Consolas
-    try:
-        doc = ms.Parent
-        st = get_consolas_style(doc)
-        if st:
-            mt.StyleName = "Consolas"
-    except:
-        pass
-
-    return mt
-
-
-
-def add_dimension_linear(
-        ms,
-        x1, y1,
-        x2, y2,
-        dimline_x, dimline_y,
-        override_text=None,
-        vertical=False,
-        arrow_size=3.0
-    ):
-    if win32com is None:
-        mx = (x1 + x2) / 2.0
-        my = (y1 + y2) / 2.0
-        raw_val = abs(x2 - x1) if abs(x2 - x1) > 0 else abs(y2 - y1)
-        val = override_text if override_text else f"{raw_val:.1f}"
-        add_text(ms, str(val), mx, my, 6.0)
-        return None
-
-    try:
-        dim = ms.AddDimAligned(
-            make_point_variant(x1, y1),
-            make_point_variant(x2, y2),
-            make_point_variant(dimline_x, dimline_y)
-        )
-
-        # Dimension text height
-        try:
-            dim.TextHeight = 3.0
-        except:
-            pass
-
-        # Increase extension line gap
-        try:
-            dim.ExtLineOffset = 6.0   # change to 10, 20 etc. to increase gap
-            dim.Update()
-        except:
-            pass
-
-        # Arrow size
-        try:
-            dim.ArrowheadSize = arrow_size
-        except:
-            pass
-
-        # Dimension text override
-        # If user provided override, use it; otherwise force one decimal
-        # place precision for displayed measurement (e.g. 150.0).
-        try:
-            raw_val = abs(x2 - x1) if abs(x2 - x1) > 0 else abs(y2 - y1)
-            if override_text:
-                try:
-                    dim.TextOverride = str(override_text)
-                except:
-                    pass
-            else:
-                try:
-                    dim.TextOverride = f"{raw_val:.1f}"
-                except:
-                    pass
-        except:
-            pass
-
-        # Rotate text vertically if needed
-        if vertical:
-            import math
-            try:
-                dim.TextRotation = math.pi / 2
-            except:
-                pass
-
-        return dim
-
-    except:
-        return None
-
-
+def _plate_layout(config):
+    """Layout params and text values for ``config`` (see layouts/db.json and outgoing_table.py)."""
+    entries = outgoing_table.aggregate(config.get('outgoings', []))
+    params = dict(config, outgoing_columns=1)
+    env = plate_layout.plan_for('db', params).env
+    columns = outgoing_table.choose_columns(entries, env['table_w'], env['outgoing_min_h'],
+                                            int(config.get('outgoing_columns', 0)))
+    outgoing = outgoing_table.pack(entries, columns)
+    params = dict(config, outgoing_rows=len(outgoing), outgoing_columns=columns)
+    values = dict(config, outgoing=outgoing, year=config.get('year', datetime.now().year))
+    return params, values
 
 
 def draw_db_plate(doc, config, suppress_zoom=False):
@@ -213,241 +61,57 @@ def draw_db_plate(doc, config, suppress_zoom=False):
       - offset_x, offset_y
       - override_width (string) - show this instead of measured width if non-empty
       - override_height (string)
+    The geometry comes from layouts/db.json.
     """
-    plate_w = float(config.get('plate_width', 150.0))
-    plate_h = float(config.get('plate_height', 95.0))
-    ox = float(config.get('offset_x', 100.0))
-    oy = float(config.get('offset_y', 100.0))
-    margin = float(config.get('margin', 3.0))
-
-    ms = doc.ModelSpace
-
-    outer_top = oy + plate_h
-    outer_bottom = oy
-
-    # inner usable x range
-    ux1 = ox + margin
-    ux2 = ox + plate_w - margin
-    y = outer_top - margin
-
-    row_h = 10.5
-    txt_h = 3.2
-
-    param_offset_right = 40
-    param_offset_top = 6
-
-    # PRODUCT row
-    product_top = y
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    add_text(ms, 'PRODUCT', ux1 + 2, y - param_offset_top - 1, txt_h)
-    add_mtext(ms, config.get('product_text', 'AC DISTRIBUTION BOARD'), ux1 + param_offset_right, y - param_offset_top + 2.5, ux2 - (ux1 + param_offset_right), txt_h + 0.2)
-    y = y_bottom
-
-    # INPUT VOLTAGE row
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    add_text(ms, 'INPUT VOLTAGE', ux1 + 2, y - param_offset_top, txt_h-0.4)
-    add_text(ms, config.get('input_voltage', ''), ux1 + param_offset_right, y - param_offset_top, txt_h)
-    y = y_bottom
-
-    # INCOMER row
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    add_text(ms, 'INCOMER', ux1 + 2, y - param_offset_top, txt_h)
-    add_text(ms, config.get('incomer', ''), ux1 + param_offset_right, y - param_offset_top, txt_h)
-    y = y_bottom
-
-    # OUTGOINGS
-    out_list = config.get('outgoings', [])
-    n_out = len(out_list)
-    per_row = 2
-    groups = [out_list[i:i+per_row] for i in range(0, n_out, per_row)] if n_out else [[]]
-    for grp in groups:
-        y_bottom = y - row_h
-        add_rect(ms, ux1, y_bottom, ux2, y)
-        add_text(ms, 'OUTGOING', ux1 + 2, y - param_offset_top, txt_h)
-        parts = []
-        for it in grp:
-            rating = it.get('rating', '')
-            poles = it.get('poles', '')
-            btype = it.get('type', '')
-            count = it.get('count', 1)
-            parts.append(f"{rating}A {poles}P {btype} - {count} NOS.")
-        combined = ' ; '.join(parts) if parts else ''
-        try:
-            add_mtext(ms, combined, ux1 + param_offset_right, y - param_offset_top + 3, ux2 - (ux1 + param_offset_right) + 24, txt_h - 0.2)
-        except Exception:
-            add_text(ms, combined, ux1 + param_offset_right, y - param_offset_top, txt_h)
-        y = y_bottom
-
-    # SL NO and YEAR
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    add_text(ms, 'SL. NO.', ux1 + 2, y - param_offset_top, txt_h)
-    add_text(ms, config.get('serial', ''), ux1 + param_offset_right, y - param_offset_top, txt_h)
-    y = y_bottom
-
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    add_text(ms, 'YEAR OF MFG.', ux1 + 2, y - param_offset_top, txt_h)
-    add_text(ms, str(config.get('year', datetime.now().year)), ux1 + param_offset_right, y - param_offset_top, txt_h)
-    y = y_bottom
-
-    # vertical separator
-    try:
-        vline_x = ux1 + 37
-        vline_top = product_top
-        vline_bottom = y + row_h
-        add_line(ms, vline_x, vline_top, vline_x, vline_bottom - 10.5)
-    except Exception:
-        pass
-
-    # Footer + logo
-    FOOT_H = 20
-    y_footer_top = y
-    y_footer_bottom = y_footer_top - FOOT_H
-    add_line(ms, ux1, y_footer_top, ux2, y_footer_top)
-    try:
-        add_mtext(ms, r"\fConsolas|b1;LIVELINE ELECTRONICS", ux1 + 2, y_footer_top - 6, 160, 3.6)
-    except Exception:
-        add_mtext(ms, 'LIVELINE ELECTRONICS', ux1 + 2, y_footer_top, 160, 3.6)
-
-    try:
-        add_text(ms, 'North Ramchandrapur, Narendrapur, Kolkata : 700103', ux1 + 2, y_footer_top - 15, 2.6)
-        add_text(ms, 'Telefax : 033 2477 2094', ux1 + 2, y_footer_top - 19, 2.4)
-        add_text(ms, 'Email : info@livelineindia.com', ux1 + 2, y_footer_top - 23, 2.4)
-    except Exception:
-        try:
-            add_text(ms, 'North Ramchandrapur, Narendrapur, Kolkata : 700103 | Tel: 033 2477 2094 | info@livelineindia.com', ux1 + 2, y_footer_top - 12, 2.6)
-        except Exception:
-            pass
-
-    # logo
-    logo_block = os.path.abspath('liveline_logo.dwg')
-    if os.path.exists(logo_block):
-        try:
-            ins_pt = make_point_variant(ux2 - 62, y_footer_bottom - 16)
-            blk = ms.InsertBlock(ins_pt, logo_block, 38.0, 38.0, 38.0, 0)
-            try:
-                blk.Update()
-            except Exception:
-                pass
-            try:
-                doc.SendCommand('_REGEN ')
-            except Exception:
-                try:
-                    doc.Regen(0)
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
-    # Re-draw outer & inner frames (final)
-    try:
-        new_outer_bottom = min(outer_bottom, y_footer_bottom - margin - 7)
-        add_rect(ms, ox, new_outer_bottom, ox + plate_w, outer_top)
-        add_rect(ms, ox + margin, new_outer_bottom + margin, ox + plate_w - margin, outer_top - margin)
-    except Exception:
-        pass
-
-    # ---------------------------
-    # Dimensions: width (horizontal) and height (vertical)
-    # ---------------------------
-    try:
-        # user-provided override strings
-        override_w = config.get('override_width', '').strip()
-        override_h = config.get('override_height', '').strip()
-
-        # If frames were redrawn to extend bottom, prefer that as final bottom
-        final_bottom = locals().get('new_outer_bottom', outer_bottom)
-
-        # width dimension: between (ox, final_bottom) and (ox+plate_w, final_bottom)
-        # place dim line below the bottom by configured gap (defaults to 12 mm)
-        # This controls the height of the short extension lines on both ends
-        # of the dimension line (use config key 'dim_gap').
-        dim_gap = float(config.get('dim_gap', 12.0))
-        # keep previous behavior of respecting margin: place dim line
-        # at `margin + dim_gap` away from the plate edge so extension
-        # lines are visibly clear of the plate.
-        dim_offset = margin + dim_gap
-        # dimline point for width: mid-x, lower than bottom
-        dim_w_x = ox + plate_w / 2.0
-        dim_w_y = final_bottom - dim_offset
-
-        # For AutoCAD AddDimAligned we need a point on the dimension line outside the measured segment.
-        add_dimension_linear(
-            ms,
-            ox, final_bottom,
-            ox + plate_w, final_bottom,
-            dim_w_x, dim_w_y,
-            override_text=override_w if override_w else None,
-            arrow_size=5.0
-        )
-
-        # height dimension: between (ox, outer_bottom) and (ox, outer_top)
-        # place dimline point left of the box by 12 units
-        dim_h_x = ox - dim_offset
-        # place height dim centered between final bottom and outer_top
-        dim_h_y = final_bottom + (outer_top - final_bottom) / 2.0
-        add_dimension_linear(
-            ms,
-            ox, final_bottom,  # P1: Bottom Y extent (use extended bottom)
-            ox, outer_top,     # P2: Top Y extent
-            dim_h_x, dim_h_y,  # Dimension line location
-            override_text=override_h if override_h else None,
-            vertical=True,     # Flag for text rotation
-            arrow_size=5.0
-        )
-
-
-
-    except Exception:
-        pass
+    params, values = _plate_layout(config)
+    plan = plate_layout.plan_for('db', params)
+    origin = (float(config.get('offset_x', 100.0)), float(config.get('offset_y', 100.0)))
+    plan.draw(doc.ModelSpace, values, origin)
 
     # zoom extents if possible (can be suppressed when drawing many plates)
     if not suppress_zoom:
-        try:
-            doc.SendCommand('_ZOOM _E ')
-        except Exception:
-            try:
-                doc.Regen(0)
-            except Exception:
-                pass
+        plate_layout.zoom_extents(doc)
+
+
+def job_plates(config):
+    """Layout jobs ``(plan, values, count)`` for this config (used by plate_job)."""
+    params, values = _plate_layout(config)
+    return [(plate_layout.plan_for('db', params), values, max(1, int(config.get('units', 1))))]
+
+
+def sheet_options(config):
+    """Sheet size, kerf and rotation for nesting this config's plates (AutoCAD and SVG/PDF export)."""
+    return {
+        'sheet_width': float(config.get('sheet_width', sheet_nesting.DEFAULT_SHEET_WIDTH)),
+        'sheet_height': float(config.get('sheet_height', sheet_nesting.DEFAULT_SHEET_HEIGHT)),
+        'kerf': float(config.get('plate_gap', 20.0)),
+        'allow_rotate': config.get('allow_rotate', False),
+    }
 
 
 def draw_plates_grid(doc, config):
-    """Draw multiple plates in a grid layout based on config keys:
+    """Nest multiple plates onto sheets based on config keys:
       - units (int): total number of plates to draw
-      - cols (int): number of columns per row
-      - plate_gap (float): gap between plates in mm
+      - sheet_width / sheet_height (float): sheet size in mm
+      - plate_gap (float): kerf between plates in mm
+      - allow_rotate (bool): let plates turn 90 degrees to fit
+      - explode_grid (bool): explode the block references into plain entities
 
-    The function calls `draw_db_plate` repeatedly, adjusting `offset_x` and
-    `offset_y` for each tile. Zoom is suppressed for intermediate tiles to
-    avoid repeated zoom-extents calls.
+    The plate is drawn once as a block definition and inserted per
+    placement; zoom extents runs once at the end.
     """
     units = int(config.get('units', 1))
-    # Auto-compute number of columns to form a near-square layout:
-    # cols = ceil(sqrt(units)). Examples: 4 -> 2, 5 -> 3
-    cols = int(ceil(math.sqrt(units))) if units >= 1 else 1
-    plate_gap = float(config.get('plate_gap', 20.0))
-
-    plate_w = float(config.get('plate_width', 150.0))
-    plate_h = float(config.get('plate_height', 95.0))
-    base_ox = float(config.get('offset_x', 100.0))
-    base_oy = float(config.get('offset_y', 100.0))
-
-    for i in range(units):
-        r = i // cols
-        c = i % cols
-        cfg = dict(config)
-        cfg['offset_x'] = base_ox + c * (plate_w + plate_gap)
-        # move rows downwards by subtracting in Y (y increases upwards)
-        cfg['offset_y'] = base_oy - r * (plate_h + plate_gap)
-
-        # suppress zoom for all but the last plate
-        suppress = (i != units - 1)
-        draw_db_plate(doc, cfg, suppress_zoom=suppress)
+    params, values = _plate_layout(config)
+    plan = plate_layout.plan_for('db', params)
+    placements = plate_layout.draw_sheets(
+        doc, [(plan, values, max(1, units))],
+        origin=(float(config.get('offset_x', 100.0)), float(config.get('offset_y', 100.0))),
+        explode=config.get('explode_grid', False),
+        outline=config.get('draw_sheet_outline', False),
+        **sheet_options(config),
+    )
+    plate_layout.zoom_extents(doc)
+    print(f"{units} plates on {sheet_nesting.sheet_count(placements)} sheet(s)")
 
 
 class OutgoingDialog(QDialog):
@@ -492,6 +156,76 @@ class OutgoingDialog(QDialog):
         }
 
 
+class OutgoingModel(QAbstractListModel):
+    """
+    The outgoing feeders as ``(rating, poles, type, count)`` tuples.
+
+    A list view over this model stays responsive with hundreds of feeders,
+    where a QListWidget keeps one item object per feeder.
+    """
+
+    FIELDS = ('rating', 'poles', 'type', 'count')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return outgoing_table.outgoing_text(row)
+        if role == Qt.ItemDataRole.UserRole:
+            return dict(zip(self.FIELDS, row))
+        return None
+
+    def _row(self, data):
+        return tuple(data[key] for key in self.FIELDS)
+
+    def outgoing(self, row):
+        return self.data(self.index(row), Qt.ItemDataRole.UserRole)
+
+    def outgoings(self):
+        return [dict(zip(self.FIELDS, row)) for row in self._rows]
+
+    def append(self, data):
+        n = len(self._rows)
+        self.beginInsertRows(QModelIndex(), n, n)
+        self._rows.append(self._row(data))
+        self.endInsertRows()
+
+    def replace(self, row, data):
+        self._rows[row] = self._row(data)
+        self.dataChanged.emit(self.index(row), self.index(row))
+
+    def remove(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+
+    def move(self, row, to):
+        """Move ``row`` one place up or down to ``to``."""
+        lo, hi = min(row, to), max(row, to)
+        self.beginMoveRows(QModelIndex(), hi, hi, QModelIndex(), lo)
+        self._rows[lo], self._rows[hi] = self._rows[hi], self._rows[lo]
+        self.endMoveRows()
+
+    def merge(self):
+        """Replace the feeders by one entry per rating/poles/type (counts added)."""
+        # aggregate() keys are strings; keep each group's first feeder for the values
+        first = {}
+        for outgoing in self.outgoings():
+            first.setdefault(outgoing_table.outgoing_key(outgoing), outgoing)
+        self.beginResetModel()
+        self._rows = [self._row(dict(first[entry[:3]], count=entry[3]))
+                      for entry in outgoing_table.aggregate(self.outgoings())]
+        self.endResetModel()
+
+
 class DBRatingPlateGUI(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -537,6 +271,21 @@ class DBRatingPlateGUI(QMainWindow):
         btn.clicked.connect(self.generate_plate)
         L.addWidget(btn)
 
+        # Collect this plate for one combined drawing with the other tools (plate_job.py)
+        job_btn = QPushButton('Add to Job')
+        job_btn.clicked.connect(self.add_to_job)
+        L.addWidget(job_btn)
+
+        # Vector files for the engraving machine, no AutoCAD needed (plate_export.py)
+        export_btn = QPushButton('Export SVG/PDF')
+        export_btn.clicked.connect(self.export_vector)
+        L.addWidget(export_btn)
+
+        # Live preview from the same layout plan that is sent to AutoCAD
+        self.preview = PreviewPanel(lambda: job_plates(self.get_config())[0][:2])
+        preview_dock(self, self.preview)
+        self.preview.watch(main)
+
     def create_config_group(self):
         g = QGroupBox('General')
         l = QGridLayout()
@@ -605,12 +354,19 @@ class DBRatingPlateGUI(QMainWindow):
         self.units = QSpinBox(); self.units.setRange(1, 1000); self.units.setValue(1)
         l.addWidget(self.units, 9, 1)
 
-        # Columns are auto-computed from Units (no user control)
+        # Placement on the sheet is computed from Units (no column control)
 
         l.addWidget(QLabel('Plate Gap (mm):'), 10, 0)
         self.plate_gap = QDoubleSpinBox(); self.plate_gap.setRange(0.0, 500.0); self.plate_gap.setValue(20.0); self.plate_gap.setSingleStep(1.0)
         l.addWidget(self.plate_gap, 10, 1)
 
+        l.addWidget(QLabel('Sheet W x H (mm):'), 11, 0)
+        sheet_row = QHBoxLayout()
+        self.sheet_w = QDoubleSpinBox(); self.sheet_w.setRange(50.0, 5000.0); self.sheet_w.setValue(sheet_nesting.DEFAULT_SHEET_WIDTH)
+        self.sheet_h = QDoubleSpinBox(); self.sheet_h.setRange(50.0, 5000.0); self.sheet_h.setValue(sheet_nesting.DEFAULT_SHEET_HEIGHT)
+        sheet_row.addWidget(self.sheet_w); sheet_row.addWidget(self.sheet_h)
+        l.addLayout(sheet_row, 11, 1)
+
         # connect signals
         self.db_type.currentTextChanged.connect(self.on_db_type_changed)
         self.ac_voltage.currentTextChanged.connect(self.update_input_voltage)
@@ -625,8 +381,11 @@ class DBRatingPlateGUI(QMainWindow):
     def create_outgoing_group(self):
         g = QGroupBox('Outgoings')
         l = QVBoxLayout()
-        self.out_list_widget = QListWidget()
-        l.addWidget(self.out_list_widget)
+        self.out_model = OutgoingModel(self)
+        self.out_list = QListView()
+        self.out_list.setModel(self.out_model)
+        self.out_list.setUniformItemSizes(True)
+        l.addWidget(self.out_list)
 
         btns = QHBoxLayout()
         add = QPushButton('Add'); add.clicked.connect(self.add_outgoing); btns.addWidget(add)
@@ -634,11 +393,34 @@ class DBRatingPlateGUI(QMainWindow):
         remove = QPushButton('Remove'); remove.clicked.connect(self.remove_outgoing); btns.addWidget(remove)
         up = QPushButton('Up'); up.clicked.connect(self.move_up); btns.addWidget(up)
         down = QPushButton('Down'); down.clicked.connect(self.move_down); btns.addWidget(down)
+        merge = QPushButton('Merge'); merge.clicked.connect(self.out_model.merge); btns.addWidget(merge)
         l.addLayout(btns)
 
+        # Table on the plate: identical feeders are merged there in any case (outgoing_table.py)
+        table = QHBoxLayout()
+        table.addWidget(QLabel('Columns:'))
+        self.out_columns = QComboBox(); self.out_columns.addItems(['Auto', '1', '2', '3', '4'])
+        table.addWidget(self.out_columns)
+        table.addWidget(QLabel('Row Height (mm):'))
+        self.out_row_h = QDoubleSpinBox(); self.out_row_h.setRange(5.0, 30.0); self.out_row_h.setValue(10.5); self.out_row_h.setSingleStep(0.5)
+        table.addWidget(self.out_row_h)
+        self.out_summary = QLabel('')
+        table.addWidget(self.out_summary, 1)
+        l.addLayout(table)
+
+        for signal in (self.out_model.rowsInserted, self.out_model.rowsRemoved,
+                       self.out_model.dataChanged, self.out_model.modelReset):
+            signal.connect(self.update_outgoing_summary)
+        self.update_outgoing_summary()
+
         g.setLayout(l)
         return g
 
+    def update_outgoing_summary(self, *_args):
+        outs = self.out_model.outgoings()
+        feeders = sum(int(o['count']) for o in outs)
+        self.out_summary.setText(f"{feeders} feeder(s), {len(outgoing_table.aggregate(outs))} distinct")
+
     def on_db_type_changed(self, txt: str):
         """Adjust UI when DB type changes: set product text and input voltage rules."""
         if txt == 'DCDB':
@@ -672,41 +454,33 @@ class DBRatingPlateGUI(QMainWindow):
     def add_outgoing(self):
         d = OutgoingDialog(self)
         if d.exec() == QDialog.DialogCode.Accepted:
-            data = d.get_data()
-            text = f"{data['rating']}A {data['poles']}P {data['type']} - {data['count']} NOS."
-            item = QListWidgetItem(text)
-            item.setData(Qt.ItemDataRole.UserRole, data)
-            self.out_list_widget.addItem(item)
+            self.out_model.append(d.get_data())
+            self.out_list.setCurrentIndex(self.out_model.index(self.out_model.rowCount() - 1))
 
     def edit_outgoing(self):
-        itm = self.out_list_widget.currentItem()
-        if not itm:
+        row = self.out_list.currentIndex().row()
+        if row < 0:
             return
-        data = itm.data(Qt.ItemDataRole.UserRole)
-        d = OutgoingDialog(self, data)
+        d = OutgoingDialog(self, self.out_model.outgoing(row))
         if d.exec() == QDialog.DialogCode.Accepted:
-            new = d.get_data()
-            itm.setText(f"{new['rating']}A {new['poles']}P {new['type']} - {new['count']} NOS.")
-            itm.setData(Qt.ItemDataRole.UserRole, new)
+            self.out_model.replace(row, d.get_data())
 
     def remove_outgoing(self):
-        row = self.out_list_widget.currentRow()
+        row = self.out_list.currentIndex().row()
         if row >= 0:
-            self.out_list_widget.takeItem(row)
+            self.out_model.remove(row)
 
     def move_up(self):
-        row = self.out_list_widget.currentRow()
+        row = self.out_list.currentIndex().row()
         if row > 0:
-            itm = self.out_list_widget.takeItem(row)
-            self.out_list_widget.insertItem(row - 1, itm)
-            self.out_list_widget.setCurrentRow(row - 1)
+            self.out_model.move(row, row - 1)
+            self.out_list.setCurrentIndex(self.out_model.index(row - 1))
 
     def move_down(self):
-        row = self.out_list_widget.currentRow()
-        if row < self.out_list_widget.count() - 1 and row >= 0:
-            itm = self.out_list_widget.takeItem(row)
-            self.out_list_widget.insertItem(row + 1, itm)
-            self.out_list_widget.setCurrentRow(row + 1)
+        row = self.out_list.currentIndex().row()
+        if row < self.out_model.rowCount() - 1 and row >= 0:
+            self.out_model.move(row, row + 1)
+            self.out_list.setCurrentIndex(self.out_model.index(row + 1))
 
     def get_config(self):
         cfg = {}
@@ -720,12 +494,14 @@ class DBRatingPlateGUI(QMainWindow):
         op = int(self.order_no.value()) if hasattr(self, 'order_no') else 0
         dtype = self.db_type.currentText() if hasattr(self, 'db_type') else 'ACDB'
         cfg['serial'] = f"LL/{yy1:02d}-{yy2:02d}/{proj}-OP{op}/{dtype}"
+        # kept for the plate history index (plate_history.py)
+        cfg['project_no'] = proj
+        cfg['order_no'] = op
+        cfg['db_type'] = dtype
         # outgoings
-        outs = []
-        for i in range(self.out_list_widget.count()):
-            itm = self.out_list_widget.item(i)
-            outs.append(itm.data(Qt.ItemDataRole.UserRole))
-        cfg['outgoings'] = outs
+        cfg['outgoings'] = self.out_model.outgoings()
+        cfg['outgoing_columns'] = self.out_columns.currentIndex()  # 0 = Auto
+        cfg['outgoing_row_h'] = float(self.out_row_h.value())
         # plate geometry from UI
         cfg['plate_width'] = float(self.plate_width.value())
         cfg['plate_height'] = float(self.plate_height.value())
@@ -736,8 +512,10 @@ class DBRatingPlateGUI(QMainWindow):
         cfg['dim_gap'] = float(self.dim_gap.value())
         # tiling / duplication
         cfg['units'] = int(self.units.value()) if hasattr(self, 'units') else 1
-        # columns are auto-computed from units; do not take from GUI
+        # placement is nested onto sheets from units; only the sheet size comes from the GUI
         cfg['plate_gap'] = float(self.plate_gap.value()) if hasattr(self, 'plate_gap') else 20.0
+        cfg['sheet_width'] = float(self.sheet_w.value()) if hasattr(self, 'sheet_w') else sheet_nesting.DEFAULT_SHEET_WIDTH
+        cfg['sheet_height'] = float(self.sheet_h.value()) if hasattr(self, 'sheet_h') else sheet_nesting.DEFAULT_SHEET_HEIGHT
         # overrides for dimension text
         cfg['override_width'] = self.override_w.text().strip()
         cfg['override_height'] = self.override_h.text().strip()
@@ -761,6 +539,21 @@ class DBRatingPlateGUI(QMainWindow):
             end = year
         return start % 100, end % 100
     
+    def add_to_job(self):
+        cfg = self.get_config()
+        try:
+            count = plate_job.add_plate('db', cfg, cfg['product_text'])
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'Could not add the plate to the job: {e}')
+            return
+        QMessageBox.information(self, 'Job', f'Plate added to the job ({count} entries).\n{plate_job.job_path()}')
+
+    def export_vector(self):
+        """Export the current plates as SVG or PDF for the engraving machine."""
+        config = self.get_config()
+        if plate_export.export_dialog(self, job_plates(config), sheet_options(config)):
+            plate_history.record('db', config, config['product_text'])
+
     def generate_plate(self):
         cfg = self.get_config()
         if win32com is None:
@@ -770,22 +563,30 @@ class DBRatingPlateGUI(QMainWindow):
                        f"Incomer: {cfg['incomer']}\n"
                        f"Plate WxH: {cfg['plate_width']} x {cfg['plate_height']} mm\n"
                        f"Override W text: {cfg['override_width']}\nOverride H text: {cfg['override_height']}\n"
-                       f"Outgoings: {len(cfg['outgoings'])} items")
+                       f"Outgoings: {len(cfg['outgoings'])} items\n\n"
+                       f"The layout is shown in the Preview panel.")
             QMessageBox.information(self, 'Planned Plate', preview)
             return
+        # Report texts that overflow their cells before AutoCAD is touched
+        if not confirm_overflows(self, job_plates(cfg)):
+            return
         try:
-            acad = win32com.client.Dispatch('AutoCAD.Application')
-            acad.Visible = True
-            template_path = os.path.abspath("acadiso.dwt")
-            doc = acad.Documents.Add(template_path)
-            # doc = acad.ActiveDocument
+            with metrics.span("acad.connect"):
+                acad = win32com.client.Dispatch('AutoCAD.Application')
+                acad.Visible = True
+                template_path = os.path.abspath("acadiso.dwt")
+                doc = acad.Documents.Add(template_path)
+                # doc = acad.ActiveDocument
         except Exception as e:
             QMessageBox.critical(self, 'AutoCAD Error', f'Could not access AutoCAD: {e}')
             return
 
         try:
-            # Draw plates in grid according to units/cols/plate_gap
-            draw_plates_grid(doc, cfg)
+            # Nest plates onto sheets according to units/sheet size/plate_gap
+            with DrawingSession(doc) as session:
+                draw_plates_grid(doc, cfg)
+            print(session.summary())
+            plate_history.record('db', cfg, cfg['product_text'])
             QMessageBox.information(self, 'Done', 'DB plate(s) generated in AutoCAD')
         except Exception as e:
             QMessageBox.critical(self, 'Error', f'Failed to generate plate(s): {e}')
@@ -798,6 +599,7 @@ def main():
     
     w = DBRatingPlateGUI()
     w.show()
+    startup_profile.mark_first_window(w)
     sys.exit(app.exec())
 
 
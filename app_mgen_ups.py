@@ -1,18 +1,24 @@
+import startup_profile
+startup_profile.install_from_argv("app_mgen_ups")  # before the heavy imports, see --profile-startup
 import sys
 import os
 import subprocess
-import requests
 from datetime import datetime
-from docxtpl import DocxTemplate
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLineEdit, QLabel, QPushButton, QVBoxLayout,
     QHBoxLayout, QGridLayout, QComboBox, QTabWidget, QListWidget,
     QMessageBox, QInputDialog, QSpinBox, QDoubleSpinBox, QFileDialog,
     QMenuBar, QMenu, QMainWindow, QDialog, QCheckBox
 )
-from PyQt6.QtCore import Qt, QSettings, QThread, pyqtSignal, QCoreApplication
+from PyQt6.QtCore import Qt, QSettings, QThread, pyqtSignal, QCoreApplication, QTimer
 from PyQt6.QtGui import QAction, QIcon
 
+import docx_cache
+import docx_templates
+import update_check
+import mgen_ups_batch
+import pdf_convert
+
 
 # --- Global Application Metadata ---
 try:
@@ -26,11 +32,16 @@ COMPANY_NAME = "Bitmutex Technolgies"
 
 GITHUB_REPO = "aamitn/plategen" # usename/reponame
 GITHUB_URL_BASE = f"https://github.com/{GITHUB_REPO}/releases" # helper URL
+TEMPLATE_FILE = "template-mgen-ups.docx"
 # -----------------------------------
 
 # --- 1. Document Generation Core Function ---
-def _generate_docx_file(input_params, list_data, output_filepath):
-    """Generates the DOCX file using the provided parameters."""
+def _generate_docx_file(input_params, list_data, output_filepath, force_rebuild=False):
+    """Generates the DOCX file using the provided parameters.
+
+    Identical requests (same rendered context and template content) are served
+    from the shared output cache unless force_rebuild is set.
+    """
     
     # -----------------------------------------
     # Safely retrieve all list data using .get() to prevent KeyError
@@ -160,12 +171,20 @@ def _generate_docx_file(input_params, list_data, output_filepath):
 
     # Render and save
     try:
-        if not os.path.exists("template-mgen-ups.docx"):
-            return False, "ERROR: The required 'template-mgen-ups.docx' file was not found in the application directory."
-            
-        doc = DocxTemplate("template-mgen-ups.docx")
-        doc.render(context)
-        doc.save(output_filepath)
+        template = docx_templates.get_template_service(TEMPLATE_FILE)
+        if not template.exists():
+            return False, f"ERROR: The required '{TEMPLATE_FILE}' file was not found in the application directory."
+
+        cache = docx_cache.get_output_cache()
+        cache_key = docx_cache.make_key("mgen-ups", context, [TEMPLATE_FILE])
+        if cache is not None and not force_rebuild and cache.get(cache_key, output_filepath):
+            return True, f"DOCX Specification (unchanged, reused from cache) saved to: {output_filepath}"
+
+        # Loaded and compiled once per process; reloaded if the template file changes
+        template.render(context, output_filepath)
+
+        if cache is not None:
+            cache.put(cache_key, output_filepath)
         return True, f"DOCX Specification generated successfully to: {output_filepath}"
     except Exception as e:
         return False, f"An error occurred during DOCX rendering: {e}"
@@ -179,27 +198,55 @@ class GithubVersionWorker(QThread):
         self.repo_path = repo_path
         
     def run(self):
-        latest_version = "Failed to fetch latest version"
-        api_url = f"https://api.github.com/repos/{self.repo_path}/releases/latest"
+        # Shared checker: served from the on-disk cache when fresh (see update_check)
+        tag, _, err = update_check.latest_release(self.repo_path)
         
-        try:
-            response = requests.get(api_url, timeout=5) # 5 second timeout
-            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-            data = response.json()
-            
+        if err:
+            print(f"Error fetching GitHub release: {err}")
+            latest_version = f"Error: {err}"
+        else:
             # The 'tag_name' is usually the version number
-            latest_version = data.get('tag_name', 'N/A')
-            
-        except requests.exceptions.RequestException as e:
-            # Handle connection errors, timeouts, and bad status codes
-            print(f"Error fetching GitHub release: {e}")
-            latest_version = f"Error: {e.__class__.__name__}"
+            latest_version = tag or 'N/A'
             
         self.version_fetched.emit(latest_version) # Emit the result when done
         
+
+
+class BatchWorker(QThread):
+    """Worker thread that renders a spreadsheet of specs on a process pool."""
+    progress = pyqtSignal(int, int, str)  # done, total, last file
+    finished_batch = pyqtSignal(list, str)  # results, error message ("" on success; with results: PDF conversion failed)
+
+    def __init__(self, jobs, out_dir, force_rebuild=False, convert_pdf=False):
+        super().__init__()
+        self.jobs = jobs
+        self.out_dir = out_dir
+        self.force_rebuild = force_rebuild
+        self.convert_pdf = convert_pdf
+
+    def run(self):
+        try:
+            results = mgen_ups_batch.run_batch(
+                self.jobs, self.out_dir, force_rebuild=self.force_rebuild,
+                progress=lambda done, total, path, ok, msg: self.progress.emit(done, total, os.path.basename(path))
+            )
+        except Exception as e:
+            self.finished_batch.emit([], str(e))
+            return
+        error = ""
+        generated = [path for path, success, _ in results if success]
+        if self.convert_pdf and generated:
+            try:
+                mgen_ups_batch.convert_to_pdf(generated)
+            except Exception as e:
+                error = f"PDF conversion failed: {e}"  # the DOCX files are still there
+        self.finished_batch.emit(results, error)
+
         
 # --- 2. PyQt GUI Application (Main Window) ---
 class UPSConfiguratorApp(QMainWindow):
+    pdf_finished = pyqtSignal(str, str)  # pdf path, error message ("" on success)
+
     def __init__(self, default_params, default_list_data):
         super().__init__()
         self.default_params = default_params
@@ -236,6 +283,10 @@ class UPSConfiguratorApp(QMainWindow):
         
         self.init_ui()
         self.init_menubar()
+
+        # Load and compile the spec template while the user fills the form;
+        # deferred until the window is up so docxtpl stays off the startup path
+        QTimer.singleShot(0, lambda: docx_templates.preload_in_background(TEMPLATE_FILE))
         
     def init_menubar(self):
         menubar = self.menuBar()
@@ -251,6 +302,23 @@ class UPSConfiguratorApp(QMainWindow):
         self.auto_open_action.triggered.connect(self.save_settings)
         settings_menu.addAction(self.auto_open_action)
 
+        self.force_rebuild_action = QAction("Always Rebuild (Ignore Cache)", self)
+        self.force_rebuild_action.setCheckable(True)
+        self.force_rebuild_action.setChecked(self.settings.value("force_rebuild", False, type=bool))
+        self.force_rebuild_action.triggered.connect(self.save_settings)
+        settings_menu.addAction(self.force_rebuild_action)
+
+        # --- Batch Menu ---
+        batch_menu = menubar.addMenu("&Batch")
+
+        batch_generate_action = QAction("Generate Specs from Spreadsheet...", self)
+        batch_generate_action.triggered.connect(self.generate_batch)
+        batch_menu.addAction(batch_generate_action)
+
+        batch_template_action = QAction("Save Batch Spreadsheet Template...", self)
+        batch_template_action.triggered.connect(self.save_batch_template)
+        batch_menu.addAction(batch_template_action)
+
         # --- About Menu ---
         about_menu = menubar.addMenu("&Help")
         
@@ -259,8 +327,9 @@ class UPSConfiguratorApp(QMainWindow):
         about_menu.addAction(help_action)
 
     def save_settings(self):
-        """Saves the current state of the Auto-Open checkbox."""
+        """Saves the current state of the Settings menu checkboxes."""
         self.settings.setValue("auto_open_file", self.auto_open_action.isChecked())
+        self.settings.setValue("force_rebuild", self.force_rebuild_action.isChecked())
 
     def show_about_dialog(self):
         """Displays a professional dialog with application info and initiates version check."""
@@ -286,9 +355,9 @@ class UPSConfiguratorApp(QMainWindow):
             <div class="section-header">Required Dependencies</div>
             <ul>
                 <li><code>docxtpl</code> (for DOCX generation)</li>
-                <li><code>docx2pdf</code> (for PDF generation)</li>
+                <li>LibreOffice or Microsoft Word (for PDF generation)</li>
             </ul>
-            <p>Installation: <code>pip install docxtpl docx2pdf</code></p>
+            <p>Installation: <code>pip install docxtpl</code></p>
             
             <hr>
 
@@ -380,15 +449,16 @@ class UPSConfiguratorApp(QMainWindow):
         action_layout.addWidget(generate_docx_btn)
         
         # Convert to PDF Button
-        generate_pdf_btn = QPushButton("Convert Last Generated DOCX to PDF")
-        generate_pdf_btn.setStyleSheet("background-color: #3498db; color: white; padding: 10px; font-size: 16px; border-radius: 8px;")
-        generate_pdf_btn.clicked.connect(self.convert_to_pdf)
-        action_layout.addWidget(generate_pdf_btn)
+        self.generate_pdf_btn = QPushButton("Convert Last Generated DOCX to PDF")
+        self.generate_pdf_btn.setStyleSheet("background-color: #3498db; color: white; padding: 10px; font-size: 16px; border-radius: 8px;")
+        self.generate_pdf_btn.clicked.connect(self.convert_to_pdf)
+        self.pdf_finished.connect(self.on_pdf_finished)
+        action_layout.addWidget(self.generate_pdf_btn)
         
         main_layout.addLayout(action_layout)
         
         # Instructions/Warnings
-        warning_label = QLabel("Note: Requires 'template.docx' in the same directory. PDF generation requires 'docx2pdf'.")
+        warning_label = QLabel("Note: Requires 'template-mgen-ups.docx' in the same directory. PDF generation requires LibreOffice or Microsoft Word.")
         warning_label.setStyleSheet("color: #d35400; font-style: italic;")
         main_layout.addWidget(warning_label)
 
@@ -668,7 +738,10 @@ class UPSConfiguratorApp(QMainWindow):
         if not filepath:
             return # User cancelled
 
-        success, message = _generate_docx_file(input_params, list_data, filepath)
+        success, message = _generate_docx_file(
+            input_params, list_data, filepath,
+            force_rebuild=self.force_rebuild_action.isChecked()
+        )
         
         if success:
             self.last_docx_filepath = filepath # Store path for PDF conversion
@@ -679,46 +752,119 @@ class UPSConfiguratorApp(QMainWindow):
         else:
             QMessageBox.critical(self, "Error", message)
 
-    def convert_to_pdf(self):
-        if not self.last_docx_filepath or not os.path.exists(self.last_docx_filepath):
-            QMessageBox.warning(self, "Warning", "Please generate and save the DOCX file first.")
+    # --- Batch Generation ---
+    def save_batch_template(self):
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "Save Batch Template", "UPS_SPEC_BATCH.xlsx",
+            "Excel Workbook (*.xlsx);;CSV File (*.csv)"
+        )
+        if not filepath:
+            return
+        try:
+            mgen_ups_batch.write_batch_template(filepath)
+            QMessageBox.information(self, "Success", f"Batch template saved to: {filepath}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not save batch template: {e}")
+
+    def generate_batch(self):
+        sheet, _ = QFileDialog.getOpenFileName(
+            self, "Open Batch Spreadsheet", "",
+            "Spreadsheets (*.xlsx *.xlsm *.csv);;All Files (*)"
+        )
+        if not sheet:
             return
 
         try:
-            from docx2pdf import convert
-        except ImportError:
-            QMessageBox.critical(
-                self, 
-                "Dependency Error", 
-                "The 'docx2pdf' library is not installed.\n"
-                "Please run: `pip install docx2pdf`"
+            jobs = mgen_ups_batch.read_batch_file(sheet)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not read batch spreadsheet:\n{e}")
+            return
+        if not jobs:
+            QMessageBox.warning(self, "Warning", "The spreadsheet contains no specifications.")
+            return
+
+        out_dir = QFileDialog.getExistingDirectory(self, "Select Output Folder")
+        if not out_dir:
+            return
+
+        convert_pdf = QMessageBox.question(
+            self, "Batch Generation",
+            f"Generate {len(jobs)} specification(s).\n\nAlso convert them to PDF?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        ) == QMessageBox.StandardButton.Yes
+
+        self.statusBar().showMessage(f"Generating 0/{len(jobs)}...")
+        self.batch_worker = BatchWorker(
+            jobs, out_dir, force_rebuild=self.force_rebuild_action.isChecked(), convert_pdf=convert_pdf
+        )
+        self.batch_worker.progress.connect(
+            lambda done, total, name: self.statusBar().showMessage(f"Generating {done}/{total}: {name}")
+        )
+        self.batch_worker.finished_batch.connect(lambda results, err: self.on_batch_finished(results, err, out_dir))
+        self.batch_worker.start()
+
+    def on_batch_finished(self, results, error, out_dir):
+        self.statusBar().clearMessage()
+        if error and not results:
+            QMessageBox.critical(self, "Batch Error", f"Batch generation failed: {error}")
+            return
+
+        failed = [(path, message) for path, success, message in results if not success]
+        if failed or error:
+            details = "\n".join(f"{os.path.basename(p)}: {m}" for p, m in failed)
+            QMessageBox.warning(
+                self, "Batch Finished",
+                f"Generated {len(results) - len(failed)} of {len(results)} specification(s) in:\n{out_dir}"
+                + (f"\n\nFailed:\n{details}" if failed else "")
+                + (f"\n\n{error}" if error else "")
             )
+        else:
+            QMessageBox.information(
+                self, "Batch Finished",
+                f"Generated {len(results)} specification(s) in:\n{out_dir}"
+            )
+
+    def convert_to_pdf(self):
+        if not self.last_docx_filepath or not os.path.exists(self.last_docx_filepath):
+            QMessageBox.warning(self, "Warning", "Please generate and save the DOCX file first.")
             return
 
         pdf_filepath = self.last_docx_filepath.replace(".docx", ".pdf")
+        converter = pdf_convert.get_converter()
+        converter.warm_up() # First PDF use: start the converter while the user picks a file name
+
+        # Open file dialog to choose save location for PDF
+        pdf_filepath, _ = QFileDialog.getSaveFileName(
+            self, 
+            "Save PDF Specification", 
+            pdf_filepath, 
+            "PDF Document (*.pdf)"
+        )
         
-        try:
-            # Open file dialog to choose save location for PDF
-            pdf_filepath, _ = QFileDialog.getSaveFileName(
-                self, 
-                "Save PDF Specification", 
-                pdf_filepath, 
-                "PDF Document (*.pdf)"
-            )
-            
-            if not pdf_filepath:
-                return # User cancelled
-                
-            convert(self.last_docx_filepath, pdf_filepath)
-            
-            QMessageBox.information(self, "Success", f"PDF successfully generated to: {pdf_filepath}")
-            
-            if self.auto_open_action.isChecked():
-                self.open_file(pdf_filepath)
+        if not pdf_filepath:
+            return # User cancelled
 
-        except Exception as e:
-            QMessageBox.critical(self, "PDF Conversion Error", f"An error occurred during PDF conversion: {e}\n\n"
-                                                                "Ensure Microsoft Word is installed and closed.")
+        # Converted on the service's worker thread; the result comes back through pdf_finished
+        self.generate_pdf_btn.setEnabled(False)
+        self.statusBar().showMessage(f"Converting to PDF: {os.path.basename(pdf_filepath)}...")
+        future = converter.submit(self.last_docx_filepath, pdf_filepath)
+        future.add_done_callback(
+            lambda f, path=pdf_filepath: self.pdf_finished.emit(path, str(f.exception() or ""))
+        )
+
+    def on_pdf_finished(self, pdf_filepath, error):
+        self.generate_pdf_btn.setEnabled(True)
+        self.statusBar().clearMessage()
+        if error:
+            QMessageBox.critical(self, "PDF Conversion Error", f"An error occurred during PDF conversion: {error}\n\n"
+                                                                "Ensure LibreOffice or Microsoft Word is installed.")
+            return
+
+        QMessageBox.information(self, "Success", f"PDF successfully generated to: {pdf_filepath}")
+        
+        if self.auto_open_action.isChecked():
+            self.open_file(pdf_filepath)
 
     def open_file(self, filepath):
         """Opens a file using the default system application."""
@@ -792,7 +938,10 @@ DEFAULT_LIST_DATA = {
 # 4. Main Execution
 # -----------------------------------------
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # batch mode uses a process pool in the frozen exe
     app = QApplication(sys.argv)
     window = UPSConfiguratorApp(DEFAULT_PARAMS, DEFAULT_LIST_DATA)
     window.show()
+    startup_profile.mark_first_window(window)
     sys.exit(app.exec())
\ No newline at end of file
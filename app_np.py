@@ -1,4 +1,6 @@
 # NAMEPLATE LIST EXCEL/PDF GENERATOR 
+import startup_profile
+startup_profile.install_from_argv("app_np")  # before the heavy imports, see --profile-startup
 import sqlite3
 import os
 from PyQt6.QtWidgets import (
@@ -10,16 +12,13 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QIcon
 from PyQt6.QtWidgets import QSpinBox
 import sys
+import time
 import urllib.request
 import subprocess
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+import metrics
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
-
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
+# openpyxl and reportlab are imported inside the export functions, so they only
+# load when the user exports
 
 
 DB_FILE = 'nameplates.db'
@@ -66,11 +65,20 @@ def ensure_database():
     return False
 
 
-# Ensure DB is ready
-if not ensure_database():
-    raise RuntimeError("Database setup failed. Cannot continue.")
+_database_ready = False
+
+
+def require_database():
+    """Ensure the DB is ready before first use (once per process)."""
+    global _database_ready
+    if not _database_ready:
+        if not ensure_database():
+            raise RuntimeError("Database setup failed. Cannot continue.")
+        _database_ready = True
+
 
 # ------------------- DB Functions -------------------
+@metrics.span("db.query")
 def fetch_nameplates(ch_group_id):
     """Fetch nameplates for a given charger group ID, including COMMON entries with repeater handling."""
     conn = sqlite3.connect(DB_FILE)
@@ -125,12 +133,198 @@ def fetch_nameplates(ch_group_id):
 
 
 
+RECT_HEADER = "--- RECTANGULAR TYPE ---"
+RING_HEADER = "--- RING TYPE ---"
+
+
+def nameplate_list(ch_group_name, customer, job_no, include_special=False):
+    """
+    Heading and table rows of the nameplate list for a charger group.
+
+    Rows are (sl_no, name, cutout/size, qty) with a section header row
+    before the rectangular and the ring nameplates, as shown in the
+    window and written by write_excel()/write_pdf().
+    """
+    conn = sqlite3.connect(DB_FILE)
+    cursor = conn.cursor()
+    cursor.execute('SELECT id FROM ch_groups WHERE group_name=?', (ch_group_name,))
+    result = cursor.fetchone()
+    cursor.execute("SELECT id FROM ch_groups WHERE group_name='SPECIAL'")
+    special_group = cursor.fetchone()
+    conn.close()
+    if not result:
+        raise ValueError(f"Charger group '{ch_group_name}' not found!")
+
+    # Fetch entries from DB
+    ring_entries, rect_entries = fetch_nameplates(result[0])
+
+    # Include SPECIAL if requested
+    if include_special and special_group:
+        special_ring, special_rect = fetch_nameplates(special_group[0])
+        ring_entries.extend(special_ring)
+        rect_entries.extend(special_rect)
+
+    rows = []
+    for header, entries in ((RECT_HEADER, rect_entries), (RING_HEADER, ring_entries)):
+        if entries:
+            rows.append((header, "", "", ""))
+            rows.extend((sl_no, name, size, qty) for sl_no, (_, name, size, qty) in enumerate(entries, start=1))
+    return f"LIVELINE NAME-PLATE-{job_no}-{ch_group_name} - {customer}", rows
+
+
+# ------------------- List Exports -------------------
+def write_excel(file_path, heading, rows):
+    """Write the nameplate list (see nameplate_list()) as an Excel sheet."""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+
+    MAX_LEN = 30  # wrap threshold for Nameplate Name
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Nameplates"
+
+    # Styles
+    center_align = Alignment(horizontal="center")
+    thin_border = Border(left=Side(style='thin'),
+                        right=Side(style='thin'),
+                        top=Side(style='thin'),
+                        bottom=Side(style='thin'))
+    
+    rect_fill = PatternFill(start_color='FFCCE5FF', end_color='FFCCE5FF', fill_type='solid')  # light blue
+    ring_fill = PatternFill(start_color='FFFFCC99', end_color='FFFFCC99', fill_type='solid')  # light orange
+
+    # Main header
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=4)
+    header_cell = ws.cell(row=1, column=1)
+    header_cell.value = heading
+    header_cell.font = Font(bold=True, size=14)
+    header_cell.alignment = center_align
+
+    current_row = 3
+    current_section = None  # Track current section for coloring
+
+    for row_values in rows:
+        row_values = [str(v) for v in row_values]
+
+        # Section heading
+        if row_values[0].startswith("---"):
+            ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=4)
+            cell = ws.cell(row=current_row, column=1, value=row_values[0])
+            cell.font = Font(bold=True, color="080707")
+            cell.alignment = center_align
+            cell.fill = rect_fill if "RECTANGULAR" in row_values[0] else ring_fill
+            current_section = "RECT" if "RECTANGULAR" in row_values[0] else "RING"
+            current_row += 1
+
+            # Column headers
+            headers = ['SL No', 'Nameplate Name', 'Cutout/Size', 'Qty']
+            for col, header in enumerate(headers, start=1):
+                hcell = ws.cell(row=current_row, column=col, value=header)
+                hcell.font = Font(bold=True)
+                hcell.alignment = center_align
+                hcell.border = thin_border
+                hcell.fill = rect_fill if current_section=="RECT" else ring_fill
+            current_row += 1
+        else:
+            for col, value in enumerate(row_values, start=1):
+                # Wrap Nameplate Name column
+                if col == 2 and len(value) > MAX_LEN:
+                    wrapped = ""
+                    while len(value) > MAX_LEN:
+                        split_at = value.rfind(' ', 0, MAX_LEN)
+                        if split_at == -1:
+                            split_at = MAX_LEN
+                        wrapped += value[:split_at] + "\n"
+                        value = value[split_at:].lstrip()
+                    wrapped += value
+                    value = wrapped
+
+                cell = ws.cell(row=current_row, column=col, value=value)
+                # Wrap text for Nameplate Name
+                if col == 2:
+                    cell.alignment = Alignment(horizontal="center", wrap_text=True)
+                else:
+                    cell.alignment = center_align
+                cell.border = thin_border
+            current_row += 1
+
+    # Set column widths
+    ws.column_dimensions['A'].width = 8
+    ws.column_dimensions['B'].width = 40
+    ws.column_dimensions['C'].width = 15
+    ws.column_dimensions['D'].width = 8
+
+    wb.save(file_path)
+
+
+def write_pdf(file_path, heading, rows):
+    """Write the nameplate list (see nameplate_list()) as an A4 PDF table."""
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    MAX_LEN = 30
+    wrap_style = ParagraphStyle(
+        name='WrapStyle',
+        fontName='Helvetica',
+        fontSize=10,
+        leading=12,
+        alignment=1,  # center
+    )
+
+    doc = SimpleDocTemplate(file_path, pagesize=A4)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    # Header
+    header = Paragraph(heading, styles['Title'])
+    elements.append(header)
+    elements.append(Spacer(1, 12))
+
+    # Build table data with wrapping
+    data = []
+    for row in rows:
+        row_values = []
+        for c, val in enumerate(row):
+            val = str(val)
+            # Wrap Nameplate Name column
+            if c == 1 and len(val) > MAX_LEN:
+                val = Paragraph(val, wrap_style)
+            row_values.append(val)
+        data.append(row_values)
+
+    # Table style
+    table = Table(data, colWidths=[50, 250, 80, 50])
+    style = TableStyle([
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTSIZE', (0,0), (-1,-1), 10),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+    ])
+
+    # Highlight section headers
+    for i, row in enumerate(data):
+        first_cell = row[0]
+        if isinstance(first_cell, str) and first_cell.startswith("---"):
+            style.add('BACKGROUND', (0,i), (-1,i), colors.lightgrey)
+            style.add('SPAN', (0,i), (-1,i))
+            style.add('ALIGN', (0,i), (-1,i), 'CENTER')
+            style.add('FONTNAME', (0,i), (-1,i), 'Helvetica-Bold')
+
+    table.setStyle(style)
+    elements.append(table)
+
+    doc.build(elements)
+
+
 # ------------------- Main App -------------------
 class NameplateApp(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Nameplate Ordering App")
         self.setMinimumSize(800, 600)
+        require_database()
         self.setup_ui()
 
     def setup_ui(self):
@@ -345,53 +539,20 @@ class NameplateApp(QWidget):
             QMessageBox.critical(self, "Input Error", "Please fill all fields.")
             return
 
-        # Fetch ch_group_id
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM ch_groups WHERE group_name=?', (ch_group_name,))
-        result = cursor.fetchone()
-        conn.close()
-        if not result:
-            QMessageBox.critical(self, "Error", f"Charger group '{ch_group_name}' not found!")
+        try:
+            heading, rows = nameplate_list(ch_group_name, customer, job_no, self.chk_special.isChecked())
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", str(e))
             return
-        ch_group_id = result[0]
-
-        # Fetch entries from DB
-        ring_entries, rect_entries = fetch_nameplates(ch_group_id)
-
-        # Include SPECIAL if checkbox checked
-        if self.chk_special.isChecked():
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM ch_groups WHERE group_name='SPECIAL'")
-            special_group = cursor.fetchone()
-            conn.close()
-            if special_group:
-                special_id = special_group[0]
-                special_ring, special_rect = fetch_nameplates(special_id)
-                ring_entries.extend(special_ring)
-                rect_entries.extend(special_rect)
 
         # Clear table
         self.tbl_result.setRowCount(0)
 
         # Set heading
-        self.lbl_heading.setText(f"LIVELINE NAME-PLATE-{job_no}-{ch_group_name} - {customer}")
-
-        # Track added entries to avoid duplicates
-        added_entries = set()
+        self.lbl_heading.setText(heading)
 
-        # --- Insert Rectangular Section ---
-        if rect_entries:
-            self.add_table_row(("--- RECTANGULAR TYPE ---", "", "", ""))
-            for entry in rect_entries:
-                self.add_table_row(entry, section="RECT")
-
-        # --- Insert Ring Section ---
-        if ring_entries:
-            self.add_table_row(("--- RING TYPE ---", "", "", ""))
-            for entry in ring_entries:
-                self.add_table_row(entry, section="RING")
+        for row in rows:
+            self.add_table_row(row)
 
 
     def add_table_row(self, row_data, section=None):
@@ -420,7 +581,7 @@ class NameplateApp(QWidget):
         """
         count = 0
         in_section = False
-        header_text = "--- RECTANGULAR TYPE ---" if section == "RECT" else "--- RING TYPE ---"
+        header_text = RECT_HEADER if section == "RECT" else RING_HEADER
         
         for row in range(self.tbl_result.rowCount()):
             item = self.tbl_result.item(row, 0)
@@ -441,7 +602,7 @@ class NameplateApp(QWidget):
         Adds a new empty row in the specified section (RECT or RING) at the BOTTOM of the section.
         Creates the section if it doesn't exist yet.
         """
-        header_text = "--- RECTANGULAR TYPE ---" if type_section == 'RECT' else "--- RING TYPE ---"
+        header_text = RECT_HEADER if type_section == 'RECT' else RING_HEADER
         section_found = False
         last_row_in_section = -1
 
@@ -507,6 +668,12 @@ class NameplateApp(QWidget):
         QMessageBox.information(self, "Remove Entry", f"Removed {removed_count} selected entries.")
 
 
+    def table_rows(self):
+        """The result table as (sl_no, name, cutout/size, qty) string rows."""
+        return [[self.tbl_result.item(r, c).text() if self.tbl_result.item(r, c) else ""
+                 for c in range(self.tbl_result.columnCount())]
+                for r in range(self.tbl_result.rowCount())]
+
     def export_to_excel(self):
         if self.tbl_result.rowCount() == 0:
             QMessageBox.warning(self, "Export Error", "No data to export.")
@@ -516,92 +683,19 @@ class NameplateApp(QWidget):
         if not file_path:
             return
 
-        MAX_LEN = 30  # wrap threshold for Nameplate Name
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Nameplates"
-
-        # Styles
-        center_align = Alignment(horizontal="center")
-        thin_border = Border(left=Side(style='thin'),
-                            right=Side(style='thin'),
-                            top=Side(style='thin'),
-                            bottom=Side(style='thin'))
-        
-        rect_fill = PatternFill(start_color='FFCCE5FF', end_color='FFCCE5FF', fill_type='solid')  # light blue
-        ring_fill = PatternFill(start_color='FFFFCC99', end_color='FFFFCC99', fill_type='solid')  # light orange
-
-        # Main header
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=4)
-        header_cell = ws.cell(row=1, column=1)
-        header_cell.value = self.lbl_heading.text()
-        header_cell.font = Font(bold=True, size=14)
-        header_cell.alignment = center_align
-
-        current_row = 3
-        current_section = None  # Track current section for coloring
-
-        for r in range(self.tbl_result.rowCount()):
-            row_values = [self.tbl_result.item(r, c).text() if self.tbl_result.item(r, c) else "" 
-                        for c in range(self.tbl_result.columnCount())]
-
-            # Section heading
-            if row_values[0].startswith("---"):
-                ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=4)
-                cell = ws.cell(row=current_row, column=1, value=row_values[0])
-                cell.font = Font(bold=True, color="080707")
-                cell.alignment = center_align
-                cell.fill = rect_fill if "RECTANGULAR" in row_values[0] else ring_fill
-                current_section = "RECT" if "RECTANGULAR" in row_values[0] else "RING"
-                current_row += 1
-
-                # Column headers
-                headers = ['SL No', 'Nameplate Name', 'Cutout/Size', 'Qty']
-                for col, header in enumerate(headers, start=1):
-                    hcell = ws.cell(row=current_row, column=col, value=header)
-                    hcell.font = Font(bold=True)
-                    hcell.alignment = center_align
-                    hcell.border = thin_border
-                    hcell.fill = rect_fill if current_section=="RECT" else ring_fill
-                current_row += 1
-            else:
-                for col, value in enumerate(row_values, start=1):
-                    # Wrap Nameplate Name column
-                    if col == 2 and len(value) > MAX_LEN:
-                        wrapped = ""
-                        while len(value) > MAX_LEN:
-                            split_at = value.rfind(' ', 0, MAX_LEN)
-                            if split_at == -1:
-                                split_at = MAX_LEN
-                            wrapped += value[:split_at] + "\n"
-                            value = value[split_at:].lstrip()
-                        wrapped += value
-                        value = wrapped
-
-                    cell = ws.cell(row=current_row, column=col, value=value)
-                    # Wrap text for Nameplate Name
-                    if col == 2:
-                        cell.alignment = Alignment(horizontal="center", wrap_text=True)
-                    else:
-                        cell.alignment = center_align
-                    cell.border = thin_border
-                current_row += 1
-
-        # Set column widths
-        ws.column_dimensions['A'].width = 8
-        ws.column_dimensions['B'].width = 40
-        ws.column_dimensions['C'].width = 15
-        ws.column_dimensions['D'].width = 8
+        started = time.perf_counter()
+        rows = self.table_rows()
 
         try:
-            wb.save(file_path)
+            write_excel(file_path, self.lbl_heading.text(), rows)
+            metrics.record("export.excel", (time.perf_counter() - started) * 1000, rows=self.tbl_result.rowCount())
             QMessageBox.information(self, "Success", f"Excel file saved at:\n{file_path}")
             if os.name == 'nt':  # Windows
                 os.startfile(file_path)
             elif os.name == 'posix':  # macOS/Linux
                 subprocess.call(['open' if sys.platform=='darwin' else 'xdg-open', file_path])
         except Exception as e:
+            metrics.record("export.excel", (time.perf_counter() - started) * 1000, ok=False)
             QMessageBox.critical(self, "Error", f"Failed to save Excel file:\n{e}")
 
 
@@ -614,69 +708,19 @@ class NameplateApp(QWidget):
         if not file_path:
             return
 
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
-        MAX_LEN = 30
-        wrap_style = ParagraphStyle(
-            name='WrapStyle',
-            fontName='Helvetica',
-            fontSize=10,
-            leading=12,
-            alignment=1,  # center
-        )
-
-        doc = SimpleDocTemplate(file_path, pagesize=A4)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        # Header
-        header = Paragraph(self.lbl_heading.text(), styles['Title'])
-        elements.append(header)
-        elements.append(Spacer(1, 12))
-
-        # Build table data with wrapping
-        data = []
-        for r in range(self.tbl_result.rowCount()):
-            row_values = []
-            for c in range(self.tbl_result.columnCount()):
-                val = self.tbl_result.item(r, c).text() if self.tbl_result.item(r, c) else ""
-                # Wrap Nameplate Name column
-                if c == 1 and len(val) > MAX_LEN:
-                    val = Paragraph(val, wrap_style)
-                row_values.append(val)
-            data.append(row_values)
-
-        # Table style
-        table = Table(data, colWidths=[50, 250, 80, 50])
-        style = TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('FONTSIZE', (0,0), (-1,-1), 10),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-        ])
-
-        # Highlight section headers
-        for i, row in enumerate(data):
-            first_cell = row[0]
-            if isinstance(first_cell, str) and first_cell.startswith("---"):
-                style.add('BACKGROUND', (0,i), (-1,i), colors.lightgrey)
-                style.add('SPAN', (0,i), (-1,i))
-                style.add('ALIGN', (0,i), (-1,i), 'CENTER')
-                style.add('FONTNAME', (0,i), (-1,i), 'Helvetica-Bold')
-
-        table.setStyle(style)
-        elements.append(table)
+        started = time.perf_counter()
+        rows = self.table_rows()
 
         try:
-            doc.build(elements)
+            write_pdf(file_path, self.lbl_heading.text(), rows)
+            metrics.record("export.pdf", (time.perf_counter() - started) * 1000, rows=self.tbl_result.rowCount())
             QMessageBox.information(self, "Success", f"PDF file saved at:\n{file_path}")
             if os.name == 'nt':
                 os.startfile(file_path)
             elif os.name == 'posix':
                 subprocess.call(['open' if sys.platform=='darwin' else 'xdg-open', file_path])
         except Exception as e:
+            metrics.record("export.pdf", (time.perf_counter() - started) * 1000, ok=False)
             QMessageBox.critical(self, "Error", f"Failed to save PDF file:\n{e}")
 
     def bulk_update_qty(self):
@@ -716,4 +760,5 @@ if __name__ == "__main__":
     window = NameplateApp()
     window.show()
     window.resize(1024, 768)  
+    startup_profile.mark_first_window(window)
     sys.exit(app.exec())
@@ -12,10 +12,17 @@ Sticker generator application for UPS and Battery Charger products.
 Generates front and back stickers with customizable product details and serial numbers.
 """
 
+from __future__ import annotations
+
+import startup_profile
+startup_profile.install_from_argv("app_sticker")  # before the heavy imports, see --profile-startup
+
 import sys
 import os
 import logging
-from typing import Optional, Tuple
+import sqlite3
+import time
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, List, Dict
 from pathlib import Path
 from datetime import date
 
@@ -23,22 +30,23 @@ from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton,
     QVBoxLayout, QHBoxLayout, QFileDialog, QComboBox, QSpinBox,
     QMessageBox, QGroupBox, QFormLayout, QMainWindow, QMenuBar,
-    QCheckBox, QProgressDialog
+    QCheckBox, QProgressDialog, QInputDialog
 )
 from PyQt6.QtGui import QFont, QIcon, QColor, QPalette, QIntValidator, QAction, QPageSize
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSettings
-from PyQt6.QtPrintSupport import QPrinter, QPrintDialog
-
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 
 import subprocess
 import webbrowser
 import platform
-import urllib.request
-import json
-from packaging import version
+
+import docx_cache
+import metrics
+import update_check
+
+# python-docx, QtPrintSupport and packaging are imported where they are used,
+# so the window appears before they are loaded.
+if TYPE_CHECKING:
+    from docx.document import Document
 
 # ----------------------------------------
 # Global Configuration Constants
@@ -50,7 +58,6 @@ class Config:
     APP_NAME = "Sticker Generator Tool"
     ORGANIZATION = "Bitmutex"
     GITHUB_REPO = "aamitn/sticker-generator"
-    GITHUB_API_URL = f"https://api.github.com/repos/aamitn/sticker-generator/releases/latest"
     
     # Input validation limits
     KVA_MIN = 0
@@ -66,6 +73,7 @@ class Config:
     # File paths - use user directories to avoid permission issues
     APP_DATA_DIR = Path.home() / "Documents" / "Sticker Generator"
     DOCS_DIR = APP_DATA_DIR / "Output"
+    INDEX_FILE = APP_DATA_DIR / "output_index.db"
     LOG_FILE = APP_DATA_DIR / "sticker_generator.log"
     DEFAULT_STICKER = Path.cwd() / "sticker.png"
     
@@ -138,6 +146,8 @@ def fit_text_to_line(
     Returns:
         Final font size used
     """
+    from docx.shared import Pt
+
     text_length = len(text)
     font_size = base_font_size
     
@@ -170,6 +180,9 @@ def add_page(
         sticker_path: Path to sticker image
         show_customer_in_parens: Whether to show customer name in parentheses
     """
+    from docx.shared import Inches, Pt, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
     # Add heading
     heading = doc.add_paragraph()
     run = heading.add_run(side)
@@ -255,34 +268,378 @@ def get_current_financial_year() -> str:
     return get_financial_year_from_year(fy_start)
 
 
-def get_latest_github_release() -> Optional[dict]:
+def release_info(tag: Optional[str], url: Optional[str], err: Optional[str]) -> Optional[dict]:
     """
-    Fetch the latest release information from GitHub.
+    Convert an update_check result to release information.
     
     Returns:
         Dictionary with 'version' and 'url' or None if failed
     """
-    try:
-        req = urllib.request.Request(
-            Config.GITHUB_API_URL,
-            headers={'User-Agent': 'Mozilla/5.0'}
-        )
-        
-        with urllib.request.urlopen(req, timeout=5) as response:
-            data = json.loads(response.read().decode())
-            
-            # Extract version from tag_name (e.g., "v0.15" -> "0.15")
-            tag_name = data.get('tag_name', '')
-            release_version = tag_name.lstrip('v')
-            release_url = data.get('html_url', '')
-            
-            return {
-                'version': release_version,
-                'url': release_url
-            }
-    except Exception as e:
-        logger.warning(f"Failed to fetch latest release: {e}")
+    if err or not tag:
+        logger.warning(f"Failed to fetch latest release: {err or 'no release found'}")
         return None
+    # Extract version from tag_name (e.g., "v0.15" -> "0.15")
+    return {'version': tag.lstrip('v'), 'url': url or ''}
+
+
+# ----------------------------------------
+# Output Manifest Index
+# ----------------------------------------
+class OutputIndex:
+    """
+    Manifest of generated sticker documents kept in a small SQLite file.
+
+    Every document written by DocxWorker is recorded with its job, OP,
+    product, customer, size and timestamp, so purging, job lookup and
+    duplicate detection are index queries instead of directory walks.
+    The folder is scanned only once, to seed the index on first use or
+    when the user explicitly asks for a rebuild.
+
+    ``outputs`` holds one row per file on disk. Regenerating an order
+    writes the same filename again, so every generation is also logged
+    as its own row in ``generations``, which duplicate detection reads.
+    Deleting a file drops its generations too.
+    """
+
+    FILE_PREFIX = "Sticker_"
+
+    def __init__(self, db_path: Path = Config.INDEX_FILE, docs_dir: Path = Config.DOCS_DIR):
+        self.db_path = Path(db_path)
+        self.docs_dir = Path(docs_dir)
+        self._ensure_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_schema(self) -> None:
+        """Create the index table, seeding it from the output folder on first use."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.db_path.exists()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outputs (
+                    path TEXT PRIMARY KEY,
+                    job_no TEXT,
+                    op_no TEXT,
+                    product_type TEXT,
+                    customer_name TEXT,
+                    size INTEGER,
+                    created REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outputs_job ON outputs(job_no, op_no)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outputs_created ON outputs(created)")
+            has_generations = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'generations'"
+            ).fetchone()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS generations (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT,
+                    job_no TEXT,
+                    op_no TEXT,
+                    product_type TEXT,
+                    customer_name TEXT,
+                    created REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_key "
+                         "ON generations(job_no, op_no, product_type)")
+            if not has_generations:
+                # Index files from before the generation log count as one generation each
+                self._seed_generations(conn)
+        if is_new:
+            count = self.rebuild()
+            logger.info(f"Output index created with {count} existing file(s)")
+
+    @classmethod
+    def parse_filename(cls, filename: str) -> Optional[Tuple[str, str, str, str]]:
+        """
+        Split a generated filename into its parts.
+
+        Args:
+            filename: Name like "Sticker_{customer}_{job}_{op}_{product}.docx"
+
+        Returns:
+            Tuple of (customer_name, job_no, op_no, product_type) or None
+        """
+        stem = Path(filename).stem
+        if not stem.startswith(cls.FILE_PREFIX):
+            return None
+        # Customer names may contain underscores, so split from the right
+        parts = stem[len(cls.FILE_PREFIX):].rsplit("_", 3)
+        if len(parts) != 4:
+            return None
+        return parts[0], parts[1], parts[2], parts[3]
+
+    @staticmethod
+    def _seed_generations(conn: sqlite3.Connection) -> None:
+        """Log indexed files that have no generation row yet."""
+        conn.execute("""
+            INSERT INTO generations (path, job_no, op_no, product_type, customer_name, created)
+            SELECT path, job_no, op_no, product_type, customer_name, created FROM outputs
+            WHERE path NOT IN (SELECT path FROM generations)
+        """)
+
+    def record(
+        self,
+        path: str,
+        job_no: str,
+        op_no: str,
+        product_type: str,
+        customer_name: str
+    ) -> None:
+        """
+        Add or refresh the entry for a document that has just been written
+        and log the generation.
+
+        Args:
+            path: Full path of the saved document
+            job_no: Job number
+            op_no: OP number
+            product_type: Product type as used in the filename
+            customer_name: Customer name as used in the filename
+        """
+        stat = os.stat(path)
+        path = str(Path(path).resolve())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, str(job_no), str(op_no), product_type,
+                 customer_name, stat.st_size, stat.st_mtime)
+            )
+            conn.execute(
+                "INSERT INTO generations (path, job_no, op_no, product_type, customer_name, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, str(job_no), str(op_no), product_type, customer_name, stat.st_mtime)
+            )
+
+    def remove(self, paths: List[str]) -> None:
+        """Drop entries and generations for the given paths."""
+        keys = [(str(Path(p).resolve()),) for p in paths]
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM outputs WHERE path = ?", keys)
+            conn.executemany("DELETE FROM generations WHERE path = ?", keys)
+
+    def rebuild(self) -> int:
+        """
+        Re-create the index from a single scan of the output folder.
+
+        The generation log is kept for files still on disk; files it does
+        not know yet are added as one generation each.
+
+        Returns:
+            Number of documents indexed
+        """
+        rows = []
+        if self.docs_dir.exists():
+            for file in self.docs_dir.glob("*.docx"):
+                parts = self.parse_filename(file.name)
+                if parts is None:
+                    continue
+                customer_name, job_no, op_no, product_type = parts
+                try:
+                    stat = file.stat()
+                except OSError:
+                    continue
+                rows.append((str(file.resolve()), job_no, op_no, product_type,
+                             customer_name, stat.st_size, stat.st_mtime))
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM outputs")
+            conn.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("DELETE FROM generations WHERE path NOT IN (SELECT path FROM outputs)")
+            self._seed_generations(conn)
+        logger.info(f"Output index rebuilt: {len(rows)} file(s)")
+        return len(rows)
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def all_entries(self) -> List[Dict]:
+        """Return every indexed document, newest first."""
+        return self._query("SELECT * FROM outputs ORDER BY created DESC")
+
+    def find_by_job(self, job_no: str, op_no: Optional[str] = None) -> List[Dict]:
+        """Return documents for a job number, optionally narrowed to one OP."""
+        if op_no:
+            return self._query(
+                "SELECT * FROM outputs WHERE job_no = ? AND op_no = ? ORDER BY created DESC",
+                (str(job_no), str(op_no))
+            )
+        return self._query(
+            "SELECT * FROM outputs WHERE job_no = ? ORDER BY created DESC",
+            (str(job_no),)
+        )
+
+    def older_than(self, days: int) -> List[Dict]:
+        """Return documents written more than ``days`` days ago."""
+        cutoff = time.time() - days * 86400
+        return self._query(
+            "SELECT * FROM outputs WHERE created < ? ORDER BY created",
+            (cutoff,)
+        )
+
+    def duplicates(self) -> List[List[Dict]]:
+        """
+        Find job/OP/product combinations that were generated more than once.
+
+        Regenerating the same order (same file) counts, as does the same
+        combination under another customer spelling.
+
+        Returns:
+            List of groups, each a list of generations for the same combination
+        """
+        rows = self._query("""
+            SELECT g.* FROM generations g
+            JOIN (
+                SELECT job_no, op_no, product_type FROM generations
+                GROUP BY job_no, op_no, product_type
+                HAVING COUNT(*) > 1
+            ) d USING (job_no, op_no, product_type)
+            ORDER BY g.job_no, g.op_no, g.product_type, g.created DESC
+        """)
+        groups: Dict[Tuple[str, str, str], List[Dict]] = {}
+        for row in rows:
+            groups.setdefault((row["job_no"], row["op_no"], row["product_type"]), []).append(row)
+        return list(groups.values())
+
+
+# ----------------------------------------
+# DOCX Generation
+# ----------------------------------------
+def _ups_sticker_pages(params: dict, fy: str) -> list:
+    """add_page() arguments after ``doc`` for every UPS sticker page."""
+    num_sets = params.get("num_sets", 1)
+    ups_per_set = params.get("ups_per_set", 1)
+    kva_rating = params.get("kva_rating")
+    job_no, op_no = params.get("job_no", ""), params.get("op_no", "")
+    customer_name = params.get("customer_name", "").upper().strip()
+    sticker_path = params.get("sticker_path", "")
+
+    logger.info(f"Generating {num_sets} UPS sets with {ups_per_set} units each")
+
+    pages = []
+    for set_idx in range(1, num_sets + 1):
+        ups_list = [f"UPS{i + 1}" for i in range(ups_per_set)]
+        if ups_per_set > 1:
+            ups_list.append("BYPASS")
+
+        for unit in ups_list:
+            product_label = f"{kva_rating}kVA {unit}"
+            serial_number = (
+                f"(SL. NO. : LL/{fy}/{job_no}-OP{op_no}/BYP)"
+                if unit == "BYPASS"
+                else f"(SL. NO. : LL/{fy}/{job_no}-OP{op_no}/{unit})"
+            )
+
+            for side in ["FRONT SIDE", "BACK SIDE"]:
+                pages.append((side, product_label, customer_name, serial_number, sticker_path, True))
+    return pages
+
+
+def _charger_sticker_pages(params: dict, fy: str, show_label: bool) -> list:
+    """add_page() arguments after ``doc`` for every Battery Charger sticker page."""
+    start_index = params.get("start_index", 1)
+    start = 0 if start_index == 0 else 1
+    num_chargers = params.get("num_chargers", 1)
+    voltage = params.get("voltage", "")
+    current = params.get("current", "")
+    battery_capacity = params.get("battery_capacity", "")
+    charger_type = params.get("charger_type", "")
+    battery_type = params.get("battery_type", "")
+    job_no, op_no = params.get("job_no", ""), params.get("op_no", "")
+    customer_name = params.get("customer_name", "").upper().strip()
+    sticker_path = params.get("sticker_path", "")
+
+    logger.info(f"Generating {num_chargers} charger stickers (show_label={show_label})")
+
+    pages = []
+    for i in range(start, num_chargers + start):
+        index_label = "" if i == 0 else str(i)
+
+        if show_label:
+            product_label = (
+                f"{voltage}V/{current}A {charger_type} "
+                f"for {battery_capacity}Ah {battery_type} battery"
+            )
+            show_customer_in_parens = True
+        else:
+            product_label = customer_name
+            show_customer_in_parens = False
+
+        serial_number = f"(SL. NO. : LL/{fy}/{job_no}-OP{op_no}/BCH{index_label})"
+
+        for side in ["FRONT SIDE", "BACK SIDE"]:
+            pages.append((side, product_label, customer_name, serial_number, sticker_path, show_customer_in_parens))
+    return pages
+
+
+def sticker_filename(params: dict) -> str:
+    """File name of the sticker document for ``params``."""
+    product_type = params.get("product_type", "").upper().strip()
+    customer_name = params.get("customer_name", "").upper().strip()
+    return f"Sticker_{customer_name}_{params.get('job_no', '')}_{params.get('op_no', '')}_{product_type}.docx"
+
+
+def build_sticker_docx(params: dict, fy: str, show_label: bool, output_path: str,
+                       progress: Optional[Callable[[int], None]] = None) -> str:
+    """
+    Write the sticker document for one job/OP to ``output_path``.
+
+    Shared by DocxWorker and the job queue (job_daemon.py), so it uses no
+    widgets. Identical inputs (incl. FY and sticker image content) reuse
+    the cached document.
+
+    Args:
+        params: Generation parameters (product_type, customer_name, sticker_path,
+                job_no, op_no, start_index, force_rebuild and the UPS/charger fields)
+        fy: Financial year for the serial numbers, e.g. "25-26"
+        show_label: Charger stickers show the product label (else the customer name)
+        output_path: Where to save the .docx
+        progress: Optional callable receiving the percentage done
+
+    Returns:
+        ``output_path``
+    """
+    product_type = params.get("product_type", "").upper().strip()
+
+    cache = docx_cache.get_output_cache()
+    cache_params = {k: v for k, v in params.items() if k != "force_rebuild"}
+    cache_params.update(fy=fy, show_label=show_label, app_version=Config.VERSION)
+    cache_key = docx_cache.make_key("sticker", cache_params, [params.get("sticker_path", "")])
+
+    if cache is not None and not params.get("force_rebuild", False):
+        if cache.get(cache_key, output_path):
+            if progress:
+                progress(100)
+            return output_path
+
+    from docx import Document
+    doc = Document()
+
+    # Generate pages based on product type
+    if product_type == "UPS":
+        pages = _ups_sticker_pages(params, fy)
+    else:
+        pages = _charger_sticker_pages(params, fy, show_label)
+    for done, page in enumerate(pages, start=1):
+        add_page(doc, *page)
+        if progress:
+            progress(int(done / len(pages) * 100))
+
+    # Save document
+    with metrics.span("docx.save", template="sticker", pages=len(pages)):
+        doc.save(output_path)
+
+    logger.info(f"Document saved successfully: {output_path}")
+
+    if cache is not None:
+        cache.put(cache_key, output_path)
+    return output_path
 
 
 # ----------------------------------------
@@ -322,14 +679,11 @@ class DocxWorker(QThread):
             sticker_path = self.kwargs.get("sticker_path", "")
             job_no = self.kwargs.get("job_no", "")
             op_no = self.kwargs.get("op_no", "")
-            start_index = self.kwargs.get("start_index", 1)
 
             # Validate required parameters
             if not all([product_type, customer_name, sticker_path, job_no, op_no]):
                 raise ValueError("Missing required parameters")
 
-            doc = Document()
-            
             # Determine fiscal year
             if self.main_window.override_fy_cb.isChecked():
                 fy_str = self.main_window.fy_dropdown.currentText()
@@ -340,30 +694,11 @@ class DocxWorker(QThread):
                 fy = get_current_financial_year()
                 logger.info(f"Using current FY: {fy}")
 
-            # Calculate total pages for progress tracking
-            total_pages = self._calculate_total_pages(product_type)
-            current_page = 0
-
-            def add_with_progress(*args, **kwargs):
-                """Wrapper to track progress."""
-                nonlocal current_page
-                add_page(*args, **kwargs)
-                current_page += 1
-                percent = int((current_page / total_pages) * 100) if total_pages > 0 else 0
-                self.progress.emit(percent)
-
-            # Generate pages based on product type
-            if product_type == "UPS":
-                self._generate_ups_stickers(doc, fy, job_no, op_no, customer_name, sticker_path, add_with_progress)
-            else:
-                self._generate_charger_stickers(doc, fy, job_no, op_no, customer_name, sticker_path, start_index, add_with_progress)
+            output_path = str(self.main_window.save_output_path(sticker_filename(self.kwargs)))
 
-            # Save document
-            filename = f"Sticker_{customer_name}_{job_no}_{op_no}_{product_type}.docx"
-            output_path = str(self.main_window.save_output_path(filename))
-            doc.save(output_path)
-            
-            logger.info(f"Document saved successfully: {output_path}")
+            build_sticker_docx(self.kwargs, fy, self.main_window.show_prod_label_cb.isChecked(),
+                               output_path, self.progress.emit)
+            self._record_output(output_path, job_no, op_no, product_type, customer_name)
             self.finished.emit(output_path)
 
         except Exception as e:
@@ -371,77 +706,16 @@ class DocxWorker(QThread):
             logger.error(error_msg, exc_info=True)
             self.error.emit(error_msg)
 
-    def _calculate_total_pages(self, product_type: str) -> int:
-        """Calculate total pages for progress tracking."""
-        if product_type == "UPS":
-            num_sets = self.kwargs.get("num_sets", 1)
-            ups_per_set = self.kwargs.get("ups_per_set", 1)
-            return num_sets * (ups_per_set + 1) * 2  # +1 for BYPASS, 2 sides
-        else:
-            num_chargers = self.kwargs.get("num_chargers", 1)
-            return num_chargers * 2
-
-    def _generate_ups_stickers(self, doc, fy, job_no, op_no, customer_name, sticker_path, add_with_progress):
-        """Generate UPS stickers."""
-        num_sets = self.kwargs.get("num_sets", 1)
-        ups_per_set = self.kwargs.get("ups_per_set", 1)
-        kva_rating = self.kwargs.get("kva_rating")
-        
-        logger.info(f"Generating {num_sets} UPS sets with {ups_per_set} units each")
-        
-        for set_idx in range(1, num_sets + 1):
-            ups_list = [f"UPS{i + 1}" for i in range(ups_per_set)]
-            if ups_per_set > 1:
-                ups_list.append("BYPASS")
-
-            for unit in ups_list:
-                product_label = f"{kva_rating}kVA {unit}"
-                serial_number = (
-                    f"(SL. NO. : LL/{fy}/{job_no}-OP{op_no}/BYP)" 
-                    if unit == "BYPASS" 
-                    else f"(SL. NO. : LL/{fy}/{job_no}-OP{op_no}/{unit})"
-                )
-                
-                for side in ["FRONT SIDE", "BACK SIDE"]:
-                    add_with_progress(
-                        doc, side, product_label, customer_name, 
-                        serial_number, sticker_path, True
-                    )
-
-    def _generate_charger_stickers(self, doc, fy, job_no, op_no, customer_name, sticker_path, start_index, add_with_progress):
-        """Generate Battery Charger stickers."""
-        start = 0 if start_index == 0 else 1
-        num_chargers = self.kwargs.get("num_chargers", 1)
-        voltage = self.kwargs.get("voltage", "")
-        current = self.kwargs.get("current", "")
-        battery_capacity = self.kwargs.get("battery_capacity", "")
-        charger_type = self.kwargs.get("charger_type", "")
-        battery_type = self.kwargs.get("battery_type", "")
-        
-        show_label = self.main_window.show_prod_label_cb.isChecked()
-        
-        logger.info(f"Generating {num_chargers} charger stickers (show_label={show_label})")
-
-        for i in range(start, num_chargers + start):
-            index_label = "" if i == 0 else str(i)
-
-            if show_label:
-                product_label = (
-                    f"{voltage}V/{current}A {charger_type} "
-                    f"for {battery_capacity}Ah {battery_type} battery"
-                )
-                show_customer_in_parens = True
-            else:
-                product_label = customer_name
-                show_customer_in_parens = False
-
-            serial_number = f"(SL. NO. : LL/{fy}/{job_no}-OP{op_no}/BCH{index_label})"
-
-            for side in ["FRONT SIDE", "BACK SIDE"]:
-                add_with_progress(
-                    doc, side, product_label, customer_name,
-                    serial_number, sticker_path, show_customer_in_parens
-                )
+    def _record_output(self, output_path, job_no, op_no, product_type, customer_name) -> None:
+        """Add the written document to the main window's output index."""
+        if self.main_window.output_index is None:
+            return
+        try:
+            self.main_window.output_index.record(
+                output_path, job_no, op_no, product_type, customer_name
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update output index: {e}")
 
 
 # ----------------------------------------
@@ -450,6 +724,8 @@ class DocxWorker(QThread):
 class StickerApp(QMainWindow):
     """Main application window for sticker generator."""
 
+    release_checked = pyqtSignal(object, object, object)  # tag, url, err from update_check
+
     def __init__(self):
         """Initialize the application."""
         super().__init__()
@@ -460,6 +736,13 @@ class StickerApp(QMainWindow):
         self.setFixedWidth(480)
         self.start_index = 1
 
+        # Manifest of generated outputs (purge/lookup without scanning the folder)
+        try:
+            self.output_index = OutputIndex()
+        except Exception as e:
+            logger.warning(f"Output index unavailable: {e}")
+            self.output_index = None
+
         # Initialize UI components
         self.init_ui()
         self.apply_adaptive_theme()
@@ -570,16 +853,37 @@ class StickerApp(QMainWindow):
         self.use_default_printer_action = QAction("Use Default Printer", self, checkable=True)
         settings_menu.addAction(self.use_default_printer_action)
 
+        self.force_rebuild_action = QAction("Always Rebuild (Ignore Cache)", self, checkable=True)
+        settings_menu.addAction(self.force_rebuild_action)
+
         # Edit menu
         edit_menu = menu_bar.addMenu("Edit")
         open_output_action = QAction("Open Output Path", self)
         open_output_action.triggered.connect(self.open_output_path)
         edit_menu.addAction(open_output_action)
         
+        find_job_action = QAction("Find Outputs by Job...", self)
+        find_job_action.triggered.connect(self.find_outputs_by_job)
+        edit_menu.addAction(find_job_action)
+
+        duplicates_action = QAction("Show Duplicate Outputs", self)
+        duplicates_action.triggered.connect(self.show_duplicate_outputs)
+        edit_menu.addAction(duplicates_action)
+
+        edit_menu.addSeparator()
+
+        purge_old_action = QAction("Purge DOCX Older Than...", self)
+        purge_old_action.triggered.connect(self.purge_old_docx)
+        edit_menu.addAction(purge_old_action)
+
         purge_all_action = QAction("Purge All DOCX", self)
         purge_all_action.triggered.connect(self.purge_all_docx)
         edit_menu.addAction(purge_all_action)
 
+        rebuild_index_action = QAction("Rebuild Output Index", self)
+        rebuild_index_action.triggered.connect(self.rebuild_output_index)
+        edit_menu.addAction(rebuild_index_action)
+
         # Help menu
         about_menu = menu_bar.addMenu("Help")
         about_action = QAction("About", self)
@@ -781,9 +1085,34 @@ class StickerApp(QMainWindow):
 
     def show_about(self) -> None:
         """Display about dialog with version information."""
-        # Fetch latest release info
-        latest_release = get_latest_github_release()
+        # Use the cached release info; if there is none yet, fill it in when the check returns
+        cached = update_check.get_checker().cached(Config.GITHUB_REPO)
         
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle(f"About – {Config.APP_NAME}")
+        msg_box.setTextFormat(Qt.TextFormat.RichText)
+        msg_box.setIcon(QMessageBox.Icon.Information)
+        msg_box.setText(self._about_text(release_info(*cached) if cached else None, checking=cached is None))
+        msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
+        
+        # Enable links to be clickable
+        msg_box.setTextInteractionFlags(
+            Qt.TextInteractionFlag.TextBrowserInteraction
+        )
+
+        if cached is None:
+            def on_release_checked(tag, url, err):
+                msg_box.setText(self._about_text(release_info(tag, url, err)))
+
+            self.release_checked.connect(on_release_checked)
+            update_check.check_async(Config.GITHUB_REPO, self.release_checked.emit)
+            msg_box.exec()
+            self.release_checked.disconnect(on_release_checked)
+        else:
+            msg_box.exec()
+
+    def _about_text(self, latest_release: Optional[dict], checking: bool = False) -> str:
+        """Build the About dialog HTML for the given release info."""
         # Build version info text
         current_version_text = f"<b>{Config.VERSION}</b>"
         
@@ -792,6 +1121,8 @@ class StickerApp(QMainWindow):
             release_url = latest_release['url']
             
             try:
+                from packaging import version
+
                 # Compare versions
                 if version.parse(Config.VERSION) < version.parse(latest_version):
                     version_status = (
@@ -807,6 +1138,8 @@ class StickerApp(QMainWindow):
                     f"Latest: <a href='{release_url}' style='color:#2F80ED; text-decoration:none;'>"
                     f"<b>v{latest_version}</b></a>"
                 )
+        elif checking:
+            version_status = "<span style='color:#999;'>Checking for updates...</span>"
         else:
             version_status = "<span style='color:#999;'>Unable to check for updates</span>"
         
@@ -827,20 +1160,7 @@ class StickerApp(QMainWindow):
             "<p style='font-size:9pt; color:#777;'>© 2025 Bitmutex Technologies. All rights reserved.</p>"
             "</div>"
         )
-
-        msg_box = QMessageBox(self)
-        msg_box.setWindowTitle(f"About – {Config.APP_NAME}")
-        msg_box.setTextFormat(Qt.TextFormat.RichText)
-        msg_box.setIcon(QMessageBox.Icon.Information)
-        msg_box.setText(about_text)
-        msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
-        
-        # Enable links to be clickable
-        msg_box.setTextInteractionFlags(
-            Qt.TextInteractionFlag.TextBrowserInteraction
-        )
-        
-        msg_box.exec()
+        return about_text
 
     def update_charger_field_state(self) -> None:
         """Show/hide charger detail fields based on checkbox state."""
@@ -964,8 +1284,74 @@ class StickerApp(QMainWindow):
                 f"Could not open GitHub releases page:\n{e}"
             )
 
+    def _folder_outputs(self) -> List[Dict]:
+        """
+        Return every .docx file in the output folder, plus index entries for it.
+
+        Files written while the index was unavailable are found by the
+        folder scan; entries whose file is already gone are included so
+        deleting them drops them from the index.
+        """
+        entries = [{"path": str(f.resolve())} for f in Config.DOCS_DIR.glob("*.docx")]
+        if self.output_index is not None:
+            docs_dir = Config.DOCS_DIR.resolve()
+            on_disk = {e["path"] for e in entries}
+            entries += [e for e in self.output_index.all_entries()
+                        if Path(e["path"]).parent == docs_dir and e["path"] not in on_disk]
+        return entries
+
+    def _delete_outputs(self, entries: List[Dict]) -> Tuple[int, List[str]]:
+        """
+        Delete the given output files and drop them from the index.
+
+        Returns:
+            Tuple of (deleted_count, failed_file_names)
+        """
+        deleted_count = 0
+        failed_files = []
+        removed = []
+
+        for entry in entries:
+            file = Path(entry["path"])
+            try:
+                file.unlink()
+                deleted_count += 1
+                removed.append(entry["path"])
+                logger.info(f"Deleted: {file.name}")
+            except FileNotFoundError:
+                # Already gone; just forget it
+                removed.append(entry["path"])
+            except Exception as e:
+                logger.error(f"Failed to delete {file.name}: {e}")
+                failed_files.append(file.name)
+
+        if self.output_index is not None and removed:
+            try:
+                self.output_index.remove(removed)
+            except Exception as e:
+                logger.warning(f"Failed to update output index: {e}")
+
+        return deleted_count, failed_files
+
+    def _show_delete_result(self, deleted_count: int, failed_files: List[str]) -> None:
+        """Show the outcome of a purge."""
+        if failed_files:
+            QMessageBox.warning(
+                self,
+                "Partial Success",
+                f"Deleted {deleted_count} file(s).\n\n"
+                f"Failed to delete: {', '.join(failed_files)}"
+            )
+        else:
+            QMessageBox.information(
+                self,
+                "Deleted",
+                f"Total .docx files deleted: {deleted_count}"
+                if deleted_count else "No .docx files found."
+            )
+
     def purge_all_docx(self) -> None:
-        """Delete all .docx files from the output folder."""
+        """Delete all .docx files in the output folder."""
         reply = QMessageBox.question(
             self,
             "Confirm Delete",
@@ -975,33 +1361,104 @@ class StickerApp(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            deleted_count = 0
-            failed_files = []
-            
-            for file in Config.DOCS_DIR.glob("*.docx"):
-                try:
-                    file.unlink()
-                    deleted_count += 1
-                    logger.info(f"Deleted: {file.name}")
-                except Exception as e:
-                    logger.error(f"Failed to delete {file.name}: {e}")
-                    failed_files.append(file.name)
-
-            # Show result message
-            if failed_files:
-                QMessageBox.warning(
-                    self,
-                    "Partial Success",
-                    f"Deleted {deleted_count} file(s).\n\n"
-                    f"Failed to delete: {', '.join(failed_files)}"
-                )
-            else:
-                QMessageBox.information(
-                    self,
-                    "Deleted",
-                    f"Total .docx files deleted: {deleted_count}"
-                    if deleted_count else "No .docx files found."
-                )
+            deleted_count, failed_files = self._delete_outputs(self._folder_outputs())
+            self._show_delete_result(deleted_count, failed_files)
+
+    def purge_old_docx(self) -> None:
+        """Delete generated .docx files older than a number of days."""
+        if self.output_index is None:
+            QMessageBox.warning(self, "Error", "Output index is not available.")
+            return
+
+        days, ok = QInputDialog.getInt(
+            self, "Purge Old DOCX", "Delete files older than (days):", 90, 1, 3650
+        )
+        if not ok:
+            return
+
+        entries = self.output_index.older_than(days)
+        if not entries:
+            QMessageBox.information(self, "Deleted", f"No .docx files older than {days} day(s).")
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Confirm Delete",
+            f"Delete {len(entries)} .docx file(s) older than {days} day(s)?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            deleted_count, failed_files = self._delete_outputs(entries)
+            self._show_delete_result(deleted_count, failed_files)
+
+    def find_outputs_by_job(self) -> None:
+        """Look up generated documents for a job number."""
+        if self.output_index is None:
+            QMessageBox.warning(self, "Error", "Output index is not available.")
+            return
+
+        job_no, ok = QInputDialog.getText(
+            self, "Find Outputs", "Job Number:", text=self.job_input.text().strip()
+        )
+        if not ok or not job_no.strip():
+            return
+
+        entries = self.output_index.find_by_job(job_no.strip())
+        if not entries:
+            QMessageBox.information(self, "Find Outputs", f"No documents found for job {job_no}.")
+            return
+
+        lines = [
+            f"OP{e['op_no']}  {e['product_type']}  {e['customer_name']}  "
+            f"({time.strftime('%Y-%m-%d %H:%M', time.localtime(e['created']))})"
+            for e in entries
+        ]
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle("Find Outputs")
+        msg_box.setIcon(QMessageBox.Icon.Information)
+        msg_box.setText(f"{len(entries)} document(s) for job {job_no}:")
+        msg_box.setDetailedText("\n".join(f"{line}\n    {e['path']}" for line, e in zip(lines, entries)))
+        msg_box.setInformativeText("\n".join(lines[:10]) + ("\n..." if len(lines) > 10 else ""))
+        msg_box.exec()
+
+    def show_duplicate_outputs(self) -> None:
+        """List job/OP/product combinations that were generated more than once."""
+        if self.output_index is None:
+            QMessageBox.warning(self, "Error", "Output index is not available.")
+            return
+
+        groups = self.output_index.duplicates()
+        if not groups:
+            QMessageBox.information(self, "Duplicate Outputs", "No duplicate outputs found.")
+            return
+
+        details = []
+        for group in groups:
+            first = group[0]
+            details.append(f"Job {first['job_no']} OP{first['op_no']} {first['product_type']}:")
+            details.extend(
+                f"    {time.strftime('%Y-%m-%d %H:%M', time.localtime(e['created']))}  {Path(e['path']).name}"
+                for e in group
+            )
+
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle("Duplicate Outputs")
+        msg_box.setIcon(QMessageBox.Icon.Information)
+        msg_box.setText(f"{len(groups)} job/OP/product combination(s) were generated more than once.")
+        msg_box.setDetailedText("\n".join(details))
+        msg_box.exec()
+
+    def rebuild_output_index(self) -> None:
+        """Re-scan the output folder and rebuild the manifest index."""
+        try:
+            if self.output_index is None:
+                self.output_index = OutputIndex()
+            count = self.output_index.rebuild()
+            QMessageBox.information(self, "Output Index", f"Indexed {count} document(s).")
+        except Exception as e:
+            logger.error(f"Failed to rebuild output index: {e}")
+            QMessageBox.warning(self, "Error", f"Could not rebuild output index:\n{e}")
 
     def validate_inputs(self) -> Tuple[bool, str]:
         """
@@ -1073,6 +1530,7 @@ class StickerApp(QMainWindow):
                 job_no=job_no,
                 op_no=op_no,
                 start_index=self.start_index,
+                force_rebuild=self.force_rebuild_action.isChecked(),
             )
 
             if product_type == "UPS":
@@ -1190,6 +1648,8 @@ class StickerApp(QMainWindow):
 
     def print_docx_via_dialog(self, docx_path: str) -> None:
         """Show print dialog and print document."""
+        from PyQt6.QtPrintSupport import QPrinter, QPrintDialog
+
         try:
             printer = QPrinter(QPrinter.PrinterMode.HighResolution)
             printer.setPageSize(QPageSize(QPageSize.PageSizeId.A4))
@@ -1238,6 +1698,9 @@ class StickerApp(QMainWindow):
             self.start_0_action.setChecked(
                 self.settings.value("start_from_zero", False, bool)
             )
+            self.force_rebuild_action.setChecked(
+                self.settings.value("force_rebuild", False, bool)
+            )
             
             # Update start index based on loaded setting
             self.start_index = 0 if self.start_0_action.isChecked() else 1
@@ -1267,6 +1730,10 @@ class StickerApp(QMainWindow):
                 "start_from_zero",
                 self.start_0_action.isChecked()
             )
+            self.settings.setValue(
+                "force_rebuild",
+                self.force_rebuild_action.isChecked()
+            )
             
             logger.info("Settings saved successfully")
             
@@ -1321,6 +1788,7 @@ def main():
         
         window = StickerApp()
         window.show()
+        startup_profile.mark_first_window(window)
         
         exit_code = app.exec()
         logger.info(f"Application exited with code: {exit_code}")
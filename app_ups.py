@@ -1,7 +1,8 @@
 # UPS RATING PLATE GENERATOR
+import startup_profile
+startup_profile.install_from_argv("app_ups")  # before the heavy imports, see --profile-startup
 import sys
 import os
-from array import array
 from datetime import datetime
 try:
     import win32com.client
@@ -10,6 +11,14 @@ except Exception:
     win32com = None
     pythoncom = None
 
+import metrics
+import plate_layout
+import sheet_nesting
+import plate_job
+import plate_export
+import plate_history
+from plate_drawing import DrawingSession
+from plate_preview import PreviewPanel, confirm_overflows, preview_dock
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QComboBox,
                              QPushButton, QGroupBox, QGridLayout, QScrollArea,
@@ -27,351 +36,105 @@ except Exception:
 APP_VERSION = f"{base_version}-ups"
 
 PF_DEFAULT = 0.8
-STYLE_REG = 'Consolas'
-STYLE_BOLD = 'ConsolasBold'
-
-def ensure_consolas_style(doc):
-    styles = doc.TextStyles
-    try:
-        return styles.Item("Standard")
-    except:
-        # Should not happen on any normal DWG:
-        st = styles.Add("Standard")
-        return st
-
-def make_safearray_3d(points):
-    arr = array('d')
-    for x, y, z in points:
-        arr.extend([float(x), float(y), float(z)])
-    if win32com is None:
-        return arr
-    return win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, arr)
-
-def make_point_variant(x, y, z=0.0):
-    if win32com is None:
-        return (float(x), float(y), float(z))
-    arr = array('d', [float(x), float(y), float(z)])
-    return win32com.client.VARIANT(pythoncom.VT_ARRAY | pythoncom.VT_R8, arr)
-
-def add_rect(ms, x1, y1, x2, y2):
-    pts = [(x1,y1,0),(x2,y1,0),(x2,y2,0),(x1,y2,0),(x1,y1,0)]
-    v = make_safearray_3d(pts)
-    if win32com is None:
-        return None
-    pl = ms.AddPolyline(v)
-    pl.Closed = True
-    return pl
-
-def add_line(ms, x1, y1, x2, y2):
-    if win32com is None:
-        return None
-    p1 = make_point_variant(x1, y1, 0)
-    p2 = make_point_variant(x2, y2, 0)
-    return ms.AddLine(p1,p2)
-
-def add_text(ms, text, x, y, height, style_name=None):
-    if win32com is None:
-        return None
-    p = make_point_variant(x, y, 0)
-    t = ms.AddText(str(text), p, float(height))
-    if style_name:
-        try:
-            t.StyleName = style_name
-        except Exception:
-            pass
-    return t
-
-def add_mtext(ms, text, x, y, width, height, style_name=None):
-    if win32com is None:
-        return None
-    p = make_point_variant(x, y, 0)
-    mt = ms.AddMText(p, float(width), str(text))
-    mt.Height = float(height)
-    if style_name:
-        try:
-            mt.StyleName = style_name
-        except Exception:
-            pass
-    try:
-        mt.Attachment = 2
-    except Exception:
-        pass
-    return mt
-
-def insert_scaled_block(ms, block_path, x, y, target_w, target_h):
-    if win32com is None:
-        return None
-    ins_pt = make_point_variant(x, y, 0)
-    blk = ms.InsertBlock(ins_pt, block_path, 1.0, 1.0, 1.0, 0)
-    try:
-        blk.Update()
-    except Exception:
-        pass
-    try:
-        bb = blk.GetBoundingBox()
-        (xmin, ymin, zmin) = bb[0]
-        (xmax, ymax, zmax) = bb[1]
-    except Exception:
-        return blk
-    bw = xmax - xmin
-    bh = ymax - ymin
-    if bw == 0 or bh == 0:
-        return blk
-    sx = target_w / bw
-    sy = target_h / bh
-    s = min(sx, sy)
-    blk.XScaleFactor = s
-    blk.YScaleFactor = s
-    blk.ZScaleFactor = s
-    blk.Update()
-    try:
-        bb2 = blk.GetBoundingBox()
-        (xmin2, ymin2, zmin2) = bb2[0]
-    except Exception:
-        return blk
-    dx = x - xmin2
-    dy = y - ymin2
-    blk.Move(make_point_variant(0, 0, 0), make_point_variant(dx, dy, 0))    
-    # Try to explode and remove the block reference so any embedded raster
-    # or block content becomes native entities. This helps avoid the issue
-    # where only the last inserted block's image displays until objects are
-    # moved or the drawing is regenerated.
-    deleted = False
-    try:
-        # get document from ModelSpace if available
-        doc = None
-        try:
-            doc = ms.Parent
-        except Exception:
-            doc = None
-
-        try:
-            # Explode the block instance into its constituent entities
-            blk.Explode()
-            deleted = True
-        except Exception:
-            deleted = False
 
-        try:
-            # delete the original block reference if possible
-            if deleted:
-                blk.Delete()
-        except Exception:
-            pass
 
-        try:
-            # Force a regen to refresh display
-            if doc is not None:
-                try:
-                    doc.SendCommand("_REGEN ")
-                except Exception:
-                    try:
-                        # fallback: call Regen method if available
-                        doc.Regen(0)
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-    except Exception:
-        pass
-
-    # return None if we removed the block reference, otherwise return the block
-    return None if deleted else blk
-
-def draw_rating_plate_ups(doc, config):
-    """Draw a simple UPS rating plate. Computed rated power = kVA * PF_DEFAULT."""
-    plate_w = config.get('plate_width', 150.0)
-    plate_h = config.get('plate_height', 125.0)
-    margin = config.get('margin', 3.0)
-    ox = config.get('offset_x', 100.0)
-    oy = config.get('offset_y', 100.0)
-
-    ms = doc.ModelSpace
-
-    # Ensure Consolas styles exist and use their names
-    try:
-        style_reg = ensure_consolas_style(doc)
-        style_bold = ensure_consolas_bold_style(doc)
-        style_reg_name = style_reg.Name
-    except Exception:
-        style_reg_name = STYLE_REG
-
-    outer_top = oy + plate_h
-    outer_bottom = oy
-
-    # Frames
-    add_rect(ms, ox, outer_bottom, ox + plate_w, outer_top)
-    add_rect(ms, ox + margin, outer_bottom + margin, ox + plate_w - margin, outer_top - margin)
-
-    ux1 = ox + margin
-    ux2 = ox + plate_w - margin
-    uy2 = outer_top - margin
-    y = uy2
-
-    # Optional: draw simple dimension lines (horizontal below and vertical left)
-    if config.get('show_dimensions', False):
-        try:
-            dt = float(config.get('dim_text_height', 3.0))
-        except Exception:
-            dt = 3.0
-        ext = 8.0
-        arrow = 1.6
-        # gap between plate edge and dimension extension (in mm)
-        gap = float(config.get('dim_gap', 3.0))
-        # Use outer rectangle edges so dimensions cover full plate
-        outer_left = ox
-        outer_right = ox + plate_w
-
-        # horizontal dimension below plate (use outer edges)
-        dim_y = outer_bottom - ext
-        # extension lines from outer edges down to dimension line, leaving a small gap
-        add_line(ms, outer_left, outer_bottom - gap, outer_left, dim_y)
-        add_line(ms, outer_right, outer_bottom - gap, outer_right, dim_y)
-        # main dim line across full outer width
-        add_line(ms, outer_left, dim_y, outer_right, dim_y)
-        # simple arrowheads at ends
-        add_line(ms, outer_left, dim_y, outer_left + arrow, dim_y + 1)
-        add_line(ms, outer_left, dim_y, outer_left + arrow, dim_y - 1)
-        add_line(ms, outer_right, dim_y, outer_right - arrow, dim_y + 1)
-        add_line(ms, outer_right, dim_y, outer_right - arrow, dim_y - 1)
-        wtext = config.get('dim_width_override') or f"{plate_w:g} mm"
-        # center text under the dimension line
-        add_text(ms, wtext, (outer_left + outer_right) / 2 - 8, dim_y - 6, dt, style_name=style_reg_name)
-
-        # vertical dimension left of plate (use outer edges for references)
-        dim_x = outer_left - ext
-        # extension lines from outer left to the vertical dimension line, leaving a small gap
-        add_line(ms, outer_left - gap, outer_bottom, dim_x, outer_bottom)
-        add_line(ms, outer_left - gap, outer_top, dim_x, outer_top)
-        # main vertical dim line
-        add_line(ms, dim_x, outer_bottom, dim_x, outer_top)
-        # arrowheads for vertical dim (small horizontal ticks)
-        add_line(ms, dim_x, outer_top, dim_x + 1, outer_top - arrow)
-        add_line(ms, dim_x, outer_top, dim_x - 1, outer_top - arrow)
-        add_line(ms, dim_x, outer_bottom, dim_x + 1, outer_bottom + arrow)
-        add_line(ms, dim_x, outer_bottom, dim_x - 1, outer_bottom + arrow)
-        htext = config.get('dim_height_override') or f"{plate_h:g} mm"
-        # place height text to the left of the vertical dim line
-        import math
-
-        txt = add_text(ms, htext, dim_x - 5,
-                    (outer_bottom + outer_top) / 2 - 2,
-                    dt,
-                    style_name=style_reg_name)
-
-        # Rotate 90 degrees
-        txt.Rotation = math.radians(90)
-    row_h = 12.0
-    text_h = 4.0
-    # Smaller text height for unequal frequency variations
-    text_h_small = 3.5
-
-    # PRODUCT row
-    y_bottom = y - 10
-    param_offset_right = 60
-    param_offset_top = 7
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    # Add vertical line separator in PRODUCT row
-    add_line(ms, ux1 + param_offset_right - 3, y_bottom, ux1 + param_offset_right - 3, y)
-    product_text = config.get('product_text', 'DEFAULT UPS')
-    add_mtext(ms, r"\fConsolas|b1;" + "PRODUCT", ux1 + 3, y - param_offset_top + 4 , ux2 - (ux1 + param_offset_right) - 4.0 , 4.0, style_name=style_reg_name)
-    
-    # Draw product description in bold using font override sequence
-    try:
-        mtext_w = ux2 - (ux1 + param_offset_right) - 4.0
-        add_mtext(ms, r"\fConsolas|b1;" + product_text, ux1 + param_offset_right, y - param_offset_top + 4, mtext_w, 4.2, style_name=style_reg_name)
-    except Exception:
-        # fallback to plain text if MText fails
-        add_text(ms, product_text, ux1 + param_offset_right, y - param_offset_top, 4.0, style_name=style_reg_name)
-    y = y_bottom
-
-    # INPUT VOLTAGE - use smaller font if frequency variation is unequal
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    # Add vertical line separator in INPUT VOLTAGE row
-    add_line(ms, ux1 + param_offset_right - 3, y_bottom, ux1 + param_offset_right - 3, y)
-    add_text(ms, 'INPUT VOLTAGE', ux1 + 3, y - param_offset_top, text_h, style_name=style_reg_name)
-    input_voltage_text = config.get('input_voltage', '415V, 3 PHASE, 4 WIRES, 50HZ ±5%')
-    # Check if input has unequal frequency variation (contains "to")
-    input_text_height = text_h_small if ' to ' in input_voltage_text else text_h
-    add_text(ms, input_voltage_text, ux1 + param_offset_right, y - param_offset_top, input_text_height, style_name=style_reg_name)
-    y = y_bottom
-
-    # OUTPUT VOLTAGE - use smaller font if frequency variation is unequal
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    # Add vertical line separator in OUTPUT VOLTAGE row
-    add_line(ms, ux1 + param_offset_right - 3, y_bottom, ux1 + param_offset_right - 3, y)
-    add_text(ms, 'OUTPUT VOLTAGE', ux1 + 3, y - param_offset_top, text_h, style_name=style_reg_name)
-    output_voltage_text = config.get('output_voltage', '230V, 1PHASE, 2 WIRES, 50HZ')
-    # Check if output has unequal frequency variation (contains "to")
-    output_text_height = text_h_small if ' to ' in output_voltage_text else text_h
-    add_text(ms, output_voltage_text, ux1 + param_offset_right, y - param_offset_top, output_text_height, style_name=style_reg_name)
-    y = y_bottom
-
-    # RATED POWER (compute)
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    # Add vertical line separator in RATED POWER row
-    add_line(ms, ux1 + param_offset_right - 3, y_bottom, ux1 + param_offset_right - 3, y)
-    add_text(ms, 'RATED POWER', ux1 + 3, y - param_offset_top, text_h, style_name=style_reg_name)
+def compute_fiscal_yy(year, ref_date=None):
+    """Two-digit fiscal year start and end (April to March) for ``year`` as of ``ref_date`` (default: today)."""
+    if ref_date is None:
+        ref_date = datetime.now()
+    if ref_date.month >= 4:
+        start = year
+        end = year + 1
+    else:
+        start = year - 1
+        end = year
+    return start % 100, end % 100
+
+
+def unit_configs(base_cfg):
+    """One config per UPS unit, plus the bypass plate when there is more than one unit."""
+    configs = []
+    unit_count = base_cfg.get('unit_count', 1)
+    kva = base_cfg.get('apparent_kva', 0.0)
+    yy1, yy2 = compute_fiscal_yy(base_cfg['year'])
+    serial = f"LL/{yy1:02d}-{yy2:02d}/{base_cfg.get('project_no')}-OP{base_cfg.get('order_no')}"
+
+    for i in range(1, unit_count + 1):
+        cfg = dict(base_cfg)
+        cfg['product_text'] = f"{kva:g}kVA UPS-{i} PANEL"
+        cfg['serial'] = f"{serial}/UPS{i}"
+        configs.append(cfg)
+
+    # Add bypass plate if more than one UPS unit
+    if unit_count > 1:
+        cfg = dict(base_cfg)
+        cfg['product_text'] = f"{kva:g}kVA BYPASS PANEL"
+        cfg['serial'] = f"{serial}/BYP"
+        configs.append(cfg)
+    return configs
+
+
+def _plate_values(config, plate_w, plate_h):
+    """Text values for one UPS plate, including the computed rated power."""
     kva = float(config.get('apparent_kva', 0.0))
     pf = float(config.get('pf', PF_DEFAULT))
     rated_kw = round(kva * pf, 3)
-    rated_text = f"{rated_kw:g} kW (at {pf:g} PF)"
-    add_text(ms, rated_text, ux1 + param_offset_right, y - param_offset_top, text_h, style_name=style_reg_name)
-    y = y_bottom
-
-    # SL NO
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    # Add vertical line separator in SL NO row
-    add_line(ms, ux1 + param_offset_right - 3, y_bottom, ux1 + param_offset_right - 3, y)
-    add_text(ms, 'SL. NO.', ux1 + 3, y - param_offset_top, text_h, style_name=style_reg_name)
-    serial = config.get('serial', '')
-    add_text(ms, serial, ux1 + param_offset_right, y - param_offset_top, text_h, style_name=style_reg_name)
-    y = y_bottom
-
-    # YEAR
-    y_bottom = y - row_h
-    add_rect(ms, ux1, y_bottom, ux2, y)
-    # Add vertical line separator in YEAR row
-    add_line(ms, ux1 + param_offset_right - 3, y_bottom, ux1 + param_offset_right - 3, y)
-    add_text(ms, 'YEAR OF MFG.', ux1 + 3, y - param_offset_top, text_h, style_name=style_reg_name)
-    add_text(ms, str(config.get('year', datetime.now().year)), ux1 + param_offset_right, y - param_offset_top, text_h, style_name=style_reg_name)
-    y = y_bottom
-
-    # Footer
-    FOOT_H = 22
-    y_footer_top = y
-    y_footer_bottom = y_footer_top - FOOT_H
-    add_line(ms, ux1, y_footer_top, ux2, y_footer_top)
-    # Footer: title (bold) and address/contact lines
-    # Footer title in bold using font override
-    try:
-        add_mtext(ms, r"\fConsolas|b1;LIVELINE ELECTRONICS", ux1 + 3, y_footer_top - 4, 200, 4.2, style_name=style_reg_name)
-    except Exception:
-        add_mtext(ms, 'LIVELINE ELECTRONICS', ux1 + 3, y_footer_top - 3, 200, 4.0, style_name=style_reg_name)
-    # Address and contact
-    addr_y = y_footer_top - 14
-    add_text(ms, 'North Ramchandrapur, Narendrapur, Kolkata : 700103, WB', ux1 + 3, addr_y, 2.6, style_name=style_reg_name)
-    add_text(ms, 'Telefax : 033 2477 2094', ux1 + 3, addr_y - 5, 2.6, style_name=style_reg_name)
-    add_text(ms, 'Email : info@livelineindia.com', ux1 + 3, addr_y - 10, 2.6, style_name=style_reg_name)
-
-    # Logo
-    logo_w = 45
-    logo_h = 40
-    logo_block = os.path.abspath("liveline_logo.dwg")
-    insert_scaled_block(ms, logo_block, ux2 - 45.5, y_footer_bottom -6.5, logo_w, logo_h)
-
-    try:
-        doc.SendCommand("_ZOOM _E ")
-    except Exception:
-        pass
+    values = dict(config)
+    values['rated_power'] = f"{rated_kw:g} kW (at {pf:g} PF)"
+    values['year'] = config.get('year', datetime.now().year)
+    values['dim_width_text'] = config.get('dim_width_override') or f"{plate_w:g} mm"
+    values['dim_height_text'] = config.get('dim_height_override') or f"{plate_h:g} mm"
+    return values
+
+
+def draw_rating_plate_ups(doc, config, suppress_zoom=False):
+    """Draw a simple UPS rating plate (layouts/ups.json). Computed rated power = kVA * PF_DEFAULT."""
+    plan = plate_layout.plan_for('ups', config)
+    values = _plate_values(config, plan.params['plate_width'], plan.params['plate_height'])
+    origin = (float(config.get('offset_x', 100.0)), float(config.get('offset_y', 100.0)))
+    plan.draw(doc.ModelSpace, values, origin)
+
+    if not suppress_zoom:
+        plate_layout.zoom_extents(doc)
 
     print("UPS rating plate generated.")
 
 
+def job_plates(base_cfg):
+    """Layout jobs ``(plan, values, 1)`` for every unit and the bypass plate (used by plate_job)."""
+    jobs = []
+    for cfg in unit_configs(base_cfg):
+        plan = plate_layout.plan_for('ups', cfg)
+        jobs.append((plan, _plate_values(cfg, plan.params['plate_width'], plan.params['plate_height']), 1))
+    return jobs
+
+
+def sheet_options(base_cfg):
+    """Sheet size, kerf and rotation for nesting the plates (AutoCAD and SVG/PDF export)."""
+    return {
+        'sheet_width': float(base_cfg.get('sheet_width', sheet_nesting.DEFAULT_SHEET_WIDTH)),
+        'sheet_height': float(base_cfg.get('sheet_height', sheet_nesting.DEFAULT_SHEET_HEIGHT)),
+        'kerf': float(base_cfg.get('inter_plate_spacing', 10.0)) + float(base_cfg.get('multi_right_gap', 10.0)),
+        'allow_rotate': base_cfg.get('allow_rotate', False),
+    }
+
+
+def draw_ups_sheets(doc, base_cfg):
+    """
+    Nest the unit and bypass plates onto sheets of ``sheet_width`` x
+    ``sheet_height``. The gap between plates is ``inter_plate_spacing``
+    plus ``multi_right_gap``. Returns the sheet count.
+    """
+    placements = plate_layout.draw_sheets(
+        doc, job_plates(base_cfg),
+        origin=(float(base_cfg.get('offset_x', 100.0)), float(base_cfg.get('offset_y', 100.0))),
+        outline=base_cfg.get('draw_sheet_outline', False),
+        **sheet_options(base_cfg),
+    )
+    plate_layout.zoom_extents(doc)
+    return sheet_nesting.sheet_count(placements)
+
+
 class UPSRatingPlateGUI(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -430,12 +193,27 @@ class UPSRatingPlateGUI(QMainWindow):
         btn.clicked.connect(self.generate_plate)
         layout.addWidget(btn)
 
+        # Collect these plates for one combined drawing with the other tools (plate_job.py)
+        job_btn = QPushButton('Add to Job')
+        job_btn.clicked.connect(self.add_to_job)
+        layout.addWidget(job_btn)
+
+        # Vector files for the engraving machine, no AutoCAD needed (plate_export.py)
+        export_btn = QPushButton('Export SVG/PDF')
+        export_btn.clicked.connect(self.export_vector)
+        layout.addWidget(export_btn)
+
         self.update_rated_power()
         self.update_voltage_display()
         # Initialize wire config enable/disable state
         self.on_input_voltage_changed()
         self.on_output_voltage_changed()
 
+        # Live preview from the same layout plan that is sent to AutoCAD
+        self.preview = PreviewPanel(lambda: job_plates(self.get_config())[0][:2])
+        preview_dock(self, self.preview)
+        self.preview.watch(main_widget)
+
     def create_general_group(self):
         g = QGroupBox('General')
         l = QGridLayout()
@@ -616,6 +394,19 @@ class UPSRatingPlateGUI(QMainWindow):
         l.addWidget(self.dim_height_override, 2, 2, 1, 2)
         self.dim_height_override_chk.stateChanged.connect(lambda s: self.dim_height_override.setEnabled(self.dim_height_override_chk.isChecked()))
 
+        # Sheet the plates are nested onto
+        l.addWidget(QLabel('Sheet Width (mm):'), 3, 0)
+        self.sheet_width = QDoubleSpinBox()
+        self.sheet_width.setRange(50.0, 5000.0)
+        self.sheet_width.setValue(sheet_nesting.DEFAULT_SHEET_WIDTH)
+        l.addWidget(self.sheet_width, 3, 1)
+
+        l.addWidget(QLabel('Sheet Height (mm):'), 3, 2)
+        self.sheet_height = QDoubleSpinBox()
+        self.sheet_height.setRange(50.0, 5000.0)
+        self.sheet_height.setValue(sheet_nesting.DEFAULT_SHEET_HEIGHT)
+        l.addWidget(self.sheet_height, 3, 3)
+
         g.setLayout(l)
         return g
 
@@ -699,6 +490,8 @@ class UPSRatingPlateGUI(QMainWindow):
         cfg['apparent_kva'] = self.kva.value()
         cfg['pf'] = self.pf.value()
         cfg['unit_count'] = int(self.unit_count.value())
+        cfg['sheet_width'] = float(self.sheet_width.value())
+        cfg['sheet_height'] = float(self.sheet_height.value())
         cfg['input_voltage'] = self.input_voltage_display.text()
         cfg['output_voltage'] = self.output_voltage_display.text()
         # Dimensions config
@@ -714,6 +507,8 @@ class UPSRatingPlateGUI(QMainWindow):
             cfg['dim_height_override'] = ''
         year = int(self.year.value())
         cfg['year'] = year
+        cfg['project_no'] = self.project_no.value()
+        cfg['order_no'] = self.order_no.value()
         yy1, yy2 = self.compute_fiscal_yy(year)
         cfg['serial'] = f"LL/{yy1:02d}-{yy2:02d}/{self.project_no.value()}-OP{self.order_no.value()}/{self.sn_suffix.text()}"
         return cfg
@@ -726,85 +521,59 @@ class UPSRatingPlateGUI(QMainWindow):
         For Jan-Mar, the fiscal year that contains the given year started in the previous calendar year
         (e.g., Feb 2026 -> FY 25-26).
         """
-        if ref_date is None:
-            ref_date = datetime.now()
-        if ref_date.month >= 4:
-            start = year
-            end = year + 1
-        else:
-            start = year - 1
-            end = year
-        return start % 100, end % 100
+        return compute_fiscal_yy(year, ref_date)
+
+    def add_to_job(self):
+        cfg = self.get_config()
+        try:
+            count = plate_job.add_plate('ups', cfg, cfg['product_text'])
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'Could not add the plates to the job: {e}')
+            return
+        QMessageBox.information(self, 'Job', f'Plates added to the job ({count} entries).\n{plate_job.job_path()}')
+
+    def export_vector(self):
+        """Export the current plates as SVG or PDF for the engraving machine."""
+        config = self.get_config()
+        if plate_export.export_dialog(self, job_plates(config), sheet_options(config)):
+            plate_history.record('ups', config, config['product_text'])
 
     def generate_plate(self):
         base_cfg = self.get_config()
 
-        # Build list of configurations to generate
-        to_generate = []
-        unit_count = base_cfg.get('unit_count', 1)
-        kva = base_cfg.get('apparent_kva', 0.0)
-
-        for i in range(1, unit_count + 1):
-            cfg = dict(base_cfg)
-            cfg['product_text'] = f"{kva:g}kVA UPS-{i} PANEL"
-            yy1, yy2 = self.compute_fiscal_yy(cfg['year'])
-            cfg['serial'] = f"LL/{yy1:02d}-{yy2:02d}/{self.project_no.value()}-OP{self.order_no.value()}/UPS{i}"
-            to_generate.append(cfg)
-
-        # Add bypass plate if more than one UPS unit
-        if unit_count > 1:
-            cfg = dict(base_cfg)
-            cfg['product_text'] = f"{kva:g}kVA BYPASS PANEL"
-            yy1, yy2 = self.compute_fiscal_yy(cfg['year'])
-            cfg['serial'] = f"LL/{yy1:02d}-{yy2:02d}/{self.project_no.value()}-OP{self.order_no.value()}/BYP"
-            to_generate.append(cfg)
+        # One config per unit, plus the bypass plate
+        to_generate = unit_configs(base_cfg)
 
         # If AutoCAD not present, show planned plates
         if win32com is None:
             QMessageBox.information(self, 'Planned Plates', 'AutoCAD not available. The following plates would be generated:\n\n' + '\n'.join([g['product_text'] + '  ->  ' + g['serial'] for g in to_generate]))
             return
+        # Report texts that overflow their cells before AutoCAD is touched
+        if not confirm_overflows(self, job_plates(base_cfg)):
+            return
 
         try:
-            acad = win32com.client.Dispatch('AutoCAD.Application')
-            acad.Visible = True
-            template_path = os.path.abspath("acadiso.dwt")
-            doc = acad.Documents.Add(template_path)
-            # doc = acad.ActiveDocument
+            with metrics.span("acad.connect"):
+                acad = win32com.client.Dispatch('AutoCAD.Application')
+                acad.Visible = True
+                template_path = os.path.abspath("acadiso.dwt")
+                doc = acad.Documents.Add(template_path)
+                # doc = acad.ActiveDocument
         except Exception as e:
             QMessageBox.critical(self, 'AutoCAD Error', f'Could not access AutoCAD: {e}')
             return
 
-        failures = []
-        # Layout plates in a grid: side-by-side (max 2 per row) then stack rows below.
-        # spacing between plates (horizontal/vertical)
-        spacing = base_cfg.get('inter_plate_spacing', 10.0)
-        # extra gap to add to the right of each plate (useful when placing multiple plates)
-        extra_right = base_cfg.get('multi_right_gap', 10.0)
-        # extra gap to add below each plate
-        extra_bottom = base_cfg.get('multi_bottom_gap', 10.0)
-        per_row = 2
-        plate_w = base_cfg.get('plate_width', 185.0)
-        plate_h = base_cfg.get('plate_height', 105.0)
-
-        for idx, cfg in enumerate(to_generate):
-            col = idx % per_row
-            row = idx // per_row
-            # compute offsets: start from base offset and shift right by (plate_w + spacing + extra_right) per column
-            cfg_offset_x = base_cfg.get('offset_x', 100.0) + col * (plate_w + spacing + extra_right)
-            # shift down by (plate_h + spacing + extra_bottom) per row
-            cfg_offset_y = base_cfg.get('offset_y', 100.0) - row * (plate_h + spacing + extra_bottom)
-            cfg['offset_x'] = cfg_offset_x
-            cfg['offset_y'] = cfg_offset_y
-            try:
-                draw_rating_plate_ups(doc, cfg)
-            except Exception as e:
-                failures.append((cfg.get('product_text', '<unknown>'), str(e)))
-
-        if not failures:
-            QMessageBox.information(self, 'Done', f'Generated {len(to_generate)} plates in AutoCAD.')
-        else:
-            msg = 'Some plates failed to generate:\n' + '\n'.join([f'{p}: {err}' for p, err in failures])
-            QMessageBox.warning(self, 'Partial Failure', msg)
+        try:
+            # Same size for every unit: the cached layout is reused, only the values change
+            with DrawingSession(doc) as session:
+                sheets = draw_ups_sheets(doc, base_cfg)
+            print(session.summary())
+        except Exception as e:
+            QMessageBox.warning(self, 'Error', f'Failed to generate plates: {e}')
+            return
+        plate_history.record('ups', base_cfg, base_cfg['product_text'])
+
+        QMessageBox.information(self, 'Done', f'Generated {len(to_generate)} plates on {sheets} sheet(s) in AutoCAD.')
 
 
 def main():
@@ -815,6 +584,7 @@ def main():
 
     window = UPSRatingPlateGUI()
     window.show()
+    startup_profile.mark_first_window(window)
     sys.exit(app.exec())
 
 
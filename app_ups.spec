@@ -1,7 +1,7 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('installer/icons/plategen_icon.ico', 'installer/icons')]
+datas = [('installer/icons/plategen_icon.ico', 'installer/icons'), ('layouts', 'layouts'), ('font/Consolas.ttf', 'font'), ('font/1CONSOLAB.TTF', 'font')]
 binaries = []
 hiddenimports = []
 tmp_ret = collect_all('requests')
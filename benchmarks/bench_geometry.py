@@ -0,0 +1,159 @@
+"""
+Micro-benchmark: per-point VARIANT helpers vs. a packed GeometryBuffer.
+
+Builds the vertex data for a 25-plate grid (5 x 5) of a typical rating
+plate - frames, row separators, column dividers and text insertion
+points - three ways:
+
+* ``per-point``: the helpers the plate tools used before plate_drawing
+  (``array.extend`` per point, a new array and VARIANT per text point)
+* ``plate_drawing``: the shared helpers (one array constructor per shape,
+  memoised point VARIANTs)
+* ``GeometryBuffer``: one plate packed once, tiled 25 times by vectorised
+  translation, VARIANTs cut from slices
+
+With pywin32 installed the real ``win32com.client.VARIANT`` is built;
+otherwise only the packing is measured (noted in the output).
+
+    python benchmarks/bench_geometry.py [-n REPEAT] [--plates 25]
+"""
+
+import os
+import sys
+import json
+import math
+import timeit
+import argparse
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import plate_drawing  # noqa: E402
+import geometry_buffer  # noqa: E402
+from geometry_buffer import GeometryBuffer  # noqa: E402
+
+PLATE_W, PLATE_H, MARGIN, GAP = 150.0, 100.0, 3.0, 10.0
+ROWS = 12            # table rows per plate
+TEXT_PER_ROW = 4     # label + value(s) per row
+
+
+def plate_shapes(ox, oy):
+    """Rectangles, lines and text points of one plate at (ox, oy)."""
+    rects = [
+        (ox, oy, ox + PLATE_W, oy + PLATE_H),
+        (ox + MARGIN, oy + MARGIN, ox + PLATE_W - MARGIN, oy + PLATE_H - MARGIN),
+    ]
+    lines = []
+    texts = []
+    row_h = (PLATE_H - 2 * MARGIN) / ROWS
+    for r in range(1, ROWS):
+        y = oy + MARGIN + r * row_h
+        lines.append((ox + MARGIN, y, ox + PLATE_W - MARGIN, y))
+    for x in (45.0, 95.0):
+        lines.append((ox + x, oy + MARGIN, ox + x, oy + PLATE_H - MARGIN))
+    for r in range(ROWS):
+        y = oy + MARGIN + r * row_h + 2
+        for c in range(TEXT_PER_ROW):
+            texts.append((ox + MARGIN + 2 + c * 36.0, y))
+    return rects, lines, texts
+
+
+def grid_offsets(plates):
+    cols = math.ceil(math.sqrt(plates))
+    return [((i % cols) * (PLATE_W + GAP), -(i // cols) * (PLATE_H + GAP)) for i in range(plates)]
+
+
+# ----- the helpers as they were in app_bch/app_db/app_ups -----
+
+def _legacy_safearray_3d(points):
+    arr = array('d')
+    for x, y, z in points:
+        arr.extend([float(x), float(y), float(z)])
+    return plate_drawing.to_variant(arr)
+
+
+def _legacy_point_variant(x, y, z=0.0):
+    arr = array('d', [float(x), float(y), float(z)])
+    return plate_drawing.to_variant(arr)
+
+
+def run_per_point(offsets):
+    out = []
+    for ox, oy in offsets:
+        rects, lines, texts = plate_shapes(ox, oy)
+        for x1, y1, x2, y2 in rects:
+            out.append(_legacy_safearray_3d([(x1, y1, 0), (x2, y1, 0), (x2, y2, 0), (x1, y2, 0), (x1, y1, 0)]))
+        for x1, y1, x2, y2 in lines:
+            out.append((_legacy_point_variant(x1, y1, 0), _legacy_point_variant(x2, y2, 0)))
+        for x, y in texts:
+            out.append(_legacy_point_variant(x, y, 0))
+    return out
+
+
+def run_plate_drawing(offsets):
+    plate_drawing._point_variant.cache_clear()
+    out = []
+    for ox, oy in offsets:
+        rects, lines, texts = plate_shapes(ox, oy)
+        for x1, y1, x2, y2 in rects:
+            out.append(plate_drawing.to_variant(array('d', (x1, y1, 0, x2, y1, 0, x2, y2, 0, x1, y2, 0, x1, y1, 0))))
+        for x1, y1, x2, y2 in lines:
+            out.append((plate_drawing.make_point_variant(x1, y1), plate_drawing.make_point_variant(x2, y2)))
+        for x, y in texts:
+            out.append(plate_drawing.make_point_variant(x, y))
+    return out
+
+
+def run_geometry_buffer(offsets):
+    base = GeometryBuffer()
+    rects, lines, texts = plate_shapes(0.0, 0.0)
+    rect_spans = [base.add_rect(*r) for r in rects]
+    line_spans = [base.add_line(*ln) for ln in lines]
+    text_span = base.add_flat(v for x, y in texts for v in (x, y, 0.0))
+
+    grid = base.tiled(offsets)
+    per_plate = len(base)
+    shapes = rect_spans + line_spans
+    out = []
+    for k in range(len(offsets)):
+        shift = k * per_plate
+        out.extend(grid.variants(shapes, shift))
+        out.extend(grid.point_variants(text_span, shift))
+    return out
+
+
+CASES = [
+    ("per-point", run_per_point),
+    ("plate_drawing", run_plate_drawing),
+    ("GeometryBuffer", run_geometry_buffer),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--repeat", type=int, default=200, help="grids built per measurement")
+    parser.add_argument("--plates", type=int, default=25, help="plates in the grid (default: 25)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    offsets = grid_offsets(args.plates)
+    print(f"{args.plates}-plate grid, {args.repeat} grids per run, "
+          f"{'real VARIANTs' if plate_drawing.win32com else 'no pywin32: packing only'}, "
+          f"{'NumPy' if geometry_buffer.numpy is not None else 'no NumPy'} tiling")
+
+    results = {}
+    for name, fn in CASES:
+        best = min(timeit.repeat(lambda: fn(offsets), number=args.repeat, repeat=5))
+        results[name] = best / args.repeat * 1000
+    baseline = results["per-point"]
+    for name, ms in results.items():
+        print(f"  {name:<15} {ms:8.3f} ms/grid   x{baseline / ms:4.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"plates": args.plates, "ms_per_grid": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Time-to-first-window benchmark for the launcher and every sub-app.
+
+Each app is started ``--runs`` times with ``--exit-after-first-window``; the
+app reports how long it took from process creation until its first window
+was shown (see startup_profile.py). One extra run with ``--profile-startup``
+records the per-subsystem import breakdown.
+
+    python benchmarks/bench_startup.py                  # all apps from source
+    python benchmarks/bench_startup.py app_np app_sticker -n 10
+    python benchmarks/bench_startup.py --dist dist      # the PyInstaller builds
+    python benchmarks/bench_startup.py --compare benchmarks/results/startup-old.json
+
+Results are written to benchmarks/results/startup-<timestamp>.json.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+APPS = ["app", "app_bch", "app_db", "app_ups", "app_np", "app_mgen_ups", "app_sticker"]
+# Built executable name per app, when it differs from the script name
+EXE_NAMES = {"app": "plategen"}
+
+
+def _command(app, dist):
+    if dist:
+        return [os.path.join(dist, EXE_NAMES.get(app, app) + (".exe" if os.name == "nt" else ""))]
+    return [sys.executable, os.path.join(ROOT, app + ".py")]
+
+
+def run_once(app, dist=None, profile=False, timeout=120):
+    """Start the app once and return its startup report (dict) or raise RuntimeError."""
+    fd, report_path = tempfile.mkstemp(prefix=f"{app}-", suffix=".json")
+    os.close(fd)
+    env = dict(os.environ, PLATEGEN_STARTUP_REPORT=report_path, PLATEGEN_METRICS="off")
+    cmd = _command(app, dist) + ["--exit-after-first-window"]
+    if profile:
+        cmd.append("--profile-startup")
+
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, env=env, timeout=timeout,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall_ms = (time.perf_counter() - started) * 1000
+        try:
+            with open(report_path, encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            tail = (proc.stderr or "").strip().splitlines()[-5:]
+            raise RuntimeError(f"exit code {proc.returncode}, no report\n    " + "\n    ".join(tail))
+    finally:
+        try:
+            os.remove(report_path)
+        except OSError:
+            pass
+
+    report["wall_ms"] = round(wall_ms, 1)
+    return report
+
+
+def bench_app(app, runs, dist=None):
+    samples = []
+    for _ in range(runs):
+        samples.append(run_once(app, dist))
+    first_window = [s["first_window_ms"] for s in samples]
+    profiled = run_once(app, dist, profile=True)
+    return {
+        "runs": runs,
+        "first_window_ms": {
+            "min": min(first_window),
+            "median": round(statistics.median(first_window), 1),
+            "max": max(first_window),
+        },
+        "wall_ms_median": round(statistics.median(s["wall_ms"] for s in samples), 1),
+        "import_ms": profiled["import_ms"],
+        "subsystems": profiled["subsystems"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time to first window for each app.")
+    parser.add_argument("apps", nargs="*", default=APPS, help=f"apps to run (default: all of {', '.join(APPS)})")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="timed runs per app (default: 5)")
+    parser.add_argument("--dist", help="folder with the built executables instead of the .py sources")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("-o", "--out", help="results file (default: benchmarks/results/startup-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "source": "dist" if args.dist else "python",
+        "apps": {},
+    }
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f).get("apps", {})
+
+    print(f"{'app':<14} {'median':>9} {'min':>9} {'imports':>9}  slowest subsystem")
+    failed = 0
+    for app in args.apps:
+        try:
+            result = bench_app(app, args.runs, args.dist)
+        except (RuntimeError, OSError, subprocess.TimeoutExpired) as e:
+            print(f"{app:<14} FAILED: {e}")
+            failed += 1
+            continue
+        results["apps"][app] = result
+
+        heaviest = next(iter(result["subsystems"].items()), ("-", {"ms": 0}))
+        line = (f"{app:<14} {result['first_window_ms']['median']:>7.0f}ms {result['first_window_ms']['min']:>7.0f}ms "
+                f"{result['import_ms']:>7.0f}ms  {heaviest[0]} ({heaviest[1]['ms']:.0f}ms)")
+        if app in baseline:
+            before = baseline[app]["first_window_ms"]["median"]
+            line += f"   {result['first_window_ms']['median'] - before:+.0f}ms vs baseline"
+        print(line)
+
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("startup-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
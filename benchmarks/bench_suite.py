@@ -0,0 +1,393 @@
+"""
+Headless benchmark suite for the plate tools.
+
+Runs on any OS without AutoCAD or a display (Qt uses the offscreen
+platform). Plates are drawn into com_trace.RecordingDocument, so the
+figures are the Python-side cost of a plate; the COM round trips come on
+top (see com_trace.py for those).
+
+Cases (names are ``group/case``):
+
+* ``layout/bch-<mode>``: draw_rating_plate in all four BCH modes
+* ``db/outgoings-<n>``: draw_db_plate with 1, 10, 25 and 50 outgoings
+* ``grid/bch-<units>``, ``grid/db-<units>``: draw_plates_grid at 1, 25 and 100 units
+* ``np/fetch-10k``: fetch_nameplates over a synthetic 10,000 row catalogue
+* ``np/excel-<rows>``, ``np/pdf-<rows>``: the nameplate list exports over large tables
+* ``sticker/docx-400``: DocxWorker generating a 400 page sticker document
+* ``mgen/spec-docx``: _generate_docx_file rendering a UPS specification
+
+A case whose optional dependency (python-docx, openpyxl, reportlab,
+docxtpl, PyQt6) is missing is reported as skipped.
+
+    python benchmarks/bench_suite.py                     # everything
+    python benchmarks/bench_suite.py layout grid -n 20   # cases containing "layout" or "grid"
+    python benchmarks/bench_suite.py --compare benchmarks/results/suite-old.json
+
+Results are written to benchmarks/results/suite-<timestamp>.json. With
+``--compare``, cases whose median got slower than ``--threshold`` percent
+are flagged and the exit code is 1.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("PLATEGEN_METRICS", "off")  # keep benchmark runs out of the telemetry
+
+BCH_MODES = ("single", "dual", "ffcb", "dualsf")
+DB_OUTGOINGS = (1, 10, 25, 50)
+GRID_UNITS = (1, 25, 100)
+CATALOGUE_ROWS = 10000
+EXPORT_ROWS = (1000, 5000)
+STICKER_PAGES = 400
+
+CASES = []  # (name, setup, repeat); setup() returns the callable to time
+
+
+class Skip(Exception):
+    """Raised by a setup when the case cannot run here."""
+
+
+def case(name, repeat=None):
+    def register(setup):
+        CASES.append((name, setup, repeat))
+        return setup
+    return register
+
+
+def _work_dir():
+    path = getattr(_work_dir, "path", None)
+    if path is None:
+        path = _work_dir.path = tempfile.mkdtemp(prefix="plategen-bench-")
+    return path
+
+
+def _require(module):
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise Skip(f"{module} not installed ({e})")
+
+
+def _qt_app():
+    _require("PyQt6")
+    from PyQt6.QtWidgets import QApplication
+    if QApplication.instance() is None:
+        _qt_app.app = QApplication([])  # keep a reference, or it is collected
+    return QApplication.instance()
+
+
+def _quiet(fn):
+    """Run ``fn`` with the tools' progress prints swallowed."""
+    def run():
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            return fn()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    return run
+
+
+def _recording_doc():
+    from com_trace import RecordingDocument
+    return RecordingDocument()
+
+
+# -----------------------------
+# Plate drawing
+# -----------------------------
+def _bch_config(**extra):
+    config = {"mode": "single", "year": 2025, "project_no": 1077, "order_no": 2111}
+    config.update(extra)
+    return config
+
+
+def _db_config(outgoings, **extra):
+    config = {"product_text": "LIGHTING DB", "input_voltage": "415V AC", "incomer": "63A 4P MCCB",
+              "outgoings": [{"rating": 16 + 2 * (i % 8), "poles": 4 if i % 3 else 2, "type": "MCB", "count": 1 + i % 3}
+                            for i in range(outgoings)]}
+    config.update(extra)
+    return config
+
+
+for _mode in BCH_MODES:
+    @case(f"layout/bch-{_mode}")
+    def _layout(mode=_mode):
+        import app_bch
+        config = _bch_config(mode=mode)
+        return _quiet(lambda: app_bch.draw_rating_plate(_recording_doc(), config, suppress_zoom=True))
+
+for _n in DB_OUTGOINGS:
+    @case(f"db/outgoings-{_n}")
+    def _db(n=_n):
+        import app_db
+        config = _db_config(n)
+        return _quiet(lambda: app_db.draw_db_plate(_recording_doc(), config, suppress_zoom=True))
+
+for _units in GRID_UNITS:
+    @case(f"grid/bch-{_units}")
+    def _grid_bch(units=_units):
+        import app_bch
+        config = _bch_config(mode="dual", units=units, plate_gap=10.0)
+        return _quiet(lambda: app_bch.draw_plates_grid(_recording_doc(), config))
+
+    @case(f"grid/db-{_units}")
+    def _grid_db(units=_units):
+        import app_db
+        config = _db_config(10, units=units)
+        return _quiet(lambda: app_db.draw_plates_grid(_recording_doc(), config))
+
+
+# -----------------------------
+# Nameplate list (app_np)
+# -----------------------------
+def _catalogue(rows=CATALOGUE_ROWS):
+    """A nameplates.db with ``rows`` synthetic nameplates (schema from app_np_db_schema)."""
+    path = os.path.join(_work_dir(), f"nameplates-{rows}.db")
+    if os.path.exists(path):
+        return path
+    import app_np_db_schema
+    conn = sqlite3.connect(path)
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        app_np_db_schema.create_tables(conn)
+        app_np_db_schema.insert_default_data(conn)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO nameplates (sl_no, type_id, ch_group_id, name, qty, repeater) VALUES (?, ?, ?, ?, ?, ?)",
+        [(i + 1, rng.randint(1, 6), rng.randint(1, 4), f"NAMEPLATE {i:05d} {rng.choice(['MCB', 'LAMP', 'METER', 'SWITCH'])}",
+          rng.randint(1, 5), rng.choice((0, 0, 0, 1, 2))) for i in range(rows)],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _nameplate_module():
+    _qt_app()
+    import app_np
+    app_np.DB_FILE = _catalogue()
+    return app_np
+
+
+@case("np/fetch-10k")
+def _fetch():
+    app_np = _nameplate_module()
+    return lambda: app_np.fetch_nameplates(2)  # DFCB: its own rows plus the repeated COMMON rows
+
+
+class _NoDialogs:
+    """Stands in for QFileDialog/QMessageBox so the exports run without user input."""
+
+    target = None
+
+    @classmethod
+    def getSaveFileName(cls, *args, **kwargs):
+        return cls.target, ""
+
+    @staticmethod
+    def information(*args, **kwargs):
+        pass
+
+    warning = critical = information
+
+
+def _export_window(rows, suffix):
+    app_np = _nameplate_module()
+    from PyQt6.QtWidgets import QTableWidgetItem
+    app_np.QFileDialog = app_np.QMessageBox = _NoDialogs
+    app_np.subprocess = SimpleNamespace(call=lambda *a, **k: 0)  # do not open the exported file
+    _NoDialogs.target = os.path.join(_work_dir(), f"export-{rows}{suffix}")
+
+    window = app_np.NameplateApp()
+    window.lbl_heading.setText("NAMEPLATE LIST - BENCHMARK")
+    table = window.tbl_result
+    table.setRowCount(rows)
+    for r in range(rows):
+        if r % 250 == 0:
+            values = ["--- RECTANGULAR NAMEPLATES ---" if r % 500 == 0 else "--- RING NAMEPLATES ---", "", "", ""]
+        else:
+            values = [str(r), f"INCOMING MCB FOR FEEDER {r} WITH A LONG DESCRIPTION TO WRAP", "75x15", "2"]
+        for c, value in enumerate(values):
+            table.setItem(r, c, QTableWidgetItem(value))
+    return window
+
+
+for _rows in EXPORT_ROWS:
+    @case(f"np/excel-{_rows}", repeat=3)
+    def _excel(rows=_rows):
+        _require("openpyxl")
+        window = _export_window(rows, ".xlsx")
+        return window.export_to_excel
+
+    @case(f"np/pdf-{_rows}", repeat=3)
+    def _pdf(rows=_rows):
+        _require("reportlab")
+        window = _export_window(rows, ".pdf")
+        return window.export_to_pdf
+
+
+# -----------------------------
+# Documents
+# -----------------------------
+def _private_output_cache():
+    """Point the shared DOCX output cache at the work folder (the benchmark never hits it anyway)."""
+    import docx_cache
+    docx_cache._shared_cache = docx_cache.OutputCache(os.path.join(_work_dir(), "docx-cache"))
+
+
+class _Checked:
+    def __init__(self, checked):
+        self._checked = checked
+
+    def isChecked(self):
+        return self._checked
+
+
+@case("sticker/docx-400", repeat=3)
+def _sticker():
+    _require("docx")
+    _qt_app()
+    import app_sticker
+    logging.getLogger(app_sticker.__name__).setLevel(logging.WARNING)
+    _private_output_cache()
+
+    image = os.path.join(_work_dir(), "sticker.png")
+    try:
+        from PIL import Image
+        Image.new("RGB", (600, 300), "white").save(image)
+    except ImportError:
+        image = os.path.join(_work_dir(), "missing.png")  # pages get the "image missing" note
+
+    window = SimpleNamespace(
+        override_fy_cb=_Checked(False),
+        show_prod_label_cb=_Checked(True),
+        output_index=None,
+        save_output_path=lambda filename: os.path.join(_work_dir(), filename),
+    )
+    kwargs = dict(product_type="BCH", customer_name="BENCH CUSTOMER", sticker_path=image, job_no="1077",
+                  op_no="1", start_index=1, num_chargers=STICKER_PAGES // 2, voltage="110", current="20",
+                  battery_capacity="200", charger_type="FCBC", battery_type="VRLA", force_rebuild=True)
+
+    def run():
+        worker = app_sticker.DocxWorker(window, **kwargs)
+        errors = []
+        worker.error.connect(errors.append)
+        worker.run()  # synchronously, on this thread
+        if errors:
+            raise RuntimeError(errors[0])
+    return run
+
+
+@case("mgen/spec-docx", repeat=5)
+def _spec():
+    _require("docxtpl")
+    _qt_app()
+    import app_mgen_ups
+    _private_output_cache()
+    output = os.path.join(_work_dir(), "spec.docx")
+
+    def run():
+        success, message = app_mgen_ups._generate_docx_file(
+            dict(app_mgen_ups.DEFAULT_PARAMS), app_mgen_ups.DEFAULT_LIST_DATA, output, force_rebuild=True)
+        if not success:
+            raise RuntimeError(message)
+    return run
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+def run_case(setup, repeat):
+    fn = setup()
+    fn()  # warm-up: imports, template parsing, caches
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks for plate drawing, queries and documents.")
+    parser.add_argument("filters", nargs="*", help="run only cases whose name contains one of these")
+    parser.add_argument("-n", "--repeat", type=int, default=10, help="timed runs per light case (default: 10)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent (default: 10)")
+    parser.add_argument("-o", "--out", help="results file (default: benchmarks/results/suite-<timestamp>.json)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    selected = [c for c in CASES if not args.filters or any(f in c[0] for f in args.filters)]
+    if args.list:
+        print("\n".join(name for name, _, _ in selected))
+        return 0
+
+    os.chdir(ROOT)  # templates, layouts and the logo are found relative to the app folder
+    results = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": {},
+        "skipped": {},
+    }
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f).get("cases", {})
+
+    print(f"{'case':<22} {'median':>11} {'min':>11}")
+    regressions = 0
+    for name, setup, repeat in selected:
+        try:
+            result = run_case(setup, repeat or args.repeat)
+        except Skip as e:
+            results["skipped"][name] = str(e)
+            print(f"{name:<22} skipped: {e}")
+            continue
+        results["cases"][name] = result
+
+        line = f"{name:<22} {result['median_ms']:>9.2f}ms {result['min_ms']:>9.2f}ms"
+        if name in baseline:
+            before = baseline[name]["median_ms"]
+            change = (result["median_ms"] - before) / before * 100 if before else 0.0
+            line += f"   {change:+6.1f}% vs baseline"
+            if change > args.threshold:
+                line += "  REGRESSION"
+                regressions += 1
+        print(line)
+
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("suite-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {out}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
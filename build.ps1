@@ -40,10 +40,12 @@ pip install -r requirements.txt
 # Build EXE
 # -------------------------------------------------------------
 Write-Host Building EXE with PyInstaller...
-pyinstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=plategen app.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --collect-all requests
-PyInstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=app_db app_db.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --collect-all requests
-pyinstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=app_ups app_ups.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --collect-all requests
-pyinstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=app_bch app_bch.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --collect-all requests
+pyinstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=plategen app.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --add-data "layouts;layouts" --add-data "font/Consolas.ttf;font" --add-data "font/1CONSOLAB.TTF;font" --collect-all requests --hidden-import app_bch --hidden-import app_db --hidden-import app_ups --hidden-import app_np --hidden-import app_mgen_ups --hidden-import app_sticker
+# Console build of the launcher for its subcommands (plategen-cli stats / history / queue)
+pyinstaller --noconfirm --onefile --console --icon=installer/icons/plategen_icon.ico --name=plategen-cli app.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --add-data "layouts;layouts" --add-data "font/Consolas.ttf;font" --add-data "font/1CONSOLAB.TTF;font" --collect-all requests --hidden-import app_bch --hidden-import app_db --hidden-import app_ups --hidden-import app_np --hidden-import app_mgen_ups --hidden-import app_sticker
+PyInstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=app_db app_db.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --add-data "layouts;layouts" --add-data "font/Consolas.ttf;font" --add-data "font/1CONSOLAB.TTF;font" --collect-all requests
+pyinstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=app_ups app_ups.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --add-data "layouts;layouts" --add-data "font/Consolas.ttf;font" --add-data "font/1CONSOLAB.TTF;font" --collect-all requests
+pyinstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=app_bch app_bch.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --add-data "layouts;layouts" --add-data "font/Consolas.ttf;font" --add-data "font/1CONSOLAB.TTF;font" --collect-all requests
 pyinstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=app_np app_np.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --collect-all requests
 pyinstaller --noconfirm --onefile --windowed --icon=installer/icons/plategen_icon.ico --name=app_np_db_schema app_np_db_schema.py --add-data "installer/icons/plategen_icon.ico;installer/icons" --collect-all requests
 pyinstaller --noconfirm --onefile --windowed --icon=installer/icons/sticker_icon.ico --name=app_sticker app_sticker.py --add-data "installer/icons/sticker_icon.ico;installer/icons" --collect-all requests
@@ -0,0 +1,432 @@
+"""
+COM call tracing for the plate generators.
+
+``trace(doc)`` wraps an AutoCAD document (or any COM object) in a
+TracingProxy. Every method call, property get and property put made
+through it is timed and recorded with the member name and the call
+site. A call site is the first function outside this module, e.g.
+``plate_drawing.insert_scaled_block``. Objects returned by a call
+(ModelSpace, entities, block definitions, ...) are wrapped too, so one
+proxy at the document covers a whole plate.
+
+    doc, tracer = com_trace.trace(doc)
+    with tracer.plate("BCH dual"):
+        app_bch.draw_rating_plate(doc, config)
+    tracer.report()
+
+The report aggregates the calls per call site, per primitive (``AddText``,
+``Put StyleName``, ``SendCommand``, ...) and per plate, slowest first.
+
+RecordingDocument is a stand-in for an AutoCAD document that records the
+entities it is asked to create. Together with the tracer it profiles the
+drawing code on any platform (no AutoCAD, no pywin32)::
+
+    python com_trace.py bch --units 4
+    python com_trace.py ups --latency-us 300   # simulate COM round trips
+    python com_trace.py db --live              # the running AutoCAD instead
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import argparse
+import threading
+from contextlib import contextmanager
+from typing import NamedTuple
+
+_PLAIN = (str, bytes, int, float, bool, type(None))
+# Bound methods; COM objects returned by property gets are callable too, so callable() is not enough
+_METHODS = (types.MethodType, types.BuiltinMethodType, types.FunctionType)
+
+
+class Call(NamedTuple):
+    member: str      # "AddText", "Put StyleName", "Get ModelSpace"
+    site: str        # "plate_drawing.add_text_at"
+    line: int
+    plate: str
+    seconds: float
+
+
+class Tracer:
+    """Collects the Call records of all proxies created from one trace()."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+        self._plate = "-"
+
+    @contextmanager
+    def plate(self, label):
+        """Attribute the calls made inside the block to plate ``label``."""
+        previous, self._plate = self._plate, str(label)
+        try:
+            yield self
+        finally:
+            self._plate = previous
+
+    def record(self, member, seconds):
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_globals.get("__name__") == __name__:
+            frame = frame.f_back
+        if frame is None:
+            site, line = "?", 0
+        else:
+            site = f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+            line = frame.f_lineno
+        with self._lock:
+            self.calls.append(Call(member, site, line, self._plate, seconds))
+
+    def clear(self):
+        with self._lock:
+            self.calls = []
+
+    # ----- report -----
+
+    def summary(self, top=15):
+        """Aggregated calls as a dict: totals, slowest call sites, primitives and plates."""
+        with self._lock:
+            calls = list(self.calls)
+        total = sum(c.seconds for c in calls)
+
+        def group(key):
+            groups = {}
+            for c in calls:
+                entry = groups.setdefault(key(c), [0, 0.0])
+                entry[0] += 1
+                entry[1] += c.seconds
+            rows = sorted(groups.items(), key=lambda kv: kv[1][1], reverse=True)
+            return [
+                {"name": name, "calls": n, "ms": round(s * 1000, 3),
+                 "share": round(s / total * 100, 1) if total else 0.0}
+                for name, (n, s) in rows
+            ]
+
+        return {
+            "calls": len(calls),
+            "ms": round(total * 1000, 3),
+            "sites": group(lambda c: c.site)[:top],
+            "lines": group(lambda c: f"{c.site}:{c.line} {c.member}")[:top],
+            "primitives": group(lambda c: c.member)[:top],
+            "plates": group(lambda c: c.plate),
+        }
+
+    def report(self, stream=None, top=15):
+        """Print the summary; returns it as a dict."""
+        data = self.summary(top)
+        lines = [f"{data['calls']} COM calls, {data['ms']:.1f} ms"]
+        for title, key in (("slowest call sites", "sites"), ("slowest lines", "lines"),
+                           ("per primitive", "primitives"), ("per plate", "plates")):
+            lines.append(f"  {title}:")
+            for row in data[key]:
+                lines.append(f"    {row['name']:<58} {row['calls']:>6} calls {row['ms']:>10.2f} ms {row['share']:>6.1f}%")
+        print("\n".join(lines), file=stream or sys.stdout)
+        return data
+
+
+def _unwrap(value):
+    if isinstance(value, TracingProxy):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(v) for v in value)
+    return value
+
+
+class TracingProxy:
+    """Times every member access of ``target`` and records it in ``tracer``."""
+
+    __slots__ = ("_target", "_tracer", "_proxies")
+
+    def __init__(self, target, tracer, proxies=None):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_tracer", tracer)
+        # One proxy per target object, so identity checks (style caches) keep working
+        object.__setattr__(self, "_proxies", proxies if proxies is not None else {})
+
+    def _wrap(self, value):
+        if isinstance(value, _PLAIN) or isinstance(value, TracingProxy):
+            return value
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._wrap(v) for v in value)
+        if type(value).__module__ == "array":
+            return value
+        proxies = object.__getattribute__(self, "_proxies")
+        proxy = proxies.get(id(value))
+        if proxy is None or object.__getattribute__(proxy, "_target") is not value:
+            proxy = proxies[id(value)] = TracingProxy(value, object.__getattribute__(self, "_tracer"), proxies)
+        return proxy
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, "_target")
+        tracer = object.__getattribute__(self, "_tracer")
+        start = time.perf_counter()
+        value = getattr(target, name)
+        elapsed = time.perf_counter() - start
+        if not isinstance(value, _METHODS):
+            tracer.record(f"Get {name}", elapsed)
+            return self._wrap(value)
+
+        def call(*args, **kwargs):
+            args = _unwrap(args)
+            kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+            start = time.perf_counter()
+            try:
+                return self._wrap(value(*args, **kwargs))
+            finally:
+                tracer.record(name, time.perf_counter() - start)
+        return call
+
+    def __setattr__(self, name, value):
+        target = object.__getattribute__(self, "_target")
+        start = time.perf_counter()
+        try:
+            setattr(target, name, _unwrap(value))
+        finally:
+            object.__getattribute__(self, "_tracer").record(f"Put {name}", time.perf_counter() - start)
+
+    def __iter__(self):
+        for item in object.__getattribute__(self, "_target"):
+            yield self._wrap(item)
+
+    def __len__(self):
+        return len(object.__getattribute__(self, "_target"))
+
+    def __repr__(self):
+        return f"<traced {object.__getattribute__(self, '_target')!r}>"
+
+
+def trace(obj, tracer=None):
+    """``(proxy, tracer)`` for ``obj``; pass ``tracer`` to add to an existing trace."""
+    tracer = tracer or Tracer()
+    return TracingProxy(obj, tracer), tracer
+
+
+# -----------------------------
+# Recording backend
+# -----------------------------
+class RecordingEntity:
+    """An entity of the recording backend: remembers its properties, supports the calls the tools make."""
+
+    def __init__(self, owner, kind, args):
+        self.__dict__.update(_owner=owner, kind=kind, args=args, props={})
+
+    def __getattr__(self, name):
+        try:
+            return self.props[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self.props[name] = value
+        self._owner._latency()
+
+    def Update(self):
+        self._owner._latency()
+
+    def Delete(self):
+        self._owner._latency()
+        self.props["deleted"] = True
+
+    def Move(self, from_point, to_point):
+        self._owner._latency()
+
+    def Explode(self):
+        self._owner._latency()
+        return tuple(RecordingEntity(self._owner, "exploded", ()) for _ in range(3))
+
+    def GetBoundingBox(self):
+        self._owner._latency()
+        x, y = (self.args[0][0], self.args[0][1]) if self.args else (0.0, 0.0)
+        s = self.props.get("XScaleFactor", 1.0)
+        return (x, y, 0.0), (x + 100.0 * s, y + 40.0 * s, 0.0)
+
+
+class RecordingSpace:
+    """ModelSpace or a block definition of the recording backend."""
+
+    def __init__(self, document, name="*Model_Space"):
+        self.Document = document
+        self.Parent = document
+        self.Name = name
+        self.entities = []
+
+    def _latency(self):
+        self.Document._latency()
+
+    def _add(self, kind, args):
+        self._latency()
+        entity = RecordingEntity(self, kind, args)
+        self.entities.append(entity)
+        return entity
+
+    def AddLine(self, *args): return self._add("Line", args)
+    def AddPolyline(self, *args): return self._add("Polyline", args)
+    def AddLightWeightPolyline(self, *args): return self._add("LWPolyline", args)
+    def AddText(self, *args): return self._add("Text", args)
+    def AddMText(self, *args): return self._add("MText", args)
+    def AddDimAligned(self, *args): return self._add("DimAligned", args)
+    def AddDimRotated(self, *args): return self._add("DimRotated", args)
+
+    def InsertBlock(self, point, name, xs=1.0, ys=1.0, zs=1.0, rotation=0.0):
+        # Inserting a DWG by path defines a block named after the file, like AutoCAD does
+        block = os.path.splitext(os.path.basename(str(name)))[0]
+        self.Document.Blocks._define(block)
+        entity = self._add("BlockReference", (point, block, xs, ys, zs, rotation))
+        entity.props.update(XScaleFactor=xs, YScaleFactor=ys, ZScaleFactor=zs)
+        return entity
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __len__(self):
+        return len(self.entities)
+
+
+class _RecordingCollection:
+    def __init__(self, document, factory):
+        self._document = document
+        self._factory = factory
+        self._items = {}
+
+    def Item(self, name):
+        self._document._latency()
+        return self._items[name]
+
+    def Add(self, *args):
+        self._document._latency()
+        name = args[-1]
+        item = self._items.get(name)
+        if item is None:
+            item = self._items[name] = self._factory(name)
+        return item
+
+    def _define(self, name):
+        if name not in self._items:
+            self._items[name] = self._factory(name)
+
+    @property
+    def Count(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+
+class _RecordingStyle:
+    def __init__(self, name):
+        self.Name = name
+        self.fontFile = ""
+
+
+class RecordingDocument:
+    """
+    AutoCAD document stand-in: records entities instead of drawing them.
+
+    ``latency_us`` adds a simulated round trip to every call, so the traced
+    timings resemble a real COM session.
+    """
+
+    def __init__(self, latency_us=0.0):
+        self.latency_us = latency_us
+        self.commands = []
+        self.variables = {"REGENMODE": 1}
+        self.ModelSpace = RecordingSpace(self)
+        self.Blocks = _RecordingCollection(self, lambda name: RecordingSpace(self, name))
+        self.TextStyles = _RecordingCollection(self, _RecordingStyle)
+        self.TextStyles._define("Standard")
+        self.Name = "Recording.dwg"
+
+    def _latency(self):
+        if self.latency_us:
+            end = time.perf_counter() + self.latency_us / 1e6
+            while time.perf_counter() < end:
+                pass
+
+    def SendCommand(self, command):
+        self._latency()
+        self.commands.append(command)
+
+    def Regen(self, which):
+        self._latency()
+        self.commands.append("Regen")
+
+    def GetVariable(self, name):
+        self._latency()
+        return self.variables.get(name)
+
+    def SetVariable(self, name, value):
+        self._latency()
+        self.variables[name] = value
+
+    def SaveAs(self, path, file_type=None):
+        self._latency()
+        self.commands.append(f"SaveAs {path}")
+
+    def entity_count(self):
+        return len(self.ModelSpace.entities) + sum(len(b.entities) for b in self.Blocks)
+
+
+# -----------------------------
+# Command line
+# -----------------------------
+def _sample_plates(tool, units):
+    """``(label, draw(doc))`` pairs for the default config of ``tool``."""
+    import importlib
+    module = importlib.import_module(f"app_{tool}")
+    if tool == "bch":
+        config = {"mode": "dual", "units": units, "year": 2025, "project_no": 1077, "order_no": 2111}
+        if units > 1:
+            return [(f"bch grid x{units}", lambda doc: module.draw_plates_grid(doc, config))]
+        return [("bch", lambda doc: module.draw_rating_plate(doc, config))]
+    if tool == "db":
+        config = {"units": units, "outgoings": [], "product_text": "DB"}
+        return [(f"db x{units}", lambda doc: module.draw_plates_grid(doc, config))]
+    config = {"apparent_kva": 10.0, "unit_count": units, "year": 2025, "project_no": 1000, "order_no": 1,
+              "input_voltage": "415V AC, 3PH, 4W, 50Hz", "output_voltage": "230V AC, 1PH, 2W, 50Hz",
+              "show_dimensions": True}
+    return [(cfg["product_text"], lambda doc, cfg=cfg: module.draw_rating_plate_ups(doc, cfg, suppress_zoom=True))
+            for cfg in module.unit_configs(config)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trace the COM calls of a plate and report where the time goes.")
+    parser.add_argument("tool", choices=("bch", "db", "ups"))
+    parser.add_argument("--units", type=int, default=1, help="plates (BCH/DB grid, UPS units)")
+    parser.add_argument("--latency-us", type=float, default=0.0, help="simulated cost per call of the recording backend")
+    parser.add_argument("--live", action="store_true", help="draw into a new drawing of the running AutoCAD")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args(argv)
+
+    # Templates and the logo are looked up relative to the app folder, as in the apps
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    os.chdir(here)
+    import plate_layout
+    from plate_drawing import DrawingSession
+    if args.live:
+        import plate_job
+        target = plate_job.new_drawing()
+    else:
+        target = RecordingDocument(args.latency_us)
+    doc, tracer = trace(target)
+
+    # Same batch context as the apps' Generate button
+    with DrawingSession(doc):
+        for label, draw in _sample_plates(args.tool, args.units):
+            with tracer.plate(label):
+                draw(doc)
+        plate_layout.zoom_extents(doc)
+    data = tracer.report(top=args.top)
+    if not args.live:
+        print(f"{target.entity_count()} entities recorded, commands: {target.commands}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
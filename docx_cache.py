@@ -0,0 +1,241 @@
+"""
+Content-addressed cache for generated documents.
+
+Shared by the sticker generator and the UPS specification generator. A cache
+key is a hash of every generation parameter plus fingerprints of the template
+and image files the document is built from, so an identical request can reuse
+the previously generated file instead of rebuilding it. Cached files are kept
+in a single folder and evicted least-recently-used once their total size
+exceeds a limit.
+"""
+
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / "Documents" / "Plategen" / "cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+# (path, size, mtime_ns) -> sha256 hex, so unchanged files are hashed only once
+_fingerprints: Dict[Tuple[str, int, int], str] = {}
+_fingerprint_lock = threading.Lock()
+
+
+def file_fingerprint(path) -> str:
+    """
+    Return a content hash for a file, memoized on its size and mtime.
+
+    Args:
+        path: File to fingerprint
+
+    Returns:
+        sha256 hex digest, or "missing" if the file does not exist
+    """
+    path = os.path.abspath(str(path))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+
+    memo_key = (path, stat.st_size, stat.st_mtime_ns)
+    with _fingerprint_lock:
+        cached = _fingerprints.get(memo_key)
+    if cached:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+
+    with _fingerprint_lock:
+        _fingerprints[memo_key] = value
+    return value
+
+
+def make_key(kind: str, params: dict, files: Iterable = ()) -> str:
+    """
+    Build a cache key from generation parameters and input files.
+
+    Args:
+        kind: Generator name (keeps keys of different tools apart)
+        params: All parameters that affect the output; must be JSON-serialisable
+                (other values are converted with str())
+        files: Template/image paths whose content affects the output
+
+    Returns:
+        sha256 hex digest
+    """
+    payload = {
+        "kind": kind,
+        "params": params,
+        "files": [file_fingerprint(p) for p in files],
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+class OutputCache:
+    """
+    Folder of cached documents with an SQLite index for LRU eviction.
+
+    Entries are stored as ``<key><suffix>`` in ``cache_dir``; the index
+    records size and last use so eviction never needs a directory walk.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "cache_index.db"
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def get(self, key: str, output_path) -> Optional[str]:
+        """
+        Materialise a cached document at ``output_path``.
+
+        If the file already at ``output_path`` has the cached content it is
+        left untouched; otherwise the cached copy is copied there.
+
+        Args:
+            key: Cache key from make_key()
+            output_path: Where the caller expects the document
+
+        Returns:
+            ``output_path`` as a string on a hit, None on a miss
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT filename FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        cached_file = self.cache_dir / row[0]
+        if not cached_file.exists():
+            self._forget(key)
+            return None
+
+        output_path = str(output_path)
+        try:
+            if not (os.path.exists(output_path)
+                    and file_fingerprint(output_path) == file_fingerprint(cached_file)):
+                os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+                shutil.copyfile(cached_file, output_path)
+        except OSError as e:
+            logger.warning(f"Cache hit for {key[:12]} but copy failed: {e}")
+            return None
+
+        with self._connect() as conn:
+            conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        logger.info(f"Output cache hit {key[:12]} -> {output_path}")
+        return output_path
+
+    def put(self, key: str, source_path) -> None:
+        """
+        Store a freshly generated document under ``key`` and evict old entries.
+
+        Args:
+            key: Cache key from make_key()
+            source_path: Generated document to copy into the cache
+        """
+        source_path = Path(source_path)
+        filename = key + source_path.suffix
+        target = self.cache_dir / filename
+        try:
+            shutil.copyfile(source_path, target)
+            size = target.stat().st_size
+        except OSError as e:
+            logger.warning(f"Could not cache {source_path}: {e}")
+            return
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, filename, size, time.time())
+            )
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits ``max_bytes``.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            rows = conn.execute("SELECT key, filename, size FROM entries ORDER BY last_used").fetchall()
+
+        removed = 0
+        for key, filename, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                (self.cache_dir / filename).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not evict {filename}: {e}")
+                continue
+            self._forget(key)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(f"Output cache evicted {removed} entr{'y' if removed == 1 else 'ies'}")
+        return removed
+
+    def _forget(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Drop every cached document."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT filename FROM entries").fetchall()
+            conn.execute("DELETE FROM entries")
+        for (filename,) in rows:
+            try:
+                (self.cache_dir / filename).unlink()
+            except OSError:
+                pass
+
+
+_shared_cache: Optional[OutputCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_output_cache() -> Optional[OutputCache]:
+    """Return the process-wide cache, or None if the cache folder is unusable."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = OutputCache()
+            except Exception as e:
+                logger.warning(f"Output cache unavailable: {e}")
+                return None
+        return _shared_cache
@@ -0,0 +1,194 @@
+"""
+Preloaded DOCX template service for the specification generators.
+
+``DocxTemplate("template-mgen-ups.docx")`` reads the file from disk, unzips
+and parses it, cleans the body XML for Jinja and compiles it on every call.
+A TemplateService does the expensive, render-independent parts once: the
+template bytes stay in memory, the cleaned body XML is kept, and compiled
+Jinja templates are reused between renders. The template file's mtime and
+size are checked before each render, so editing the template in Word is
+picked up without restarting the app.
+
+Usage::
+
+    service = get_template_service("template-mgen-ups.docx")
+    service.render(context, "UPS_SPEC.docx")
+
+The same service works for any docxtpl template (e.g. template-mgen-bch.docx).
+"""
+
+import io
+import os
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _template_classes():
+    """
+    Build the docxtpl/jinja2 subclasses on first use.
+
+    docxtpl, python-docx and jinja2 take a noticeable share of the startup
+    time, so they are imported when the first template is loaded rather than
+    when this module is imported.
+    """
+    from docx import Document
+    from docxtpl import DocxTemplate
+    from jinja2 import Environment
+
+    class _CompiledTemplateEnvironment(Environment):
+        """Jinja environment that compiles each distinct source string only once."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._compiled: Dict[str, object] = {}
+            self._compiled_lock = threading.Lock()
+
+        def from_string(self, source, globals=None, template_class=None):
+            if globals is not None or template_class is not None or not isinstance(source, str):
+                return super().from_string(source, globals, template_class)
+            with self._compiled_lock:
+                template = self._compiled.get(source)
+                if template is None:
+                    template = super().from_string(source)
+                    self._compiled[source] = template
+                return template
+
+        def clear_compiled(self) -> None:
+            with self._compiled_lock:
+                self._compiled.clear()
+
+    class _PreparedDocxTemplate(DocxTemplate):
+        """DocxTemplate that loads from in-memory bytes and reuses the cleaned body XML."""
+
+        def __init__(self, blob: bytes, patched_body: str):
+            super().__init__(io.BytesIO(blob))
+            self._blob = blob
+            self._patched_body = patched_body
+
+        def init_docx(self, reload: bool = True):
+            if not self.docx or (self.is_rendered and reload):
+                self.template_file = io.BytesIO(self._blob)
+                self.docx = Document(self.template_file)
+                self.is_rendered = False
+
+        def build_xml(self, context, jinja_env=None):
+            # Equivalent to patch_xml(get_xml()) on the pristine template, computed once
+            return self.render_xml_part(self._patched_body, self.docx._part, context, jinja_env)
+
+    return DocxTemplate, _CompiledTemplateEnvironment, _PreparedDocxTemplate
+
+
+class TemplateService:
+    """
+    Keeps one docxtpl template loaded and ready to render.
+
+    Thread-safe; renders may run concurrently once the template is loaded.
+    """
+
+    def __init__(self, template_path: str):
+        self.template_path = os.path.abspath(template_path)
+        self._lock = threading.Lock()
+        self._env = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._blob: Optional[bytes] = None
+        self._patched_body: Optional[str] = None
+
+    def exists(self) -> bool:
+        """Return True if the template file is present."""
+        return os.path.exists(self.template_path)
+
+    def _current_stamp(self) -> Tuple[int, int]:
+        stat = os.stat(self.template_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, stamp: Tuple[int, int]) -> None:
+        with open(self.template_path, "rb") as f:
+            blob = f.read()
+
+        DocxTemplate, environment_class, _ = _template_classes()
+        if self._env is None:
+            self._env = environment_class()
+
+        # Clean the body XML for Jinja once; it only depends on the template
+        pristine = DocxTemplate(io.BytesIO(blob))
+        pristine.init_docx()
+        patched_body = pristine.patch_xml(pristine.get_xml())
+
+        self._blob = blob
+        self._patched_body = patched_body
+        self._env.clear_compiled()
+        self._stamp = stamp
+        logger.info(f"Loaded template {self.template_path}")
+
+    def preload(self) -> bool:
+        """
+        Load (or reload, if the file changed) the template now.
+
+        Returns:
+            True if the template is loaded, False if it is missing or unreadable
+        """
+        try:
+            stamp = self._current_stamp()
+        except OSError:
+            return False
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    self._load(stamp)
+                except Exception as e:
+                    logger.warning(f"Could not load template {self.template_path}: {e}")
+                    return False
+        return True
+
+    def render(self, context: dict, output_path) -> None:
+        """
+        Render the template with ``context`` and save it to ``output_path``.
+
+        Raises:
+            FileNotFoundError: If the template file does not exist
+        """
+        if not self.preload():
+            if not self.exists():
+                raise FileNotFoundError(self.template_path)
+            raise RuntimeError(f"Template could not be loaded: {self.template_path}")
+
+        with self._lock:
+            blob, patched_body = self._blob, self._patched_body
+
+        doc = _template_classes()[2](blob, patched_body)
+        doc.render(context, jinja_env=self._env)
+        with metrics.span("docx.save", template=os.path.basename(self.template_path)):
+            doc.save(output_path)
+
+
+_services: Dict[str, TemplateService] = {}
+_services_lock = threading.Lock()
+
+
+def get_template_service(template_path: str) -> TemplateService:
+    """Return the shared service for a template path, creating it on first use."""
+    key = os.path.abspath(template_path)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = TemplateService(key)
+            _services[key] = service
+        return service
+
+
+def preload_in_background(template_path: str) -> threading.Thread:
+    """Warm the service for ``template_path`` on a daemon thread."""
+    thread = threading.Thread(
+        target=get_template_service(template_path).preload,
+        name="template-preload",
+        daemon=True,
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,445 @@
+"""
+Consolas text metrics for laying out plates without AutoCAD.
+
+The plate templates place text by insertion point, and centring a label or
+keeping a value inside its cell needs the text's width. AutoCAD can only
+tell that after the text has been drawn (``GetBoundingBox`` over COM), so
+the widths are taken from the font files instead: ``font/Consolas.ttf``
+and ``font/1CONSOLAB.TTF`` are parsed once per process (head, hhea, hmtx,
+cmap and OS/2 tables) and their advance widths kept in an ``array``
+indexed by character code for Latin text, with a dict for the rest.
+
+Heights follow AutoCAD: a text height is the cap height, so a 3 mm text
+has 3 mm capitals and its em is ``3 / cap_height`` mm.
+
+    font_metrics.text_width("CHARGER-I", 3.0)              # mm
+    font_metrics.text_width("PRODUCT", 4.0, bold=True)
+    font_metrics.fit_height("415V, 3 PHASE, 4 WIRES, 50HZ ±5%", 4.0, 80.0)
+    font_metrics.fit_block(product_desc, 2.0, 95.0, 16.0)   # wrapped into a cell
+
+Without the font files (e.g. in a build that does not ship ``font/``) the
+built-in Consolas numbers are used. Consolas is monospaced, so they give
+the same widths for every character it has.
+
+``subset()`` cuts a font file down to the outlines of the characters a
+plate sheet uses, for embedding in SVG exports (plate_export.py).
+
+    python font_metrics.py "CHARGER-I" --height 3 --bold
+"""
+
+import os
+import sys
+import struct
+import argparse
+from array import array
+from functools import lru_cache
+
+FONT_DIR = "font"
+FONT_FILES = {False: "Consolas.ttf", True: "1CONSOLAB.TTF"}
+
+# Consolas: 2048 units per em, every glyph 1126 wide, capitals 1307 high
+FALLBACK_UNITS_PER_EM = 2048
+FALLBACK_ADVANCE = 1126
+FALLBACK_CAP_HEIGHT = 1307
+FALLBACK_ASCENDER = 1521
+FALLBACK_DESCENDER = -527
+
+DIRECT_CODES = 0x250  # Basic Latin to Latin Extended-B: looked up in an array
+MTEXT_LINE_SPACING = 5 / 3  # AutoCAD MTEXT line pitch per text height at spacing factor 1
+FIT_TOLERANCE = 0.02  # mm: fit_block() stops bisecting at this height step
+
+# Tables subset() leaves out: the signature no longer matches, and plate text
+# is set without kerning, ligatures or other OpenType layout features
+SUBSET_DROP_TABLES = {"DSIG", "GDEF", "GPOS", "GSUB", "MERG"}
+
+
+class FontError(ValueError):
+    """A font file is missing a table or uses an unsupported layout."""
+
+
+# -----------------------------
+# TrueType parsing
+# -----------------------------
+def _tables(data):
+    if data[:4] not in (b"\x00\x01\x00\x00", b"true"):
+        raise FontError("not a TrueType font")
+    count = struct.unpack_from(">H", data, 4)[0]
+    tables = {}
+    for i in range(count):
+        tag, _checksum, offset, length = struct.unpack_from(">4sIII", data, 12 + 16 * i)
+        tables[tag.decode("latin-1")] = (offset, length)
+    return tables
+
+
+def _cmap_format4(data, offset):
+    """Character code -> glyph index from a format 4 (BMP) cmap subtable."""
+    seg_count = struct.unpack_from(">H", data, offset + 6)[0] // 2
+    ends = struct.unpack_from(f">{seg_count}H", data, offset + 14)
+    starts_at = offset + 16 + 2 * seg_count
+    starts = struct.unpack_from(f">{seg_count}H", data, starts_at)
+    deltas = struct.unpack_from(f">{seg_count}h", data, starts_at + 2 * seg_count)
+    range_at = starts_at + 4 * seg_count
+    range_offsets = struct.unpack_from(f">{seg_count}H", data, range_at)
+
+    glyphs = {}
+    for seg, (start, end, delta, ro) in enumerate(zip(starts, ends, deltas, range_offsets)):
+        if start == 0xFFFF:
+            continue
+        for code in range(start, end + 1):
+            if ro == 0:
+                glyph = (code + delta) & 0xFFFF
+            else:
+                at = range_at + 2 * seg + ro + 2 * (code - start)
+                glyph = struct.unpack_from(">H", data, at)[0]
+                if glyph:
+                    glyph = (glyph + delta) & 0xFFFF
+            if glyph:
+                glyphs[code] = glyph
+    return glyphs
+
+
+def _cmap(data, offset):
+    count = struct.unpack_from(">H", data, offset + 2)[0]
+    subtables = {}
+    for i in range(count):
+        platform, encoding, sub = struct.unpack_from(">HHI", data, offset + 4 + 8 * i)
+        subtables[(platform, encoding)] = offset + sub
+    for key in ((3, 1), (0, 3), (0, 1), (3, 0)):
+        at = subtables.get(key)
+        if at is not None and struct.unpack_from(">H", data, at)[0] == 4:
+            return _cmap_format4(data, at)
+    raise FontError("no Unicode BMP (format 4) cmap")
+
+
+class FontMetrics:
+    """
+    Advance widths and vertical metrics of one font, in font units.
+
+    ``direct`` holds the advance of every character code below
+    DIRECT_CODES (0 where the font has no glyph); ``other`` the advances
+    of the remaining characters it has.
+    """
+
+    def __init__(self, name, units_per_em, ascender, descender, cap_height, default_advance,
+                 direct, other=None):
+        self.name = name
+        self.units_per_em = units_per_em
+        self.ascender = ascender
+        self.descender = descender
+        self.cap_height = cap_height
+        self.default_advance = default_advance  # characters the font lacks (its .notdef glyph)
+        self.direct = direct
+        self.other = other or {}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        tables = _tables(data)
+        for tag in ("head", "hhea", "hmtx", "cmap"):
+            if tag not in tables:
+                raise FontError(f"{path}: no '{tag}' table")
+
+        units_per_em = struct.unpack_from(">H", data, tables["head"][0] + 18)[0]
+        hhea = tables["hhea"][0]
+        ascender, descender = struct.unpack_from(">hh", data, hhea + 4)
+        long_metrics = struct.unpack_from(">H", data, hhea + 34)[0]
+        glyph_advances = array("H", struct.unpack_from(f">{long_metrics * 2}H", data, tables["hmtx"][0])[0::2])
+
+        cap_height = None
+        if "OS/2" in tables:
+            os2, length = tables["OS/2"]
+            if struct.unpack_from(">H", data, os2)[0] >= 2 and length >= 90:
+                cap_height = struct.unpack_from(">h", data, os2 + 88)[0] or None
+        if cap_height is None:
+            cap_height = round(ascender * 0.86)  # close enough for fonts that do not record it
+
+        def advance(glyph):
+            return glyph_advances[min(glyph, long_metrics - 1)]
+
+        glyphs = _cmap(data, tables["cmap"][0])
+        direct = array("H", [0]) * DIRECT_CODES
+        other = {}
+        for code, glyph in glyphs.items():
+            if code < DIRECT_CODES:
+                direct[code] = advance(glyph)
+            else:
+                other[code] = advance(glyph)
+        return cls(os.path.basename(path), units_per_em, ascender, descender, cap_height, advance(0), direct, other)
+
+    @classmethod
+    def fallback(cls):
+        """Built-in Consolas metrics (every character the same width)."""
+        direct = array("H", [FALLBACK_ADVANCE]) * DIRECT_CODES
+        return cls("Consolas (built-in)", FALLBACK_UNITS_PER_EM, FALLBACK_ASCENDER, FALLBACK_DESCENDER,
+                   FALLBACK_CAP_HEIGHT, FALLBACK_ADVANCE, direct)
+
+    def advance(self, char):
+        """Advance width of one character in font units."""
+        code = ord(char)
+        if code < DIRECT_CODES:
+            return self.direct[code] or self.default_advance
+        return self.other.get(code, self.default_advance)
+
+    def units(self, text):
+        """Advance width of ``text`` in font units."""
+        direct = self.direct
+        total = 0
+        for char in text:
+            code = ord(char)
+            if code < DIRECT_CODES and direct[code]:
+                total += direct[code]
+            else:
+                total += self.advance(char)
+        return total
+
+    def em(self, height):
+        """The em in mm of text whose cap height is ``height`` mm."""
+        return height / (self.cap_height / self.units_per_em)
+
+
+def font_path(bold=False):
+    """``font/`` next to the program (working folder first, then the bundled copy)."""
+    name = FONT_FILES[bool(bold)]
+    bundled = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    for folder in (os.path.abspath(FONT_DIR), os.path.join(bundled, FONT_DIR)):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            return path
+    return os.path.join(FONT_DIR, name)
+
+
+@lru_cache(maxsize=2)
+def metrics(bold=False):
+    """FontMetrics of regular or bold Consolas, parsed once per process."""
+    try:
+        return FontMetrics.from_file(font_path(bold))
+    except (OSError, FontError, struct.error):
+        return FontMetrics.fallback()
+
+
+# -----------------------------
+# Subsetting
+# -----------------------------
+def _components(glyph):
+    """Glyph indices a composite glyph is built from."""
+    if len(glyph) < 10 or struct.unpack_from(">h", glyph, 0)[0] >= 0:
+        return []
+    components = []
+    at = 10
+    while True:
+        flags, index = struct.unpack_from(">HH", glyph, at)
+        components.append(index)
+        at += 4 + (4 if flags & 0x0001 else 2)  # ARG_1_AND_2_ARE_WORDS
+        if flags & 0x0008:  # WE_HAVE_A_SCALE
+            at += 2
+        elif flags & 0x0040:  # WE_HAVE_AN_X_AND_Y_SCALE
+            at += 4
+        elif flags & 0x0080:  # WE_HAVE_A_TWO_BY_TWO
+            at += 8
+        if not flags & 0x0020:  # MORE_COMPONENTS
+            return components
+
+
+def _checksum(data):
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+
+def subset(path, chars):
+    """
+    The TrueType font at ``path`` with outlines only for ``chars``, as bytes.
+
+    Glyph indices are kept, so cmap, hmtx and the hinting tables stay
+    valid as they are: the outlines of the other glyphs are dropped from
+    glyf and loca. Enough for embedding the few characters of a plate
+    sheet in an SVG.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    tables = _tables(data)
+    for tag in ("head", "maxp", "loca", "glyf", "cmap"):
+        if tag not in tables:
+            raise FontError(f"{path}: no '{tag}' table")
+
+    long_loca = struct.unpack_from(">h", data, tables["head"][0] + 50)[0] == 1
+    glyph_count = struct.unpack_from(">H", data, tables["maxp"][0] + 4)[0]
+    if long_loca:
+        loca = struct.unpack_from(f">{glyph_count + 1}I", data, tables["loca"][0])
+    else:
+        loca = [2 * x for x in struct.unpack_from(f">{glyph_count + 1}H", data, tables["loca"][0])]
+    glyf = tables["glyf"][0]
+
+    def outline(glyph):
+        return data[glyf + loca[glyph]:glyf + loca[glyph + 1]]
+
+    cmap = _cmap(data, tables["cmap"][0])
+    keep = {0}
+    todo = [cmap[ord(c)] for c in set(chars) if ord(c) in cmap]
+    while todo:
+        glyph = todo.pop()
+        if glyph < glyph_count and glyph not in keep:
+            keep.add(glyph)
+            todo.extend(_components(outline(glyph)))
+
+    new_glyf = bytearray()
+    offsets = []
+    for glyph in range(glyph_count):
+        offsets.append(len(new_glyf))
+        if glyph in keep:
+            new_glyf += outline(glyph)
+            new_glyf += b"\0" * (-len(new_glyf) % 4)
+    offsets.append(len(new_glyf))
+    if long_loca:
+        new_loca = struct.pack(f">{len(offsets)}I", *offsets)
+    else:
+        new_loca = struct.pack(f">{len(offsets)}H", *(x // 2 for x in offsets))
+
+    out = {}
+    for tag, (offset, length) in tables.items():
+        if tag not in SUBSET_DROP_TABLES:
+            out[tag] = data[offset:offset + length]
+    out["glyf"] = bytes(new_glyf)
+    out["loca"] = new_loca
+    head = bytearray(out["head"])
+    head[8:12] = b"\0\0\0\0"  # checkSumAdjustment, set below
+    out["head"] = bytes(head)
+
+    count = len(out)
+    power = 1 << (count.bit_length() - 1)
+    font = bytearray(data[:4] + struct.pack(">HHHH", count, power * 16, power.bit_length() - 1,
+                                            (count - power) * 16))
+    offset = 12 + 16 * count
+    body = bytearray()
+    head_at = None
+    for tag in sorted(out):
+        table = out[tag]
+        if tag == "head":
+            head_at = offset + len(body)
+        font += struct.pack(">4sIII", tag.encode("latin-1"), _checksum(table), offset + len(body), len(table))
+        body += table + b"\0" * (-len(table) % 4)
+    font += body
+    struct.pack_into(">I", font, head_at + 8, (0xB1B0AFBA - _checksum(bytes(font))) & 0xFFFFFFFF)
+    return bytes(font)
+
+
+# -----------------------------
+# Text extents
+# -----------------------------
+@lru_cache(maxsize=4096)
+def _width(text, height, bold):
+    font = metrics(bold)
+    return font.units(text) * font.em(height) / font.units_per_em
+
+
+def text_width(text, height, bold=False, width_factor=1.0):
+    """Width in mm of ``text`` at text (cap) height ``height`` mm."""
+    return _width(str(text), float(height), bool(bold)) * width_factor
+
+
+def text_extents(text, height, bold=False, width_factor=1.0):
+    """
+    ``(width, ascent, descent)`` in mm: the advance width, and how far the
+    font's ascender rises above and its descender drops below the baseline.
+    """
+    font = metrics(bold)
+    em = font.em(height)
+    return (text_width(text, height, bold, width_factor),
+            font.ascender * em / font.units_per_em,
+            -font.descender * em / font.units_per_em)
+
+
+def fit_height(text, height, max_width, bold=False, min_height=None):
+    """
+    ``height``, reduced so that ``text`` is at most ``max_width`` mm wide
+    (never below ``min_height``, if given).
+    """
+    width = text_width(text, height, bold)
+    if width <= max_width or width <= 0:
+        return height
+    fitted = height * max_width / width
+    return max(fitted, min_height) if min_height else fitted
+
+
+def wrap(text, width, height, bold=False):
+    """
+    Lines of ``text`` broken between words to at most ``width`` mm, like an
+    MTEXT of that width (a word longer than the width stays whole).
+    """
+    lines = []
+    for paragraph in str(text).split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if line and text_width(candidate, height, bold) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def block_height(lines, height):
+    """Height in mm of ``lines`` lines of MTEXT, from the first cap line to the last baseline."""
+    return height * (1 + (lines - 1) * MTEXT_LINE_SPACING)
+
+
+def _block_fits(text, height, width, max_height, bold):
+    lines = wrap(text, width, height, bold)
+    fits = (block_height(len(lines), height) <= max_height
+            and all(text_width(line, height, bold) <= width for line in lines))
+    return fits, lines
+
+
+@lru_cache(maxsize=1024)
+def fit_block(text, height, width, max_height, bold=False, min_height=None):
+    """
+    The largest height up to ``height`` at which ``text``, wrapped to
+    ``width`` mm, fits in ``max_height`` mm, found by bisection down to
+    ``min_height`` (default: a quarter of ``height``).
+
+    Returns ``(height, lines, fits)``; ``fits`` is False when the text
+    overflows even at ``min_height``, which is then the height returned.
+    """
+    floor = min_height or height / 4
+    fits, lines = _block_fits(text, height, width, max_height, bold)
+    if fits or height <= floor:
+        return height, lines, fits
+    fits, lines = _block_fits(text, floor, width, max_height, bold)
+    if not fits:
+        return floor, lines, False
+    lo, hi = floor, height
+    while hi - lo > FIT_TOLERANCE:
+        mid = (lo + hi) / 2
+        if _block_fits(text, mid, width, max_height, bold)[0]:
+            lo = mid
+        else:
+            hi = mid
+    return lo, _block_fits(text, lo, width, max_height, bold)[1], True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Width of a text in Consolas, as AutoCAD sets it.")
+    parser.add_argument("text")
+    parser.add_argument("--height", type=float, default=3.0, help="text (cap) height in mm (default: 3)")
+    parser.add_argument("--bold", action="store_true")
+    parser.add_argument("--fit", type=float, metavar="WIDTH", help="also print the height that fits WIDTH mm")
+    parser.add_argument("--box", type=float, nargs=2, metavar=("WIDTH", "HEIGHT"),
+                        help="also print the height at which the text, wrapped, fits the box")
+    args = parser.parse_args(argv)
+
+    width, ascent, descent = text_extents(args.text, args.height, args.bold)
+    print(f"{metrics(args.bold).name}: {width:.2f} x {args.height:g} mm "
+          f"(ascent {ascent:.2f}, descent {descent:.2f})")
+    if args.fit:
+        print(f"height to fit {args.fit:g} mm: {fit_height(args.text, args.height, args.fit, args.bold):.2f} mm")
+    if args.box:
+        height, lines, fits = fit_block(args.text, args.height, args.box[0], args.box[1], args.bold)
+        print(f"height to fit {args.box[0]:g} x {args.box[1]:g} mm: {height:.2f} mm, {len(lines)} line(s)"
+              + ("" if fits else " (does not fit)"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Contiguous vertex storage for plate geometry.
+
+A GeometryBuffer keeps every vertex of a plate (or of a whole grid of
+plates) as ``x, y, z`` doubles in one ``array('d')``. Shapes are recorded as
+spans into that array, and the SAFEARRAY VARIANT AutoCAD wants is produced
+from a slice, which is a single memory copy instead of a Python loop per
+point. Copying a plate to other grid positions is one vectorised
+translation of the whole buffer: NumPy broadcasting when NumPy is
+installed, otherwise ``map(operator.add, ...)`` over an ``array('d')``
+repeated offset pattern (both without Python bytecode per point).
+
+    buf = GeometryBuffer()
+    frame = buf.add_rect(0, 0, 150, 100)
+    label = buf.add_point(3, 94)
+    ...
+    ms.AddPolyline(buf.variant(frame))
+    ms.AddText("INPUT", buf.point_variant(label), 3.0)
+
+    tile = buf.translated(160, 0)      # same spans, shifted vertices
+
+Used by the plate layout engine; see benchmarks/bench_geometry.py for the
+comparison with the per-point helpers.
+"""
+
+import operator
+from array import array
+from typing import Iterable, NamedTuple
+
+from plate_drawing import to_variant
+
+try:
+    import numpy
+except Exception:
+    numpy = None
+
+
+class Span(NamedTuple):
+    """``count`` consecutive points starting at point index ``start``."""
+    start: int
+    count: int
+
+
+class GeometryBuffer:
+    """Append-only buffer of 3D points backed by one ``array('d')``."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data=None):
+        self._data = data if data is not None else array('d')
+
+    def __len__(self):
+        """Number of points."""
+        return len(self._data) // 3
+
+    @property
+    def data(self) -> array:
+        """The flat ``x, y, z, x, y, z, ...`` array (do not resize it)."""
+        return self._data
+
+    # ----- building -----
+
+    def add_flat(self, coords: Iterable[float]) -> Span:
+        """Append points given as a flat ``x, y, z, ...`` sequence."""
+        start = len(self)
+        self._data.extend(coords)
+        if len(self._data) % 3:
+            raise ValueError("coordinate count must be a multiple of 3")
+        return Span(start, len(self) - start)
+
+    def add_point(self, x, y, z=0.0) -> int:
+        """Append one point and return its index."""
+        index = len(self)
+        self._data.extend((x, y, z))
+        return index
+
+    def add_line(self, x1, y1, x2, y2) -> Span:
+        return self.add_flat((x1, y1, 0.0, x2, y2, 0.0))
+
+    def add_rect(self, x1, y1, x2, y2) -> Span:
+        """Closed rectangle as five points (first point repeated)."""
+        return self.add_flat((x1, y1, 0.0, x2, y1, 0.0, x2, y2, 0.0, x1, y2, 0.0, x1, y1, 0.0))
+
+    def extend(self, other: "GeometryBuffer") -> int:
+        """Append all points of ``other``; returns the index offset of its spans."""
+        offset = len(self)
+        self._data.extend(other._data)
+        return offset
+
+    # ----- reading -----
+
+    def coords(self, span: Span) -> array:
+        """Flat coordinates of ``span`` (a copy, made with one memcpy)."""
+        return self._data[span.start * 3:(span.start + span.count) * 3]
+
+    def point(self, index: int):
+        i = index * 3
+        return self._data[i], self._data[i + 1], self._data[i + 2]
+
+    def variant(self, span: Span):
+        """SAFEARRAY VARIANT of the points in ``span`` (for AddPolyline, AddLine pairs, ...)."""
+        return to_variant(self.coords(span))
+
+    def point_variant(self, index: int):
+        """VARIANT for a single point."""
+        i = index * 3
+        return to_variant(self._data[i:i + 3])
+
+    def variants(self, spans, shift: int = 0) -> list:
+        """VARIANT per span, with every span moved ``shift`` points (e.g. to another tile)."""
+        d = self._data
+        return [to_variant(d[(start + shift) * 3:(start + shift + count) * 3]) for start, count in spans]
+
+    def point_variants(self, span: Span, shift: int = 0) -> list:
+        """One point VARIANT per point of ``span`` (text insertion points)."""
+        d = self._data
+        first = (span.start + shift) * 3
+        return [to_variant(d[i:i + 3]) for i in range(first, first + span.count * 3, 3)]
+
+    # ----- transforming -----
+
+    def translated(self, dx: float, dy: float, dz: float = 0.0) -> "GeometryBuffer":
+        """
+        Copy of the buffer moved by (dx, dy, dz). Spans stay valid.
+
+        No Python-level loop: the offset pattern is built by array
+        repetition and added element-wise by ``map(operator.add)``.
+        """
+        if not dx and not dy and not dz:
+            return GeometryBuffer(array('d', self._data))
+        pattern = array('d', (dx, dy, dz)) * len(self)
+        return GeometryBuffer(array('d', map(operator.add, self._data, pattern)))
+
+    def tiled(self, offsets) -> "GeometryBuffer":
+        """
+        One buffer holding a translated copy per ``(dx, dy)`` in ``offsets``.
+
+        Copy ``k`` starts at point index ``k * len(self)``.
+        """
+        offsets = list(offsets)
+        out = array('d')
+        if numpy is not None and offsets and self._data:
+            base = numpy.frombuffer(self._data, dtype=numpy.float64).reshape(-1, 3)
+            shifts = numpy.zeros((len(offsets), 1, 3))
+            shifts[:, 0, :2] = offsets
+            out.frombytes((base[numpy.newaxis] + shifts).tobytes())
+            return GeometryBuffer(out)
+        for dx, dy in offsets:
+            out.extend(self.translated(dx, dy)._data)
+        return GeometryBuffer(out)
+
+    def bounds(self):
+        """``(xmin, ymin, xmax, ymax)`` of all points; None if empty."""
+        if not self._data:
+            return None
+        xs = self._data[0::3]
+        ys = self._data[1::3]
+        return min(xs), min(ys), max(xs), max(ys)
@@ -0,0 +1,460 @@
+"""
+Unattended generation: the watch-folder job queue.
+
+Drop job files into the queue's ``inbox`` folder (by default
+``~/Documents/Plategen/queue/inbox``, ``PLATEGEN_QUEUE`` overrides the
+queue folder) and a running daemon generates them without an operator:
+
+    {"kind": "plates", "plates": [{"tool": "bch", "config": {...}}], "dxf": "job.dxf"}
+    {"kind": "plates", "snapshots": [12, 15], "export": "plates.pdf"}
+    {"kind": "sticker", "params": {...}, "fy": "25-26", "show_label": true}
+    {"kind": "nameplates", "group": "DFCB", "customer": "ACME", "job_no": "1234",
+     "special": false, "excel": "np.xlsx", "pdf": "np.pdf"}
+    {"kind": "spec", "params": {...}, "lists": {...}, "output": "spec.docx", "pdf": true}
+    {"kind": "spec", "sheet": "specs.xlsx"}
+
+``plates`` is a plate_job job (``snapshots`` takes plates from the plate
+history instead); it is drawn into a new AutoCAD drawing, or with
+``export`` written as SVG/PDF without AutoCAD. ``sticker`` params are the
+Sticker Generator's (app_sticker.build_sticker_docx), ``nameplates``
+runs app_np.nameplate_list() and its exports, and ``spec`` renders UPS
+specifications (app_mgen_ups._generate_docx_file, or a whole
+mgen_ups_batch sheet). Relative output paths are taken from the queue's
+``out`` folder.
+
+Each kind of work runs in a lane with its own concurrency limit: plates
+for AutoCAD share one ``acad`` lane (AutoCAD automation is single
+threaded), everything else runs in the ``cpu`` lane, a process pool of
+``--cpu-lanes`` workers. A long AutoCAD job therefore never holds up the
+DOCX/PDF work behind it. A job is claimed by moving it to ``running``
+under a ``<host>@<pid>@`` prefix (so two daemons never take the same
+file, and each knows its own) and ends up in ``done`` or ``failed`` with
+a ``<name>.result.txt`` (JSON) next to it. On start, jobs left in
+``running`` by a stopped daemon of the same host are queued again; jobs
+of daemons that are still running, or of other hosts, are left alone.
+
+Write job files under another name and rename them into ``inbox`` (or
+use ``--submit``), so the daemon never reads half a file. Run the daemon
+from the application folder; the tools find their templates and
+nameplates.db there.
+
+    python job_daemon.py                         # watch the queue until Ctrl+C
+    python job_daemon.py --once                  # work through the inbox and exit
+    python job_daemon.py --submit job.json       # queue a job file
+    python job_daemon.py --status
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import argparse
+import importlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import metrics
+
+DEFAULT_QUEUE_DIR = Path.home() / "Documents" / "Plategen" / "queue"
+POLL_SECONDS = 1.0
+FOLDERS = ("inbox", "running", "done", "failed", "out")
+RESULT_SUFFIX = ".result.txt"
+
+
+def _owner() -> str:
+    """``<host>@<pid>``: the prefix of the running files this daemon claimed."""
+    return f"{socket.gethostname()}@{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def job_name(running_path) -> str:
+    """The job file name of a ``running`` file (without its owner prefix)."""
+    name = Path(running_path).name
+    parts = name.split("@", 2)
+    return parts[2] if len(parts) == 3 else name
+
+
+def queue_dir(path=None) -> Path:
+    return Path(path or os.environ.get("PLATEGEN_QUEUE") or DEFAULT_QUEUE_DIR)
+
+
+def default_cpu_lanes() -> int:
+    """One CPU lane per core, leaving one for AutoCAD and the desktop."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+# -----------------------------
+# Job handlers (run in the lane's worker)
+# -----------------------------
+def _out_path(out_dir, path):
+    """``path`` taken relative to the queue's out folder, with its folder created."""
+    path = Path(out_dir) / Path(path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return str(path)
+
+
+def _plate_job(job):
+    """The plate_job job of a ``plates`` job file (its own plates or history snapshots)."""
+    import plate_job
+    import plate_history
+
+    if "snapshots" in job:
+        store = plate_history.SnapshotStore()
+        plates = plate_history.job_for(store.get(job["snapshots"]))
+        store.touch(job["snapshots"])
+    else:
+        plates = dict(plate_job.new_job(), plates=list(job.get("plates", [])))
+        for entry in plates["plates"]:
+            if entry.get("tool") in plate_job.TOOLS and not plates["sheet"]:
+                module = importlib.import_module(plate_job.TOOLS[entry["tool"]])
+                plates["sheet"] = module.sheet_options(entry.get("config", {}))
+    plates["sheet"] = dict(plates["sheet"], **job.get("sheet", {}))
+    if not plates["plates"]:
+        raise ValueError("The job has no plates")
+    return plates
+
+
+def _run_plates(job, out_dir):
+    import plate_job
+    import plate_history
+    import sheet_nesting
+
+    plates = _plate_job(job)
+    outputs = []
+    if job.get("export"):
+        import plate_export
+        sheet = plates["sheet"]
+        outputs = plate_export.export_sheets(
+            plate_job.layout_jobs(plates), _out_path(out_dir, job["export"]),
+            sheet_width=float(sheet.get("sheet_width", sheet_nesting.DEFAULT_SHEET_WIDTH)),
+            sheet_height=float(sheet.get("sheet_height", sheet_nesting.DEFAULT_SHEET_HEIGHT)),
+            kerf=float(sheet.get("kerf", sheet_nesting.DEFAULT_KERF)),
+            allow_rotate=sheet.get("allow_rotate", False))
+        message = f"Exported {len(plates['plates'])} plate entries to {len(outputs)} file(s)"
+    else:
+        doc = plate_job.new_drawing()
+        placements = plate_job.render(doc, plates)
+        if job.get("dxf"):
+            outputs = [_out_path(out_dir, job["dxf"])]
+            doc.SaveAs(os.path.abspath(outputs[0]), plate_job.AC_2013_DXF)
+        message = f"Rendered {len(placements)} plates on {sheet_nesting.sheet_count(placements)} sheet(s)"
+    if "snapshots" not in job:  # history plates were already counted as used by _plate_job()
+        for entry in plates["plates"]:
+            plate_history.record(entry["tool"], entry.get("config", {}), entry.get("label"))
+    return outputs, message
+
+
+def _run_sticker(job, out_dir):
+    import app_sticker
+
+    params = dict(job["params"])
+    fy = job.get("fy") or app_sticker.get_current_financial_year()
+    if job.get("output"):
+        output = _out_path(out_dir, job["output"])
+    else:
+        app_sticker.Config.DOCS_DIR.mkdir(parents=True, exist_ok=True)
+        output = str(app_sticker.Config.DOCS_DIR / app_sticker.sticker_filename(params))
+    app_sticker.build_sticker_docx(params, fy, job.get("show_label", True), output)
+    try:
+        app_sticker.OutputIndex().record(output, params.get("job_no", ""), params.get("op_no", ""),
+                                         params.get("product_type", "").upper().strip(),
+                                         params.get("customer_name", "").upper().strip())
+    except Exception as e:
+        app_sticker.logger.warning(f"Failed to update output index: {e}")
+    return [output], f"Sticker document saved to {output}"
+
+
+def _run_nameplates(job, out_dir):
+    import app_np
+
+    app_np.require_database()
+    heading, rows = app_np.nameplate_list(job["group"], job.get("customer", ""), job.get("job_no", ""),
+                                          job.get("special", False))
+    name = f"NAMEPLATES_{job.get('job_no', '')}_{job['group']}"
+    outputs = []
+    if job.get("excel", True):
+        outputs.append(_out_path(out_dir, job["excel"] if isinstance(job.get("excel"), str) else name + ".xlsx"))
+        app_np.write_excel(outputs[-1], heading, rows)
+    if job.get("pdf", False):
+        outputs.append(_out_path(out_dir, job["pdf"] if isinstance(job.get("pdf"), str) else name + ".pdf"))
+        app_np.write_pdf(outputs[-1], heading, rows)
+    return outputs, f"{heading}: {len(rows)} rows"
+
+
+def _run_spec(job, out_dir):
+    import mgen_ups_batch
+
+    if "sheet" in job:
+        specs = mgen_ups_batch.read_batch_file(job["sheet"])
+    else:
+        default_params, default_lists = mgen_ups_batch._defaults()
+        specs = [(dict(default_params, **job.get("params", {})),
+                  dict(default_lists, **job.get("lists", {})), job.get("output"))]
+    spec_dir = Path(out_dir) / job.get("folder", "")
+    spec_dir.mkdir(parents=True, exist_ok=True)
+    paths = mgen_ups_batch._output_paths(specs, str(spec_dir))
+    outputs, failures = [], []
+    for (params, lists, _name), path in zip(specs, paths):
+        path, success, message = mgen_ups_batch._render_job(params, lists, path, job.get("force", False))
+        (outputs if success else failures).append(path if success else f"{os.path.basename(path)}: {message}")
+    if failures:
+        raise RuntimeError("; ".join(failures))
+    if job.get("pdf") and outputs:
+        outputs += mgen_ups_batch.convert_to_pdf(outputs)
+    return outputs, f"{len(specs)} specification(s) generated"
+
+
+HANDLERS = {
+    "plates": _run_plates,
+    "sticker": _run_sticker,
+    "nameplates": _run_nameplates,
+    "spec": _run_spec,
+}
+
+
+def lane_for(job) -> str:
+    """``acad`` for work that drives AutoCAD, ``cpu`` for the rest."""
+    if job.get("kind") == "plates" and not job.get("export"):
+        return "acad"
+    return "cpu"
+
+
+def run_job(job, out_dir):
+    """
+    Lane worker entry point: generate one job.
+
+    Returns a result dict ``{"ok", "message", "outputs", "ms"}``; errors
+    are reported in it instead of raised.
+    """
+    kind = job.get("kind")
+    started = time.perf_counter()
+    try:
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind '{kind}' (expected one of: {', '.join(HANDLERS)})")
+        with metrics.span("queue.job", kind=kind, lane=lane_for(job)):
+            outputs, message = HANDLERS[kind](job, out_dir)
+        ok = True
+    except Exception as e:
+        outputs, message, ok = [], f"{type(e).__name__}: {e}", False
+    return {"ok": ok, "message": message, "outputs": [str(p) for p in outputs],
+            "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+# -----------------------------
+# The queue
+# -----------------------------
+class JobQueue:
+    """
+    A queue folder and the lanes that work through it.
+
+    ``lanes`` maps a lane name to its executor and size; a job is only
+    claimed when its lane has a free worker, so the inbox keeps the
+    backlog and a second daemon can share it.
+    """
+
+    def __init__(self, root=None, cpu_lanes=None):
+        self.root = queue_dir(root)
+        for name in FOLDERS:
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+        self.lane_sizes = {"acad": 1, "cpu": cpu_lanes or default_cpu_lanes()}
+        self.lanes = {}
+        self.in_flight = {}  # running path -> (lane, future)
+
+    def folder(self, name) -> Path:
+        return self.root / name
+
+    def submit(self, job) -> Path:
+        """Queue ``job`` (a dict or a job file path); written atomically into the inbox."""
+        if not isinstance(job, dict):
+            name = Path(job).stem
+            with open(job, encoding="utf-8") as f:
+                job = json.load(f)
+        else:
+            name = f"{job.get('kind', 'job')}-{time.strftime('%Y%m%d-%H%M%S')}"
+        target = self.folder("inbox") / f"{name}.json"
+        n = 1
+        while target.exists():
+            n += 1
+            target = self.folder("inbox") / f"{name}-{n}.json"
+        fd, tmp = tempfile.mkstemp(dir=self.folder("inbox"), prefix=".job-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(job, f, indent=2)
+        os.replace(tmp, target)
+        return target
+
+    def pending(self):
+        """Inbox job files, oldest first (temporary ``.``-files are skipped)."""
+        files = []
+        for path in self.folder("inbox").glob("*.json"):
+            if path.name.startswith("."):
+                continue
+            try:
+                files.append((path.stat().st_mtime, path.name, path))
+            except OSError:
+                continue  # claimed by another daemon since the listing
+        return [path for _, _, path in sorted(files)]
+
+    def recover(self) -> int:
+        """
+        Queue jobs again that a stopped daemon of this host left in ``running``.
+
+        Jobs of a daemon whose process is still alive, or of another host
+        (whose processes cannot be checked from here), stay where they are.
+        """
+        host = socket.gethostname()
+        count = 0
+        for path in self.folder("running").glob("*.json"):
+            parts = path.name.split("@", 2)
+            if len(parts) == 3:
+                owner_host, pid, _ = parts
+                if owner_host != host or not pid.isdigit() or _pid_alive(int(pid)):
+                    continue
+            try:
+                os.replace(path, self.folder("inbox") / job_name(path))
+            except OSError:
+                continue  # recovered by another daemon starting at the same time
+            count += 1
+        return count
+
+    def _executor(self, lane):
+        if lane not in self.lanes:
+            size = self.lane_sizes[lane]
+            # AutoCAD is driven from one thread; CPU work gets its own processes
+            self.lanes[lane] = (ThreadPoolExecutor(max_workers=size, thread_name_prefix="acad") if lane == "acad"
+                                else ProcessPoolExecutor(max_workers=size))
+        return self.lanes[lane]
+
+    def _busy(self, lane) -> int:
+        return sum(1 for busy_lane, _ in self.in_flight.values() if busy_lane == lane)
+
+    def _finish(self, path, result):
+        target = self.folder("done" if result["ok"] else "failed") / job_name(path)
+        try:
+            os.replace(path, target)
+        except FileNotFoundError:
+            print(f"{job_name(path)} is no longer in {self.folder('running')}; its result is kept anyway")
+        with open(target.with_name(target.stem + RESULT_SUFFIX), "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"{'OK  ' if result['ok'] else 'FAIL'} {path.name} ({result['ms']:.0f} ms): {result['message']}")
+
+    def claim(self) -> int:
+        """Start every inbox job whose lane has a free worker; returns how many were started."""
+        started = 0
+        for path in self.pending():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    job = json.load(f)
+                if not isinstance(job, dict):
+                    raise ValueError("a job file holds one JSON object")
+            except (OSError, ValueError) as e:
+                running = self.folder("running") / f"{_owner()}@{path.name}"
+                try:
+                    os.replace(path, running)
+                except OSError:
+                    continue  # taken by another daemon
+                self._finish(running, {"ok": False, "message": f"Invalid job file: {e}", "outputs": [], "ms": 0.0})
+                continue
+            lane = lane_for(job)
+            if self._busy(lane) >= self.lane_sizes[lane]:
+                continue
+            running = self.folder("running") / f"{_owner()}@{path.name}"
+            try:
+                os.replace(path, running)
+            except OSError:
+                continue  # taken by another daemon
+            future = self._executor(lane).submit(run_job, job, str(self.folder("out")))
+            self.in_flight[running] = (lane, future)
+            started += 1
+        return started
+
+    def reap(self) -> int:
+        """Move finished jobs to done/failed; returns how many finished."""
+        finished = [path for path, (_, future) in self.in_flight.items() if future.done()]
+        for path in finished:
+            _, future = self.in_flight.pop(path)
+            try:
+                result = future.result()
+            except Exception as e:  # a worker process that died
+                result = {"ok": False, "message": f"Worker failed: {e}", "outputs": [], "ms": 0.0}
+            self._finish(path, result)
+        return len(finished)
+
+    def run(self, once=False, poll_seconds=POLL_SECONDS):
+        """Work through the queue; with ``once``, return when the inbox is empty and all jobs are done."""
+        recovered = self.recover()
+        if recovered:
+            print(f"Re-queued {recovered} interrupted job(s)")
+        print(f"Watching {self.folder('inbox')} (lanes: "
+              + ", ".join(f"{lane} x{size}" for lane, size in self.lane_sizes.items()) + ")")
+        try:
+            while True:
+                self.reap()
+                self.claim()
+                if once and not self.in_flight and not self.pending():
+                    break
+                time.sleep(poll_seconds)
+        except KeyboardInterrupt:
+            print("Stopping: waiting for the running jobs to finish ...")
+            # Ctrl+C may have hit the pool workers too; reap() reports their errors
+            wait([future for _, future in self.in_flight.values()])
+            self.reap()
+        finally:
+            for executor in self.lanes.values():
+                executor.shutdown(wait=True)
+            self.lanes.clear()
+
+    def status(self) -> dict:
+        """Number of job files in each folder."""
+        return {name: len(list(self.folder(name).glob("*.json"))) for name in ("inbox", "running", "done", "failed")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate plates, stickers, nameplate lists and specs from a queue folder.")
+    parser.add_argument("--queue", help=f"queue folder (default: {queue_dir()})")
+    parser.add_argument("--cpu-lanes", type=int, default=None,
+                        help=f"parallel DOCX/PDF/export jobs (default: {default_cpu_lanes()})")
+    parser.add_argument("--once", action="store_true", help="work through the inbox, then exit")
+    parser.add_argument("--submit", nargs="+", metavar="JOB", help="queue job files and exit")
+    parser.add_argument("--status", action="store_true", help="count the jobs in each folder and exit")
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(args.queue, args.cpu_lanes)
+    if args.submit:
+        for path in args.submit:
+            print(f"Queued {queue.submit(path)}")
+        return 0
+    if args.status:
+        for name, count in queue.status().items():
+            print(f"{name:8} {count}")
+        return 0
+    queue.run(once=args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
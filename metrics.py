@@ -0,0 +1,247 @@
+"""
+Timing telemetry shared by the launcher and every sub-app.
+
+Tools wrap the stages worth watching in spans::
+
+    import metrics
+
+    with metrics.span("acad.connect"):
+        acad = win32com.client.Dispatch("AutoCAD.Application")
+
+    with metrics.span("export.excel", rows=n) as fields:
+        ...
+        fields["sheets"] = 2          # extra fields can be added inside the span
+
+Every finished span becomes one JSON line
+``{"ts", "host", "app", "op", "ms", "ok", ...fields}`` in a per-workstation
+file, ``~/Documents/Plategen/metrics/<host>.jsonl``. Spans nested in
+another span are buffered and written together when the outer one ends,
+so a grid of plates costs one file append. Once a file reaches
+MAX_FILE_BYTES it is rolled over to ``<host>.jsonl.1`` (one generation is
+kept). Telemetry never raises: a file that cannot be written is skipped.
+
+Operations recorded by the tools:
+
+    startup.window   time from process start to the first window
+    acad.connect     getting an AutoCAD application and a new drawing
+    plate.draw       one plate (``plate.grid`` / ``plate.blocks``: ``plates`` plates)
+    db.query         nameplate list query
+    export.excel, export.pdf    nameplate list exports
+    export.plates    SVG/PDF plate export (``plates``, ``sheets``)
+    docx.save        saving a generated DOCX (stickers, specifications)
+    pdf.convert      DOCX to PDF conversion
+    queue.job        one job of the unattended queue (``kind``, ``lane``, see job_daemon.py)
+
+Point PLATEGEN_METRICS_DIR at a network share to collect every
+workstation in one place (each host still writes its own file); set
+PLATEGEN_METRICS=off to turn recording off.
+
+    python metrics.py stats                    # p50/p95 per operation, all hosts
+    python metrics.py stats --by-host --since 7
+    plategen-cli stats ...                     # the same through the console launcher
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import atexit
+import socket
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_METRICS_DIR = Path.home() / "Documents" / "Plategen" / "metrics"
+MAX_FILE_BYTES = 2 * 1024 * 1024
+
+_state = {"app": os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]}
+_buffer = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def enabled():
+    return os.environ.get("PLATEGEN_METRICS", "").strip().lower() not in ("off", "0", "false", "no")
+
+
+def host():
+    return os.environ.get("COMPUTERNAME") or socket.gethostname() or "unknown"
+
+
+def metrics_dir(path=None) -> Path:
+    return Path(path or os.environ.get("PLATEGEN_METRICS_DIR") or DEFAULT_METRICS_DIR)
+
+
+def metrics_file(path=None) -> Path:
+    """This workstation's metrics file."""
+    return metrics_dir(path) / f"{host()}.jsonl"
+
+
+def set_app(name):
+    """Name recorded with every span (startup_profile sets it for each app)."""
+    _state["app"] = name
+
+
+def record(op, ms, ok=True, **fields):
+    """Record a measurement taken elsewhere (e.g. startup_profile's time to window)."""
+    if not enabled():
+        return
+    entry = {"ts": round(time.time(), 3), "host": host(), "app": _state["app"], "op": op,
+             "ms": round(float(ms), 3), "ok": ok}
+    entry.update(fields)
+    with _lock:
+        _buffer.append(entry)
+    if not getattr(_local, "depth", 0):
+        flush()
+
+
+@contextmanager
+def span(op, **fields):
+    """
+    Time the block as ``op``. Yields ``fields``, which the block may extend.
+
+    A span left by an exception is recorded with ``"ok": false`` and the
+    exception propagates unchanged.
+    """
+    _local.depth = getattr(_local, "depth", 0) + 1
+    ok = True
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        _local.depth -= 1
+        record(op, elapsed, ok, **fields)
+
+
+def flush(path=None):
+    """Append the buffered spans to this workstation's file."""
+    with _lock:
+        if not _buffer:
+            return
+        lines = "".join(json.dumps(entry, default=str) + "\n" for entry in _buffer)
+        _buffer.clear()
+        target = metrics_file(path)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target.exists() and target.stat().st_size + len(lines) > MAX_FILE_BYTES:
+                os.replace(target, target.with_name(target.name + ".1"))
+            with open(target, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError:
+            pass  # telemetry must never get in the way of the tool
+
+
+atexit.register(flush)
+
+
+# -----------------------------
+# Statistics
+# -----------------------------
+def load(paths=None, since_days=None):
+    """
+    Every record in ``paths`` (files or folders; default: the metrics folder).
+
+    Folders contribute their ``*.jsonl`` and rolled ``*.jsonl.1`` files.
+    Unreadable lines are skipped.
+    """
+    files = []
+    for path in paths or [metrics_dir()]:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.jsonl")) + glob.glob(os.path.join(path, "*.jsonl.1"))))
+        else:
+            files.append(str(path))
+
+    cutoff = time.time() - since_days * 86400 if since_days else None
+    records = []
+    for name in files:
+        try:
+            with open(name, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if not isinstance(entry, dict) or "op" not in entry or "ms" not in entry:
+                        continue
+                    if cutoff and entry.get("ts", 0) < cutoff:
+                        continue
+                    records.append(entry)
+        except OSError:
+            continue
+    return records
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a sorted list."""
+    if not values:
+        return None
+    k = (len(values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def summarize(records, by_host=False):
+    """``{(op,) or (op, host): {"count", "failed", "p50_ms", "p95_ms", "max_ms"}}``, sorted by key."""
+    groups = {}
+    for entry in records:
+        key = (entry["op"], entry.get("host", "?")) if by_host else (entry["op"],)
+        groups.setdefault(key, []).append(entry)
+
+    stats = {}
+    for key in sorted(groups):
+        entries = groups[key]
+        times = sorted(float(e["ms"]) for e in entries)
+        stats[key] = {
+            "count": len(times),
+            "failed": sum(1 for e in entries if e.get("ok") is False),
+            "p50_ms": round(percentile(times, 50), 1),
+            "p95_ms": round(percentile(times, 95), 1),
+            "max_ms": round(times[-1], 1),
+        }
+    return stats
+
+
+def format_stats(stats, by_host=False):
+    head = f"{'operation':<16} " + (f"{'host':<16} " if by_host else "")
+    lines = [head + f"{'count':>7} {'failed':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}"]
+    for key, s in stats.items():
+        line = f"{key[0]:<16} " + (f"{key[1]:<16} " if by_host else "")
+        lines.append(line + f"{s['count']:>7} {s['failed']:>6} {s['p50_ms']:>10.1f} {s['p95_ms']:>10.1f} {s['max_ms']:>10.1f}")
+    if not stats:
+        lines.append("(no measurements yet)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="plategen", description="Plategen timing telemetry.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats_cmd = commands.add_parser("stats", help="p50/p95 latency per operation")
+    stats_cmd.add_argument("paths", nargs="*", help=f"metrics files or folders (default: {metrics_dir()})")
+    stats_cmd.add_argument("--since", type=float, metavar="DAYS", help="only the last DAYS days")
+    stats_cmd.add_argument("--app", help="only spans recorded by this app (e.g. app_bch)")
+    stats_cmd.add_argument("--by-host", action="store_true", help="one line per operation and workstation")
+    stats_cmd.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    records = load(args.paths, args.since)
+    if args.app:
+        records = [r for r in records if r.get("app") == args.app]
+    stats = summarize(records, args.by_host)
+    if args.json:
+        print(json.dumps([dict(zip(("op", "host"), key), **s) for key, s in stats.items()], indent=2))
+    else:
+        hosts = len({r.get("host") for r in records})
+        print(format_stats(stats, args.by_host))
+        print(f"{len(records)} measurements from {hosts} workstation(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
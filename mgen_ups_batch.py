@@ -0,0 +1,258 @@
+"""
+Batch UPS specification generator.
+
+Reads many UPS configurations from an XLSX or CSV sheet and renders one
+specification per row with the same logic as the configurator's Generate
+button (``app_mgen_ups._generate_docx_file``), spread over a process pool.
+The generated documents can then be converted to PDF in one pass through
+the shared conversion service (pdf_convert).
+
+Sheet layout: the first row holds column names, one row per specification.
+
+* Parameter columns use the configurator's keys (``ups_config``, ``ipf``,
+  ``job_no``, ``op_no``, ``rev_no``, ``ble_option_key``, ``ivoltage``,
+  ``batno``, ``batcap``, ``ip_rating``, ...). Missing columns or empty cells
+  fall back to ``DEFAULT_PARAMS``.
+* List columns (``rectifier_protections``, ``inverter_protections``,
+  ``metering_input``, ``metering_battery``, ``metering_output``,
+  ``all_indications``, ``audio_alarms``, ``pot_free_contacts_signals``)
+  hold items separated by ``|`` or line breaks. Empty cells fall back to
+  ``DEFAULT_LIST_DATA``.
+* Optional ``output_name`` sets the file name; by default it is
+  ``UPS_SPEC_<job_no>_OP<op_no>.docx``.
+
+Command line::
+
+    python mgen_ups_batch.py jobs.xlsx -o specs --pdf -j 4
+"""
+
+import os
+import re
+import csv
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+LIST_SEPARATOR = re.compile(r"\s*(?:\||\r?\n)\s*")
+TEMPLATE_SHEET_NAME = "UPS Specs"
+
+
+def _defaults():
+    """Return (DEFAULT_PARAMS, DEFAULT_LIST_DATA) from the configurator."""
+    from app_mgen_ups import DEFAULT_PARAMS, DEFAULT_LIST_DATA
+    return DEFAULT_PARAMS, DEFAULT_LIST_DATA
+
+
+def _read_rows(path):
+    """Yield one {column: value} dict per data row of an XLSX or CSV file."""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        import openpyxl
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [str(h).strip().lower() if h is not None else "" for h in next(rows, [])]
+            for values in rows:
+                yield dict(zip(header, values))
+        finally:
+            wb.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                yield {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+
+
+def _coerce(value, default):
+    """Convert a cell value to the type of the configurator default."""
+    if isinstance(default, bool):
+        return str(value).strip().lower() in ("1", "true", "yes", "y")
+    if isinstance(default, int):
+        return int(float(value))
+    if isinstance(default, float):
+        return float(value)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def read_batch_file(path):
+    """
+    Parse a batch sheet into generation jobs.
+
+    Args:
+        path: XLSX or CSV file
+
+    Returns:
+        List of (input_params, list_data, output_name) tuples; output_name may be None
+
+    Raises:
+        ValueError: If a cell cannot be converted, with the row number
+    """
+    default_params, default_lists = _defaults()
+    jobs = []
+
+    for row_no, row in enumerate(_read_rows(path), start=2):
+        if all(v is None or str(v).strip() == "" for v in row.values()):
+            continue
+
+        input_params = dict(default_params)
+        for key, default in default_params.items():
+            value = row.get(key)
+            if value is None or str(value).strip() == "":
+                continue
+            try:
+                input_params[key] = _coerce(value, default)
+            except (TypeError, ValueError):
+                raise ValueError(f"Row {row_no}: invalid value {value!r} for '{key}'")
+
+        list_data = {}
+        for key, default in default_lists.items():
+            value = row.get(key)
+            if value is None or str(value).strip() == "":
+                list_data[key] = list(default)
+            else:
+                list_data[key] = [item for item in LIST_SEPARATOR.split(str(value).strip()) if item]
+
+        output_name = row.get("output_name")
+        output_name = str(output_name).strip() if output_name not in (None, "") else None
+        jobs.append((input_params, list_data, output_name))
+
+    return jobs
+
+
+def write_batch_template(path):
+    """Write a sheet with every column and one row of default values."""
+    default_params, default_lists = _defaults()
+    header = list(default_params) + list(default_lists) + ["output_name"]
+    row = list(default_params.values()) + [" | ".join(v) for v in default_lists.values()] + [""]
+
+    if path.lower().endswith(".xlsx"):
+        import openpyxl
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = TEMPLATE_SHEET_NAME
+        ws.append(header)
+        ws.append(row)
+        wb.save(path)
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerow(row)
+
+
+def _output_paths(jobs, out_dir):
+    """Assign a unique .docx path in out_dir to every job."""
+    used = set()
+    paths = []
+    for index, (params, _, output_name) in enumerate(jobs, start=1):
+        name = output_name or f"UPS_SPEC_{params.get('job_no', 0)}_OP{params.get('op_no', 0)}"
+        if not name.lower().endswith(".docx"):
+            name += ".docx"
+        stem, suffix = name[:-5], index
+        while name.lower() in used:
+            # The suffixed name may itself be taken ("A", "A_3", then "A" as job 3)
+            name = f"{stem}_{suffix}.docx"
+            suffix += 1
+        used.add(name.lower())
+        paths.append(os.path.join(out_dir, name))
+    return paths
+
+
+def _render_job(input_params, list_data, output_filepath, force_rebuild):
+    """Process-pool entry point: one spec, same semantics as the Generate button."""
+    from app_mgen_ups import _generate_docx_file
+    success, message = _generate_docx_file(
+        input_params, list_data, output_filepath, force_rebuild=force_rebuild
+    )
+    return output_filepath, success, message
+
+
+def run_batch(jobs, out_dir, workers=None, force_rebuild=False, progress=None):
+    """
+    Render every job into out_dir on a process pool.
+
+    Args:
+        jobs: Output of read_batch_file()
+        out_dir: Folder for the generated .docx files (created if missing)
+        workers: Process count (default: CPU count, at most one per job)
+        force_rebuild: Bypass the output cache
+        progress: Optional callable(done, total, path, success, message)
+
+    Returns:
+        List of (output_filepath, success, message) in job order
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = _output_paths(jobs, out_dir)
+    total = len(jobs)
+    if not total:
+        return []
+
+    workers = max(1, min(workers or os.cpu_count() or 1, total))
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_render_job, params, lists, path, force_rebuild): path
+            for (params, lists, _), path in zip(jobs, paths)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = (path, False, f"Worker failed: {e}")
+            results[path] = result
+            if progress:
+                progress(done, total, *result)
+
+    return [results[path] for path in paths]
+
+
+def convert_to_pdf(docx_paths):
+    """
+    Convert the given documents to PDF next to the originals.
+
+    All files go through the shared conversion service in one queue, so the
+    converter is started once for the whole batch.
+
+    Returns:
+        List of PDF paths
+    """
+    import pdf_convert
+    return pdf_convert.get_converter().convert_many(docx_paths)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate UPS specifications from a spreadsheet.")
+    parser.add_argument("sheet", help="XLSX or CSV file, one specification per row")
+    parser.add_argument("-o", "--out", default="specs", help="output folder (default: specs)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--pdf", action="store_true", help="also convert the results to PDF")
+    parser.add_argument("--force", action="store_true", help="ignore the output cache")
+    args = parser.parse_args(argv)
+
+    jobs = read_batch_file(args.sheet)
+    print(f"{len(jobs)} specification(s) in {args.sheet}")
+
+    def report(done, total, path, success, message):
+        print(f"[{done}/{total}] {'OK  ' if success else 'FAIL'} {os.path.basename(path)}"
+              + ("" if success else f": {message}"))
+
+    results = run_batch(jobs, args.out, workers=args.jobs, force_rebuild=args.force, progress=report)
+    generated = [path for path, success, _ in results if success]
+
+    if args.pdf and generated:
+        try:
+            convert_to_pdf(generated)
+        except Exception as e:
+            print(f"PDF conversion failed: {e}", file=sys.stderr)
+            return 1
+        print(f"Converted {len(generated)} file(s) to PDF")
+
+    return 0 if len(generated) == len(results) else 1
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+OUTGOING rows of the DB rating plate.
+
+A distribution board can have hundreds of outgoing feeders, mostly of a few
+kinds. Feeders with the same rating, poles and breaker type are merged into
+one entry (their counts added, first-seen order kept) and the entries are
+packed into a table of up to MAX_COLUMNS columns, so the plate grows by one
+row per ``columns`` distinct kinds instead of one row per two feeders.
+
+    entries = outgoing_table.aggregate(config['outgoings'])
+    columns = outgoing_table.choose_columns(entries, table_width, min_height)
+    rows = outgoing_table.pack(entries, columns)    # [[cell text, ...], ...]
+
+With ``columns=0`` choose_columns() takes as many columns as still fit the
+widest entry at the smallest text height the cells may shrink to
+(measured with font_metrics).
+"""
+
+import font_metrics
+
+MAX_COLUMNS = 4
+CELL_PADDING = 4.0  # mm of a column not used by its text (2 mm either side)
+
+
+def outgoing_key(outgoing):
+    """``(rating, poles, type)`` of an outgoing dict; feeders with equal keys are merged."""
+    return (str(outgoing.get('rating', '')), str(outgoing.get('poles', '')),
+            str(outgoing.get('type', '')).strip().upper())
+
+
+def aggregate(outgoings):
+    """``[(rating, poles, type, count), ...]`` with equal feeders merged, in first-seen order."""
+    counts = {}
+    for outgoing in outgoings:
+        key = outgoing_key(outgoing)
+        counts[key] = counts.get(key, 0) + int(outgoing.get('count', 1))
+    return [key + (count,) for key, count in counts.items()]
+
+
+def outgoing_text(entry):
+    """Plate text of one ``(rating, poles, type, count)`` entry."""
+    rating, poles, btype, count = entry
+    return f"{rating}A {poles}P {btype} - {count} NOS."
+
+
+def choose_columns(entries, table_width, height, columns=0):
+    """
+    Column count for ``entries`` in a table ``table_width`` mm wide.
+
+    A positive ``columns`` is used as given (capped at MAX_COLUMNS);
+    0 picks the most columns whose cells fit the widest entry at text
+    ``height`` (the smallest the cells may shrink it to), but never more
+    columns than there are entries.
+    """
+    if columns > 0:
+        return min(int(columns), MAX_COLUMNS)
+    if not entries:
+        return 1
+    widest = max(font_metrics.text_width(outgoing_text(e), height) for e in entries)
+    best = 1
+    for n in range(2, min(MAX_COLUMNS, len(entries)) + 1):
+        if table_width / n - CELL_PADDING >= widest:
+            best = n
+    return best
+
+
+def pack(entries, columns):
+    """
+    Row-major ``[[cell, ...], ...]`` of entry texts, every row ``columns``
+    long (one empty row if none).
+
+    The last row is padded with '' so the template can index every cell;
+    empty texts are not drawn.
+    """
+    texts = [outgoing_text(e) for e in entries]
+    rows = [texts[i:i + columns] for i in range(0, len(texts), columns)] or [[]]
+    return [row + [''] * (columns - len(row)) for row in rows]
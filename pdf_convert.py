@@ -0,0 +1,518 @@
+"""
+DOCX-to-PDF conversion service.
+
+``docx2pdf.convert`` starts and quits Microsoft Word for every call and only
+works where Word is installed. This module keeps one converter warm for the
+life of the process and feeds it through a queue from a single worker thread:
+
+* ``LibreOfficeBackend`` - a headless LibreOffice listener driven over UNO
+  (needs the ``uno`` Python bridge, e.g. the python3-uno package on Linux).
+  Documents are loaded and exported inside the running office process.
+* ``WordBackend`` - one hidden Word instance over COM (Windows + Word).
+* ``LibreOfficeBatchBackend`` - fallback when the UNO bridge is missing:
+  everything waiting in the queue is converted by a single ``soffice
+  --convert-to pdf`` run with a persistent profile.
+* ``Docx2PdfBackend`` - the previous behaviour, used only if nothing else is
+  available.
+
+Set PLATEGEN_PDF_BACKEND to "libreoffice", "word", "libreoffice-batch" or
+"docx2pdf" to force a backend; conversions fail with the reason if it is
+not available.
+
+Command line::
+
+    python pdf_convert.py specs/*.docx -o pdf
+"""
+
+import os
+import sys
+import time
+import queue
+import shutil
+import socket
+import atexit
+import logging
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(tempfile.gettempdir()) / "plategen_lo_profile"
+STARTUP_TIMEOUT = 30  # seconds to wait for the office listener
+
+
+def find_soffice() -> Optional[str]:
+    """Return the LibreOffice executable, or None if it is not installed."""
+    for name in ("soffice", "libreoffice"):
+        path = shutil.which(name)
+        if path:
+            return path
+    if sys.platform == "win32":
+        for base in (os.environ.get("ProgramFiles", r"C:\Program Files"),
+                     os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)")):
+            candidate = os.path.join(base, "LibreOffice", "program", "soffice.exe")
+            if os.path.exists(candidate):
+                return candidate
+    return None
+
+
+def _profile_url() -> str:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    return PROFILE_DIR.as_uri()
+
+
+# ----------------------------------------
+# Backends
+# ----------------------------------------
+class LibreOfficeBackend:
+    """Warm headless LibreOffice process, driven over a UNO socket."""
+
+    name = "libreoffice"
+
+    def __init__(self, soffice: str):
+        import uno  # noqa: F401 - fail early if the bridge is missing
+        self.soffice = soffice
+        self.process = None
+        self.desktop = None
+
+    @staticmethod
+    def _props(**values):
+        from com.sun.star.beans import PropertyValue
+        props = []
+        for name, value in values.items():
+            prop = PropertyValue()
+            prop.Name = name
+            prop.Value = value
+            props.append(prop)
+        return tuple(props)
+
+    def start(self) -> None:
+        import uno
+
+        if self.alive():
+            return
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+
+        self.process = subprocess.Popen(
+            [self.soffice, "--headless", "--invisible", "--nologo", "--norestore",
+             "--nodefault", "--nolockcheck", f"-env:UserInstallation={_profile_url()}",
+             f"--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            try:
+                ctx = resolver.resolve(
+                    f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+                )
+                break
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("LibreOffice listener did not start")
+                time.sleep(0.25)
+
+        self.desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+        logger.info(f"LibreOffice listener ready on port {port}")
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None and self.desktop is not None
+
+    def convert(self, jobs: List[Tuple[str, str]]) -> List[Optional[Exception]]:
+        import uno
+
+        if not self.alive():
+            self.stop()
+            self.start()
+
+        errors = []
+        for src, dst in jobs:
+            doc = None
+            try:
+                doc = self.desktop.loadComponentFromURL(
+                    uno.systemPathToFileUrl(src), "_blank", 0,
+                    self._props(Hidden=True, ReadOnly=True)
+                )
+                if doc is None:
+                    raise RuntimeError(f"LibreOffice could not open {src}")
+                doc.storeToURL(uno.systemPathToFileUrl(dst), self._props(FilterName="writer_pdf_Export"))
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                if doc is not None:
+                    try:
+                        doc.close(True)
+                    except Exception:
+                        pass
+        return errors
+
+    def stop(self) -> None:
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+            self.desktop = None
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+
+class WordBackend:
+    """One hidden Microsoft Word instance kept open over COM."""
+
+    name = "word"
+    WD_FORMAT_PDF = 17
+
+    def __init__(self):
+        import win32com.client  # noqa: F401 - fail early without pywin32
+        self.word = None
+
+    def start(self) -> None:
+        import pythoncom
+        import win32com.client
+        if self.word is not None:
+            return
+        pythoncom.CoInitialize()  # COM apartment of the worker thread
+        self.word = win32com.client.DispatchEx("Word.Application")
+        self.word.Visible = False
+        self.word.DisplayAlerts = 0
+
+    def convert(self, jobs: List[Tuple[str, str]]) -> List[Optional[Exception]]:
+        if self.word is None:
+            self.start()
+        errors = []
+        for src, dst in jobs:
+            doc = None
+            try:
+                doc = self.word.Documents.Open(src, ReadOnly=True, AddToRecentFiles=False)
+                doc.SaveAs(dst, FileFormat=self.WD_FORMAT_PDF)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                if doc is not None:
+                    try:
+                        doc.Close(False)
+                    except Exception:
+                        pass
+        return errors
+
+    def stop(self) -> None:
+        if self.word is not None:
+            try:
+                self.word.Quit()
+            except Exception:
+                pass
+            self.word = None
+
+
+class LibreOfficeBatchBackend:
+    """One ``soffice --convert-to pdf`` run per queued batch and output folder."""
+
+    name = "libreoffice-batch"
+
+    def __init__(self, soffice: str):
+        self.soffice = soffice
+
+    def start(self) -> None:
+        pass
+
+    def convert(self, jobs: List[Tuple[str, str]]) -> List[Optional[Exception]]:
+        errors: List[Optional[Exception]] = [None] * len(jobs)
+        with tempfile.TemporaryDirectory(prefix="plategen_pdf_") as outdir:
+            # Inputs with the same stem would overwrite each other in one outdir
+            batches: List[List[int]] = []
+            for index, (src, _) in enumerate(jobs):
+                stem = Path(src).stem.lower()
+                for batch in batches:
+                    if all(Path(jobs[i][0]).stem.lower() != stem for i in batch):
+                        batch.append(index)
+                        break
+                else:
+                    batches.append([index])
+
+            for batch in batches:
+                result = subprocess.run(
+                    [self.soffice, "--headless", "--norestore", "--nolockcheck",
+                     f"-env:UserInstallation={_profile_url()}",
+                     "--convert-to", "pdf", "--outdir", outdir] + [jobs[i][0] for i in batch],
+                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+                )
+                for i in batch:
+                    src, dst = jobs[i]
+                    produced = Path(outdir) / (Path(src).stem + ".pdf")
+                    if produced.exists():
+                        shutil.move(str(produced), dst)
+                    else:
+                        errors[i] = RuntimeError(
+                            f"LibreOffice did not convert {src}: {result.stdout.strip()[-300:]}"
+                        )
+        return errors
+
+    def stop(self) -> None:
+        pass
+
+
+class Docx2PdfBackend:
+    """Previous behaviour: docx2pdf per file (starts Word each time)."""
+
+    name = "docx2pdf"
+
+    def __init__(self):
+        import docx2pdf  # noqa: F401
+
+    def start(self) -> None:
+        pass
+
+    def convert(self, jobs: List[Tuple[str, str]]) -> List[Optional[Exception]]:
+        from docx2pdf import convert
+        errors = []
+        for src, dst in jobs:
+            try:
+                convert(src, dst)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    def stop(self) -> None:
+        pass
+
+
+BACKENDS = ("libreoffice", "word", "libreoffice-batch", "docx2pdf")
+
+
+def create_backend(preferred: Optional[str] = None):
+    """
+    Pick the best available backend.
+
+    Args:
+        preferred: Backend name; defaults to PLATEGEN_PDF_BACKEND or automatic choice
+
+    Raises:
+        ValueError: If ``preferred`` is not a backend name
+        RuntimeError: If no converter (or not the preferred one) is available
+    """
+    preferred = (preferred or os.environ.get("PLATEGEN_PDF_BACKEND", "")).strip().lower()
+    soffice = find_soffice()
+
+    candidates = []
+    if soffice:
+        candidates.append(("libreoffice", lambda: LibreOfficeBackend(soffice)))
+    if sys.platform == "win32":
+        candidates.append(("word", WordBackend))
+    if soffice:
+        candidates.append(("libreoffice-batch", lambda: LibreOfficeBatchBackend(soffice)))
+    candidates.append(("docx2pdf", Docx2PdfBackend))
+
+    if preferred:
+        if preferred not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend '{preferred}' (expected one of: {', '.join(BACKENDS)})")
+        candidates = [c for c in candidates if c[0] == preferred]
+        if not candidates:
+            raise RuntimeError(f"PDF backend '{preferred}' is not available on this system")
+
+    for name, factory in candidates:
+        try:
+            backend = factory()
+            logger.info(f"PDF conversion backend: {name}")
+            return backend
+        except Exception as e:
+            if preferred:
+                raise RuntimeError(f"PDF backend '{preferred}' is not available: {e}") from e
+            logger.debug(f"PDF backend {name} unavailable: {e}")
+
+    raise RuntimeError(
+        "No DOCX to PDF converter found. Install LibreOffice or Microsoft Word."
+    )
+
+
+# ----------------------------------------
+# Queueing service
+# ----------------------------------------
+class ConversionService:
+    """
+    Single worker thread that owns a warm backend and drains a queue.
+
+    Jobs that arrive while a conversion is running are handed to the backend
+    together, so batch backends can convert them in one run.
+    """
+
+    MAX_BATCH = 50
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend_name(self) -> Optional[str]:
+        return getattr(self._backend, "name", None)
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pdf-convert", daemon=True)
+                self._thread.start()
+
+    def warm_up(self) -> None:
+        """Start the backend in the background so the first conversion is fast."""
+        self._queue.put(("warm", None, None))
+        self._ensure_thread()
+
+    def submit(self, src, dst=None) -> Future:
+        """
+        Queue one conversion.
+
+        Args:
+            src: .docx file
+            dst: .pdf file (default: next to src)
+
+        Returns:
+            Future resolving to the PDF path
+        """
+        src = os.path.abspath(str(src))
+        dst = os.path.abspath(str(dst)) if dst else os.path.splitext(src)[0] + ".pdf"
+        future: Future = Future()
+        self._queue.put(("convert", (src, dst), future))
+        self._ensure_thread()
+        return future
+
+    def convert(self, src, dst=None, timeout: Optional[float] = None) -> str:
+        """Convert one file and wait for the result."""
+        return self.submit(src, dst).result(timeout)
+
+    def convert_many(self, paths, out_dir=None) -> List[str]:
+        """
+        Convert several files and wait for all of them.
+
+        Args:
+            paths: .docx files
+            out_dir: Folder for the PDFs (default: next to each source)
+
+        Raises:
+            RuntimeError: If any conversion failed, listing every failure
+        """
+        futures = []
+        for src in paths:
+            dst = os.path.join(out_dir, Path(src).stem + ".pdf") if out_dir else None
+            futures.append(self.submit(src, dst))
+
+        results, failures = [], []
+        for src, future in zip(paths, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures.append(f"{os.path.basename(str(src))}: {e}")
+        if failures:
+            raise RuntimeError("PDF conversion failed for:\n" + "\n".join(failures))
+        return results
+
+    def _run(self) -> None:
+        while True:
+            kind, job, future = self._queue.get()
+            if kind == "stop":
+                break
+
+            batch = []
+            if kind == "convert":
+                batch.append((job, future))
+            # Pick up everything else already waiting
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    kind, job, future = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "stop":
+                    self._queue.put((kind, job, future))
+                    break
+                if kind == "convert":
+                    batch.append((job, future))
+
+            try:
+                if self._backend is None:
+                    self._backend = create_backend()
+                if not batch:
+                    self._backend.start()
+                    continue
+                with metrics.span("pdf.convert", backend=getattr(self._backend, "name", None), files=len(batch)):
+                    errors = self._backend.convert([job for job, _ in batch])
+            except Exception as e:
+                logger.error(f"PDF conversion failed: {e}")
+                errors = [e] * len(batch)
+
+            for (job, future), error in zip(batch, errors):
+                if error is None:
+                    future.set_result(job[1])
+                else:
+                    future.set_exception(error)
+
+        if self._backend is not None:
+            self._backend.stop()
+
+    def shutdown(self) -> None:
+        """Stop the worker and close the backend."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(("stop", None, None))
+            self._thread.join(timeout=15)
+
+
+_service: Optional[ConversionService] = None
+_service_lock = threading.Lock()
+
+
+def get_converter() -> ConversionService:
+    """Return the process-wide conversion service."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ConversionService()
+            atexit.register(_service.shutdown)
+        return _service
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert DOCX files to PDF.")
+    parser.add_argument("files", nargs="+", help=".docx files")
+    parser.add_argument("-o", "--out", default=None, help="output folder (default: next to each file)")
+    parser.add_argument("--backend", default=None, help="force a backend")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    service = ConversionService(create_backend(args.backend))
+    started = time.perf_counter()
+    try:
+        results = service.convert_many(args.files, args.out)
+    finally:
+        service.shutdown()
+    elapsed = time.perf_counter() - started
+    print(f"Converted {len(results)} file(s) in {elapsed:.1f}s via {service.backend_name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,516 @@
+"""
+Shared AutoCAD drawing primitives for the rating plate generators.
+
+app_bch.py, app_db.py and app_ups.py draw through these functions instead of
+keeping their own copies, so a fix or speed-up lands in every tool at once.
+
+* Point arrays are packed straight into ``array('d')`` without building
+  per-point lists, and the VARIANT for a repeated point (``(0, 0, 0)`` for
+  ``Move``, a column's x on every row, ...) is built once and reused.
+* Text style lookups go to AutoCAD once per document, not once per text.
+* Inside a DrawingSession, entity ``Update()`` calls, regens and zooms are
+  deferred and sent once when the batch ends.
+* When pywin32 is not installed the primitives still call the ModelSpace
+  methods with plain tuples/arrays, so a recording stand-in (see the
+  tracing tools) can capture a plate on any platform. The apps themselves
+  check for pywin32 before connecting to AutoCAD.
+"""
+
+import os
+import math
+import threading
+from array import array
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+
+try:
+    import win32com.client
+    import pythoncom
+except Exception:
+    win32com = None
+    pythoncom = None
+
+VT_R8_ARRAY = (pythoncom.VT_ARRAY | pythoncom.VT_R8) if pythoncom is not None else None
+
+# AcAttachmentPoint used for all MText (acAttachmentPointTopCenter)
+MTEXT_ATTACHMENT = 2
+BYLAYER = 256
+
+
+# -----------------------------
+# SAFEARRAY helpers
+# -----------------------------
+def to_variant(values):
+    """Wrap an ``array('d')`` as a SAFEARRAY(VT_R8) VARIANT (the array itself without pywin32)."""
+    if win32com is None:
+        return values
+    return win32com.client.VARIANT(VT_R8_ARRAY, values)
+
+
+def make_safearray_3d(points):
+    """VARIANT of ``x, y, z`` doubles for an iterable of 3-tuples."""
+    return to_variant(array('d', chain.from_iterable(points)))
+
+
+@lru_cache(maxsize=4096)
+def _point_variant(x, y, z):
+    if win32com is None:
+        return (x, y, z)
+    return win32com.client.VARIANT(VT_R8_ARRAY, array('d', (x, y, z)))
+
+
+def make_point_variant(x, y=None, z=0.0):
+    """
+    VARIANT for one 3D point; identical points share one VARIANT.
+
+    Also accepts a single ``(x, y, z)`` tuple as ``x``.
+    """
+    if y is None and isinstance(x, (list, tuple)):
+        x, y, z = x
+    return _point_variant(float(x), float(y), float(z))
+
+
+# -----------------------------
+# Text styles
+# -----------------------------
+_style_lock = threading.Lock()
+_style_owner = None  # document (or space) the cached names belong to
+_style_names = {}
+
+
+def text_style(owner, name="Standard", create=True):
+    """
+    Return the name of text style ``name``, creating it if needed.
+
+    ``owner`` is the document, a space or a block definition.
+    The lookup is cached for the most recent owner, so drawing a plate only
+    asks AutoCAD once per style. Returns None if the style is unavailable.
+    """
+    global _style_owner, _style_names
+    with _style_lock:
+        if _style_owner is not owner:
+            _style_owner = owner
+            _style_names = {}
+        if name in _style_names:
+            return _style_names[name]
+
+    try:
+        styles = owner.TextStyles
+    except AttributeError:
+        # A space or block definition: every AutoCAD object knows its document
+        try:
+            styles = owner.Document.TextStyles
+        except AttributeError:
+            styles = owner.Parent.TextStyles
+
+    resolved = None
+    try:
+        resolved = styles.Item(name).Name
+    except Exception:
+        if create:
+            try:
+                resolved = styles.Add(name).Name
+            except Exception:
+                resolved = None
+
+    with _style_lock:
+        if _style_owner is owner:
+            _style_names[name] = resolved
+    return resolved
+
+
+def _style_name(style):
+    """Accept a style name or a TextStyle object."""
+    if style is None or isinstance(style, str):
+        return style
+    return style.Name
+
+
+# -----------------------------
+# Drawing sessions: deferred Update / regen / zoom
+# -----------------------------
+CALL_COUNTS = Counter()  # SendCommand / Update / Regen calls this process sent to AutoCAD
+_session_local = threading.local()
+
+
+class DrawingSession:
+    """
+    Batch context for drawing many plates into one document.
+
+        with DrawingSession(doc) as session:
+            draw_plates_grid(doc, config)
+        print(session.summary())
+
+    While the session is open, entity ``Update()`` calls are skipped, and
+    regen and zoom requests are only recorded. AutoCAD's automatic
+    regeneration (REGENMODE) is off. Leaving the session restores
+    REGENMODE and sends one regen (if any was requested or an update was
+    skipped) and one zoom extents (if any was requested). A session opened
+    inside another one joins the outer session.
+
+    ``calls`` counts the calls sent (``SendCommand``, ``Update``,
+    ``Regen``) and the ones deferred (``deferred_update``, ...).
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.calls = Counter()
+        self.regen_requested = False
+        self.zoom_requested = False
+        self._joined = None
+        self._regenmode = None
+
+    def __enter__(self):
+        outer = current_session()
+        if outer is not None:
+            self._joined = outer
+            return outer
+        _session_local.session = self
+        try:
+            self._regenmode = self.doc.GetVariable("REGENMODE")
+            self.doc.SetVariable("REGENMODE", 0)
+        except Exception:
+            self._regenmode = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._joined is not None:
+            return False
+        _session_local.session = None
+        if self._regenmode is not None:
+            try:
+                self.doc.SetVariable("REGENMODE", self._regenmode)
+            except Exception:
+                pass
+        if self.regen_requested or self.calls["deferred_update"]:
+            _regen_now(self.doc, self)
+        if self.zoom_requested:
+            _zoom_now(self.doc, self)
+        return False
+
+    def summary(self):
+        sent = ", ".join(f"{name} {self.calls[name]}" for name in ("SendCommand", "Update", "Regen"))
+        deferred = ", ".join(f"{name[9:]} {n}" for name, n in sorted(self.calls.items()) if name.startswith("deferred_"))
+        return f"AutoCAD calls: {sent} (deferred: {deferred or 'none'})"
+
+
+def current_session():
+    """The DrawingSession open on this thread, or None."""
+    return getattr(_session_local, "session", None)
+
+
+def _count(name, session=None):
+    CALL_COUNTS[name] += 1
+    if session is not None:
+        session.calls[name] += 1
+
+
+def _regen_now(doc, session=None):
+    try:
+        doc.SendCommand("_REGEN ")
+        _count("SendCommand", session)
+    except Exception:
+        try:
+            doc.Regen(0)
+            _count("Regen", session)
+        except Exception:
+            pass
+
+
+def _zoom_now(doc, session=None):
+    try:
+        doc.SendCommand("_ZOOM _E ")
+        _count("SendCommand", session)
+    except Exception:
+        _regen_now(doc, session)
+
+
+def update_entity(entity):
+    """``entity.Update()``, or nothing inside a session (its final regen redraws everything)."""
+    session = current_session()
+    if session is not None:
+        session.calls["deferred_update"] += 1
+        return
+    try:
+        entity.Update()
+        _count("Update")
+    except Exception:
+        pass
+
+
+def regen_drawing(doc):
+    """Regenerate the drawing now, or once at the end of the open session."""
+    session = current_session()
+    if session is not None:
+        session.regen_requested = True
+        session.calls["deferred_regen"] += 1
+        return
+    _regen_now(doc)
+
+
+def zoom_extents(doc):
+    """Zoom to the drawing extents now, or once at the end of the open session."""
+    session = current_session()
+    if session is not None:
+        session.zoom_requested = True
+        session.calls["deferred_zoom"] += 1
+        return
+    _zoom_now(doc)
+
+
+# -----------------------------
+# Primitives: rectangles, lines, text, mtext
+# -----------------------------
+def add_rect(ms, x1, y1, x2, y2):
+    pts = array('d', (x1, y1, 0, x2, y1, 0, x2, y2, 0, x1, y2, 0, x1, y1, 0))
+    pl = ms.AddPolyline(to_variant(pts))
+    pl.Closed = True
+    return pl
+
+
+def add_line(ms, x1, y1, x2, y2):
+    return ms.AddLine(make_point_variant(x1, y1), make_point_variant(x2, y2))
+
+
+def add_polyline_span(ms, buf, span, closed=False):
+    """Polyline through the points of ``span`` in a geometry_buffer.GeometryBuffer."""
+    pl = ms.AddPolyline(buf.variant(span))
+    if closed:
+        pl.Closed = True
+    return pl
+
+
+def _apply_style(entity, style):
+    name = _style_name(style)
+    if name:
+        try:
+            entity.StyleName = name
+        except Exception:
+            pass
+
+
+def add_text_at(ms, text, point, height, style=None):
+    """add_text with the insertion point already packed as a VARIANT."""
+    t = ms.AddText(str(text), point, float(height))
+    _apply_style(t, style)
+    return t
+
+
+def add_text(ms, text, x, y, height, style=None):
+    return add_text_at(ms, text, make_point_variant(x, y), height, style)
+
+
+def add_mtext_at(ms, text, point, width, height, style=None):
+    """add_mtext with the insertion point already packed as a VARIANT."""
+    mt = ms.AddMText(point, float(width), str(text))
+    mt.Height = float(height)
+    _apply_style(mt, style)
+    try:
+        mt.Attachment = MTEXT_ATTACHMENT
+    except Exception:
+        pass
+    return mt
+
+
+def add_mtext(ms, text, x, y, width, height, style=None):
+    return add_mtext_at(ms, text, make_point_variant(x, y), width, height, style)
+
+
+def add_bold_text_at(ms, text, point, height, width=200):
+    """add_bold_text with the insertion point already packed as a VARIANT."""
+    mt = ms.AddMText(point, float(width), fr"\fConsolas|b1;{text}")
+    mt.Height = float(height)
+    try:
+        mt.Attachment = MTEXT_ATTACHMENT
+    except Exception:
+        pass
+    return mt
+
+
+def add_bold_text(ms, text, x, y, height, width=200):
+    """
+    Adds bold Consolas text using MTEXT formatting.
+    Works even if AutoCAD styles are not bold.
+    """
+    return add_bold_text_at(ms, text, make_point_variant(x, y), height, width)
+
+
+def align_label(label, width=8):
+    return label.ljust(width)
+
+
+# -----------------------------
+# Dimensions
+# -----------------------------
+def add_dimension_aligned(ms, x1, y1, x2, y2, dim_x, dim_y, override_text=None, text_height=None):
+    """
+    Add an aligned dimension between (x1,y1) and (x2,y2) with
+    dimension line passing through (dim_x,dim_y).
+    """
+    dim = ms.AddDimAligned(
+        make_point_variant(x1, y1),
+        make_point_variant(x2, y2),
+        make_point_variant(dim_x - 3, dim_y - 3),
+    )
+
+    try:
+        dim.TextFill = False
+    except Exception:
+        pass
+
+    dim.TextGap = 1.5
+
+    content = override_text if override_text is not None else "<>"
+    final_override = r"\FConsolas;"
+    if text_height:
+        final_override += r"\H{0};".format(text_height)
+    dim.TextOverride = final_override + content
+    return dim
+
+
+def add_dimension_linear(ms, x1, y1, x2, y2, dimline_x, dimline_y,
+                         override_text=None, vertical=False, arrow_size=3.0):
+    """
+    Aligned dimension with a one-decimal measurement (or ``override_text``).
+
+    Returns None if AutoCAD rejects the dimension.
+    """
+    try:
+        dim = ms.AddDimAligned(
+            make_point_variant(x1, y1),
+            make_point_variant(x2, y2),
+            make_point_variant(dimline_x, dimline_y),
+        )
+    except Exception:
+        return None
+
+    for prop, value in (("TextHeight", 3.0), ("ExtLineOffset", 6.0), ("ArrowheadSize", arrow_size)):
+        try:
+            setattr(dim, prop, value)
+        except Exception:
+            pass
+
+    raw_val = abs(x2 - x1) if abs(x2 - x1) > 0 else abs(y2 - y1)
+    try:
+        dim.TextOverride = str(override_text) if override_text else f"{raw_val:.1f}"
+    except Exception:
+        pass
+
+    if vertical:
+        try:
+            dim.TextRotation = math.pi / 2
+        except Exception:
+            pass
+
+    update_entity(dim)
+    return dim
+
+
+# -----------------------------
+# Blocks
+# -----------------------------
+def _set_bylayer(entities):
+    if entities is None:
+        return
+    try:
+        for e in entities:
+            try:
+                e.Color = BYLAYER
+            except Exception:
+                pass
+    except TypeError:
+        # single entity
+        try:
+            entities.Color = BYLAYER
+        except Exception:
+            pass
+
+
+def block_source(ms, block_path):
+    """
+    What to pass to InsertBlock for the DWG ``block_path``: the name of the
+    block definition an earlier insert created in this drawing, or the path
+    for the first insert. Every further logo then reuses one definition
+    instead of reading the file again.
+    """
+    name = os.path.splitext(os.path.basename(block_path))[0]
+    try:
+        ms.Document.Blocks.Item(name)
+        return name
+    except Exception:
+        return block_path
+
+
+def insert_scaled_block(ms, block_path, x, y, target_w, target_h,
+                        bylayer=False, explode=False, delete_original=False, regen=False):
+    """
+    Insert a DWG block scaled to fit ``target_w`` x ``target_h`` with its
+    lower-left corner at (x, y).
+
+    Args:
+        bylayer: Set the reference (and exploded copies) to ByLayer colour so
+                 repeated inserts keep their colours
+        explode: Explode the reference into native entities as well
+        delete_original: After exploding, delete the block reference
+                         (only the exploded entities remain)
+        regen: Regenerate the drawing afterwards (refreshes embedded images)
+
+    Returns:
+        The block reference, or None if it was deleted
+    """
+    blk = ms.InsertBlock(make_point_variant(x, y), block_source(ms, block_path), 1.0, 1.0, 1.0, 0)
+    update_entity(blk)
+
+    try:
+        (xmin, ymin, _), (xmax, ymax, _) = blk.GetBoundingBox()
+    except Exception:
+        return blk
+    bw = xmax - xmin
+    bh = ymax - ymin
+    if bw == 0 or bh == 0:
+        print("Block has zero geometry.")
+        return blk
+
+    s = min(target_w / bw, target_h / bh)
+    blk.XScaleFactor = s
+    blk.YScaleFactor = s
+    blk.ZScaleFactor = s
+    update_entity(blk)
+
+    try:
+        xmin2, ymin2, _ = blk.GetBoundingBox()[0]
+    except Exception:
+        return blk
+    blk.Move(make_point_variant(0, 0, 0), make_point_variant(x - xmin2, y - ymin2, 0))
+
+    if bylayer:
+        try:
+            blk.Color = BYLAYER
+        except Exception:
+            pass
+        update_entity(blk)
+
+    deleted = False
+    if explode:
+        try:
+            exploded = blk.Explode()
+        except Exception:
+            exploded = None
+        else:
+            if bylayer:
+                _set_bylayer(exploded)
+            if delete_original:
+                try:
+                    blk.Delete()
+                    deleted = True
+                except Exception:
+                    pass
+
+    if regen:
+        try:
+            regen_drawing(ms.Parent)
+        except Exception:
+            pass
+
+    return None if deleted else blk
@@ -0,0 +1,631 @@
+"""
+SVG and PDF export of plates for engraving and laser machines.
+
+Plates are rendered straight from their plate_layout.LayoutPlan, the same
+plans draw_rating_plate(), draw_db_plate() and draw_rating_plate_ups() send
+to AutoCAD, and nested onto sheets with sheet_nesting exactly like
+plate_layout.draw_sheets(). No AutoCAD is involved.
+
+* Units are millimetres: an SVG sheet is ``width="600mm"`` with a matching
+  viewBox, a PDF page is the sheet size.
+* Text is set in Consolas from ``font/`` (see font_metrics.py), embedded
+  in the file as a subset of the characters used: as ``@font-face`` data
+  in SVG, as a TrueType subset in PDF. A text height is the cap height, as in AutoCAD. MTEXT is wrapped
+  to its width with the font_metrics widths.
+* The logo is a DWG, which cannot be read without AutoCAD. Export uses a
+  DXF copy next to it (``liveline_logo.dxf``; ``--make-logo-dxf`` writes it
+  once through AutoCAD). The DXF is parsed once into vector paths, cached,
+  and defined once per file (an SVG ``<g>`` in ``<defs>``, a PDF form
+  XObject) that every plate references.
+* Dimensions are construction aids and are left out unless asked for.
+
+SVG has one sheet per file: ``plates.svg`` for one sheet, ``plates-1.svg``,
+``plates-2.svg``, ... for more. PDF has one page per sheet.
+
+    python plate_export.py plates.pdf                 # the plate job (see plate_job.py)
+    python plate_export.py plates.svg --job other.json --dimensions
+    python plate_export.py --make-logo-dxf            # once, on a machine with AutoCAD
+"""
+
+import os
+import sys
+import math
+import base64
+import struct
+import argparse
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+import metrics
+import font_metrics
+import plate_layout
+import sheet_nesting
+
+try:
+    import win32com.client
+    import pythoncom
+except Exception:
+    win32com = None
+    pythoncom = None
+
+PDF_FONTS = {False: "Consolas", True: "Consolas-Bold"}
+PDF_FALLBACK_FONTS = {False: "Courier", True: "Courier-Bold"}  # when font/ is missing
+
+LINE_WIDTH = 0.1            # mm
+ARC_SEGMENT_DEG = 10        # arcs and circles of the logo are flattened to this step
+
+AC_2013_DXF = 61
+
+
+# -----------------------------
+# Logo
+# -----------------------------
+class VectorLogo:
+    """Polylines of a DXF drawing, in drawing units relative to its base point."""
+
+    def __init__(self, paths, base=(0.0, 0.0)):
+        self.paths = paths  # [(closed, [(x, y), ...])]
+        self.base = base
+        xs = [x for _, pts in paths for x, _ in pts]
+        ys = [y for _, pts in paths for _, y in pts]
+        self.bounds = (min(xs), min(ys), max(xs), max(ys)) if xs else (0.0, 0.0, 0.0, 0.0)
+
+
+def logo_dxf_path(block_path):
+    return os.path.splitext(block_path)[0] + ".dxf"
+
+
+def _dxf_pairs(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        lines = f.read().splitlines()
+    for i in range(0, len(lines) - 1, 2):
+        yield lines[i].strip(), lines[i + 1].strip()
+
+
+def _arc(cx, cy, r, start_deg, end_deg):
+    if end_deg <= start_deg:
+        end_deg += 360.0
+    steps = max(2, int(math.ceil((end_deg - start_deg) / ARC_SEGMENT_DEG)))
+    return [(cx + r * math.cos(math.radians(start_deg + (end_deg - start_deg) * k / steps)),
+             cy + r * math.sin(math.radians(start_deg + (end_deg - start_deg) * k / steps))) for k in range(steps + 1)]
+
+
+def _bulge_points(p1, p2, bulge):
+    """Points after ``p1`` up to ``p2`` for a polyline segment with ``bulge``."""
+    if not bulge:
+        return [p2]
+    (x1, y1), (x2, y2) = p1, p2
+    angle = 4 * math.atan(bulge)
+    chord = math.hypot(x2 - x1, y2 - y1)
+    if chord == 0:
+        return [p2]
+    r = chord / (2 * math.sin(angle / 2))
+    mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+    d = r * math.cos(angle / 2)
+    nx, ny = -(y2 - y1) / chord, (x2 - x1) / chord
+    cx, cy = mx + nx * d, my + ny * d
+    a1 = math.atan2(y1 - cy, x1 - cx)
+    steps = max(2, int(math.ceil(abs(math.degrees(angle)) / ARC_SEGMENT_DEG)))
+    radius = abs(r)
+    return [(cx + radius * math.cos(a1 + angle * k / steps), cy + radius * math.sin(a1 + angle * k / steps))
+            for k in range(1, steps)] + [p2]
+
+
+def _polyline(vertices, closed):
+    """``vertices``: [(x, y, bulge)] -> flattened points."""
+    if not vertices:
+        return []
+    pts = [vertices[0][:2]]
+    ring = vertices + [vertices[0]] if closed else vertices
+    for a, b in zip(ring, ring[1:]):
+        pts.extend(_bulge_points(a[:2], b[:2], a[2]))
+    return pts
+
+
+def parse_dxf(path):
+    """
+    Read LINE, LWPOLYLINE, POLYLINE, CIRCLE, ARC and SPLINE entities of the
+    ENTITIES section of an ASCII DXF into a VectorLogo. Other entities
+    (hatches, text) are skipped.
+    """
+    paths = []
+    base = [0.0, 0.0]
+    section = None
+    entity = None
+    data = {}
+    vertices = []
+    polyline = None  # open POLYLINE waiting for its VERTEX entities
+
+    def finish():
+        nonlocal polyline
+        kind = entity
+        if kind == "LINE":
+            paths.append((False, [(data.get("10", 0.0), data.get("20", 0.0)), (data.get("11", 0.0), data.get("21", 0.0))]))
+        elif kind == "LWPOLYLINE":
+            closed = bool(int(data.get("70", 0)) & 1)
+            paths.append((closed, _polyline(vertices, closed)))
+        elif kind == "CIRCLE":
+            paths.append((True, _arc(data.get("10", 0.0), data.get("20", 0.0), data.get("40", 0.0), 0.0, 360.0)[:-1]))
+        elif kind == "ARC":
+            paths.append((False, _arc(data.get("10", 0.0), data.get("20", 0.0), data.get("40", 0.0),
+                                      data.get("50", 0.0), data.get("51", 360.0))))
+        elif kind == "SPLINE":
+            if len(vertices) > 1:
+                paths.append((bool(int(data.get("70", 0)) & 1), [v[:2] for v in vertices]))
+        elif kind == "POLYLINE":
+            polyline = (bool(int(data.get("70", 0)) & 1), [])
+        elif kind == "VERTEX" and polyline is not None:
+            polyline[1].append((data.get("10", 0.0), data.get("20", 0.0), data.get("42", 0.0)))
+        elif kind == "SEQEND" and polyline is not None:
+            paths.append((polyline[0], _polyline(polyline[1], polyline[0])))
+            polyline = None
+
+    header_var = None
+    for code, value in _dxf_pairs(path):
+        if code == "0":
+            if section == "ENTITIES" and entity is not None:
+                finish()
+            entity, data, vertices = None, {}, []
+            if value == "SECTION":
+                section = "?"
+            elif value == "ENDSEC":
+                section = None
+            elif section == "ENTITIES":
+                entity = value
+            continue
+        if section == "?" and code == "2":
+            section = value
+            continue
+        if section == "HEADER":
+            if code == "9":
+                header_var = value
+            elif header_var == "$INSBASE" and code in ("10", "20"):
+                base[0 if code == "10" else 1] = float(value)
+            continue
+        if entity is None:
+            continue
+        if code in ("10", "20", "11", "21", "40", "42", "50", "51", "70"):
+            number = float(value)
+            if entity in ("LWPOLYLINE", "SPLINE") and code == "10":
+                vertices.append([number, 0.0, 0.0])
+            elif entity in ("LWPOLYLINE", "SPLINE") and code == "20" and vertices:
+                vertices[-1][1] = number
+            elif entity == "LWPOLYLINE" and code == "42" and vertices:
+                vertices[-1][2] = number
+            else:
+                data[code] = number
+    if section == "ENTITIES" and entity is not None:
+        finish()
+
+    paths = [(closed, [tuple(p) for p in pts]) for closed, pts in paths if len(pts) > 1]
+    return VectorLogo(paths, tuple(base))
+
+
+@lru_cache(maxsize=8)
+def _cached_logo(dxf_path, mtime):
+    return parse_dxf(dxf_path)
+
+
+def load_logo(block_path):
+    """The VectorLogo for a logo block (from its DXF copy), or None if there is no DXF."""
+    dxf = logo_dxf_path(os.path.abspath(block_path))
+    try:
+        mtime = os.path.getmtime(dxf)
+    except OSError:
+        return None
+    return _cached_logo(dxf, mtime)
+
+
+def make_logo_dxf(block_path="liveline_logo.dwg"):
+    """Save a DXF copy of the logo DWG through AutoCAD (needed once per logo change)."""
+    if win32com is None:
+        raise RuntimeError("pywin32 is not installed; AutoCAD is needed to convert the DWG logo.")
+    src = os.path.abspath(block_path)
+    dst = logo_dxf_path(src)
+    pythoncom.CoInitialize()
+    acad = win32com.client.Dispatch("AutoCAD.Application")
+    doc = acad.Documents.Open(src)
+    try:
+        doc.SaveAs(dst, AC_2013_DXF)
+    finally:
+        doc.Close(False)
+    return dst
+
+
+# -----------------------------
+# Fonts
+# -----------------------------
+def font_path(bold):
+    return font_metrics.font_path(bold)
+
+
+@lru_cache(maxsize=64)
+def _font_data_uri(bold, chars):
+    """The font as a data URI, with outlines only for ``chars`` (a frozenset)."""
+    try:
+        data = font_metrics.subset(font_path(bold), chars)
+    except (font_metrics.FontError, struct.error):
+        with open(font_path(bold), "rb") as f:
+            data = f.read()
+    return "data:font/ttf;base64," + base64.b64encode(data).decode("ascii")
+
+
+def font_size(height, bold=False):
+    """Font size (em, mm) whose cap height is ``height`` mm."""
+    return font_metrics.metrics(bold).em(height)
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class SvgSheet:
+    """One sheet as an SVG document, y up in the calls and y down in the file."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._parts = []
+        self._logos = {}  # id(VectorLogo) -> element id
+        self._chars = {False: set(), True: set()}  # characters set in regular / bold
+
+    def path(self, points, closed=False):
+        h = self.height
+        d = "M" + "L".join(f"{x:.3f},{h - y:.3f}" for x, y in points)
+        self._parts.append(f'<path d="{d}{"Z" if closed else ""}"/>')
+
+    def text(self, x, y, text, height, rotation=0.0, bold=False):
+        if not text:
+            return
+        self._chars[bold].update(text)
+        sy = self.height - y
+        attrs = f'x="{x:.3f}" y="{sy:.3f}" font-size="{font_size(height, bold):.3f}"'
+        if bold:
+            attrs += ' font-weight="bold"'
+        if rotation:
+            attrs += f' transform="rotate({-math.degrees(rotation):.3f} {x:.3f} {sy:.3f})"'
+        self._parts.append(f"<text {attrs}>{escape(text)}</text>")
+
+    def logo(self, logo, a, b, c, d, e, f):
+        """Reference ``logo`` with the affine map X = a*u + c*v + e, Y = b*u + d*v + f."""
+        ref = self._logos.setdefault(id(logo), (f"logo{len(self._logos) + 1}", logo))[0]
+        h = self.height
+        self._parts.append(f'<use href="#{ref}" transform="matrix({a:.6f} {-b:.6f} {c:.6f} {-d:.6f} {e:.3f} {h - f:.3f})"/>')
+
+    def _defs(self):
+        faces = [f"@font-face{{font-family:'Consolas';font-weight:{'bold' if bold else 'normal'};"
+                 f"src:url({_font_data_uri(bold, frozenset(chars))}) format('truetype');}}"
+                 for bold, chars in self._chars.items() if chars]
+        defs = [f"<style>{''.join(faces)}</style>"] if faces else []
+        for ref, logo in self._logos.values():
+            paths = "".join(
+                f'<path d="M{"L".join(f"{x:.4f},{y:.4f}" for x, y in pts)}{"Z" if closed else ""}"/>'
+                for closed, pts in logo.paths)
+            defs.append(f'<g id="{ref}" vector-effect="non-scaling-stroke">{paths}</g>')
+        return "<defs>" + "".join(defs) + "</defs>"
+
+    def save(self, path):
+        try:
+            defs = self._defs()
+        except OSError:
+            defs = ""  # no font/ folder: viewers fall back to an installed Consolas
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width:g}mm" height="{self.height:g}mm" '
+                    f'viewBox="0 0 {self.width:g} {self.height:g}">\n')
+            f.write(defs + "\n")
+            f.write(f'<g fill="none" stroke="black" stroke-width="{LINE_WIDTH}">\n')
+            f.write("\n".join(p for p in self._parts if not p.startswith("<text")))
+            f.write('\n</g>\n<g fill="black" stroke="none" font-family="Consolas, monospace">\n')
+            f.write("\n".join(p for p in self._parts if p.startswith("<text")))
+            f.write("\n</g>\n</svg>\n")
+
+
+class PdfDocument:
+    """A reportlab PDF with one page per sheet, drawn in millimetres with y up."""
+
+    def __init__(self, path, width, height):
+        try:
+            from reportlab.pdfgen import canvas
+            from reportlab.lib.units import mm
+        except ImportError:
+            raise RuntimeError("reportlab is not installed; PDF export is not available.")
+        self.width = width
+        self.height = height
+        self._mm = mm
+        self._canvas = canvas.Canvas(path, pagesize=(width * mm, height * mm))
+        self._fonts = self._register_fonts()
+        self._forms = {}
+        self._started = False
+
+    @staticmethod
+    def _register_fonts():
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        fonts = {}
+        for bold, name in PDF_FONTS.items():
+            try:
+                pdfmetrics.getFont(name)
+            except KeyError:
+                try:
+                    pdfmetrics.registerFont(TTFont(name, font_path(bold)))
+                except Exception:
+                    name = PDF_FALLBACK_FONTS[bold]
+            fonts[bold] = name
+        return fonts
+
+    def new_sheet(self):
+        c = self._canvas
+        if self._started:
+            c.showPage()
+        self._started = True
+        c.scale(self._mm, self._mm)
+        c.setLineWidth(LINE_WIDTH)
+        c.setLineJoin(1)
+
+    def path(self, points, closed=False):
+        p = self._canvas.beginPath()
+        p.moveTo(*points[0])
+        for x, y in points[1:]:
+            p.lineTo(x, y)
+        if closed:
+            p.close()
+        self._canvas.drawPath(p, stroke=1, fill=0)
+
+    def text(self, x, y, text, height, rotation=0.0, bold=False):
+        if not text:
+            return
+        c = self._canvas
+        c.setFont(self._fonts[bold], font_size(height, bold))
+        if rotation:
+            c.saveState()
+            c.translate(x, y)
+            c.rotate(math.degrees(rotation))
+            c.drawString(0, 0, text)
+            c.restoreState()
+        else:
+            c.drawString(x, y, text)
+
+    def logo(self, logo, a, b, c_, d, e, f):
+        c = self._canvas
+        name = self._forms.get(id(logo))
+        if name is None:
+            name = self._forms[id(logo)] = f"logo{len(self._forms) + 1}"
+            c.beginForm(name)
+            for closed, pts in logo.paths:
+                self.path(pts, closed)
+            c.endForm()
+        c.saveState()
+        c.transform(a, b, c_, d, e, f)
+        c.setLineWidth(LINE_WIDTH / (math.hypot(a, b) or 1.0))
+        c.doForm(name)
+        c.restoreState()
+
+    def save(self):
+        self._canvas.save()
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+class _Placement:
+    """Maps plate coordinates to sheet coordinates (optionally turned 90 degrees)."""
+
+    def __init__(self, ix, iy, rotated):
+        self.ix = ix
+        self.iy = iy
+        self.rotated = rotated
+
+    def __call__(self, x, y):
+        if self.rotated:
+            return self.ix - y, self.iy + x
+        return self.ix + x, self.iy + y
+
+    def affine(self, s, tx, ty):
+        """(a, b, c, d, e, f) of plate point (tx + s*u, ty + s*v) on the sheet."""
+        if self.rotated:
+            return 0.0, s, -s, 0.0, self.ix - ty, self.iy + tx
+        return s, 0.0, 0.0, s, self.ix + tx, self.iy + ty
+
+
+def render_plate(out, plan, values, place, dimensions=False):
+    """Draw one plate of ``plan`` into the backend ``out`` at ``place``."""
+    buf = plan.buffer
+    values = plan.values(values)
+    turn = math.pi / 2 if place.rotated else 0.0
+    for op in plan.ops:
+        kind = op.kind
+        if kind in ("rect", "polyline", "line"):
+            out.path([place(*buf.point(op.at + k)[:2]) for k in range(op.count)], closed=kind == "rect")
+        elif kind == "text":
+            text = op.text.format_map(values) if op.fmt else op.text
+            height, dx, dy = plate_layout.LayoutPlan.text_placement(op, text)
+            x, y, _ = buf.point(op.at)
+            out.text(*place(x + dx, y + dy), text, height, (op.extra["rotation"] if op.extra else 0.0) + turn)
+        elif kind in ("mtext", "bold"):
+            text = op.text.format_map(values) if op.fmt else op.text
+            height, dx, dy = plate_layout.LayoutPlan.text_placement(op, text)
+            text, bold = plate_layout.mtext_plain(text)
+            bold = bold or kind == "bold"
+            x, y, _ = buf.point(op.at)
+            # Reads from the insertion point (top left), first baseline one text height down
+            for i, line in enumerate(font_metrics.wrap(text, op.width, height, bold)):
+                out.text(*place(x + dx, y + dy - height - i * height * font_metrics.MTEXT_LINE_SPACING), line, height, turn, bold)
+        elif kind == "dimension" and dimensions:
+            _dimension(out, op.extra, values, place, turn)
+        elif kind == "block":
+            _logo(out, op.extra, place)
+
+
+def _dimension(out, d, values, place, turn):
+    (x1, y1), (x2, y2), (dx, dy) = d["from"], d["to"], d["at"]
+    height = d["text_height"] or 3.0
+    text = plate_layout.LayoutPlan.dimension_text(d, values) or f"{abs(x2 - x1) or abs(y2 - y1):.1f}"
+    if abs(x2 - x1) >= abs(y2 - y1):
+        for x, y in ((x1, y1), (x2, y2)):
+            out.path([place(x, y), place(x, dy)])
+        out.path([place(x1, dy), place(x2, dy)])
+        width = font_metrics.text_width(text, height)
+        out.text(*place((x1 + x2) / 2 - width / 2, dy + 1), text, height, turn)
+    else:
+        for x, y in ((x1, y1), (x2, y2)):
+            out.path([place(x, y), place(dx, y)])
+        out.path([place(dx, y1), place(dx, y2)])
+        width = font_metrics.text_width(text, height)
+        out.text(*place(dx - 1, (y1 + y2) / 2 - width / 2), text, height, turn + math.pi / 2)
+
+
+_missing_logos = set()
+
+
+def _logo(out, b, place):
+    logo = load_logo(b["path"])
+    if logo is None or not logo.paths:
+        if b["path"] not in _missing_logos:
+            _missing_logos.add(b["path"])
+            print(f"No vector logo for {b['path']} (expected {logo_dxf_path(b['path'])}; "
+                  f"see plate_export.py --make-logo-dxf); plates are exported without it")
+        return
+    ax, ay = b["at"]
+    xmin, ymin, xmax, ymax = logo.bounds
+    if b["size"] is not None:
+        # Like insert_scaled_block: fit the box, lower-left corner at "at"
+        w, h = b["size"]
+        s = min(w / ((xmax - xmin) or 1.0), h / ((ymax - ymin) or 1.0))
+        tx, ty = ax - xmin * s, ay - ymin * s
+    else:
+        # Like InsertBlock: the base point at "at"
+        s = b["scale"] or 1.0
+        tx, ty = ax - logo.base[0] * s, ay - logo.base[1] * s
+    out.logo(logo, *place.affine(s, tx, ty))
+
+
+def _sheet_files(path, sheets):
+    if sheets <= 1:
+        return [path]
+    stem, ext = os.path.splitext(path)
+    return [f"{stem}-{n}{ext}" for n in range(1, sheets + 1)]
+
+
+def export_sheets(jobs, path, sheet_width=sheet_nesting.DEFAULT_SHEET_WIDTH,
+                  sheet_height=sheet_nesting.DEFAULT_SHEET_HEIGHT, kerf=sheet_nesting.DEFAULT_KERF,
+                  margin=0.0, allow_rotate=False, dimensions=False, outline=False):
+    """
+    Nest ``jobs`` (``(plan, values, count)``, as for plate_layout.draw_sheets)
+    onto sheets and write them to ``path`` (``.svg`` or ``.pdf``).
+
+    Returns the written files.
+    """
+    fmt = os.path.splitext(path)[1].lower().lstrip(".")
+    if fmt not in ("svg", "pdf"):
+        raise ValueError(f"Unsupported export format '{fmt}' (use .svg or .pdf)")
+
+    with metrics.span("export.plates", format=fmt) as fields:
+        items = []
+        for index, (plan, _values, count) in enumerate(jobs):
+            xmin, ymin, xmax, ymax = plan.extent(dimensions)
+            items.extend([sheet_nesting.Item(xmax - xmin, ymax - ymin, index)] * int(count))
+        placements = sheet_nesting.pack(items, sheet_width, sheet_height, kerf, margin, allow_rotate)
+        sheets = sheet_nesting.sheet_count(placements)
+        fields.update(plates=len(placements), sheets=sheets)
+
+        by_sheet = [[] for _ in range(sheets)]
+        for p in placements:
+            by_sheet[p.sheet].append(p)
+
+        files = _sheet_files(path, sheets) if fmt == "svg" else [path]
+        pdf = PdfDocument(path, sheet_width, sheet_height) if fmt == "pdf" else None
+        for sheet, sheet_placements in enumerate(by_sheet):
+            if pdf is not None:
+                out = pdf
+                pdf.new_sheet()
+            else:
+                out = SvgSheet(sheet_width, sheet_height)
+            if outline:
+                out.path([(0, 0), (sheet_width, 0), (sheet_width, sheet_height), (0, sheet_height)], closed=True)
+            for p in sheet_placements:
+                plan, values, _count = jobs[p.item.data]
+                xmin, ymin, xmax, ymax = plan.extent(dimensions)
+                if p.rotated:
+                    place = _Placement(p.x + ymax, p.y - xmin, True)
+                else:
+                    place = _Placement(p.x - xmin, p.y - ymin, False)
+                render_plate(out, plan, values, place, dimensions)
+            if pdf is None:
+                out.save(files[sheet])
+        if pdf is not None:
+            pdf.save()
+    return files
+
+
+def export_dialog(window, jobs, sheet_options, name="plates"):
+    """
+    Ask ``window``'s user for an SVG or PDF file and export ``jobs`` with
+    ``sheet_options`` (sheet_width, sheet_height, kerf, allow_rotate).
+    Used by the "Export SVG/PDF" buttons of the plate tools.
+    """
+    from PyQt6.QtWidgets import QFileDialog, QMessageBox
+    from plate_preview import confirm_overflows
+    if not confirm_overflows(window, jobs):
+        return None
+    path, _ = QFileDialog.getSaveFileName(window, "Export Plates", f"{name}.pdf",
+                                          "PDF Files (*.pdf);;SVG Files (*.svg)")
+    if not path:
+        return None
+    try:
+        files = export_sheets(jobs, path, **sheet_options)
+    except Exception as e:
+        QMessageBox.critical(window, "Error", f"Could not export the plates:\n{e}")
+        return None
+    QMessageBox.information(window, "Export", f"Exported {len(files)} file(s):\n" + "\n".join(files))
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export plates as SVG or PDF for engraving (no AutoCAD needed).")
+    parser.add_argument("output", nargs="?", help="output .svg or .pdf file")
+    parser.add_argument("--job", help="plate job file (default: the shared job, see plate_job.py)")
+    parser.add_argument("--sheet-width", type=float, help="sheet width in mm (default: from the job)")
+    parser.add_argument("--sheet-height", type=float, help="sheet height in mm (default: from the job)")
+    parser.add_argument("--kerf", type=float, help="gap between plates in mm (default: from the job)")
+    parser.add_argument("--dimensions", action="store_true", help="include the width/height dimensions")
+    parser.add_argument("--outline", action="store_true", help="draw the sheet border")
+    parser.add_argument("--make-logo-dxf", action="store_true", help="convert liveline_logo.dwg to DXF through AutoCAD and exit")
+    args = parser.parse_args(argv)
+
+    if args.make_logo_dxf:
+        try:
+            print(f"Wrote {make_logo_dxf()}")
+        except Exception as e:
+            print(f"Error: {e}")
+            return 1
+        return 0
+    if not args.output:
+        parser.error("an output file is required")
+
+    import plate_job
+    try:
+        job = plate_job.load_job(args.job)
+        if not job["plates"]:
+            raise ValueError(f"The job {plate_job.job_path(args.job)} has no plates")
+        sheet = job.get("sheet", {})
+        jobs = plate_job.layout_jobs(job)
+        for overflow in plate_layout.overflows(jobs):
+            print(f"Text does not fit: {overflow}")
+        files = export_sheets(
+            jobs, args.output,
+            sheet_width=args.sheet_width or float(sheet.get("sheet_width", sheet_nesting.DEFAULT_SHEET_WIDTH)),
+            sheet_height=args.sheet_height or float(sheet.get("sheet_height", sheet_nesting.DEFAULT_SHEET_HEIGHT)),
+            kerf=args.kerf if args.kerf is not None else float(sheet.get("kerf", sheet_nesting.DEFAULT_KERF)),
+            allow_rotate=sheet.get("allow_rotate", False),
+            dimensions=args.dimensions,
+            outline=args.outline,
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    print("\n".join(files))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
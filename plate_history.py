@@ -0,0 +1,330 @@
+"""
+History of every generated plate: the snapshot store.
+
+Each time a tool draws or exports plates, its get_config() dictionary is
+kept in a local SQLite database, ``~/Documents/Plategen/history.db``
+(``PLATEGEN_HISTORY`` overrides it). A repeat order is then found by
+project, order number, year or any text on the plate and re-rendered in
+one step, without re-keying the form.
+
+Snapshots are indexed by tool (bch, db, ups), project_no, order_no and
+year. Every text value of the config is also put in an FTS5 full-text
+index, together with the texts of the laid-out plate, so "1077 dual" or
+"63A MCCB" finds the plate. When SQLite has no
+FTS5, search falls back to LIKE over the stored configs. Generating the
+same config again refreshes its snapshot instead of adding a copy.
+
+Re-rendering builds a plate_job job from the snapshots, so the plates go
+through the tools' job_plates() and the cached layout plans like any job.
+
+    python plate_history.py                    # the 20 most recent plates
+    python plate_history.py "1077 dual"        # search
+    python plate_history.py --render 12 15     # draw snapshots 12 and 15 into a new drawing
+    python plate_history.py --add-to-job 12
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+import importlib
+import threading
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+
+import plate_job
+import sheet_nesting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_FILE = Path.home() / "Documents" / "Plategen" / "history.db"
+SEARCH_LIMIT = 200
+
+
+def history_path(path=None) -> Path:
+    return Path(path or os.environ.get("PLATEGEN_HISTORY") or DEFAULT_HISTORY_FILE)
+
+
+class Snapshot(NamedTuple):
+    id: int
+    tool: str
+    project_no: Optional[int]
+    order_no: Optional[int]
+    year: Optional[int]
+    label: str
+    created: float
+    last_used: float
+    uses: int
+    config: dict
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _search_text(value) -> Iterable[str]:
+    """Every text and number in a config value (outgoing lists, unit dicts, ...)."""
+    if isinstance(value, dict):
+        for v in value.values():
+            yield from _search_text(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _search_text(v)
+    elif isinstance(value, str):
+        if value.strip():
+            yield value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield str(value)
+
+
+def _plate_text(tool, config) -> List[str]:
+    """The texts on the plates of ``config`` (e.g. "63A 3P MCCB - 2 NOS."), for the full-text index."""
+    try:
+        module = importlib.import_module(plate_job.TOOLS[tool])
+        return [text for _plan, values, _count in module.job_plates(config) for text in _search_text(values)]
+    except Exception as e:
+        logger.info(f"Plate text of a {tool} snapshot not indexed: {e}")
+        return []
+
+
+def _fts_query(text: str) -> str:
+    """Each word of ``text`` as a quoted prefix term, so user input is never FTS syntax."""
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in text.split())
+
+
+class SnapshotStore:
+    """
+    SQLite table of plate configs with an FTS5 index over their text.
+
+    ``snapshots`` holds one row per distinct (tool, config); ``digest`` is
+    a hash of the config, so recording it again only updates last_used
+    and uses. ``snapshots_fts`` shares the rowid of ``snapshots``.
+    """
+
+    def __init__(self, path=None):
+        self.path = history_path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY,
+                    digest TEXT UNIQUE NOT NULL,
+                    tool TEXT NOT NULL,
+                    project_no INTEGER,
+                    order_no INTEGER,
+                    year INTEGER,
+                    label TEXT NOT NULL,
+                    config TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    uses INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_order "
+                         "ON snapshots(project_no, order_no, year, tool)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_last_used ON snapshots(last_used)")
+            try:
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS snapshots_fts USING fts5(label, body)")
+                self.fts = True
+            except sqlite3.OperationalError:
+                logger.info("SQLite has no FTS5; plate history search uses LIKE")
+                self.fts = False
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def record(self, tool: str, config: dict, label: str = "") -> int:
+        """
+        Keep ``config`` of ``tool`` (see plate_job.TOOLS); returns its snapshot id.
+
+        A config that is already stored is not copied again; its
+        last_used and uses are updated.
+        """
+        if tool not in plate_job.TOOLS:
+            raise ValueError(f"Unknown tool '{tool}' (expected one of: {', '.join(plate_job.TOOLS)})")
+        blob = json.dumps(config, sort_keys=True, default=str)
+        digest = hashlib.sha256(f"{tool}\n{blob}".encode("utf-8")).hexdigest()
+        label = label or tool.upper()
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM snapshots WHERE digest = ?", (digest,)).fetchone()
+            if row:
+                conn.execute("UPDATE snapshots SET last_used = ?, uses = uses + 1, label = ? WHERE id = ?",
+                             (now, label, row[0]))
+                if self.fts:
+                    conn.execute("UPDATE snapshots_fts SET label = ? WHERE rowid = ?", (label, row[0]))
+                return row[0]
+            cur = conn.execute(
+                "INSERT INTO snapshots (digest, tool, project_no, order_no, year, label, config, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, tool, _int_or_none(config.get("project_no")), _int_or_none(config.get("order_no")),
+                 _int_or_none(config.get("year")), label, blob, now, now))
+            if self.fts:
+                conn.execute("INSERT INTO snapshots_fts (rowid, label, body) VALUES (?, ?, ?)",
+                             (cur.lastrowid, label,
+                              " ".join([tool, *_search_text(config), *_plate_text(tool, config)])))
+            return cur.lastrowid
+
+    def search(self, text: str = "", tool: str = None, project_no: int = None, order_no: int = None,
+               year: int = None, limit: int = SEARCH_LIMIT) -> List[Snapshot]:
+        """Snapshots matching every word of ``text`` and the given fields, most recently used first."""
+        where, args = [], []
+        for column, value in (("tool", tool), ("project_no", project_no), ("order_no", order_no), ("year", year)):
+            if value is not None:
+                where.append(f"s.{column} = ?")
+                args.append(value)
+        text = text.strip()
+        if text and self.fts:
+            where.append("s.id IN (SELECT rowid FROM snapshots_fts WHERE snapshots_fts MATCH ?)")
+            args.append(_fts_query(text))
+        elif text:
+            for word in text.split():
+                where.append("(s.label LIKE ? OR s.config LIKE ?)")
+                args.extend([f"%{word}%"] * 2)
+        sql = ("SELECT s.id, s.tool, s.project_no, s.order_no, s.year, s.label, s.created, s.last_used, s.uses, "
+               "s.config FROM snapshots s")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY s.last_used DESC LIMIT ?"
+        with self._connect() as conn:
+            rows = conn.execute(sql, args + [limit]).fetchall()
+        return [Snapshot(*row[:-1], json.loads(row[-1])) for row in rows]
+
+    def get(self, snapshot_ids: Iterable[int]) -> List[Snapshot]:
+        """The snapshots with ``snapshot_ids``, in that order (unknown ids raise KeyError)."""
+        snapshot_ids = [int(i) for i in snapshot_ids]
+        if not snapshot_ids:
+            return []
+        marks = ", ".join("?" * len(snapshot_ids))
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, tool, project_no, order_no, year, label, created, last_used, uses, config "
+                f"FROM snapshots WHERE id IN ({marks})", snapshot_ids).fetchall()
+        found = {row[0]: Snapshot(*row[:-1], json.loads(row[-1])) for row in rows}
+        missing = [i for i in snapshot_ids if i not in found]
+        if missing:
+            raise KeyError(f"No plate snapshot {', '.join(map(str, missing))} in {self.path}")
+        return [found[i] for i in snapshot_ids]
+
+    def touch(self, snapshot_ids: Iterable[int]) -> None:
+        """Mark snapshots as used again (they move to the top of the list)."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("UPDATE snapshots SET last_used = ?, uses = uses + 1 WHERE id = ?",
+                             [(now, int(i)) for i in snapshot_ids])
+
+    def delete(self, snapshot_ids: Iterable[int]) -> None:
+        ids = [(int(i),) for i in snapshot_ids]
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM snapshots WHERE id = ?", ids)
+            if self.fts:
+                conn.executemany("DELETE FROM snapshots_fts WHERE rowid = ?", ids)
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+
+_shared_store: Optional[SnapshotStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[SnapshotStore]:
+    """Return the process-wide store, or None if the history file is unusable."""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            try:
+                _shared_store = SnapshotStore()
+            except Exception as e:
+                logger.warning(f"Plate history unavailable: {e}")
+                return None
+        return _shared_store
+
+
+def record(tool, config, label=None) -> Optional[int]:
+    """Keep a generated config in the history; never raises (a plate is never lost to its history)."""
+    store = get_store()
+    if store is None:
+        return None
+    try:
+        return store.record(tool, config, label)
+    except Exception as e:
+        logger.warning(f"Could not record the plate in the history: {e}")
+        return None
+
+
+def job_for(snapshots) -> dict:
+    """A plate_job job of ``snapshots``, on the sheet of the first one."""
+    job = plate_job.new_job()
+    for snap in snapshots:
+        if not job["sheet"]:
+            module = importlib.import_module(plate_job.TOOLS[snap.tool])
+            job["sheet"] = module.sheet_options(snap.config)
+        job["plates"].append({"tool": snap.tool, "label": snap.label, "config": snap.config})
+    return job
+
+
+def render_snapshots(snapshot_ids, store=None, dxf=None):
+    """Draw snapshots into a new drawing; returns (plates, sheets) like plate_job.render_job()."""
+    store = store or SnapshotStore()
+    job = job_for(store.get(snapshot_ids))
+    doc = plate_job.new_drawing()
+    placements = plate_job.render(doc, job)
+    store.touch(snapshot_ids)
+    if dxf:
+        doc.SaveAs(os.path.abspath(dxf), plate_job.AC_2013_DXF)
+    return len(placements), sheet_nesting.sheet_count(placements)
+
+
+def describe(snap: Snapshot) -> str:
+    when = time.strftime("%Y-%m-%d %H:%M", time.localtime(snap.last_used))
+    order = f"{snap.project_no or '-'}/OP{snap.order_no or '-'}/{snap.year or '-'}"
+    return f"{snap.id:5d}  {when}  {snap.tool:<3}  {order:<18} {snap.label}  (x{snap.uses})"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search and re-render previously generated plates.")
+    parser.add_argument("query", nargs="*", help="words to search for (project, order, product text, ...)")
+    parser.add_argument("--tool", choices=sorted(plate_job.TOOLS), help="only plates of this tool")
+    parser.add_argument("--project", type=int, help="only this project number")
+    parser.add_argument("--order", type=int, help="only this order number")
+    parser.add_argument("--year", type=int, help="only this year")
+    parser.add_argument("--limit", type=int, default=20, help="most results to list (default: 20)")
+    parser.add_argument("--render", type=int, nargs="+", metavar="ID", help="draw these snapshots into a new drawing")
+    parser.add_argument("--add-to-job", type=int, nargs="+", metavar="ID", help="add these snapshots to the job")
+    parser.add_argument("--dxf", help="with --render: also save the drawing as DXF")
+    parser.add_argument("--history", help=f"history database (default: {history_path()})")
+    args = parser.parse_args(argv)
+
+    try:
+        store = SnapshotStore(args.history)
+        if args.add_to_job:
+            for snap in store.get(args.add_to_job):
+                count = plate_job.add_plate(snap.tool, snap.config, snap.label)
+            store.touch(args.add_to_job)
+            print(f"Added {len(args.add_to_job)} plate(s); the job has {count} entries ({plate_job.job_path()})")
+            return 0
+        if args.render:
+            plates, sheets = render_snapshots(args.render, store, args.dxf)
+            print(f"Rendered {plates} plates on {sheets} sheet(s)")
+            return 0
+        found = store.search(" ".join(args.query), args.tool, args.project, args.order, args.year, args.limit)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for snap in found:
+        print(describe(snap))
+    print(f"{len(found)} of {store.count()} plates in {store.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+One drawing for a whole project: the plate job manifest.
+
+A project usually needs a BCH plate, a few DB plates and the UPS plates.
+Instead of each tool opening its own drawing, every tool can add its
+current plate to a shared job file ("Add to Job"), and the job is rendered
+in one pass: one AutoCAD connection, one new drawing, the plates of all
+tools nested onto the same sheets, text styles and the logo block
+definition shared, and one zoom at the end.
+
+The manifest is plain JSON, by default ``~/Documents/Plategen/job.json``
+(``PLATEGEN_JOB`` overrides it)::
+
+    {
+      "version": 1,
+      "sheet": {"sheet_width": 600, "sheet_height": 400, "kerf": 10},
+      "plates": [
+        {"tool": "bch", "label": "Dual charger", "config": {...}},
+        {"tool": "ups", "label": "10kVA UPS", "config": {...}}
+      ]
+    }
+
+``config`` is the tool's own get_config() dictionary. Each tool module
+turns it into layout jobs with its ``job_plates(config)`` function.
+
+    python plate_job.py                  # render the job into a new drawing
+    python plate_job.py --list           # show what is in the job
+    python plate_job.py --dxf out.dxf    # also save the drawing as DXF
+    python plate_job.py --clear
+"""
+
+import os
+import sys
+import json
+import tempfile
+import argparse
+import importlib
+from pathlib import Path
+
+import metrics
+import plate_layout
+import sheet_nesting
+from plate_drawing import DrawingSession
+
+try:
+    import win32com.client
+    import pythoncom
+except Exception:
+    win32com = None
+    pythoncom = None
+
+DEFAULT_JOB_FILE = Path.home() / "Documents" / "Plategen" / "job.json"
+JOB_VERSION = 1
+AC_2013_DXF = 61  # AcSaveAsType for SaveAs
+
+# tool id -> module providing job_plates(config)
+TOOLS = {
+    "bch": "app_bch",
+    "db": "app_db",
+    "ups": "app_ups",
+}
+
+
+def job_path(path=None) -> Path:
+    return Path(path or os.environ.get("PLATEGEN_JOB") or DEFAULT_JOB_FILE)
+
+
+def new_job() -> dict:
+    return {"version": JOB_VERSION, "sheet": {}, "plates": []}
+
+
+def load_job(path=None) -> dict:
+    """The job at ``path``; an empty job if the file does not exist yet."""
+    try:
+        with open(job_path(path), encoding="utf-8") as f:
+            job = json.load(f)
+    except FileNotFoundError:
+        return new_job()
+    except ValueError as e:
+        raise ValueError(f"{job_path(path)} is not a valid job file: {e}")
+    if not isinstance(job, dict) or not isinstance(job.get("plates"), list):
+        raise ValueError(f"{job_path(path)} is not a valid job file")
+    job.setdefault("sheet", {})
+    return job
+
+
+def save_job(job, path=None) -> Path:
+    """Write ``job`` atomically, so a tool adding a plate never leaves half a file."""
+    target = job_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".job-")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(job, f, indent=2)
+    os.replace(tmp, target)
+    return target
+
+
+def add_plate(tool, config, label=None, path=None) -> int:
+    """Append a plate of ``tool`` (see TOOLS) to the job; returns the number of plates in it."""
+    if tool not in TOOLS:
+        raise ValueError(f"Unknown tool '{tool}' (expected one of: {', '.join(TOOLS)})")
+    job = load_job(path)
+    # The first plate that names a sheet size sets it for the job
+    for key in ("sheet_width", "sheet_height"):
+        if key in config:
+            job["sheet"].setdefault(key, config[key])
+    job["plates"].append({"tool": tool, "label": label or tool.upper(), "config": config})
+    save_job(job, path)
+    return len(job["plates"])
+
+
+def clear_job(path=None) -> None:
+    save_job(new_job(), path)
+
+
+def layout_jobs(job):
+    """``(plan, values, count)`` for every plate of the job, for plate_layout.draw_sheets()."""
+    jobs = []
+    for entry in job["plates"]:
+        tool = entry.get("tool")
+        if tool not in TOOLS:
+            raise ValueError(f"Unknown tool '{tool}' in job")
+        module = importlib.import_module(TOOLS[tool])
+        jobs.extend(module.job_plates(entry.get("config", {})))
+    return jobs
+
+
+def render(doc, job, origin=(100.0, 100.0)):
+    """
+    Draw every plate of ``job`` into ``doc`` in one pass and zoom once.
+
+    Returns the sheet_nesting placements.
+    """
+    sheet = job.get("sheet", {})
+    jobs = layout_jobs(job)
+    for overflow in plate_layout.overflows(jobs):
+        print(f"Text does not fit: {overflow}")
+    with DrawingSession(doc) as session:
+        placements = plate_layout.draw_sheets(
+            doc, jobs,
+            sheet_width=float(sheet.get("sheet_width", sheet_nesting.DEFAULT_SHEET_WIDTH)),
+            sheet_height=float(sheet.get("sheet_height", sheet_nesting.DEFAULT_SHEET_HEIGHT)),
+            kerf=float(sheet.get("kerf", sheet_nesting.DEFAULT_KERF)),
+            origin=origin,
+            allow_rotate=sheet.get("allow_rotate", False),
+            outline=sheet.get("draw_sheet_outline", False),
+        )
+        plate_layout.zoom_extents(doc)
+    print(session.summary())
+    return placements
+
+
+def new_drawing():
+    """A new drawing from acadiso.dwt in the running (or a new) AutoCAD."""
+    if win32com is None:
+        raise RuntimeError("pywin32 is not installed; AutoCAD cannot be reached from this machine.")
+    pythoncom.CoInitialize()
+    with metrics.span("acad.connect"):
+        acad = win32com.client.Dispatch("AutoCAD.Application")
+        acad.Visible = True
+        template_path = os.path.abspath("acadiso.dwt")
+        if os.path.exists(template_path):
+            return acad.Documents.Add(template_path)
+        return acad.Documents.Add()
+
+
+def render_job(path=None, dxf=None):
+    """Render the job file into a new drawing; optionally save it as DXF. Returns (plates, sheets)."""
+    job = load_job(path)
+    if not job["plates"]:
+        raise ValueError(f"The job {job_path(path)} has no plates")
+    doc = new_drawing()
+    placements = render(doc, job)
+    if dxf:
+        doc.SaveAs(os.path.abspath(dxf), AC_2013_DXF)
+    return len(placements), sheet_nesting.sheet_count(placements)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the plates of all tools into one drawing.")
+    parser.add_argument("job", nargs="?", help=f"job file (default: {job_path()})")
+    parser.add_argument("--list", action="store_true", help="list the plates in the job and exit")
+    parser.add_argument("--clear", action="store_true", help="empty the job and exit")
+    parser.add_argument("--dxf", help="also save the drawing as DXF")
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        clear_job(args.job)
+        print(f"Cleared {job_path(args.job)}")
+        return 0
+
+    job = load_job(args.job)
+    if args.list:
+        for i, entry in enumerate(job["plates"], 1):
+            print(f"{i:3d}. [{entry.get('tool')}] {entry.get('label', '')}")
+        print(f"{len(job['plates'])} plate entries in {job_path(args.job)}")
+        return 0
+
+    try:
+        plates, sheets = render_job(args.job, args.dxf)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"Done. {plates} plates on {sheets} sheet(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
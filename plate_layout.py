@@ -0,0 +1,776 @@
+"""
+Declarative plate layouts.
+
+A plate type is described by a template in ``layouts/`` (JSON, or YAML when
+PyYAML is installed) instead of hand-written coordinates. A template is laid
+out once per template and size into a LayoutPlan: every rectangle, line and
+text insertion point packed into one GeometryBuffer plus a list of drawing
+ops. Drawing a unit then only fills in its values, and a grid of N plates
+costs one layout, one vectorised tiling and N value fills.
+
+Template keys (all coordinates are millimetres relative to the plate's
+lower-left corner, and any number may be given as an expression):
+
+    "extends"    name of a parent template; "params", "vars", "after_rows",
+                 "defaults", "fonts" and "row_defs" are merged, everything
+                 else replaced
+    "params"     size/option inputs with their defaults; config entries of
+                 the same name override them and select the cached plan
+    "vars"       derived values, evaluated in order (e.g. "ux2": "plate_width - margin")
+    "fonts"      font key -> AutoCAD text style name ("text" is the default key)
+    "defaults"   value defaults for the text fields
+    "top"        y at which the rows start stacking downwards
+    "row_x"      [left, right] of the row frames
+    "rows"       list of rows (or names from "row_defs"):
+                     {"id", "height", "frame": true, "when", "repeat", "items": [...]}
+                 inside a row, items see ``top``, ``bottom``, ``height`` and
+                 ``index``; later items see ``<id>_top`` and ``<id>_bottom``
+    "after_rows" like "vars", evaluated once the rows are placed (e.g. a frame
+                 bottom that depends on ``footer_bottom``)
+    "items"      drawn after the rows (frames, separators, dimensions, logo)
+
+Item kinds (each item may have a "when" expression):
+
+    {"rect": [x1, y1, x2, y2]}            closed polyline
+    {"line": [x1, y1, x2, y2]}
+    {"polyline": [[x, y], ...]}
+    {"text": "...", "at": [x, y], "height": h, "font", "rotation" (degrees),
+     "alt_height", "alt_if_contains"}     smaller height when the value contains a substring
+    {"mtext": "...", "at", "width", "height", "font"}
+    {"bold": "...", "at", "height", "width"}
+    {"dimension": "aligned" | "linear", "from", "to", "at", "override",
+     "override_format", "measure", "format", "text_height", "rotate", "arrow_size"}
+    {"block": "file.dwg", "at", "size": [w, h] | "scale": s,
+     "bylayer", "explode", "delete_original", "regen"}
+
+    Text items may also have "align": "left" | "center" | "right" (what
+    "at" is for the filled-in text) and "fit": w (shrink the height until
+    the text is at most w wide). MTEXT and bold items may have
+    "fit_height": h instead, to wrap at their width and take the largest
+    height (up to "height") whose lines fit in h. "min_height" is the
+    floor for both; text that does not fit even there is reported by
+    LayoutPlan.overflows() / overflows(). All of it is worked out per
+    value from the Consolas metrics in font_metrics.py, so it is exact for
+    Consolas text styles and bold/MTEXT text.
+
+Texts are ``str.format`` templates filled from the unit's values, e.g.
+``"FLOAT : {float_voltage}V"``; in repeated rows ``[#]`` is replaced by the
+repetition index (``"{outgoing[#]}"``). A text that fills in empty is
+not drawn.
+
+Expressions are plain arithmetic over params and vars (``+ - * / // % **``,
+comparisons, ``and/or/not``, ``x if c else y``, ``min``, ``max``, ``abs``,
+``round``); nothing else is evaluated.
+
+    plan = plate_layout.plan_for("bch_single", config)
+    plan.draw(doc.ModelSpace, values, origin=(100, 100))
+    plan.draw_blocks(doc, values, offsets)     # N identical plates as block references
+    plate_layout.draw_sheets(doc, [(plan, values, 20), (other_plan, other_values, 3)])
+"""
+
+import os
+import re
+import ast
+import sys
+import json
+import math
+import string
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import metrics
+import font_metrics
+import plate_drawing as drawing
+import sheet_nesting
+from geometry_buffer import GeometryBuffer, Span
+
+LAYOUT_EXTENSIONS = (".json", ".yaml", ".yml")
+DIMENSION_TEXT_HEIGHT = 3.0  # mm, when a dimension item sets no text_height
+DIMENSION_MARGIN = 6.0  # mm past a dimension line for its text gap, arrows and offset
+
+
+class LayoutError(ValueError):
+    """A template is missing, malformed or uses an unsupported expression."""
+
+
+# -----------------------------
+# Template files
+# -----------------------------
+def layout_dirs():
+    """
+    Folders searched for templates, first match wins:
+    PLATEGEN_LAYOUTS (os.pathsep separated), ``layouts`` in the working
+    folder (next to the installed executables, so templates can be edited
+    or added there), and the templates shipped with the program.
+    """
+    dirs = [d for d in os.environ.get("PLATEGEN_LAYOUTS", "").split(os.pathsep) if d]
+    dirs.append(os.path.abspath("layouts"))
+    bundled = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    dirs.append(os.path.join(bundled, "layouts"))
+    return dirs
+
+
+def find_template(name):
+    for folder in layout_dirs():
+        for ext in LAYOUT_EXTENSIONS:
+            path = os.path.join(folder, name + ext)
+            if os.path.isfile(path):
+                return path
+    raise LayoutError(f"Plate layout '{name}' not found in {', '.join(layout_dirs())}")
+
+
+def list_templates():
+    """Names of all templates found (including base templates)."""
+    names = set()
+    for folder in layout_dirs():
+        try:
+            entries = os.listdir(folder)
+        except OSError:
+            continue
+        names.update(os.path.splitext(e)[0] for e in entries if e.endswith(LAYOUT_EXTENSIONS))
+    return sorted(names)
+
+
+@lru_cache(maxsize=64)
+def _read_file(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            try:
+                data = json.load(f)
+            except ValueError as e:
+                raise LayoutError(f"{path}: {e}")
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise LayoutError(f"{path}: PyYAML is not installed; use a .json template")
+            data = yaml.safe_load(f)
+    if not isinstance(data, dict):
+        raise LayoutError(f"{path}: a template must be an object")
+    return data
+
+
+_MERGED_KEYS = ("params", "vars", "after_rows", "defaults", "fonts", "row_defs")
+
+
+def _stamp(name, seen=()):
+    """``((path, mtime), ...)`` for a template and its parents; changes when any file is edited."""
+    if name in seen:
+        raise LayoutError(f"Plate layout '{name}' extends itself")
+    path = find_template(name)
+    mtime = os.path.getmtime(path)
+    parent = _read_file(path, mtime).get("extends")
+    own = ((path, mtime),)
+    return own + _stamp(parent, seen + (name,)) if parent else own
+
+
+@lru_cache(maxsize=64)
+def _merged(stamp):
+    data = _read_file(*stamp[0])
+    if len(stamp) == 1:
+        return data
+    merged = dict(_merged(stamp[1:]))
+    for key, value in data.items():
+        if key in _MERGED_KEYS:
+            merged[key] = {**merged.get(key, {}), **value}
+        elif key != "extends":
+            merged[key] = value
+    return merged
+
+
+def load_template(name):
+    """The template ``name`` with its ``extends`` chain merged (cached until a file changes)."""
+    return _merged(_stamp(name))
+
+
+# -----------------------------
+# Expressions
+# -----------------------------
+_FUNCTIONS = {"min": min, "max": max, "abs": abs, "round": round}
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Name, ast.Load, ast.Constant, ast.Call,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+
+
+@lru_cache(maxsize=2048)
+def _compile_expr(source):
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise LayoutError(f"Bad expression {source!r}: {e.msg}")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise LayoutError(f"Unsupported syntax in expression {source!r}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS):
+            raise LayoutError(f"Only {', '.join(_FUNCTIONS)} may be called in {source!r}")
+    return compile(tree, "<layout>", "eval")
+
+
+def evaluate(expr, env):
+    """Value of a template number or expression string in ``env``."""
+    if isinstance(expr, (int, float)):
+        return expr
+    if not isinstance(expr, str):
+        raise LayoutError(f"Expected a number or expression, got {expr!r}")
+    try:
+        return eval(_compile_expr(expr), {"__builtins__": {}, **_FUNCTIONS}, env)
+    except LayoutError:
+        raise
+    except Exception as e:
+        raise LayoutError(f"Cannot evaluate {expr!r}: {e}")
+
+
+# -----------------------------
+# Plans
+# -----------------------------
+class Op(NamedTuple):
+    """One drawing call; ``at`` is a point index into the plan's buffer."""
+    kind: str
+    at: int = 0
+    count: int = 0
+    text: Optional[str] = None
+    fmt: bool = False          # text is a str.format template
+    height: float = 0.0
+    width: float = 0.0
+    font: Optional[str] = None
+    extra: Optional[dict] = None
+
+
+class _Values(dict):
+    def __missing__(self, key):
+        return ""
+
+
+_FIELD_INDEX = re.compile(r"\[#\]")
+_MTEXT_CODE = re.compile(r"\\[fFHCcWQTAp][^;]*;|\\[LlOoKk]|(?<!\\)[{}]")
+_MTEXT_BOLD = re.compile(r"\\f[^;|]*(\|[^;|]*)*\|b1")
+
+
+def mtext_plain(text):
+    """
+    ``(text, bold)`` for MTEXT contents: formatting codes dropped, ``\\P``
+    breaks as newlines, ``bold`` set by a ``\\f...|b1;`` font switch.
+
+    For renderers other than AutoCAD (preview, SVG/PDF export).
+    """
+    text = str(text)
+    bold = bool(_MTEXT_BOLD.search(text))
+    text = _MTEXT_CODE.sub("", text).replace("\\{", "{").replace("\\}", "}")
+    return text.replace("\\P", "\n").replace("\\\\", "\\"), bold
+
+
+_ALIGN = {"left": 0.0, "center": 0.5, "right": 1.0}  # share of the width left of "at"
+
+
+def _text_op(kind, item, env, buf, index):
+    text = str(item[kind])
+    if index is not None:
+        text = _FIELD_INDEX.sub(f"[{index}]", text)
+    try:
+        fmt = any(field is not None for _, field, _, _ in string.Formatter().parse(text))
+    except ValueError as e:
+        raise LayoutError(f"Bad text template {text!r}: {e}")
+    if not fmt:
+        text = text.replace("{{", "{").replace("}}", "}")
+
+    x, y = (evaluate(v, env) for v in item["at"])
+    extra = None
+    if any(key in item for key in ("rotation", "alt_height", "align", "fit", "fit_height")):
+        align = item.get("align", "left")
+        if align not in _ALIGN:
+            raise LayoutError(f"Unknown text alignment {align!r} (use left, center or right)")
+        extra = {
+            "rotation": math.radians(evaluate(item.get("rotation", 0), env)),
+            "alt_height": evaluate(item["alt_height"], env) if "alt_height" in item else None,
+            "alt_if_contains": item.get("alt_if_contains"),
+            "align": _ALIGN[align],
+            "fit": evaluate(item["fit"], env) if "fit" in item else None,
+            "fit_height": evaluate(item["fit_height"], env) if "fit_height" in item else None,
+            "min_height": evaluate(item["min_height"], env) if "min_height" in item else None,
+        }
+    return Op(
+        kind, buf.add_point(x, y), 1, text, fmt,
+        height=evaluate(item["height"], env),
+        width=evaluate(item.get("width", 200), env),
+        font=item.get("font", "text"),
+        extra=extra,
+    )
+
+
+def _compile_item(item, env, buf, ops, index=None):
+    if "when" in item and not evaluate(item["when"], env):
+        return
+    ev = lambda v: evaluate(v, env)  # noqa: E731
+
+    if "rect" in item:
+        span = buf.add_rect(*map(ev, item["rect"]))
+        ops.append(Op("rect", span.start, span.count))
+    elif "line" in item:
+        span = buf.add_line(*map(ev, item["line"]))
+        ops.append(Op("line", span.start, span.count))
+    elif "polyline" in item:
+        span = buf.add_flat(c for x, y in item["polyline"] for c in (ev(x), ev(y), 0.0))
+        ops.append(Op("polyline", span.start, span.count))
+    elif "text" in item or "mtext" in item or "bold" in item:
+        kind = "text" if "text" in item else "mtext" if "mtext" in item else "bold"
+        ops.append(_text_op(kind, item, env, buf, index))
+    elif "dimension" in item:
+        ops.append(Op("dimension", extra={
+            "style": item["dimension"],
+            "from": tuple(map(ev, item["from"])),
+            "to": tuple(map(ev, item["to"])),
+            "at": tuple(map(ev, item["at"])),
+            "override": item.get("override"),
+            "override_format": item.get("override_format", "{}"),
+            "measure": ev(item["measure"]) if "measure" in item else None,
+            "format": item.get("format", "{:.1f}"),
+            "text_height": ev(item["text_height"]) if "text_height" in item else None,
+            "rotate": bool(item.get("rotate", False)),
+            "arrow_size": ev(item.get("arrow_size", 3.0)),
+        }))
+    elif "block" in item:
+        ops.append(Op("block", extra={
+            "path": item["block"],
+            "at": tuple(map(ev, item["at"])),
+            "size": tuple(map(ev, item["size"])) if "size" in item else None,
+            "scale": ev(item["scale"]) if "scale" in item else None,
+            "bylayer": bool(item.get("bylayer", False)),
+            "explode": bool(item.get("explode", False)),
+            "delete_original": bool(item.get("delete_original", False)),
+            "regen": bool(item.get("regen", False)),
+        }))
+    else:
+        raise LayoutError(f"Unknown layout item {item!r}")
+
+
+def _coerce(default, value):
+    if value is None:
+        return default
+    if isinstance(default, bool):
+        return bool(value)
+    if isinstance(default, (int, float)) and not isinstance(value, (int, float)):
+        return float(value)
+    return value
+
+
+def template_params(name, config):
+    """The template's params with matching ``config`` entries applied."""
+    params = load_template(name).get("params", {})
+    return {k: _coerce(v, config.get(k)) for k, v in params.items()}
+
+
+class LayoutPlan:
+    """
+    A template laid out for one set of params.
+
+    ``buffer`` holds every vertex with the plate's lower-left corner at
+    (0, 0); ``ops`` says what to draw from it. Plans are immutable and
+    shared through plan_for()'s cache.
+    """
+
+    def __init__(self, name, template, params):
+        self.name = name
+        self.params = dict(params)
+        self.defaults = dict(template.get("defaults", {}))
+        self.fonts = dict(template.get("fonts", {}))
+        self.buffer = GeometryBuffer()
+        self.ops = []
+        self.env = self._layout(template)
+
+    def _layout(self, template):
+        env = dict(self.params)
+        for key, expr in template.get("vars", {}).items():
+            env[key] = evaluate(expr, env)
+
+        row_defs = template.get("row_defs", {})
+        row_x = template.get("row_x")
+        y = evaluate(template.get("top", 0), env)
+        for row in template.get("rows", []):
+            if isinstance(row, str):
+                if row not in row_defs:
+                    raise LayoutError(f"{self.name}: no row named '{row}' in row_defs")
+                row = row_defs[row]
+            if "when" in row and not evaluate(row["when"], env):
+                continue
+            repeat = int(evaluate(row.get("repeat", 1), env))
+            first_top = y
+            for index in range(repeat):
+                row_env = dict(env, top=y, index=index)
+                height = evaluate(row["height"], row_env)
+                row_env.update(bottom=y - height, height=height)
+                if row.get("frame", True) and row_x:
+                    x1, x2 = (evaluate(v, row_env) for v in row_x)
+                    span = self.buffer.add_rect(x1, y - height, x2, y)
+                    self.ops.append(Op("rect", span.start, span.count))
+                for item in row.get("items", []):
+                    _compile_item(item, row_env, self.buffer, self.ops, index if "repeat" in row else None)
+                y -= height
+            if "id" in row:
+                env[row["id"] + "_top"] = first_top
+                env[row["id"] + "_bottom"] = y
+        env["y"] = y
+        for key, expr in template.get("after_rows", {}).items():
+            env[key] = evaluate(expr, env)
+
+        for item in template.get("items", []):
+            _compile_item(item, env, self.buffer, self.ops)
+        return env
+
+    def bounds(self):
+        """``(xmin, ymin, xmax, ymax)`` of the plate geometry (without dimensions or logo)."""
+        return self.buffer.bounds()
+
+    def extent(self, dimensions=True):
+        """
+        ``(xmin, ymin, xmax, ymax)`` of everything the plan draws: the plate
+        geometry, logo blocks of known size and, with ``dimensions``, the
+        dimension lines with room for their text. Plates are nested on it.
+        """
+        xmin, ymin, xmax, ymax = self.bounds()
+        for op in self.ops:
+            if op.kind == "dimension" and dimensions:
+                d = op.extra
+                pad = (d["text_height"] or DIMENSION_TEXT_HEIGHT) + DIMENSION_MARGIN
+                ax, ay = d["at"]
+                points = (d["from"], d["to"], (ax - pad, ay - pad), (ax + pad, ay + pad))
+            elif op.kind == "block":
+                x, y = op.extra["at"]
+                w, h = op.extra["size"] or (0.0, 0.0)
+                points = ((x, y), (x + w, y + h))
+            else:
+                continue
+            for x, y in points:
+                xmin, ymin, xmax, ymax = min(xmin, x), min(ymin, y), max(xmax, x), max(ymax, y)
+        return xmin, ymin, xmax, ymax
+
+    # ----- drawing -----
+
+    def values(self, values):
+        """The template defaults overlaid with ``values``; missing fields render empty."""
+        v = _Values(self.defaults)
+        v.update(values)
+        return v
+
+    def styles(self, owner):
+        """Resolved text style names for the template's fonts (``owner``: document or space)."""
+        return {key: drawing.text_style(owner, name) for key, name in self.fonts.items()}
+
+    def draw(self, space, values, origin=(0.0, 0.0)):
+        """Draw one plate with its lower-left corner at ``origin``."""
+        with metrics.span("plate.draw", template=self.name):
+            buf = self.buffer.translated(*origin)
+            self._emit(space, buf, 0, origin, self.values(values), self.styles(space))
+
+    def draw_grid(self, space, values, offsets):
+        """
+        Draw one plate per ``(x, y)`` in ``offsets``.
+
+        ``values`` is one mapping for every plate or a sequence with one
+        mapping per plate. The geometry is translated for all plates in one
+        step; only the values are filled per plate.
+        """
+        offsets = list(offsets)
+        if isinstance(values, dict) or not isinstance(values, (list, tuple)):
+            values = [values] * len(offsets)
+        with metrics.span("plate.grid", template=self.name, plates=len(offsets)):
+            grid = self.buffer.tiled(offsets)
+            styles = self.styles(space)
+            per_plate = len(self.buffer)
+            filled = {}
+            for k, (origin, unit_values) in enumerate(zip(offsets, values)):
+                vals = filled.get(id(unit_values))
+                if vals is None:
+                    vals = filled[id(unit_values)] = self.values(unit_values)
+                self._emit(space, grid, k * per_plate, origin, vals, styles)
+
+    def draw_blocks(self, doc, values, offsets, block_name=None, explode=False):
+        """
+        Draw the plate once as a block definition and insert one reference
+        per ``(x, y)`` or ``(x, y, rotation)`` in ``offsets``; every plate
+        gets the same ``values``.
+
+        N plates cost one plate plus N InsertBlock calls. With ``explode``
+        each reference is exploded back into plain entities. Falls back to
+        draw_grid() when the document has no usable block table. Returns the
+        block name, or None after a fallback.
+        """
+        offsets = list(offsets)
+        space = doc.ModelSpace
+        try:
+            blocks = doc.Blocks
+            name = _free_block_name(blocks, block_name or f"PLATE_{self.name.upper()}")
+            block = blocks.Add(drawing.make_point_variant(0, 0), name)
+        except Exception as e:
+            if any(len(o) > 2 and o[2] for o in offsets):
+                raise LayoutError(f"Rotated plates need block definitions, which are not available: {e}")
+            print(f"Block definition not available ({e}); drawing each plate")
+            self.draw_grid(space, values, [o[:2] for o in offsets])
+            return None
+
+        with metrics.span("plate.blocks", template=self.name, plates=len(offsets)):
+            self._emit(block, self.buffer, 0, (0.0, 0.0), self.values(values), self.styles(doc))
+            for offset in offsets:
+                rotation = offset[2] if len(offset) > 2 else 0.0
+                ref = space.InsertBlock(drawing.make_point_variant(offset[0], offset[1]), name, 1.0, 1.0, 1.0, rotation)
+                if explode:
+                    try:
+                        ref.Explode()
+                        ref.Delete()
+                    except Exception:
+                        pass
+        return name
+
+    def _emit(self, ms, buf, shift, origin, values, styles):
+        ox, oy = origin
+        for op in self.ops:
+            kind = op.kind
+            if kind == "rect" or kind == "polyline":
+                drawing.add_polyline_span(ms, buf, Span(op.at + shift, op.count), closed=kind == "rect")
+            elif kind == "line":
+                ms.AddLine(buf.point_variant(op.at + shift), buf.point_variant(op.at + shift + 1))
+            elif kind == "text" or kind == "mtext" or kind == "bold":
+                text = op.text.format_map(values) if op.fmt else op.text
+                if not text:
+                    continue  # e.g. the unused cells of a table's last row
+                extra = op.extra
+                if extra:
+                    height, dx, dy = self.text_placement(op, text)
+                    x, y, z = buf.point(op.at + shift)
+                    point = drawing.make_point_variant(x + dx, y + dy, z)
+                else:
+                    height = op.height
+                    point = buf.point_variant(op.at + shift)
+                if kind == "text":
+                    t = drawing.add_text_at(ms, text, point, height, styles.get(op.font))
+                    if extra and extra["rotation"]:
+                        t.Rotation = extra["rotation"]
+                elif kind == "mtext":
+                    drawing.add_mtext_at(ms, text, point, op.width, height, styles.get(op.font))
+                else:
+                    drawing.add_bold_text_at(ms, text, point, height, op.width)
+            elif kind == "dimension":
+                self._dimension(ms, op.extra, ox, oy, values)
+            elif kind == "block":
+                self._block(ms, op.extra, ox, oy)
+
+    @staticmethod
+    def text_placement(op, text):
+        """
+        ``(height, dx, dy)`` of text op ``op`` showing ``text``: the height
+        (``alt_height``, or shrunk to fit its cell) and how far the
+        insertion point moves for ``align``.
+        """
+        extra = op.extra
+        if not extra or not (extra["fit"] or extra["fit_height"] or extra["align"]):
+            height = op.height
+            if extra and extra["alt_height"] is not None and extra["alt_if_contains"] in text:
+                height = extra["alt_height"]
+            return height, 0.0, 0.0
+        height, width, _overflow = LayoutPlan.fit_text(op, text)
+        shift = width * extra["align"]
+        angle = extra["rotation"]
+        return height, -shift * math.cos(angle), -shift * math.sin(angle)
+
+    @staticmethod
+    def fit_text(op, text):
+        """
+        ``(height, width, overflow)`` of text op ``op`` showing ``text``: the
+        height it is drawn at, the width of its widest line, and None or a
+        description of how it overflows its cell at ``min_height``.
+
+        With ``fit_height`` the text is wrapped at the MTEXT width, as
+        AutoCAD will, and the largest height that fits the box is searched
+        for; with only ``fit`` it is shrunk to that width.
+        """
+        height = op.height
+        extra = op.extra
+        if extra["alt_height"] is not None and extra["alt_if_contains"] in text:
+            height = extra["alt_height"]
+        if op.kind == "text":
+            plain, bold = text, False
+        else:
+            plain, bold = mtext_plain(text)
+            bold = bold or op.kind == "bold"
+        floor = extra["min_height"]
+
+        if extra["fit_height"] is not None and op.kind != "text":
+            height, lines, fits = font_metrics.fit_block(plain, height, op.width, extra["fit_height"], bold, floor)
+            width = max(font_metrics.text_width(line, height, bold) for line in lines)
+            overflow = None if fits else (
+                f"needs {width:.1f} x {font_metrics.block_height(len(lines), height):.1f} mm at {height:.2f} mm "
+                f"({len(lines)} line{'s' if len(lines) > 1 else ''}); the cell is {op.width:g} x {extra['fit_height']:g} mm")
+            return height, width, overflow
+
+        width = max(font_metrics.text_width(line, height, bold) for line in plain.split("\n"))
+        limit = extra["fit"]
+        if not limit or width <= limit:
+            return height, width, None
+        fitted = max(height * limit / width, floor or 0.0)  # the width scales with the height
+        width *= fitted / height
+        overflow = f"needs {width:.1f} mm at {fitted:.2f} mm; the cell is {limit:g} mm" if width > limit + 1e-6 else None
+        return fitted, width, overflow
+
+    def overflows(self, values):
+        """One message per text that does not fit its cell even at its ``min_height``."""
+        values = self.values(values)
+        found = []
+        for op in self.ops:
+            if op.kind in ("text", "mtext", "bold") and op.extra and (op.extra["fit"] or op.extra["fit_height"]):
+                text = op.text.format_map(values) if op.fmt else op.text
+                overflow = self.fit_text(op, text)[2]
+                if overflow:
+                    shown = mtext_plain(text)[0].replace("\n", " ")
+                    found.append(f"{self.name}: '{shown[:40]}{'...' if len(shown) > 40 else ''}' {overflow}")
+        return found
+
+    @staticmethod
+    def dimension_text(d, values):
+        """The text of dimension op ``d``; None means the measured length."""
+        override = values.get(d["override"]) if d["override"] else None
+        if isinstance(override, str):
+            override = override.strip()
+        if override:
+            return d["override_format"].format(override)
+        if d["measure"] is not None:
+            return d["format"].format(d["measure"])
+        return None
+
+    @staticmethod
+    def _dimension(ms, d, ox, oy, values):
+        text = LayoutPlan.dimension_text(d, values)  # None: add_dimension_linear formats the length itself
+
+        (x1, y1), (x2, y2), (dx, dy) = d["from"], d["to"], d["at"]
+        if d["style"] == "linear":
+            drawing.add_dimension_linear(ms, ox + x1, oy + y1, ox + x2, oy + y2, ox + dx, oy + dy,
+                                         override_text=text, vertical=d["rotate"], arrow_size=d["arrow_size"])
+            return
+        dim = drawing.add_dimension_aligned(ms, ox + x1, oy + y1, ox + x2, oy + y2, ox + dx, oy + dy,
+                                            text, text_height=d["text_height"])
+        if d["rotate"]:
+            try:
+                dim.TextRotation = math.pi / 2
+            except Exception:
+                pass
+
+    @staticmethod
+    def _block(ms, b, ox, oy):
+        path = os.path.abspath(b["path"])
+        if not os.path.exists(path):
+            print(f"Logo block not found: {path}")
+            return
+        x, y = ox + b["at"][0], oy + b["at"][1]
+        if b["size"] is not None:
+            drawing.insert_scaled_block(ms, path, x, y, *b["size"], bylayer=b["bylayer"], explode=b["explode"],
+                                        delete_original=b["delete_original"], regen=b["regen"])
+            return
+        try:
+            s = b["scale"] or 1.0
+            blk = ms.InsertBlock(drawing.make_point_variant(x, y), drawing.block_source(ms, path), s, s, s, 0)
+        except Exception:
+            return
+        drawing.update_entity(blk)
+        if b["regen"]:
+            try:
+                drawing.regen_drawing(ms.Parent)
+            except Exception:
+                pass
+
+
+def _free_block_name(blocks, base):
+    """``base_1``, ``base_2``, ... whichever is not yet defined in ``blocks``."""
+    n = 1
+    while True:
+        name = f"{base}_{n}"
+        try:
+            blocks.Item(name)
+        except Exception:
+            return name
+        n += 1
+
+
+@lru_cache(maxsize=128)
+def _plan(name, stamp, params_key):
+    return LayoutPlan(name, _merged(stamp), dict(params_key))
+
+
+def plan_for(name, config=None):
+    """
+    The cached LayoutPlan of template ``name`` for the params in ``config``.
+
+    Plans are cached per template, params and template file version, so a
+    grid of identical plates is laid out once and editing a template takes
+    effect on the next plate without restarting.
+    """
+    stamp = _stamp(name)
+    params = template_params(name, config or {})
+    return _plan(name, stamp, tuple(sorted(params.items())))
+
+
+def overflows(jobs):
+    """LayoutPlan.overflows() for every distinct plate of ``jobs`` (``(plan, values, count)``)."""
+    found = []
+    seen = set()
+    for plan, values, _count in jobs:
+        key = (id(plan), id(values))
+        if key not in seen:
+            seen.add(key)
+            found.extend(plan.overflows(values))
+    return found
+
+
+def draw_sheets(doc, jobs, sheet_width=sheet_nesting.DEFAULT_SHEET_WIDTH,
+                sheet_height=sheet_nesting.DEFAULT_SHEET_HEIGHT, kerf=sheet_nesting.DEFAULT_KERF,
+                margin=0.0, origin=(0.0, 0.0), allow_rotate=False, explode=False, outline=False):
+    """
+    Nest plates of any templates and sizes onto as few sheets as possible and draw them.
+
+    ``jobs`` is a list of ``(plan, values, count)``. Each job with more than
+    one plate (or a rotated one) is drawn once as a block and inserted at
+    its placements; single plates are drawn directly. Sheets are laid out
+    left to right from ``origin``; ``outline`` also draws each sheet's
+    border. Returns the sheet_nesting placements (``item.data`` is the job
+    index).
+    """
+    items = []
+    for index, (plan, _values, count) in enumerate(jobs):
+        xmin, ymin, xmax, ymax = plan.extent()
+        items.extend([sheet_nesting.Item(xmax - xmin, ymax - ymin, index)] * int(count))
+    placements = sheet_nesting.pack(items, sheet_width, sheet_height, kerf, margin, allow_rotate)
+    with drawing.DrawingSession(doc):
+        _draw_placements(doc, jobs, placements, sheet_width, sheet_height, origin, explode, outline)
+    return placements
+
+
+def _draw_placements(doc, jobs, placements, sheet_width, sheet_height, origin, explode, outline):
+    by_job = {}
+    for p in placements:
+        by_job.setdefault(p.item.data, []).append(p)
+
+    space = doc.ModelSpace
+    for index, job_placements in by_job.items():
+        plan, values, _count = jobs[index]
+        xmin, ymin, xmax, ymax = plan.extent()
+        spots = []
+        for p in job_placements:
+            sx, sy = sheet_nesting.sheet_origin(p.sheet, origin, sheet_width)
+            if p.rotated:
+                # 90 degrees counter-clockwise about the insertion point
+                spots.append((sx + p.x + ymax, sy + p.y - xmin, math.pi / 2))
+            else:
+                spots.append((sx + p.x - xmin, sy + p.y - ymin, 0.0))
+        if len(spots) > 1 or spots[0][2]:
+            plan.draw_blocks(doc, values, spots, explode=explode)
+        else:
+            plan.draw(space, values, spots[0][:2])
+
+    if outline:
+        for sheet in range(sheet_nesting.sheet_count(placements)):
+            sx, sy = sheet_nesting.sheet_origin(sheet, origin, sheet_width)
+            drawing.add_rect(space, sx, sy, sx + sheet_width, sy + sheet_height)
+
+
+def zoom_extents(doc):
+    """Zoom extents; deferred to the end of an open plate_drawing.DrawingSession."""
+    drawing.zoom_extents(doc)
@@ -0,0 +1,346 @@
+"""
+Live plate preview inside the GUIs.
+
+Renders a plate_layout.LayoutPlan - the same cached plan that
+draw_rating_plate(), draw_db_plate() and draw_rating_plate_ups() send to
+AutoCAD - into a QGraphicsScene, so an operator can see whether a layout
+fits without the round trip to AutoCAD.
+
+Redraws are incremental: the plate geometry (frames, lines, dimensions,
+logo outline) is built once per plan, and plans are cached per template and
+size, so editing a text field only updates the text items whose value
+changed. A new plan (another size or mode) rebuilds the scene. Field edits
+are debounced, so typing does not re-render on every key.
+
+    panel = PreviewPanel(lambda: app_db.job_plates(self.get_config())[0][:2])
+    panel.watch(central_widget)      # re-render when any input below it changes
+    dock = preview_dock(self, panel)
+
+Text is drawn with a generic sans-serif font scaled to the AutoCAD text
+height, so line breaks and exact glyph widths may differ slightly from the
+drawing; positions, sizes and frames are exact. Texts that overflow their
+cells (see plate_layout's "fit" keys) are counted in the status line.
+"""
+
+import html
+import math
+import time
+
+from PyQt6.QtCore import Qt, QTimer, QRectF
+from PyQt6.QtGui import QBrush, QColor, QFont, QFontMetricsF, QPainter, QPainterPath, QPen
+from PyQt6.QtWidgets import (QAbstractButton, QAbstractItemView, QAbstractSpinBox, QComboBox, QDockWidget, QGraphicsScene,
+                             QGraphicsSimpleTextItem, QGraphicsTextItem, QGraphicsView, QLabel, QLineEdit,
+                             QMessageBox, QTextEdit, QPlainTextEdit, QVBoxLayout, QWidget)
+
+import plate_layout
+
+DEBOUNCE_MS = 150
+MARGIN = 15.0  # mm around the plate when fitting the view
+
+PLATE_PEN = QColor("#202020")
+DIM_PEN = QColor("#2a6fb0")
+LOGO_PEN = QColor("#999999")
+TEXT_FONT = "Arial"
+BOLD_FONT = "Consolas"
+
+
+def _pen(color, dashed=False):
+    pen = QPen(color, 0)  # cosmetic: one pixel at any zoom
+    if dashed:
+        pen.setStyle(Qt.PenStyle.DashLine)
+    return pen
+
+
+class _Text:
+    """One text op of the plan and the scene item showing it."""
+
+    def __init__(self, op, item, x, y):
+        self.op = op
+        self.item = item
+        self.x = x
+        self.y = y
+        self.text = None
+
+
+class PlateScene(QGraphicsScene):
+    """
+    Scene of one plate, in millimetres with y pointing up like AutoCAD
+    (scene y is negated).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.plan = None
+        self._texts = []
+        self._dimensions = []  # (extra, text item)
+        self._metrics = {}
+
+    # ----- fonts -----
+
+    def _font(self, bold):
+        font = QFont(BOLD_FONT if bold else TEXT_FONT)
+        font.setPointSizeF(10.0)
+        font.setBold(bold)
+        return font
+
+    def _scale(self, font, height):
+        """Item scale that makes the font's cap height ``height`` millimetres."""
+        key = (font.family(), font.bold())
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = QFontMetricsF(font)
+        cap = metrics.capHeight() or metrics.ascent() * 0.7
+        return height / cap, metrics
+
+    # ----- building -----
+
+    def show_plan(self, plan, values):
+        """Show ``plan`` filled with ``values``; returns True when the geometry was rebuilt."""
+        rebuilt = plan is not self.plan
+        if rebuilt:
+            self._build(plan)
+        self._fill(plan.values(values))
+        return rebuilt
+
+    def _build(self, plan):
+        self.clear()
+        self.plan = plan
+        self._texts = []
+        self._dimensions = []
+
+        buf = plan.buffer
+        outline = QPainterPath()
+        for op in plan.ops:
+            if op.kind in ("rect", "polyline", "line"):
+                pts = [buf.point(op.at + k) for k in range(op.count)]
+                outline.moveTo(pts[0][0], -pts[0][1])
+                for x, y, _ in pts[1:]:
+                    outline.lineTo(x, -y)
+                if op.kind == "rect":
+                    outline.closeSubpath()
+            elif op.kind in ("text", "mtext", "bold"):
+                x, y, _ = buf.point(op.at)
+                if op.kind == "text":
+                    item = QGraphicsSimpleTextItem()
+                    item.setFont(self._font(False))
+                else:
+                    item = QGraphicsTextItem()
+                    item.setFont(self._font(op.kind == "bold"))
+                    item.document().setDocumentMargin(0)
+                self.addItem(item)
+                self._texts.append(_Text(op, item, x, y))
+            elif op.kind == "dimension":
+                self._dimensions.append((op.extra, self._dimension(op.extra)))
+            elif op.kind == "block":
+                self._logo(op.extra)
+        self.addPath(outline, _pen(PLATE_PEN))
+
+    def _dimension(self, d):
+        (x1, y1), (x2, y2), (dx, dy) = d["from"], d["to"], d["at"]
+        pen = _pen(DIM_PEN)
+        path = QPainterPath()
+        if abs(x2 - x1) >= abs(y2 - y1):
+            # horizontal: extension lines down/up to the dimension line at dy
+            for x, y in ((x1, y1), (x2, y2)):
+                path.moveTo(x, -y)
+                path.lineTo(x, -dy)
+            path.moveTo(x1, -dy)
+            path.lineTo(x2, -dy)
+            anchor = ((x1 + x2) / 2, dy)
+        else:
+            for x, y in ((x1, y1), (x2, y2)):
+                path.moveTo(x, -y)
+                path.lineTo(dx, -y)
+            path.moveTo(dx, -y1)
+            path.lineTo(dx, -y2)
+            anchor = (dx, (y1 + y2) / 2)
+        self.addPath(path, pen)
+        item = QGraphicsSimpleTextItem()
+        item.setFont(self._font(False))
+        item.setBrush(QBrush(DIM_PEN))
+        item.setData(0, anchor)
+        self.addItem(item)
+        return item
+
+    def _logo(self, b):
+        x, y = b["at"]
+        w, h = b["size"] if b["size"] is not None else (20.0, 20.0)
+        rect = QRectF(x, -(y + h), w, h)
+        self.addRect(rect, _pen(LOGO_PEN, dashed=True))
+        label = self.addSimpleText("LOGO")
+        label.setBrush(QBrush(LOGO_PEN))
+        scale, _ = self._scale(label.font(), min(h / 4, 4.0))
+        label.setScale(scale)
+        label.setPos(x + 1, -(y + h) + 1)
+
+    # ----- values -----
+
+    def _fill(self, values):
+        for t in self._texts:
+            op = t.op
+            text = op.text.format_map(values) if op.fmt else op.text
+            if text == t.text:
+                continue  # unchanged: no scene update at all
+            t.text = text
+            height, dx, dy = plate_layout.LayoutPlan.text_placement(op, text)
+            x, y = t.x + dx, t.y + dy
+            scale, metrics = self._scale(t.item.font(), height)
+            t.item.setScale(scale)
+            if op.kind == "text":
+                t.item.setText(text)
+                # AutoCAD TEXT: insertion point on the baseline
+                angle = op.extra["rotation"] if op.extra else 0.0
+                t.item.setRotation(-math.degrees(angle))
+                ascent = metrics.ascent() * scale
+                t.item.setPos(x + ascent * math.sin(angle), -y - ascent * math.cos(angle))
+            else:
+                # MTEXT: reads from the insertion point and wraps at the op width
+                t.item.setTextWidth(op.width / scale)
+                t.item.setHtml(mtext_html(text))
+                t.item.setPos(x, -y)
+
+        for d, item in self._dimensions:
+            text = self._dimension_text(d, values)
+            if text == item.text():
+                continue
+            item.setText(text)
+            scale, metrics = self._scale(item.font(), d["text_height"] or 3.0)
+            item.setScale(scale)
+            ax, ay = item.data(0)
+            w = metrics.horizontalAdvance(text) * scale
+            h = metrics.height() * scale
+            if d["rotate"]:
+                item.setRotation(-90)
+                item.setPos(ax - h - 1, -ay + w / 2)
+            else:
+                item.setRotation(0)
+                item.setPos(ax - w / 2, -ay - h - 1)
+
+    @staticmethod
+    def _dimension_text(d, values):
+        (x1, y1), (x2, y2) = d["from"], d["to"]
+        return plate_layout.LayoutPlan.dimension_text(d, values) or f"{abs(x2 - x1) or abs(y2 - y1):.1f}"
+
+
+def mtext_html(text):
+    """MTEXT contents as HTML: formatting codes dropped, ``|b1`` fonts in bold, ``\\P`` as line breaks."""
+    text, bold = plate_layout.mtext_plain(text)
+    text = html.escape(text, quote=False).replace("\n", "<br>")
+    return f"<b>{text}</b>" if bold else text
+
+
+class PlateView(QGraphicsView):
+    """Antialiased view that keeps the plate fitted when resized."""
+
+    def __init__(self, scene, parent=None):
+        super().__init__(scene, parent)
+        self.setRenderHints(QPainter.RenderHint.Antialiasing | QPainter.RenderHint.TextAntialiasing)
+        self.setBackgroundBrush(QBrush(QColor("#fafafa")))
+        self.setMinimumSize(320, 240)
+
+    def fit(self):
+        rect = self.scene().itemsBoundingRect()
+        if rect.isValid():
+            self.fitInView(rect.adjusted(-MARGIN, -MARGIN, MARGIN, MARGIN), Qt.AspectRatioMode.KeepAspectRatio)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.fit()
+
+
+class PreviewPanel(QWidget):
+    """
+    The preview view plus a status line.
+
+    ``source`` returns ``(plan, values)`` for the current GUI state, e.g.
+    ``job_plates(get_config())[0][:2]``. Call schedule() (or watch() the
+    input widgets) when something changed.
+    """
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.scene = PlateScene(self)
+        self.view = PlateView(self.scene)
+        self.status = QLabel()
+        self.status.setStyleSheet("color: #666;")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.view, 1)
+        layout.addWidget(self.status)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DEBOUNCE_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def schedule(self, *_):
+        """Refresh once the fields have been quiet for DEBOUNCE_MS."""
+        self._timer.start()
+
+    def refresh(self):
+        started = time.perf_counter()
+        try:
+            plan, values = self.source()
+            rebuilt = self.scene.show_plan(plan, values)
+        except Exception as e:
+            self.status.setText(f"Preview not available: {e}")
+            return
+        if rebuilt:
+            self.view.fit()
+        overflows = plan.overflows(values)
+        xmin, ymin, xmax, ymax = plan.bounds()
+        status = (f"{plan.name}: {xmax - xmin:g} x {ymax - ymin:g} mm  "
+                  f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+        if overflows:
+            status += f"  -  {len(overflows)} text(s) do not fit"
+        self.status.setText(status)
+        self.status.setStyleSheet("color: #b00020;" if overflows else "color: #666;")
+        self.status.setToolTip("\n".join(overflows))
+
+    def watch(self, root):
+        """Schedule a refresh whenever an input widget under ``root`` changes."""
+        for w in root.findChildren(QWidget):
+            if isinstance(w, QAbstractSpinBox) and hasattr(w, "valueChanged"):
+                w.valueChanged.connect(self.schedule)
+            elif isinstance(w, QLineEdit):
+                w.textChanged.connect(self.schedule)
+            elif isinstance(w, (QTextEdit, QPlainTextEdit)):
+                w.textChanged.connect(self.schedule)
+            elif isinstance(w, QComboBox):
+                w.currentIndexChanged.connect(self.schedule)
+            elif isinstance(w, QAbstractButton) and w.isCheckable():
+                w.toggled.connect(self.schedule)
+            elif isinstance(w, QAbstractItemView) and w.model() is not None:
+                model = w.model()
+                for signal in (model.rowsInserted, model.rowsRemoved, model.rowsMoved, model.dataChanged,
+                               model.modelReset):
+                    signal.connect(self.schedule)
+        self.schedule()
+
+
+def confirm_overflows(window, jobs):
+    """
+    Before drawing ``jobs`` (``(plan, values, count)``): if any text does
+    not fit its cell, list them and ask whether to draw anyway.
+    """
+    found = plate_layout.overflows(jobs)
+    if not found:
+        return True
+    listed = "\n".join(found[:10]) + (f"\n... and {len(found) - 10} more" if len(found) > 10 else "")
+    answer = QMessageBox.warning(
+        window, "Text does not fit",
+        f"These texts overflow their cells even at the smallest allowed height:\n\n{listed}\n\nDraw anyway?",
+        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+    return answer == QMessageBox.StandardButton.Yes
+
+
+def preview_dock(window, panel, title="Preview"):
+    """Put ``panel`` in a dock on the right of the main window ``window``."""
+    dock = QDockWidget(title, window)
+    dock.setObjectName("plate_preview")
+    dock.setWidget(panel)
+    dock.setFeatures(QDockWidget.DockWidgetFeature.DockWidgetMovable | QDockWidget.DockWidgetFeature.DockWidgetFloatable)
+    window.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, dock)
+    return dock
@@ -1,9 +1,9 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('installer/icons/plategen_icon.ico', 'installer/icons')]
+datas = [('installer/icons/plategen_icon.ico', 'installer/icons'), ('layouts', 'layouts'), ('font/Consolas.ttf', 'font'), ('font/1CONSOLAB.TTF', 'font')]
 binaries = []
-hiddenimports = []
+hiddenimports = ['app_bch', 'app_db', 'app_ups', 'app_np', 'app_mgen_ups', 'app_sticker']
 tmp_ret = collect_all('requests')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 
@@ -0,0 +1,182 @@
+"""
+Sheet nesting for rating plates.
+
+Packs rectangles of any size (BCH, DB and UPS plates mixed) onto as few
+sheets as possible with the MaxRects algorithm (best short side fit): each
+sheet keeps the list of maximal free rectangles, a plate goes into the free
+rectangle that leaves the smallest leftover edge, and the free list is split
+and pruned after every placement. Plates are placed largest first.
+
+The kerf (cutting gap) is kept between neighbouring plates, the margin
+between the plates and the sheet edge. Coordinates are millimetres from the
+sheet's lower-left corner. Nothing here talks to AutoCAD; see
+plate_layout.draw_sheets() for drawing the result.
+
+    items = [Item(150, 113, "bch")] * 20 + [Item(185, 125, "ups")] * 3
+    placements = pack(items, 600, 400, kerf=10)
+    sheets = sheet_count(placements)
+
+Hundreds of plates pack in a few milliseconds.
+"""
+
+from typing import Any, List, NamedTuple, Optional
+
+DEFAULT_SHEET_WIDTH = 600.0
+DEFAULT_SHEET_HEIGHT = 400.0
+DEFAULT_KERF = 10.0
+SHEET_GAP = 50.0  # space between sheets when they are drawn side by side
+
+
+class Item(NamedTuple):
+    """A plate to place: its size and whatever the caller needs back."""
+    width: float
+    height: float
+    data: Any = None
+
+
+class Placement(NamedTuple):
+    """Where an item went. ``rotated`` means turned 90 degrees (width and height swapped)."""
+    item: Item
+    sheet: int
+    x: float
+    y: float
+    rotated: bool = False
+
+    @property
+    def width(self):
+        return self.item.height if self.rotated else self.item.width
+
+    @property
+    def height(self):
+        return self.item.width if self.rotated else self.item.height
+
+
+class _Rect(NamedTuple):
+    x: float
+    y: float
+    w: float
+    h: float
+
+
+class MaxRectsSheet:
+    """Free-space bookkeeping for one sheet (sizes here already include the kerf)."""
+
+    __slots__ = ("width", "height", "free", "used_area")
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.free = [_Rect(0.0, 0.0, width, height)]
+        self.used_area = 0.0
+
+    def find(self, w, h, allow_rotate=False) -> Optional[tuple]:
+        """Best short side fit: ``(x, y, rotated)`` or None if the rectangle does not fit."""
+        best = None
+        best_short = best_long = float("inf")
+        for r in self.free:
+            if w <= r.w and h <= r.h:
+                short, long_ = min(r.w - w, r.h - h), max(r.w - w, r.h - h)
+                if short < best_short or (short == best_short and long_ < best_long):
+                    best, best_short, best_long = (r.x, r.y, False), short, long_
+            if allow_rotate and h <= r.w and w <= r.h:
+                short, long_ = min(r.w - h, r.h - w), max(r.w - h, r.h - w)
+                if short < best_short or (short == best_short and long_ < best_long):
+                    best, best_short, best_long = (r.x, r.y, True), short, long_
+        return best
+
+    def place(self, x, y, w, h):
+        """Mark ``w`` x ``h`` at (x, y) as used and update the free list."""
+        self.used_area += w * h
+        x2, y2 = x + w, y + h
+        split = []
+        for r in self.free:
+            if x >= r.x + r.w or x2 <= r.x or y >= r.y + r.h or y2 <= r.y:
+                split.append(r)
+                continue
+            # Up to four maximal rectangles around the used area
+            if x > r.x:
+                split.append(_Rect(r.x, r.y, x - r.x, r.h))
+            if x2 < r.x + r.w:
+                split.append(_Rect(x2, r.y, r.x + r.w - x2, r.h))
+            if y > r.y:
+                split.append(_Rect(r.x, r.y, r.w, y - r.y))
+            if y2 < r.y + r.h:
+                split.append(_Rect(r.x, y2, r.w, r.y + r.h - y2))
+        self.free = _prune(split)
+
+
+def _prune(rects):
+    """Drop free rectangles contained in another one."""
+    rects.sort(key=lambda r: r.w * r.h, reverse=True)
+    kept = []
+    for r in rects:
+        rx2, ry2 = r.x + r.w, r.y + r.h
+        for k in kept:
+            if k.x <= r.x and k.y <= r.y and rx2 <= k.x + k.w and ry2 <= k.y + k.h:
+                break
+        else:
+            kept.append(r)
+    return kept
+
+
+def pack(items, sheet_width=DEFAULT_SHEET_WIDTH, sheet_height=DEFAULT_SHEET_HEIGHT,
+         kerf=DEFAULT_KERF, margin=0.0, allow_rotate=False) -> List[Placement]:
+    """
+    Place ``items`` on as few ``sheet_width`` x ``sheet_height`` sheets as possible.
+
+    Items are placed largest first; each goes onto the first open sheet with
+    room for it, a new sheet is started only when none has. Returns one
+    Placement per item, in the order of ``items``.
+
+    Raises ValueError if an item does not fit on an empty sheet.
+    """
+    items = list(items)
+    # A plate occupies its size plus the kerf; the usable sheet grows by one
+    # kerf so the last plate in a row or column needs no gap after it.
+    usable_w = sheet_width - 2 * margin + kerf
+    usable_h = sheet_height - 2 * margin + kerf
+
+    order = sorted(range(len(items)), key=lambda i: (max(items[i].width, items[i].height),
+                                                    items[i].width * items[i].height), reverse=True)
+    sheets: List[MaxRectsSheet] = []
+    result: List[Optional[Placement]] = [None] * len(items)
+    for i in order:
+        item = items[i]
+        w, h = item.width + kerf, item.height + kerf
+        for index, sheet in enumerate(sheets):
+            spot = sheet.find(w, h, allow_rotate)
+            if spot is not None:
+                break
+        else:
+            sheet = MaxRectsSheet(usable_w, usable_h)
+            spot = sheet.find(w, h, allow_rotate)
+            if spot is None:
+                raise ValueError(f"A {item.width:g} x {item.height:g} mm plate does not fit on a "
+                                 f"{sheet_width:g} x {sheet_height:g} mm sheet")
+            sheets.append(sheet)
+            index = len(sheets) - 1
+        x, y, rotated = spot
+        if rotated:
+            sheet.place(x, y, h, w)
+        else:
+            sheet.place(x, y, w, h)
+        result[i] = Placement(item, index, margin + x, margin + y, rotated)
+    return result
+
+
+def sheet_count(placements) -> int:
+    return max((p.sheet for p in placements), default=-1) + 1
+
+
+def utilisation(placements, sheet_width, sheet_height) -> float:
+    """Share of the used sheets' area covered by plates (0..1)."""
+    sheets = sheet_count(placements)
+    if not sheets:
+        return 0.0
+    used = sum(p.item.width * p.item.height for p in placements)
+    return used / (sheets * sheet_width * sheet_height)
+
+
+def sheet_origin(sheet, origin=(0.0, 0.0), sheet_width=DEFAULT_SHEET_WIDTH, gap=SHEET_GAP):
+    """Drawing position of sheet ``sheet``'s lower-left corner; sheets are laid out left to right."""
+    return origin[0] + sheet * (sheet_width + gap), origin[1]
@@ -0,0 +1,241 @@
+"""
+Startup-time profiling shared by the launcher and every sub-app.
+
+Each app calls ``install_from_argv(name)`` before its heavy imports and
+``mark_first_window(window)`` right after showing its main window.
+
+``--profile-startup``
+    Times every module import and prints a breakdown attributed per
+    subsystem (Qt, pywin32, python-docx, openpyxl, ...) plus the
+    time to first window once the window has been shown. Unlike
+    ``python -X importtime`` it also works in the PyInstaller builds.
+
+``--exit-after-first-window``
+    Quit as soon as the first window is up (used by
+    benchmarks/bench_startup.py).
+
+If the PLATEGEN_STARTUP_REPORT environment variable names a file, the
+report is also written there as JSON. The time to first window is always
+recorded as the ``startup.window`` metric (see metrics.py).
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+
+import metrics
+
+PROFILE_FLAG = "--profile-startup"
+EXIT_FLAG = "--exit-after-first-window"
+
+# Top-level package -> subsystem shown in the report
+SUBSYSTEMS = {
+    "PyQt6": "Qt",
+    "win32com": "pywin32", "pythoncom": "pywin32", "pywintypes": "pywin32",
+    "win32api": "pywin32", "win32con": "pywin32", "win32event": "pywin32",
+    "docx": "python-docx", "lxml": "lxml",
+    "docxtpl": "docxtpl", "jinja2": "docxtpl", "markupsafe": "docxtpl", "docxcompose": "docxtpl",
+    "babel": "docxtpl",
+    "openpyxl": "openpyxl", "et_xmlfile": "openpyxl",
+    "reportlab": "reportlab", "PIL": "Pillow",
+    "requests": "requests", "urllib3": "requests", "charset_normalizer": "requests",
+    "idna": "requests", "certifi": "requests",
+    "packaging": "packaging", "psutil": "psutil", "docx2pdf": "docx2pdf",
+}
+
+_process_start = time.perf_counter()
+_state = {
+    "app": None,
+    "profiling": False,
+    "exit_after_window": False,
+    "first_window_ms": None,
+}
+_records = []  # (module name, self seconds, cumulative seconds)
+_stack = []
+_lock = threading.Lock()
+
+
+def _subsystem(module_name):
+    top = module_name.split(".")[0]
+    if top in SUBSYSTEMS:
+        return SUBSYSTEMS[top]
+    if top in sys.stdlib_module_names or top.startswith("_"):
+        return "stdlib"
+    return "plategen" if top.startswith("app") else top
+
+
+class _TimedLoader:
+    """Loader proxy that times module creation and execution."""
+
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def _timed(self, fn, *args):
+        if threading.current_thread() is not threading.main_thread():
+            return fn(*args)
+        frame = [0.0]  # time spent in nested imports
+        _stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            total = time.perf_counter() - start
+            _stack.pop()
+            if _stack:
+                _stack[-1][0] += total
+            with _lock:
+                _records.append((self._name, total - frame[0], total))
+
+    def create_module(self, spec):
+        return self._timed(self._loader.create_module, spec)
+
+    def exec_module(self, module):
+        return self._timed(self._loader.exec_module, module)
+
+
+class _TimingFinder:
+    """Meta-path finder that wraps the real loader of every new module."""
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, fullname)
+                return spec
+        return None
+
+
+def install_from_argv(app_name):
+    """
+    Read the startup flags for ``app_name`` and install the import timer if asked.
+
+    The flags are removed from sys.argv so Qt and argparse never see them.
+    """
+    if _state["app"] is None:
+        _state["app"] = app_name
+        metrics.set_app(app_name)
+    if EXIT_FLAG in sys.argv:
+        sys.argv.remove(EXIT_FLAG)
+        _state["exit_after_window"] = True
+    if PROFILE_FLAG in sys.argv:
+        sys.argv.remove(PROFILE_FLAG)
+        if not _state["profiling"]:
+            _state["profiling"] = True
+            sys.meta_path.insert(0, _TimingFinder())
+
+
+def is_profiling():
+    return _state["profiling"]
+
+
+def first_window_ms():
+    """Milliseconds from process start to the first window, once known."""
+    return _state["first_window_ms"]
+
+
+def _process_uptime():
+    """Seconds since the process was created (falls back to module import time)."""
+    try:
+        import psutil
+        return time.time() - psutil.Process().create_time()
+    except Exception:
+        return time.perf_counter() - _process_start
+
+
+def mark_first_window(window=None):
+    """
+    Record the time to first window once the event loop has painted it.
+
+    Call right after ``window.show()``. Cheap when profiling is off.
+    """
+    if _state["first_window_ms"] is not None:
+        return
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    def _shown():
+        _state["first_window_ms"] = round(_process_uptime() * 1000, 1)
+        metrics.record("startup.window", _state["first_window_ms"])
+        if _state["profiling"]:
+            report()
+        elif os.environ.get("PLATEGEN_STARTUP_REPORT"):
+            _write_report(summary())
+        if _state["exit_after_window"]:
+            QApplication.instance().quit()
+
+    QTimer.singleShot(0, _shown)
+
+
+def summary():
+    """Return the import breakdown as a dict (per subsystem and slowest modules)."""
+    with _lock:
+        records = list(_records)
+
+    per_subsystem = {}
+    for name, self_s, _ in records:
+        sub = _subsystem(name)
+        entry = per_subsystem.setdefault(sub, {"ms": 0.0, "modules": 0})
+        entry["ms"] += self_s * 1000
+        entry["modules"] += 1
+    for entry in per_subsystem.values():
+        entry["ms"] = round(entry["ms"], 1)
+
+    slowest = sorted(records, key=lambda r: r[1], reverse=True)[:15]
+    return {
+        "app": _state["app"],
+        "first_window_ms": _state["first_window_ms"],
+        "import_ms": round(sum(r[1] for r in records) * 1000, 1),
+        "subsystems": dict(sorted(per_subsystem.items(), key=lambda kv: kv[1]["ms"], reverse=True)),
+        "slowest_modules": [
+            {"module": name, "self_ms": round(s * 1000, 1), "cumulative_ms": round(c * 1000, 1)}
+            for name, s, c in slowest
+        ],
+    }
+
+
+def report(stream=None):
+    """Print the startup breakdown and write it to PLATEGEN_STARTUP_REPORT if set."""
+    data = summary()
+    out = stream or sys.stderr or sys.stdout
+    lines = [
+        f"Startup profile: {data['app']}",
+        f"  time to first window : {data['first_window_ms']} ms",
+        f"  imports (main thread): {data['import_ms']} ms",
+        "  per subsystem:",
+    ]
+    for name, entry in data["subsystems"].items():
+        lines.append(f"    {name:<14} {entry['ms']:>9.1f} ms  ({entry['modules']} modules)")
+    lines.append("  slowest modules (self time):")
+    for entry in data["slowest_modules"]:
+        lines.append(f"    {entry['module']:<40} {entry['self_ms']:>8.1f} ms")
+
+    if out is not None:
+        try:
+            print("\n".join(lines), file=out, flush=True)
+        except Exception:
+            pass  # windowed builds have no console
+
+    _write_report(data)
+    return data
+
+
+def _write_report(data):
+    path = os.environ.get("PLATEGEN_STARTUP_REPORT")
+    if path:
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError:
+            pass
@@ -0,0 +1,26 @@
+"""
+Shared setup for the tests of the headless modules.
+
+The application modules live at the repository root, next to their font/
+and layouts/ folders. Every test gets its own home, history and queue
+folders and timing telemetry is off, so nothing is written to the
+developer's Documents folder.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("PLATEGEN_METRICS", "off")
+    monkeypatch.setenv("PLATEGEN_HISTORY", str(tmp_path / "history.db"))
+    monkeypatch.setenv("PLATEGEN_QUEUE", str(tmp_path / "queue"))
+    return tmp_path
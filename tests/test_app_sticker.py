@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from app_sticker import OutputIndex
+
+
+def _write(index, name):
+    path = index.docs_dir / f"Sticker_{name}.docx"
+    path.write_bytes(b"docx")
+    customer, job_no, op_no, product = OutputIndex.parse_filename(path.name)
+    index.record(str(path), job_no, op_no, product, customer)
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    docs = tmp_path / "Output"
+    docs.mkdir()
+    return OutputIndex(tmp_path / "index.db", docs)
+
+
+def test_regenerated_order_is_a_duplicate(index):
+    _write(index, "ACME_J1_OP1_UPS")
+    _write(index, "ACME_J1_OP1_UPS")
+    _write(index, "ACME_J2_OP1_UPS")
+    (group,) = index.duplicates()
+    assert len(group) == 2 and {row["job_no"] for row in group} == {"J1"}
+
+
+def test_removed_files_leave_the_generation_log(index):
+    first = _write(index, "ACME_J1_OP1_UPS")
+    _write(index, "Acme Ltd_J1_OP1_UPS")
+    assert len(index.duplicates()) == 1
+    first.unlink()
+    index.remove([str(first)])
+    assert index.duplicates() == []
+    assert len(index.all_entries()) == 1
+
+
+def test_rebuild_drops_generations_of_vanished_files(index):
+    first = _write(index, "ACME_J1_OP1_UPS")
+    _write(index, "ACME_J1_OP1_UPS")
+    first.unlink()  # deleted outside the app
+    assert len(index.duplicates()) == 1
+    assert index.rebuild() == 0
+    assert index.duplicates() == []
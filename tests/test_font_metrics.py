@@ -0,0 +1,55 @@
+import pytest
+
+import font_metrics
+from font_metrics import FontMetrics, fit_height, text_width, wrap
+
+
+def test_font_files_match_the_built_in_metrics():
+    font = font_metrics.metrics()
+    fallback = FontMetrics.fallback()
+    assert font.name != fallback.name, "font/Consolas.ttf was not found"
+    assert font.units("CHARGER-I") * fallback.units_per_em == fallback.units("CHARGER-I") * font.units_per_em
+    assert font.cap_height / font.units_per_em == pytest.approx(fallback.cap_height / fallback.units_per_em)
+
+
+def test_width_scales_with_height_and_length():
+    assert text_width("", 3.0) == 0
+    assert text_width("MCCB", 6.0) == pytest.approx(2 * text_width("MCCB", 3.0))
+    # Monospaced: every character has the same advance
+    assert text_width("iiii", 3.0) == pytest.approx(text_width("WWWW", 3.0))
+    assert text_width("12", 3.0) == pytest.approx(text_width("1", 3.0) * 2)
+
+
+def test_characters_outside_the_font_take_the_default_advance():
+    font = font_metrics.metrics()
+    assert font.advance("\U0001F600") == font.default_advance
+    assert text_width("±5%", 3.0) > 0
+
+
+def test_fit_height_limits():
+    text = "415V, 3 PHASE, 4 WIRES, 50HZ"
+    assert fit_height(text, 4.0, 1000.0) == 4.0
+    fitted = fit_height(text, 4.0, 40.0)
+    assert text_width(text, fitted) == pytest.approx(40.0)
+    assert fit_height(text, 4.0, 40.0, min_height=3.5) == 3.5
+    assert fit_height("", 4.0, 0.0) == 4.0
+
+
+def test_wrap_breaks_between_words_only():
+    lines = wrap("DUAL FLOAT CUM BOOST CHARGER", 12 * text_width("X", 3.0), 3.0)
+    assert lines == ["DUAL FLOAT", "CUM BOOST", "CHARGER"]
+    assert wrap("UNBREAKABLEWORD", 5.0, 3.0) == ["UNBREAKABLEWORD"]
+    assert wrap("A\nB", 100.0, 3.0) == ["A", "B"]
+
+
+def test_subset_keeps_only_the_used_outlines(tmp_path):
+    path = font_metrics.font_path(bold=True)
+    data = font_metrics.subset(path, "CHARGER-I 415V")
+    with open(path, "rb") as f:
+        assert len(data) < len(f.read()) / 4
+    assert font_metrics._checksum(data) == 0xB1B0AFBA
+    subset_file = tmp_path / "subset.ttf"
+    subset_file.write_bytes(data)
+    font = FontMetrics.from_file(str(subset_file))
+    assert font.units("CHARGER-I") == font_metrics.metrics(bold=True).units("CHARGER-I")
+    assert "GPOS" not in font_metrics._tables(data)
@@ -0,0 +1,148 @@
+import os
+import sys
+import json
+import socket
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import job_daemon
+from job_daemon import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    # Lanes on threads: the claim logic is what is under test, not the process pool
+    monkeypatch.setattr(JobQueue, "_executor", lambda self, lane: self.lanes.setdefault(
+        lane, ThreadPoolExecutor(max_workers=self.lane_sizes[lane])))
+    q = JobQueue(tmp_path / "queue", cpu_lanes=1)
+    yield q
+    for executor in q.lanes.values():
+        executor.shutdown(wait=True)
+
+
+def _drain(q):
+    while q.in_flight:
+        job_daemon.wait([future for _, future in q.in_flight.values()])
+        q.reap()
+
+
+def test_lanes(queue):
+    assert job_daemon.lane_for({"kind": "plates"}) == "acad"
+    assert job_daemon.lane_for({"kind": "plates", "export": "x.pdf"}) == "cpu"
+    assert job_daemon.lane_for({"kind": "sticker"}) == "cpu"
+
+
+def test_claim_respects_the_lane_size(queue, monkeypatch):
+    release = threading.Event()
+    run_job = job_daemon.run_job
+
+    def blocked_job(job, out_dir):
+        release.wait(5)
+        return run_job(job, out_dir)
+
+    monkeypatch.setattr(job_daemon, "run_job", blocked_job)
+    for n in range(3):
+        queue.submit({"kind": "bogus", "n": n})
+    assert queue.claim() == 1
+    assert queue.claim() == 0
+    assert len(queue.pending()) == 2
+    release.set()
+    _drain(queue)
+    assert queue.status()["failed"] == 1
+
+
+def test_job_taken_by_another_daemon_is_skipped(queue, tmp_path, monkeypatch):
+    path = queue.submit({"kind": "bogus"})
+    stale = queue.pending()
+    other = JobQueue(tmp_path / "queue", cpu_lanes=1)
+    monkeypatch.setattr(other, "_executor", queue._executor)
+    assert other.claim() == 1
+    # This daemon listed the file before the other one moved it to running
+    monkeypatch.setattr(queue, "pending", lambda: stale)
+    assert queue.claim() == 0
+    assert not queue.in_flight
+    assert [job_daemon.job_name(p) for p in other.in_flight] == [path.name]
+    _drain(other)
+    assert queue.status() == {"inbox": 0, "running": 0, "done": 0, "failed": 1}
+
+
+def test_two_daemons_claim_each_job_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(JobQueue, "_executor", lambda self, lane: self.lanes.setdefault(
+        lane, ThreadPoolExecutor(max_workers=self.lane_sizes[lane])))
+    queues = [JobQueue(tmp_path / "queue", cpu_lanes=50) for _ in range(2)]
+    for n in range(40):
+        queues[0].submit({"kind": "bogus", "n": n})
+    start = threading.Barrier(2)
+
+    def claim(q):
+        start.wait()
+        return q.claim()
+
+    with ThreadPoolExecutor(2) as pool:
+        started = list(pool.map(claim, queues))
+    assert sum(started) == 40
+    for q in queues:
+        _drain(q)
+        for executor in q.lanes.values():
+            executor.shutdown()
+    assert queues[0].status() == {"inbox": 0, "running": 0, "done": 0, "failed": 40}
+
+
+def test_invalid_and_unknown_jobs_fail_with_a_reason(queue):
+    (queue.folder("inbox") / "broken.json").write_text("{not json", encoding="utf-8")
+    queue.submit({"kind": "nope"})
+    queue.claim()
+    _drain(queue)
+    results = [json.loads(p.read_text(encoding="utf-8"))
+               for p in queue.folder("failed").glob("*" + job_daemon.RESULT_SUFFIX)]
+    messages = sorted(r["message"] for r in results)
+    assert messages[0].startswith("Invalid job file")
+    assert "Unknown job kind 'nope'" in messages[1]
+
+
+def _stopped_pid():
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+
+def test_recover_requeues_jobs_of_stopped_daemons_only(queue):
+    host = socket.gethostname()
+    owners = {"legacy": "", "stopped": f"{host}@{_stopped_pid()}@",
+              "alive": f"{host}@{os.getpid()}@", "remote": f"other-host@{_stopped_pid()}@"}
+    for name, prefix in owners.items():
+        path = queue.submit({"kind": "bogus"})
+        path.replace(queue.folder("running") / f"{prefix}{name}.json")
+    assert queue.recover() == 2
+    assert sorted(p.name for p in queue.pending()) == ["legacy.json", "stopped.json"]
+    assert sorted(job_daemon.job_name(p) for p in queue.folder("running").glob("*.json")) == [
+        "alive.json", "remote.json"]
+
+
+def test_running_job_claimed_by_this_daemon_is_not_recovered_by_another(queue, tmp_path, monkeypatch):
+    release = threading.Event()
+    run_job = job_daemon.run_job
+    monkeypatch.setattr(job_daemon, "run_job", lambda job, out_dir: release.wait(5) and run_job(job, out_dir))
+    queue.submit({"kind": "bogus"})
+    assert queue.claim() == 1
+    assert JobQueue(tmp_path / "queue").recover() == 0
+    release.set()
+    _drain(queue)
+    assert queue.status() == {"inbox": 0, "running": 0, "done": 0, "failed": 1}
+
+
+def test_finish_tolerates_a_vanished_running_file(queue):
+    running = queue.folder("running") / "gone.json"
+    queue._finish(running, {"ok": True, "message": "", "outputs": [], "ms": 0.0})
+    assert (queue.folder("done") / ("gone" + job_daemon.RESULT_SUFFIX)).exists()
+
+
+def test_submit_never_overwrites(queue, tmp_path):
+    job_file = tmp_path / "job.json"
+    job_file.write_text(json.dumps({"kind": "bogus"}), encoding="utf-8")
+    first, second = queue.submit(job_file), queue.submit(job_file)
+    assert first != second
+    assert not list(queue.folder("inbox").glob(".job-*"))
@@ -0,0 +1,44 @@
+import font_metrics
+import outgoing_table
+from outgoing_table import aggregate, choose_columns, outgoing_text, pack
+
+FEEDERS = [
+    {"rating": 63, "poles": 3, "type": "MCCB", "count": 2},
+    {"rating": 32, "poles": 1, "type": "MCB", "count": 4},
+    {"rating": 63, "poles": 3, "type": " mccb ", "count": 1},
+    {"rating": 63, "poles": 4, "type": "MCCB"},
+]
+
+
+def test_aggregate_merges_in_first_seen_order():
+    assert aggregate(FEEDERS) == [("63", "3", "MCCB", 3), ("32", "1", "MCB", 4), ("63", "4", "MCCB", 1)]
+    assert aggregate([]) == []
+
+
+def test_pack_pads_the_last_row():
+    entries = aggregate(FEEDERS)
+    rows = pack(entries, 2)
+    assert rows == [[outgoing_text(entries[0]), outgoing_text(entries[1])], [outgoing_text(entries[2]), ""]]
+    assert pack(entries, 3) == [[outgoing_text(e) for e in entries]]
+
+
+def test_pack_without_entries_is_one_empty_row():
+    assert pack([], 3) == [["", "", ""]]
+
+
+def test_choose_columns_limits():
+    entries = aggregate(FEEDERS)
+    assert choose_columns(entries, 400, 2.5, columns=9) == outgoing_table.MAX_COLUMNS
+    assert choose_columns(entries, 400, 2.5, columns=2) == 2
+    assert choose_columns([], 400, 2.5) == 1
+    # Never more columns than entries, however wide the table
+    assert choose_columns(entries, 10000, 2.5) == len(entries)
+
+
+def test_choose_columns_fits_the_widest_entry():
+    entries = [(str(r), "3", "MCCB", 1) for r in (10, 16, 20, 25, 32, 40)]
+    widest = max(font_metrics.text_width(outgoing_text(e), 2.5) for e in entries)
+    table_width = 3 * (widest + outgoing_table.CELL_PADDING)
+    assert choose_columns(entries, table_width, 2.5) == 3
+    assert choose_columns(entries, table_width - 1, 2.5) == 2
+    assert choose_columns(entries, widest, 2.5) == 1
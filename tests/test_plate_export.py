@@ -0,0 +1,16 @@
+import base64
+import re
+
+from plate_export import SvgSheet
+
+
+def test_svg_embeds_a_subset_per_weight(tmp_path):
+    sheet = SvgSheet(600, 400)
+    sheet.text(10, 10, "RATING PLATE", 3.0)
+    sheet.text(10, 20, "", 3.0, bold=True)
+    path = tmp_path / "sheet.svg"
+    sheet.save(str(path))
+    svg = path.read_text(encoding="utf-8")
+    fonts = re.findall(r"base64,([A-Za-z0-9+/=]+)", svg)
+    assert len(fonts) == 1 and "font-weight:bold" not in svg
+    assert len(base64.b64decode(fonts[0])) < 40000
@@ -0,0 +1,71 @@
+import pytest
+
+import plate_history
+from plate_history import SnapshotStore, _fts_query
+
+BCH = {"project_no": 1077, "order_no": 12, "year": 2025, "charger_type": "DUAL FCBC", "dc_voltage": 110}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # The laid-out plate texts need the tool modules (Qt); index a fixed text instead
+    monkeypatch.setattr(plate_history, "_plate_text", lambda tool, config: ["63A 3P MCCB - 2 NOS."])
+    return SnapshotStore(tmp_path / "history.db")
+
+
+def test_fts_query_quotes_every_word():
+    assert _fts_query('63A "dual') == '"63A"* """dual"*'
+    assert _fts_query("  ") == ""
+
+
+@pytest.mark.parametrize("text", ['"', "NEAR(", "a OR", "-x", "*", "AND NOT", "col:1077", "(xyz", "'"])
+def test_search_never_fails_on_fts_syntax(store, text):
+    store.record("bch", BCH)
+    assert store.search(text) == []
+
+
+def test_punctuation_is_matched_as_text(store):
+    store.record("bch", BCH)
+    assert len(store.search("(dual")) == 1
+    assert len(store.search('"1077"')) == 1
+
+
+def test_search_by_words_fields_and_plate_text(store):
+    first = store.record("bch", BCH, "ACME 110V")
+    second = store.record("bch", dict(BCH, order_no=13, charger_type="FCBC"), "ACME 110V")
+    assert [s.id for s in store.search("dual 1077")] == [first]
+    assert {s.id for s in store.search("acme")} == {first, second}
+    assert [s.id for s in store.search("", order_no=13)] == [second]
+    assert len(store.search("63A MCCB")) == 2
+    assert store.search("acme", tool="db") == []
+
+
+def test_recording_again_keeps_one_snapshot(store):
+    first = store.record("bch", BCH, "old label")
+    assert store.record("bch", dict(BCH), "new label") == first
+    assert store.count() == 1
+    (snap,) = store.get([first])
+    assert (snap.uses, snap.label) == (2, "new label")
+    if store.fts:
+        assert store.search("new label") and not store.search("old")
+
+
+def test_like_fallback(store):
+    store.fts = False
+    store.record("bch", BCH, "ACME")
+    assert len(store.search("dual acme")) == 1
+    assert store.search("dual xyz") == []
+
+
+def test_unknown_tool_and_snapshot(store):
+    with pytest.raises(ValueError):
+        store.record("xyz", BCH)
+    with pytest.raises(KeyError):
+        store.get([99])
+
+
+def test_delete_drops_the_text_index(store):
+    snapshot_id = store.record("bch", BCH)
+    store.delete([snapshot_id])
+    assert store.count() == 0
+    assert store.search("dual") == []
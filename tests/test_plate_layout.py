@@ -0,0 +1,105 @@
+import pytest
+
+import font_metrics
+import plate_layout
+from plate_layout import LayoutError, LayoutPlan, evaluate
+
+
+def _text_plan(**item):
+    template = {"items": [dict({"text": "{value}", "at": [0, 0], "height": 5}, **item)]}
+    plan = LayoutPlan("test", template, {})
+    return plan, plan.ops[-1]
+
+
+def test_expressions():
+    env = {"plate_width": 150, "rows": 3}
+    assert evaluate("plate_width / 2 - max(rows, 1) * 10", env) == 45
+    assert evaluate(7.5, env) == 7.5
+
+
+@pytest.mark.parametrize("source", ["__import__('os')", "plate_width.real", "open('x')",
+                                    "[x for x in ()]", "lambda: 1"])
+def test_expressions_reject_anything_but_arithmetic(source):
+    with pytest.raises(LayoutError):
+        evaluate(source, {"plate_width": 150})
+
+
+def test_unknown_name_is_a_layout_error():
+    with pytest.raises(LayoutError, match="Cannot evaluate"):
+        evaluate("missing + 1", {})
+
+
+def test_repeated_rows_stack_downwards():
+    template = {"top": 100, "row_x": [0, 150], "rows": [
+        {"id": "out", "height": 10, "repeat": 3,
+         "items": [{"text": "{outgoing[#]}", "at": [2, "top - 8"], "height": 3}]},
+    ]}
+    plan = LayoutPlan("test", template, {})
+    assert plan.bounds() == (0, 70, 150, 100)
+    assert [op.text for op in plan.ops if op.kind == "text"] == ["{outgoing[0]}", "{outgoing[1]}", "{outgoing[2]}"]
+    assert (plan.env["out_top"], plan.env["out_bottom"]) == (100, 70)
+
+
+def test_fit_shrinks_to_the_cell():
+    _plan, op = _text_plan(fit=30)
+    text = "63A 3P MCCB - 12 NOS."
+    height, width, overflow = LayoutPlan.fit_text(op, text)
+    assert height < 5
+    assert width == pytest.approx(30)
+    assert overflow is None
+    assert font_metrics.text_width(text, height) == pytest.approx(30)
+
+
+def test_fit_keeps_short_text_at_full_height():
+    _plan, op = _text_plan(fit=100)
+    assert LayoutPlan.fit_text(op, "63A")[:1] == (5,)
+
+
+def test_fit_stops_at_min_height_and_reports_the_overflow():
+    plan, op = _text_plan(fit=10, min_height=2.5)
+    text = "400A 4P ACB - 1 NOS."
+    height, width, overflow = LayoutPlan.fit_text(op, text)
+    assert height == 2.5
+    assert width > 10
+    assert overflow and "the cell is 10 mm" in overflow
+    assert len(plan.overflows({"value": text})) == 1
+    assert plan.overflows({"value": "1A"}) == []
+
+
+def test_fit_block_never_goes_below_its_floor():
+    text = "UNINTERRUPTIBLE POWER SUPPLY SYSTEM WITH ISOLATION TRANSFORMER"
+    height, lines, fits = font_metrics.fit_block(text, 5.0, 40.0, 6.0, min_height=2.0)
+    assert (height, fits) == (2.0, False)
+    height, lines, fits = font_metrics.fit_block(text, 5.0, 60.0, 30.0)
+    assert fits and height <= 5.0
+    assert font_metrics.block_height(len(lines), height) <= 30.0
+
+
+def test_empty_texts_are_not_drawn():
+    class Space:
+        def __init__(self):
+            self.texts = []
+
+        def AddText(self, text, point, height):
+            self.texts.append(text)
+            return self
+
+    plan = LayoutPlan("test", {"items": [{"text": "{a}", "at": [0, 0], "height": 3},
+                                         {"text": "{b}", "at": [0, 5], "height": 3}]}, {})
+    space = Space()
+    plan._emit(space, plan.buffer, 0, (0.0, 0.0), plan.values({"a": "X"}), {})
+    assert space.texts == ["X"]
+
+
+def test_extent_covers_dimensions_and_logo():
+    template = {"items": [
+        {"rect": [0, 0, 100, 50]},
+        {"dimension": "aligned", "from": [0, 0], "to": [100, 0], "at": [50, -8]},
+        {"block": "logo.dwg", "at": [90, 40], "size": [20, 15]},
+    ]}
+    plan = LayoutPlan("test", template, {})
+    assert plan.bounds() == (0, 0, 100, 50)
+    xmin, ymin, xmax, ymax = plan.extent()
+    assert ymin <= -8 - plate_layout.DIMENSION_TEXT_HEIGHT
+    assert (xmax, ymax) == (110, 55)
+    assert plan.extent(dimensions=False)[1] == 0
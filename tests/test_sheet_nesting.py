@@ -0,0 +1,64 @@
+import pytest
+
+import sheet_nesting
+from sheet_nesting import Item, pack, sheet_count
+
+
+def _overlap(a, b, kerf):
+    """True if placements ``a`` and ``b`` on one sheet are closer than ``kerf``."""
+    return (a.x < b.x + b.width + kerf - 1e-9 and b.x < a.x + a.width + kerf - 1e-9
+            and a.y < b.y + b.height + kerf - 1e-9 and b.y < a.y + a.height + kerf - 1e-9)
+
+
+def _check(placements, sheet_width, sheet_height, kerf, margin=0.0):
+    for p in placements:
+        assert p.x >= margin - 1e-9 and p.y >= margin - 1e-9
+        assert p.x + p.width <= sheet_width - margin + 1e-9
+        assert p.y + p.height <= sheet_height - margin + 1e-9
+    for i, a in enumerate(placements):
+        for b in placements[i + 1:]:
+            if a.sheet == b.sheet:
+                assert not _overlap(a, b, kerf), (a, b)
+
+
+@pytest.mark.parametrize("allow_rotate", [False, True])
+def test_mixed_plates_do_not_overlap(allow_rotate):
+    items = ([Item(150, 113, "bch")] * 20 + [Item(185, 125, "ups")] * 7
+             + [Item(150, 96, "db")] * 11 + [Item(60, 250, "tall")] * 3)
+    placements = pack(items, 600, 400, kerf=10, margin=5, allow_rotate=allow_rotate)
+    assert [p.item for p in placements] == items
+    _check(placements, 600, 400, kerf=10, margin=5)
+
+
+def test_kerf_is_not_needed_after_the_last_plate():
+    # Four 145 mm plates with three 10 mm gaps fill a 610 mm row exactly
+    placements = pack([Item(145, 100)] * 4, 610, 100, kerf=10)
+    assert sheet_count(placements) == 1
+    _check(placements, 610, 100, kerf=10)
+
+
+def test_rotation_only_when_allowed():
+    tall = Item(350, 590)
+    with pytest.raises(ValueError):
+        pack([tall], 600, 400, kerf=10)
+    (placement,) = pack([tall], 600, 400, kerf=10, allow_rotate=True)
+    assert placement.rotated
+    assert (placement.width, placement.height) == (590, 350)
+    _check([placement], 600, 400, kerf=10)
+
+
+def test_plate_larger_than_the_sheet_is_rejected():
+    with pytest.raises(ValueError, match="does not fit"):
+        pack([Item(700, 100)], 600, 400, allow_rotate=True)
+
+
+def test_new_sheet_only_when_full():
+    placements = pack([Item(290, 190)] * 5, 600, 400, kerf=10)
+    assert sheet_count(placements) == 2
+    assert sum(p.sheet == 0 for p in placements) == 4
+
+
+def test_empty_job():
+    assert pack([]) == []
+    assert sheet_count([]) == 0
+    assert sheet_nesting.utilisation([], 600, 400) == 0.0
@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from update_check import FAILURE_BACKOFF, UpdateChecker
+
+REPO = "aamitn/plategen"
+
+
+class _Api(BaseHTTPRequestHandler):
+    """/repos/<repo>/releases/latest answering as ``server.status`` says."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get("If-None-Match")))
+        if server.status != 200:
+            self.send_response(server.status)
+            for name, value in server.error_headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({"tag_name": server.tag, "html_url": f"https://example.invalid/{server.tag}"}).encode()
+        self.send_response(200)
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Api)
+    server.requests = []
+    server.status = 200
+    server.error_headers = {}
+    server.tag, server.etag = "v1.2.0", '"etag-1"'
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    monkeypatch.setenv("PLATEGEN_GITHUB_API", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv("PLATEGEN_UPDATE_CACHE", str(tmp_path / "update_cache.json"))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _entry(checker):
+    return checker._entry(REPO)
+
+
+def test_fresh_answer_comes_from_the_cache(api):
+    assert UpdateChecker().latest(REPO) == ("v1.2.0", "https://example.invalid/v1.2.0", None)
+    assert api.requests == [(f"/repos/{REPO}/releases/latest", None)]
+    # Another process within the TTL does not ask again
+    assert UpdateChecker().latest(REPO)[0] == "v1.2.0"
+    assert len(api.requests) == 1
+
+
+def test_stale_answer_is_revalidated_with_the_etag(api):
+    UpdateChecker().latest(REPO)
+    checker = UpdateChecker(ttl=0)
+    checked = _entry(checker)["checked"]
+    assert checker.latest(REPO)[0] == "v1.2.0"
+    assert api.requests[-1] == (f"/repos/{REPO}/releases/latest", '"etag-1"')
+    assert _entry(checker)["checked"] > checked  # the 304 renewed the entry
+
+    api.tag, api.etag = "v1.3.0", '"etag-2"'
+    assert UpdateChecker(ttl=0).latest(REPO)[0] == "v1.3.0"
+    assert _entry(checker)["etag"] == '"etag-2"'
+
+
+def test_failure_backs_off_and_keeps_the_cached_release(api):
+    UpdateChecker().latest(REPO)
+    api.status = 500
+    checker = UpdateChecker(ttl=0)
+    assert checker.latest(REPO) == ("v1.2.0", "https://example.invalid/v1.2.0", None)
+    entry = _entry(checker)
+    assert entry["error"] == "HTTP 500"
+    assert entry["retry_at"] == pytest.approx(time.time() + FAILURE_BACKOFF, abs=5)
+
+    requests = len(api.requests)
+    assert UpdateChecker(ttl=0).latest(REPO)[0] == "v1.2.0"
+    assert len(api.requests) == requests  # backing off
+    assert UpdateChecker(ttl=0).latest(REPO, force=True) == (None, None, "HTTP 500")
+    assert len(api.requests) == requests + 1
+
+
+def test_rate_limit_waits_for_the_reset(api):
+    reset = time.time() + 3 * FAILURE_BACKOFF
+    api.status = 403
+    api.error_headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(reset))}
+    checker = UpdateChecker()
+    assert checker.latest(REPO) == (None, None, "HTTP 403")
+    assert _entry(checker)["retry_at"] == int(reset)
+    api.status = 200
+    assert UpdateChecker().latest(REPO) == (None, None, "HTTP 403")
+    assert len(api.requests) == 1
+
+
+def test_missing_release(api):
+    api.status = 404
+    assert UpdateChecker().latest(REPO) == (None, None, "No release published")
@@ -0,0 +1,308 @@
+"""
+Shared GitHub release checker for the launcher and every sub-app.
+
+Release lookups go through one cache file (by default in
+``~/Documents/Plategen``), so starting several tools - or the same tool on
+many workstations - does not hit the GitHub API every time:
+
+* A cached answer younger than the TTL (6 hours by default, with a little
+  per-repo jitter so a whole office does not refresh at the same minute)
+  is returned without any network access.
+* Once stale, the entry is revalidated with ``If-None-Match``; an
+  unchanged release answers ``304 Not Modified``, which GitHub does not
+  count against the rate limit.
+* Only one request per repo is in flight per process, and a lock file next
+  to the cache lets other processes wait for that answer instead of
+  sending their own.
+* Network failures and rate-limit responses are remembered for a short
+  back-off, and a stale cached answer is preferred to an error.
+
+Nothing here blocks the GUI: ``check_async`` runs the lookup on a daemon
+thread and calls back with ``(tag, html_url, err)``. Qt callers should emit
+a signal from the callback rather than touch widgets.
+
+The API base URL and cache location can be overridden for tests or a
+local mirror::
+
+    PLATEGEN_GITHUB_API=http://127.0.0.1:8000   (any server answering /repos/<owner>/<repo>/releases/latest)
+    PLATEGEN_UPDATE_CACHE=\\\\server\\share\\plategen_update_cache.json
+    PLATEGEN_UPDATE_TTL=21600                   (seconds)
+"""
+
+import os
+import json
+import time
+import zlib
+import logging
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://api.github.com"
+DEFAULT_CACHE_FILE = Path.home() / "Documents" / "Plategen" / "update_cache.json"
+DEFAULT_TTL = 6 * 60 * 60        # seconds a cached answer is used without asking GitHub
+TTL_JITTER = 0.1                 # up to 10% earlier refresh, spread per repo
+FAILURE_BACKOFF = 10 * 60        # seconds before retrying after a network error
+LOCK_STALE_AFTER = 30            # seconds before another process's fetch lock is ignored
+DEFAULT_TIMEOUT = 8
+
+Result = Tuple[Optional[str], Optional[str], Optional[str]]  # (tag, html_url, err)
+
+
+class UpdateChecker:
+    """
+    Cached, de-duplicated lookup of the latest release of GitHub repos.
+
+    Thread-safe; share one instance per process via get_checker().
+    """
+
+    def __init__(self, cache_path=None, api_base: Optional[str] = None,
+                 ttl: Optional[float] = None, timeout: float = DEFAULT_TIMEOUT,
+                 user_agent: str = "plategen"):
+        self.cache_path = Path(cache_path or os.environ.get("PLATEGEN_UPDATE_CACHE") or DEFAULT_CACHE_FILE)
+        self.api_base = (api_base or os.environ.get("PLATEGEN_GITHUB_API") or DEFAULT_API_BASE).rstrip("/")
+        if ttl is None:
+            ttl = float(os.environ.get("PLATEGEN_UPDATE_TTL", DEFAULT_TTL))
+        self.ttl = ttl
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, bool], Future] = {}
+        self._session: Dict[str, Result] = {}  # answers already fetched by this process
+
+    # ----- cache file -----
+
+    def _read_cache(self) -> dict:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _cache_key(self, repo: str) -> str:
+        # Answers from a stand-in server never mix with the real GitHub ones
+        return repo if self.api_base == DEFAULT_API_BASE else f"{self.api_base}|{repo}"
+
+    def _write_entry(self, repo: str, entry: dict) -> None:
+        data = self._read_cache()
+        data.setdefault("repos", {})[self._cache_key(repo)] = entry
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, prefix=".update_cache-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write update cache {self.cache_path}: {e}")
+
+    def _entry(self, repo: str) -> dict:
+        return self._read_cache().get("repos", {}).get(self._cache_key(repo), {})
+
+    def _ttl_for(self, repo: str) -> float:
+        # Same jitter every time for a repo/host, different between repos
+        spread = (zlib.crc32(f"{repo}@{os.environ.get('COMPUTERNAME', '')}".encode()) % 1000) / 1000
+        return self.ttl * (1 - TTL_JITTER * spread)
+
+    def _is_fresh(self, repo: str, entry: dict) -> bool:
+        return bool(entry.get("tag")) and time.time() - entry.get("checked", 0) < self._ttl_for(repo)
+
+    def cached(self, repo: str) -> Optional[Result]:
+        """Return the last known answer for ``repo`` without any network access, or None."""
+        with self._lock:
+            if repo in self._session:
+                return self._session[repo]
+        entry = self._entry(repo)
+        if entry.get("tag"):
+            return entry["tag"], entry.get("url"), None
+        return None
+
+    # ----- cross-process fetch lock -----
+
+    def _lock_path(self, repo: str) -> Path:
+        return self.cache_path.with_name(f".{self.cache_path.stem}-{zlib.crc32(repo.encode()):08x}.lock")
+
+    def _try_lock(self, repo: str) -> bool:
+        path = self._lock_path(repo)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - path.stat().st_mtime > LOCK_STALE_AFTER:
+                    path.unlink()
+                    return self._try_lock(repo)
+            except OSError:
+                pass
+            return False
+        except OSError:
+            return True  # cache folder not writable: just fetch
+
+    def _unlock(self, repo: str) -> None:
+        try:
+            self._lock_path(repo).unlink()
+        except OSError:
+            pass
+
+    def _wait_for_other_process(self, repo: str) -> Optional[dict]:
+        """Wait while another process holds the fetch lock; return its fresh entry if any."""
+        deadline = time.time() + self.timeout + 1
+        while time.time() < deadline:
+            time.sleep(0.25)
+            entry = self._entry(repo)
+            if self._is_fresh(repo, entry):
+                return entry
+            if not self._lock_path(repo).exists():
+                break
+        return None
+
+    # ----- lookup -----
+
+    def _request(self, repo: str, entry: dict) -> dict:
+        """Ask GitHub (or the configured stand-in) and return the new cache entry."""
+        url = f"{self.api_base}/repos/{repo}/releases/latest"
+        req = urllib.request.Request(url, headers={
+            "User-Agent": self.user_agent,
+            "Accept": "application/vnd.github+json",
+        })
+        if entry.get("etag") and entry.get("tag"):
+            req.add_header("If-None-Match", entry["etag"])
+
+        now = time.time()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                j = json.loads(resp.read().decode("utf-8"))
+                return {
+                    "tag": j.get("tag_name") or j.get("name"),
+                    "url": j.get("html_url"),
+                    "etag": resp.headers.get("ETag"),
+                    "checked": time.time(),
+                }
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return dict(entry, checked=time.time())
+            retry_at = now + FAILURE_BACKOFF
+            if e.code in (403, 429) and e.headers.get("X-RateLimit-Remaining") == "0":
+                try:
+                    retry_at = max(retry_at, float(e.headers.get("X-RateLimit-Reset")))
+                except (TypeError, ValueError):
+                    pass
+            error = "No release published" if e.code == 404 else f"HTTP {e.code}"
+        except Exception as e:
+            retry_at = now + FAILURE_BACKOFF
+            error = str(getattr(e, "reason", e))
+        return dict(entry, error=error, retry_at=retry_at)
+
+    def latest(self, repo: str, force: bool = False) -> Result:
+        """
+        Return ``(tag, html_url, err)`` for the latest release of ``owner/repo``.
+
+        Blocking; call check_async() from GUI code. ``force`` skips the TTL
+        and any back-off (the request is still conditional on the ETag).
+        """
+        if not repo or "/" not in repo:
+            return None, None, "No repo configured"
+
+        with self._lock:
+            key = (repo, force)
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                if not force and repo in self._session:
+                    return self._session[repo]
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._lookup(repo, force)
+        except Exception as e:  # never let a callback thread die silently
+            result = (None, None, str(e))
+        with self._lock:
+            if result[0]:
+                self._session[repo] = result
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def _lookup(self, repo: str, force: bool) -> Result:
+        entry = self._entry(repo)
+        if not force:
+            if self._is_fresh(repo, entry):
+                return entry["tag"], entry.get("url"), None
+            if entry.get("retry_at", 0) > time.time():
+                if entry.get("tag"):
+                    return entry["tag"], entry.get("url"), None
+                return None, None, entry.get("error") or "Update check postponed"
+
+        locked = self._try_lock(repo)
+        if not locked:
+            other = self._wait_for_other_process(repo)
+            if other is not None and not force:
+                return other["tag"], other.get("url"), None
+        try:
+            entry = self._request(repo, self._entry(repo) if not locked else entry)
+            self._write_entry(repo, entry)
+        finally:
+            if locked:
+                self._unlock(repo)
+
+        if entry.get("error"):
+            if entry.get("tag") and not force:
+                logger.info(f"Update check for {repo} failed ({entry['error']}); using cached {entry['tag']}")
+                return entry["tag"], entry.get("url"), None
+            return None, None, entry["error"]
+        return entry.get("tag"), entry.get("url"), None
+
+    def check_async(self, repo: str, callback: Optional[Callable[[Optional[str], Optional[str], Optional[str]], None]] = None,
+                    force: bool = False) -> Future:
+        """
+        Look up ``repo`` on a daemon thread.
+
+        ``callback(tag, html_url, err)`` runs on that thread; from Qt code,
+        emit a signal in it. Returns a Future with the same tuple.
+        """
+        future: Future = Future()
+
+        def run():
+            result = self.latest(repo, force=force)
+            future.set_result(result)
+            if callback is not None:
+                try:
+                    callback(*result)
+                except Exception as e:
+                    logger.warning(f"Update check callback failed: {e}")
+
+        threading.Thread(target=run, name="update-check", daemon=True).start()
+        return future
+
+
+_checker: Optional[UpdateChecker] = None
+_checker_lock = threading.Lock()
+
+
+def get_checker() -> UpdateChecker:
+    """Return the process-wide checker (shared by hosted sub-apps)."""
+    global _checker
+    with _checker_lock:
+        if _checker is None:
+            _checker = UpdateChecker()
+        return _checker
+
+
+def latest_release(repo: str, force: bool = False) -> Result:
+    """Blocking ``(tag, html_url, err)`` lookup through the shared checker."""
+    return get_checker().latest(repo, force=force)
+
+
+def check_async(repo: str, callback=None, force: bool = False) -> Future:
+    """Non-blocking lookup through the shared checker; see UpdateChecker.check_async."""
+    return get_checker().check_async(repo, callback, force=force)